@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency for batch runs.
+
+Instead of a fixed worker count, batches run as many submissions at once as the
+host can take. ``AdaptiveConcurrency`` samples the load average (per CPU), the
+share of memory still available and the summed RSS of this process's children
+(the Playwright driver and every Chromium process) every few seconds and moves
+the in-flight limit AIMD-style: any pressure signal cuts it multiplicatively,
+and only when every signal has headroom *and* the current limit is actually in
+use does it grow by one. Memory and browser RSS pressure cut at once; the load
+average lags, so a load-only cut waits until the previous cut has shown up in it
+(``cooldown``, at least one load-average window). Every change is logged with
+the reading that caused it.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional
+
+# resource_usage lives with the submission scripts; do not rely on the caller's sys.path
+_SUBMISSION_DIR = Path(__file__).resolve().parent / "submission"
+if str(_SUBMISSION_DIR) not in sys.path:
+    sys.path.append(str(_SUBMISSION_DIR))
+
+from resource_usage import children_rss_bytes
+
+# Pressure thresholds; growth additionally needs this much headroom below them
+DEFAULT_MAX_LOAD_PER_CPU = 1.5
+DEFAULT_MIN_FREE_MEMORY = 0.15
+DEFAULT_MAX_BROWSER_SHARE = 0.7  # of total memory, when no explicit RSS cap is given
+HEADROOM = 0.75
+# Seconds the 1-minute load average needs to reflect a cut
+LOAD_AVERAGE_WINDOW = 60.0
+
+
+@dataclass
+class HostSample:
+    """One reading of the signals the controller steers by."""
+
+    load_per_cpu: float
+    free_memory: float  # MemAvailable / MemTotal, 0..1
+    total_memory_mb: float
+    browser_rss_mb: float
+
+
+def _read_meminfo() -> tuple:
+    """Return (MemTotal, MemAvailable) in kB; (0, 0) when /proc/meminfo is unavailable."""
+    total = available = 0
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    total = int(line.split()[1])
+                elif line.startswith("MemAvailable:"):
+                    available = int(line.split()[1])
+                if total and available:
+                    break
+    except (OSError, ValueError, IndexError):
+        return 0, 0
+    return total, available
+
+
+def sample_host() -> HostSample:
+    """Read load, memory and browser RSS (Linux /proc; neutral values elsewhere)."""
+    try:
+        load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (OSError, AttributeError):
+        load_per_cpu = 0.0
+    total_kb, available_kb = _read_meminfo()
+    return HostSample(
+        load_per_cpu=load_per_cpu,
+        free_memory=available_kb / total_kb if total_kb else 1.0,
+        total_memory_mb=total_kb / 1024,
+        browser_rss_mb=children_rss_bytes() / (1024 * 1024),
+    )
+
+
+def _log_stderr(message: str) -> None:
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight submissions, steered by host load, free memory and browser RSS.
+
+    Workers take a slot with ``async with controller.slot():``. Lowering the limit
+    never interrupts running jobs; new slots are simply withheld until enough of
+    them finish.
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        initial: Optional[int] = None,
+        interval: float = 10.0,
+        cooldown: float = 30.0,
+        max_load_per_cpu: float = DEFAULT_MAX_LOAD_PER_CPU,
+        min_free_memory: float = DEFAULT_MIN_FREE_MEMORY,
+        max_browser_rss_mb: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: int = 1,
+        sampler: Callable[[], HostSample] = sample_host,
+        log: Callable[[str], None] = _log_stderr,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self._limit = min(self.max_limit, max(self.min_limit, initial if initial is not None else self.min_limit * 2))
+        self.interval = interval
+        self.cooldown = cooldown
+        self.max_load_per_cpu = max_load_per_cpu
+        self.min_free_memory = min_free_memory
+        self.max_browser_rss_mb = max_browser_rss_mb
+        self.decrease_factor = decrease_factor
+        self.increase_step = max(1, increase_step)
+        self.sampler = sampler
+        self.log = log
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.last_sample: Optional[HostSample] = None
+        self.changes = 0
+        self._saturated = False  # the limit was reached since the last adjustment
+        self._last_decrease = float("-inf")
+        self._cond = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    # ---------------------------------------------------------------- slots
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self._limit)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.in_flight >= self._limit:
+                self._saturated = True
+
+    async def release(self) -> None:
+        async with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            await self.release()
+
+    def observe(self, in_flight: int) -> None:
+        """For callers that size their own work from ``limit`` instead of taking slots."""
+        self.in_flight = in_flight
+        self.peak_in_flight = max(self.peak_in_flight, in_flight)
+        if in_flight >= self._limit:
+            self._saturated = True
+
+    # ------------------------------------------------------------- steering
+
+    def _rss_cap(self, sample: HostSample) -> Optional[float]:
+        if self.max_browser_rss_mb:
+            return self.max_browser_rss_mb
+        if sample.total_memory_mb:
+            return sample.total_memory_mb * DEFAULT_MAX_BROWSER_SHARE
+        return None
+
+    def _load_pressure(self, sample: HostSample) -> List[str]:
+        if sample.load_per_cpu > self.max_load_per_cpu:
+            return [f"load {sample.load_per_cpu:.2f}/cpu > {self.max_load_per_cpu:.2f}"]
+        return []
+
+    def _memory_pressure(self, sample: HostSample) -> List[str]:
+        reasons = []
+        if sample.free_memory < self.min_free_memory:
+            reasons.append(f"free memory {sample.free_memory:.0%} < {self.min_free_memory:.0%}")
+        rss_cap = self._rss_cap(sample)
+        if rss_cap and sample.browser_rss_mb > rss_cap:
+            reasons.append(f"browser RSS {sample.browser_rss_mb:.0f} MB > {rss_cap:.0f} MB")
+        return reasons
+
+    def _blocked_growth(self, sample: HostSample) -> Optional[str]:
+        """Why one more slot is not safe yet (None when it is)."""
+        if sample.load_per_cpu > self.max_load_per_cpu * HEADROOM:
+            return f"load {sample.load_per_cpu:.2f}/cpu near limit"
+        if sample.free_memory < min(1.0, self.min_free_memory / HEADROOM):
+            return f"free memory {sample.free_memory:.0%} near limit"
+        rss_cap = self._rss_cap(sample)
+        if rss_cap and self.in_flight:
+            # Room for one more job's worth of browser memory?
+            projected = sample.browser_rss_mb * (self.in_flight + 1) / self.in_flight
+            if projected > rss_cap * HEADROOM:
+                return f"browser RSS would reach {projected:.0f} MB"
+        return None
+
+    def adjust(self, sample: HostSample, now: Optional[float] = None) -> Optional[str]:
+        """Apply one AIMD step for ``sample``; returns the logged reason when the limit changed."""
+        now = time.monotonic() if now is None else now
+        self.last_sample = sample
+        try:
+            return self._adjust(sample, now)
+        finally:
+            # Growth needs the (possibly new) limit to be reached again
+            self._saturated = self.in_flight >= self._limit
+
+    def _adjust(self, sample: HostSample, now: float) -> Optional[str]:
+        old = self._limit
+        memory = self._memory_pressure(sample)
+        load = self._load_pressure(sample)
+        if load and not memory and now - self._last_decrease < max(self.cooldown, LOAD_AVERAGE_WINDOW):
+            # The load average still reflects the limit before the last cut
+            return None
+        pressure = memory + load
+        if pressure:
+            new = max(self.min_limit, math.floor(old * self.decrease_factor))
+            self._last_decrease = now
+            if new == old:
+                return None
+            reason = f"⚖️  Concurrency {old} → {new}: " + "; ".join(pressure)
+        else:
+            if (
+                old >= self.max_limit
+                or not self._saturated
+                or now - self._last_decrease < self.cooldown
+                or self._blocked_growth(sample)
+            ):
+                return None
+            new = min(self.max_limit, old + self.increase_step)
+            reason = (
+                f"⚖️  Concurrency {old} → {new}: all {old} slots busy with headroom "
+                f"(load {sample.load_per_cpu:.2f}/cpu, free memory {sample.free_memory:.0%}, "
+                f"browser RSS {sample.browser_rss_mb:.0f} MB)"
+            )
+        self._limit = new
+        self.changes += 1
+        return reason
+
+    async def _notify(self) -> None:
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def step(self) -> Optional[str]:
+        """Sample the host once and adjust."""
+        try:
+            sample = await asyncio.get_running_loop().run_in_executor(None, self.sampler)
+        except Exception as e:
+            self.log(f"⚠️  Concurrency sampling failed: {str(e)[:120]}")
+            return None
+        reason = self.adjust(sample)
+        if reason:
+            self.log(reason)
+            await self._notify()
+        return reason
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.step()
+
+    def start(self) -> "AdaptiveConcurrency":
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,586 @@
+"""
+Lease-based claiming of ``AutomationBatchItem`` rows for the multi-node batch runner.
+
+Any number of runners (on any number of hosts) share one batch through the
+database. Each runner claims pending items with ``FOR UPDATE SKIP LOCKED`` so
+concurrent claims never block on, or return, the same row, and stamps them with
+its ``leaseOwner`` and a ``leaseExpiresAt`` deadline. A heartbeat keeps the
+leases of in-flight items alive; an item whose lease has passed (its runner
+crashed or lost the database) is claimable again until ``attemptCount`` exceeds
+the run's ``retryLimit``. Every write that finishes an item is guarded by
+``leaseOwner`` so a runner that lost its lease can never overwrite the result
+of the runner that took over.
+
+Finished items go through ``WriteBehindBuffer``: outcomes are coalesced per
+item and flushed in one transaction every few hundred milliseconds (or once
+enough have piled up). The run's counters are moved by atomic increments in
+that same transaction, so concurrent runners never read-modify-write the shared
+``AutomationBatchRun`` row; a full recount only happens when a runner exits.
+
+Claims are domain-sharded: a domain that already has a live lease is never
+claimed again until that item finishes or its lease runs out, so runners (and
+the workers inside one runner) do not hit the same site at once.
+
+Table and column names are the Prisma ones (see prisma/schema.prisma).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# The DSN helper is shared with the form cache in the submission scripts
+_SUBMISSION_DIR = Path(__file__).resolve().parent / "submission"
+if str(_SUBMISSION_DIR) not in sys.path:
+    sys.path.append(str(_SUBMISSION_DIR))
+
+from form_cache import normalize_dsn
+
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_FLUSH_INTERVAL = 0.25
+DEFAULT_FLUSH_EVENTS = 100
+# Failed write-behind flushes retry after flush_interval, doubling up to this
+MAX_FLUSH_BACKOFF = 10.0
+
+# Mirrors src/lib/automation-batches.ts
+SUCCESS_STATUSES = ("success", "submitted", "completed")
+FAILURE_STATUSES = ("failed", "error", "timeout")
+STOPPED_RUN_STATUSES = ("paused", "cancelled")
+
+# Domain-sharded: a domain with a live lease anywhere (any run, any runner) is skipped, one
+# item per domain is taken per claim, and a transaction-scoped advisory lock on the domain
+# keeps two runners claiming at the same moment from both taking it.
+_CLAIM_SQL = """
+WITH candidates AS (
+    SELECT i.id, i."domainId", i."batchRunId", i.sequence
+    FROM "AutomationBatchItem" i
+    JOIN "AutomationBatchRun" r ON r.id = i."batchRunId"
+    WHERE ($1::int IS NULL OR i."batchRunId" = $1)
+      AND r.status <> ALL($5::text[])
+      AND (i.status = 'pending' OR (i.status = 'running' AND i."leaseExpiresAt" < now()))
+      AND i."attemptCount" <= r."retryLimit"
+      AND NOT EXISTS (
+          SELECT 1 FROM "AutomationBatchItem" o
+          WHERE o."domainId" = i."domainId"
+            AND o.id <> i.id
+            AND o.status = 'running'
+            AND o."leaseExpiresAt" >= now()
+      )
+    ORDER BY i."batchRunId", i.sequence
+    LIMIT $2
+    FOR UPDATE OF i SKIP LOCKED
+),
+claimable AS (
+    SELECT id
+    FROM (
+        SELECT DISTINCT ON ("domainId") id, "domainId", "batchRunId", sequence
+        FROM candidates
+        ORDER BY "domainId", "batchRunId", sequence
+    ) one_per_domain
+    WHERE pg_try_advisory_xact_lock(hashtext('teq-batch-domain'), "domainId")
+)
+UPDATE "AutomationBatchItem" i
+SET status = 'running',
+    "leaseOwner" = $3,
+    "leaseExpiresAt" = now() + make_interval(secs => $4),
+    "attemptCount" = i."attemptCount" + 1,
+    "startedAt" = now(),
+    "finishedAt" = NULL,
+    "skipReason" = NULL,
+    "lastError" = NULL,
+    "updatedAt" = now()
+FROM claimable c
+WHERE i.id = c.id
+RETURNING i.id, i."batchRunId", i."domainId", i."templateId", i."attemptCount"
+"""
+
+# Items whose runner died on their last allowed attempt are failed instead of reclaimed
+_EXPIRE_SQL = """
+UPDATE "AutomationBatchItem" i
+SET status = 'failed',
+    "lastError" = 'Lease expired after ' || i."attemptCount" || ' attempt(s) (runner lost)',
+    "finishedAt" = now(),
+    "leaseOwner" = NULL,
+    "leaseExpiresAt" = NULL,
+    "updatedAt" = now()
+FROM "AutomationBatchRun" r
+WHERE r.id = i."batchRunId"
+  AND ($1::int IS NULL OR i."batchRunId" = $1)
+  AND i.status = 'running'
+  AND i."leaseExpiresAt" < now()
+  AND i."attemptCount" > r."retryLimit"
+RETURNING i."batchRunId", i.status
+"""
+
+_FINISH_LOGS_SQL = """
+UPDATE "SubmissionLog" s
+SET status = v.status, message = v.message, "finishedAt" = now()
+FROM unnest($1::int[], $2::text[], $3::text[]) AS v(id, status, message)
+WHERE s.id = v.id
+"""
+
+_FINISH_ITEMS_SQL = """
+UPDATE "AutomationBatchItem" i
+SET status = v.status,
+    "finishedAt" = now(),
+    "lastError" = v.error,
+    "leaseOwner" = NULL,
+    "leaseExpiresAt" = NULL,
+    "updatedAt" = now()
+FROM unnest($1::int[], $2::text[], $3::text[]) AS v(id, status, error)
+WHERE i.id = v.id AND i."leaseOwner" = $4
+RETURNING i.id, i."batchRunId", i.status
+"""
+
+# Counters move by deltas; every SET expression sees the row as it was before this statement
+_BUMP_RUNS_SQL = """
+UPDATE "AutomationBatchRun" r
+SET "processedDomains" = r."processedDomains" + v.done,
+    "successCount" = r."successCount" + v.success,
+    "failureCount" = r."failureCount" + v.failed,
+    "pendingCount" = GREATEST(r."pendingCount" - v.done, 0),
+    status = CASE
+        WHEN r.status = ANY($5::text[]) THEN r.status
+        WHEN r."pendingCount" - v.done > 0 THEN 'running'
+        WHEN r."failureCount" + v.failed > 0 AND r."successCount" + v.success = 0 AND r."skippedCount" = 0 THEN 'failed'
+        WHEN r."failureCount" + v.failed > 0 THEN 'completed_with_failures'
+        ELSE 'completed'
+    END,
+    "finishedAt" = CASE
+        WHEN r.status <> ALL($5::text[]) AND r."pendingCount" - v.done <= 0 THEN now()
+        ELSE r."finishedAt"
+    END,
+    "updatedAt" = now()
+FROM unnest($1::int[], $2::int[], $3::int[], $4::int[]) AS v(run_id, done, success, failed)
+WHERE r.id = v.run_id
+"""
+
+_JOB_SQL = """
+SELECT d.url AS "domainUrl", d."contactPageUrl", d."customMessage",
+       COALESCE(t.id, dt.id) AS "templateId",
+       COALESCE(t."fieldMappings", dt."fieldMappings") AS "fieldMappings",
+       EXISTS (
+           SELECT 1 FROM "SubmissionLog" s
+           WHERE s."batchRunItemId" = i.id AND lower(s.status) = ANY($2::text[])
+       ) AS "alreadySubmitted"
+FROM "AutomationBatchItem" i
+JOIN "Domain" d ON d.id = i."domainId"
+LEFT JOIN "Template" t ON t.id = i."templateId"
+LEFT JOIN LATERAL (
+    SELECT id, "fieldMappings" FROM "Template" WHERE "domainId" = i."domainId" ORDER BY id LIMIT 1
+) dt ON TRUE
+WHERE i.id = $1
+"""
+
+_REFRESH_RUN_SQL = """
+WITH counts AS (
+    SELECT
+        count(*) AS total,
+        count(*) FILTER (WHERE lower(status) = ANY($2::text[])) AS success,
+        count(*) FILTER (WHERE lower(status) = ANY($3::text[])) AS failed,
+        count(*) FILTER (WHERE lower(status) = 'skipped') AS skipped,
+        count(*) FILTER (WHERE lower(status) = 'cancelled') AS cancelled,
+        count(*) FILTER (WHERE lower(status) = 'running') AS running
+    FROM "AutomationBatchItem"
+    WHERE "batchRunId" = $1
+), latest AS (
+    SELECT "domainId" FROM "AutomationBatchItem"
+    WHERE "batchRunId" = $1 AND lower(status) = 'running'
+    ORDER BY "updatedAt" DESC
+    LIMIT 1
+)
+UPDATE "AutomationBatchRun" r
+SET status = CASE
+        WHEN r.status = ANY($4::text[]) THEN r.status
+        WHEN c.running > 0 THEN 'running'
+        WHEN c.total - c.success - c.failed - c.skipped - c.cancelled - c.running > 0 THEN 'pending'
+        WHEN c.cancelled > 0 THEN 'cancelled'
+        WHEN c.failed > 0 AND c.success = 0 AND c.skipped = 0 THEN 'failed'
+        WHEN c.failed > 0 THEN 'completed_with_failures'
+        ELSE 'completed'
+    END,
+    "totalDomains" = c.total,
+    "processedDomains" = c.success + c.failed + c.skipped + c.cancelled,
+    "successCount" = c.success,
+    "failureCount" = c.failed,
+    "skippedCount" = c.skipped,
+    "pendingCount" = c.total - c.success - c.failed - c.skipped - c.cancelled,
+    "currentDomainId" = (SELECT "domainId" FROM latest),
+    "finishedAt" = CASE WHEN r.status = ANY($4::text[]) THEN r."finishedAt"
+                        WHEN c.total = c.success + c.failed + c.skipped + c.cancelled THEN now() ELSE NULL END,
+    "updatedAt" = now()
+FROM counts c
+WHERE r.id = $1
+"""
+
+
+def default_lease_owner() -> str:
+    """``host:pid:nonce`` - unique per runner process, readable in the database."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def item_status_for(submission_status: str) -> str:
+    """Map a finished submission's status onto the item status (anything unclear counts as failed)."""
+    return "success" if (submission_status or "").lower() in SUCCESS_STATUSES else "failed"
+
+
+@dataclass
+class ClaimedItem:
+    """One leased ``AutomationBatchItem``."""
+
+    id: int
+    batch_run_id: int
+    domain_id: int
+    template_id: Optional[int]
+    attempt: int
+
+
+@dataclass
+class ItemOutcome:
+    """Final result of one claimed item, waiting to be written."""
+
+    item: ClaimedItem
+    submission_id: Optional[int]
+    status: str
+    message: str
+
+
+@dataclass
+class ItemJob:
+    """What a runner needs to submit one claimed item."""
+
+    url: str
+    template_id: Optional[int]
+    field_mappings: Dict[str, Any]
+    custom_message: Optional[str]
+    already_submitted: bool
+
+
+class LeaseStore:
+    """asyncpg access to the batch tables for one runner (``owner``)."""
+
+    def __init__(self, dsn: str, owner: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, pool_size: int = 4):
+        self.dsn = dsn
+        self.owner = owner or default_lease_owner()
+        self.lease_seconds = float(lease_seconds)
+        self.pool_size = max(2, pool_size)
+        self._pool = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LeaseStore":
+        dsn = os.environ.get("DATABASE_URL") or os.environ.get("TEQ_DATABASE_URL")
+        if not dsn:
+            raise RuntimeError("DATABASE_URL (or TEQ_DATABASE_URL) must point at the TEQSmartSubmit database")
+        return cls(dsn, **kwargs)
+
+    async def open(self) -> "LeaseStore":
+        if self._pool is None:
+            import asyncpg
+            self._pool = await asyncpg.create_pool(
+                normalize_dsn(self.dsn), min_size=1, max_size=self.pool_size, timeout=10,
+            )
+        return self
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def __aenter__(self) -> "LeaseStore":
+        return await self.open()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # -------------------------------------------------------------- leasing
+
+    async def claim(self, limit: int, batch_run_id: Optional[int] = None) -> List[ClaimedItem]:
+        """Lease up to ``limit`` claimable items (pending, or running with an expired lease)."""
+        if limit <= 0:
+            return []
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await self._bump_runs(conn, await conn.fetch(_EXPIRE_SQL, batch_run_id))
+                rows = await conn.fetch(
+                    _CLAIM_SQL, batch_run_id, limit, self.owner, self.lease_seconds, list(STOPPED_RUN_STATUSES),
+                )
+                items = [
+                    ClaimedItem(
+                        id=row["id"],
+                        batch_run_id=row["batchRunId"],
+                        domain_id=row["domainId"],
+                        template_id=row["templateId"],
+                        attempt=row["attemptCount"],
+                    )
+                    for row in rows
+                ]
+                started_runs = {item.batch_run_id for item in items}
+                if started_runs:
+                    await conn.execute(
+                        'UPDATE "AutomationBatchRun" SET status = \'running\', '
+                        '"startedAt" = COALESCE("startedAt", now()), "finishedAt" = NULL, "updatedAt" = now() '
+                        'WHERE id = ANY($1::int[]) AND status <> ALL($2::text[])',
+                        list(started_runs), list(STOPPED_RUN_STATUSES),
+                    )
+        return items
+
+    async def renew(self, item_ids: Iterable[int]) -> Set[int]:
+        """Extend the leases this runner still holds; returns the ids that were renewed."""
+        ids = list(item_ids)
+        if not ids:
+            return set()
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                'UPDATE "AutomationBatchItem" SET "leaseExpiresAt" = now() + make_interval(secs => $3) '
+                'WHERE id = ANY($1::int[]) AND "leaseOwner" = $2 AND status = \'running\' RETURNING id',
+                ids, self.owner, self.lease_seconds,
+            )
+        return {row["id"] for row in rows}
+
+    async def release(self, item_ids: Iterable[int]) -> None:
+        """Hand unfinished items back (graceful shutdown); the attempt stays counted."""
+        ids = list(item_ids)
+        if not ids:
+            return
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                'UPDATE "AutomationBatchItem" SET status = \'pending\', "leaseOwner" = NULL, '
+                '"leaseExpiresAt" = NULL, "startedAt" = NULL, "updatedAt" = now() '
+                'WHERE id = ANY($1::int[]) AND "leaseOwner" = $2',
+                ids, self.owner,
+            )
+
+    async def stopped_runs(self, batch_run_ids: Iterable[int]) -> Set[int]:
+        """Runs among ``batch_run_ids`` that were paused or cancelled from the dashboard."""
+        ids = list(set(batch_run_ids))
+        if not ids:
+            return set()
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                'SELECT id FROM "AutomationBatchRun" WHERE id = ANY($1::int[]) AND status = ANY($2::text[])',
+                ids, list(STOPPED_RUN_STATUSES),
+            )
+        return {row["id"] for row in rows}
+
+    # ----------------------------------------------------------- submission
+
+    async def load_job(self, item: ClaimedItem) -> Optional[ItemJob]:
+        async with self._pool.acquire() as conn:
+            row = await conn.fetchrow(_JOB_SQL, item.id, list(SUCCESS_STATUSES))
+        if row is None:
+            return None
+        mappings = row["fieldMappings"]
+        if isinstance(mappings, str):
+            try:
+                mappings = json.loads(mappings)
+            except ValueError:
+                mappings = {}
+        return ItemJob(
+            url=row["contactPageUrl"] or row["domainUrl"],
+            template_id=row["templateId"],
+            field_mappings=mappings if isinstance(mappings, dict) else {},
+            custom_message=row["customMessage"],
+            already_submitted=row["alreadySubmitted"],
+        )
+
+    async def start_submission(self, item: ClaimedItem, url: str, template_id: Optional[int]) -> int:
+        """Create the item's ``SubmissionLog`` row; a row left running by a lost runner is closed first."""
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    'UPDATE "SubmissionLog" SET status = \'failed\', "finishedAt" = now(), '
+                    'message = COALESCE(message, \'\') || E\'\\n\\nRunner lease expired before the result was recorded.\' '
+                    'WHERE "batchRunItemId" = $1 AND status = \'running\'',
+                    item.id,
+                )
+                return await conn.fetchval(
+                    'INSERT INTO "SubmissionLog" (url, status, message, "createdAt", "domainId", "templateId", '
+                    '"batchRunId", "batchRunItemId") VALUES ($1, \'running\', $2, now(), $3, $4, $5, $6) RETURNING id',
+                    url, f"Automation started by batch runner {self.owner} (attempt {item.attempt})",
+                    item.domain_id, template_id, item.batch_run_id, item.id,
+                )
+
+    async def finish_many(self, outcomes: List[ItemOutcome]) -> Set[int]:
+        """Write ``outcomes`` and bump their runs' counters in one transaction.
+
+        Returns the ids of the items this runner still owned; the others were
+        taken over after their lease expired and are left untouched.
+        """
+        if not outcomes:
+            return set()
+        logs = [o for o in outcomes if o.submission_id is not None]
+        statuses = [item_status_for(o.status) for o in outcomes]
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                if logs:
+                    await conn.execute(
+                        _FINISH_LOGS_SQL,
+                        [o.submission_id for o in logs], [o.status for o in logs], [o.message for o in logs],
+                    )
+                rows = await conn.fetch(
+                    _FINISH_ITEMS_SQL,
+                    [o.item.id for o in outcomes],
+                    statuses,
+                    [o.message if status == "failed" else None for o, status in zip(outcomes, statuses)],
+                    self.owner,
+                )
+                await self._bump_runs(conn, rows)
+        return {row["id"] for row in rows}
+
+    async def finish(self, item: ClaimedItem, submission_id: Optional[int], status: str, message: str) -> bool:
+        """Record one outcome right away; False (and nothing written to the item) when the lease was lost."""
+        return item.id in await self.finish_many([ItemOutcome(item, submission_id, status, message)])
+
+    @staticmethod
+    async def _bump_runs(conn, finished_rows) -> None:
+        """Atomically add the items in ``finished_rows`` (batchRunId, status) to their runs' counters."""
+        deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+        for row in finished_rows:
+            delta = deltas[row["batchRunId"]]
+            delta[0] += 1
+            delta[1 if row["status"] == "success" else 2] += 1
+        if not deltas:
+            return
+        run_ids = sorted(deltas)  # Same lock order in every runner
+        await conn.execute(
+            _BUMP_RUNS_SQL,
+            run_ids,
+            [deltas[r][0] for r in run_ids],
+            [deltas[r][1] for r in run_ids],
+            [deltas[r][2] for r in run_ids],
+            list(STOPPED_RUN_STATUSES),
+        )
+
+    async def close_submission(self, submission_id: int, status: str, message: str) -> None:
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                'UPDATE "SubmissionLog" SET status = $2, message = $3, "finishedAt" = now() WHERE id = $1',
+                submission_id, status, message,
+            )
+
+    async def refresh_run(self, batch_run_id: int) -> None:
+        """Recount the run's items (same rules as ``refreshBatchRunCounts`` in the dashboard).
+
+        Only used to reconcile the incremental counters, e.g. when a runner exits.
+        """
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                _REFRESH_RUN_SQL, batch_run_id,
+                list(SUCCESS_STATUSES), list(FAILURE_STATUSES), list(STOPPED_RUN_STATUSES),
+            )
+
+
+def _log_stderr(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+class WriteBehindBuffer:
+    """Coalesces finished-item writes and flushes them in one transaction.
+
+    ``record()`` queues an outcome and resolves once it is in the database
+    (True if the lease was still ours). A flush happens every
+    ``flush_interval`` seconds, or as soon as ``max_events`` items are waiting.
+    A later outcome for the same item replaces the queued one. When a flush
+    fails, its outcomes stay queued and go out with the next one, after an
+    exponential backoff (up to ``MAX_FLUSH_BACKOFF``). The runner keeps renewing
+    the leases of queued items meanwhile.
+    """
+
+    def __init__(self, store: LeaseStore, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_events: int = DEFAULT_FLUSH_EVENTS, log: Callable[[str], None] = _log_stderr):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_events = max(1, max_events)
+        self.log = log
+        self.flushes = 0
+        self.written = 0
+        self._pending: Dict[int, Tuple[ItemOutcome, List[asyncio.Future]]] = {}
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._failures = 0
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def record(self, outcome: ItemOutcome) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        _, waiters = self._pending.get(outcome.item.id, (None, []))
+        self._pending[outcome.item.id] = (outcome, waiters + [future])
+        if len(self._pending) >= self.max_events:
+            self._wake.set()
+        return await future
+
+    def backoff(self) -> float:
+        """Seconds to wait before the next flush attempt after consecutive failures."""
+        if not self._failures:
+            return 0.0
+        return min(MAX_FLUSH_BACKOFF, self.flush_interval * (2 ** self._failures))
+
+    async def flush(self) -> bool:
+        """Write everything queued; False when the write failed and the outcomes were re-queued."""
+        if not self._pending:
+            return True
+        batch, self._pending = self._pending, {}
+        try:
+            owned = await self.store.finish_many([outcome for outcome, _ in batch.values()])
+        except Exception as e:
+            self._failures += 1
+            self.log(f"⚠️  Write-behind flush of {len(batch)} item(s) failed, retrying in {self.backoff():.1f}s: "
+                     f"{str(e)[:200]}")
+            for item_id, (outcome, waiters) in batch.items():
+                newer = self._pending.get(item_id)
+                self._pending[item_id] = (newer[0], waiters + newer[1]) if newer else (outcome, waiters)
+            return False
+        self._failures = 0
+        self.flushes += 1
+        self.written += len(batch)
+        for item_id, (_, waiters) in batch.items():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(item_id in owned)
+        return True
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not await self.flush():
+                # The database is struggling: do not hammer it every flush_interval
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.backoff())
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> "WriteBehindBuffer":
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def close(self) -> None:
+        """Stop the flusher and write whatever is still queued."""
+        self._closing = True
+        self._wake.set()
+        self._stop.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        for _, waiters in self._pending.values():
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(False)
+        self._pending.clear()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Multi-node runner for dashboard batches (``AutomationBatchRun``/``AutomationBatchItem``).
+
+Start one runner per host against the shared database; each claims items with
+``SELECT ... FOR UPDATE SKIP LOCKED`` under a time-limited lease (see
+``batch_leases.py``), submits them through a warm ``SubmissionWorker`` and
+writes the result to ``SubmissionLog`` and the item, exactly like the
+dashboard's ``/api/run`` does. Throughput grows with the number of runners;
+no two runners ever hold the same item. While an item is in flight its lease
+is renewed every ``--heartbeat`` seconds, so a crashed or partitioned runner's
+items become claimable again after ``--lease-seconds`` and are retried up to
+the run's ``retryLimit``. A runner that finds it has lost a lease abandons the
+job instead of recording a second result. Results are written behind: each
+runner batches its finished items into one transaction every ``--flush-ms``
+(or ``--flush-events`` items) and bumps the run counters by increments.
+
+Usage:
+    DATABASE_URL=postgresql://... python3 batch_runner.py --workers 8
+    DATABASE_URL=postgresql://... python3 batch_runner.py --batch-run-id 42 --once
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+# Add automation directory (and the submission scripts) to Python path
+_script_dir = Path(__file__).parent.absolute()
+for _path in (_script_dir, _script_dir / "submission"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from adaptive_concurrency import DEFAULT_MAX_LOAD_PER_CPU, DEFAULT_MIN_FREE_MEMORY, AdaptiveConcurrency
+from batch_leases import (
+    DEFAULT_FLUSH_EVENTS,
+    DEFAULT_FLUSH_INTERVAL,
+    DEFAULT_LEASE_SECONDS,
+    ClaimedItem,
+    ItemJob,
+    ItemOutcome,
+    LeaseStore,
+    WriteBehindBuffer,
+    item_status_for,
+)
+from browser_mode import AUTO, VISIBLE
+from domain_scheduler import DomainScheduler
+from form_discovery import SubmissionWorker
+
+DEFAULT_MESSAGE = "This is an automated test submission."
+_PLACEHOLDER_MESSAGES = ("true", "false", "null", "undefined")
+
+
+def _usable_message(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value if value and value.lower() not in _PLACEHOLDER_MESSAGES else None
+
+
+def build_template(job: ItemJob, browser_mode: str = AUTO) -> Dict[str, Any]:
+    """The template ``/api/run`` would hand to form_discovery.py for this item.
+
+    ``browser_mode`` applies unless the template picks a mode (or legacy ``headless``) itself.
+    """
+    template = dict(job.field_mappings)
+    if "browser_mode" not in template and "headless" not in template:
+        template["browser_mode"] = browser_mode
+    test_data = template.get("test_data") if isinstance(template.get("test_data"), dict) else {}
+    has_fields = isinstance(template.get("fields"), list) and bool(template["fields"])
+    template.update({
+        "use_local_captcha_solver": template.get("use_local_captcha_solver", True),
+        "use_hybrid_captcha_solver": template.get("use_hybrid_captcha_solver", False),
+        "captcha_service": template.get("captcha_service", "local"),
+        "use_auto_detect": template.get("use_auto_detect", not has_fields),
+        "test_data": {
+            **test_data,
+            "name": test_data.get("name", "TEQ QA User"),
+            "email": test_data.get("email", "test@example.com"),
+            "phone": test_data.get("phone", "+1234567890"),
+            "message": _usable_message(job.custom_message)
+                or _usable_message(test_data.get("message"))
+                or DEFAULT_MESSAGE,
+            "subject": test_data.get("subject", "Test Inquiry"),
+            "company": test_data.get("company", "Test Company"),
+        },
+    })
+    return template
+
+
+class BatchRunner:
+    """Claims, runs and records batch items until stopped (or, with ``once``, until none are left)."""
+
+    def __init__(self, store: LeaseStore, worker: SubmissionWorker, workers: int = 4,
+                 batch_run_id: Optional[int] = None, heartbeat: float = 30.0,
+                 poll_interval: float = 5.0, once: bool = False, browser_mode: str = AUTO,
+                 controller: Optional[AdaptiveConcurrency] = None,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, flush_events: int = DEFAULT_FLUSH_EVENTS,
+                 domain_delay: Optional[float] = None):
+        self.store = store
+        self.worker = worker
+        self.workers = max(1, workers)
+        self.batch_run_id = batch_run_id
+        self.heartbeat = heartbeat
+        self.poll_interval = poll_interval
+        self.once = once
+        self.browser_mode = browser_mode
+        self.controller = controller
+        self.writer = WriteBehindBuffer(store, flush_interval, flush_events, log=self._log)
+        # Per-site politeness inside this runner (one job per site, spaced by ``domain_delay``)
+        self.scheduler = DomainScheduler(max_per_domain=1, min_interval=domain_delay,
+                                         max_buffered=max(64, 4 * self.workers))
+        self.runs_touched: Set[int] = set()
+        self.in_flight: Dict[int, asyncio.Task] = {}
+        self._recording: Set[int] = set()
+        # Monotonic time each held lease was last known to be extended (claim or renewal)
+        self._renewed_at: Dict[int, float] = {}
+        self.stats = {"claimed": 0, "success": 0, "failed": 0, "lost": 0, "skipped_duplicate": 0}
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Stop claiming; in-flight items still finish."""
+        self._stopping.set()
+
+    def _log(self, message: str) -> None:
+        print(f"[{time.strftime('%H:%M:%S')}] {message}", file=sys.stderr, flush=True)
+
+    @property
+    def limit(self) -> int:
+        """Items to hold at once: the adaptive limit when there is a controller, else ``workers``."""
+        return self.controller.limit if self.controller is not None else self.workers
+
+    async def run(self) -> Dict[str, int]:
+        heartbeat = asyncio.create_task(self._heartbeat())
+        dispatcher = asyncio.create_task(self._dispatch())
+        self.writer.start()
+        if self.controller is not None:
+            self.controller.start()
+        try:
+            while not self._stopping.is_set():
+                free = self.limit - len(self.in_flight)
+                claimed = []
+                if free > 0:
+                    try:
+                        claimed = await self.store.claim(free, self.batch_run_id)
+                    except Exception as e:
+                        self._log(f"⚠️  Claim failed: {str(e)[:200]}")
+                    for item in claimed:
+                        self._spawn(item)
+                if self.controller is not None:
+                    self.controller.observe(len(self.in_flight))
+                if not self.in_flight and not claimed:
+                    if self.once:
+                        break
+                    await self._sleep(self.poll_interval * random.uniform(0.8, 1.2))
+                    continue
+                if self.in_flight:
+                    # Full, or nothing more to claim: wake on the next completion (or poll again)
+                    await asyncio.wait(
+                        list(self.in_flight.values()),
+                        timeout=self.poll_interval,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+            if self.in_flight:
+                self._log(f"⏳ Waiting for {len(self.in_flight)} in-flight item(s)")
+                await asyncio.gather(*self.in_flight.values(), return_exceptions=True)
+        finally:
+            if self.controller is not None:
+                await self.controller.stop()
+            heartbeat.cancel()
+            dispatcher.cancel()
+            await asyncio.gather(heartbeat, dispatcher, return_exceptions=True)
+            await self.writer.close()
+            await self._reconcile()
+        return self.stats
+
+    async def _reconcile(self) -> None:
+        """Recount the runs this runner worked on, in case an increment was ever lost."""
+        for run_id in sorted(self.runs_touched):
+            try:
+                await self.store.refresh_run(run_id)
+            except Exception as e:
+                self._log(f"⚠️  Could not reconcile run {run_id}: {str(e)[:200]}")
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _spawn(self, item: ClaimedItem) -> None:
+        self.stats["claimed"] += 1
+        self._renewed_at[item.id] = time.monotonic()
+        task = asyncio.create_task(self._process(item))
+        self.in_flight[item.id] = task
+
+        def _done(_task, item_id=item.id):
+            self.in_flight.pop(item_id, None)
+            self._recording.discard(item_id)
+            self._renewed_at.pop(item_id, None)
+
+        task.add_done_callback(_done)
+
+    async def _dispatch(self) -> None:
+        """Hand out site turns in the order ``DomainScheduler`` allows them."""
+        while True:
+            leased = await self.scheduler.next()
+            if leased is None:
+                return
+            key, turn = leased
+            if turn.done():
+                await self.scheduler.release(key)  # The item was abandoned while waiting
+            else:
+                turn.set_result(key)
+
+    async def _site_turn(self, url: str) -> str:
+        """Wait until the scheduler lets a job start on ``url``'s site; returns the key to release."""
+        turn = asyncio.get_running_loop().create_future()
+        await self.scheduler.add(url, turn)
+        try:
+            return await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                await self.scheduler.release(turn.result())
+            else:
+                turn.cancel()
+            raise
+
+    def _abandon(self, item_id: int, reason: str) -> None:
+        if item_id in self._recording:
+            return  # Already submitted; the lease-guarded write decides whether the result counts
+        task = self.in_flight.get(item_id)
+        if task is not None and not task.done():
+            self._log(f"🔒 {reason} on item {item_id}; abandoning it")
+            self.stats["lost"] += 1
+            task.cancel()
+
+    async def _heartbeat(self) -> None:
+        """Renew every held lease in one statement; abandon items whose lease was taken over or ran out."""
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            # Outcomes waiting in the write-behind buffer keep their lease until they are written,
+            # otherwise a slow database lets another runner reclaim and submit the item again
+            held = list(self.in_flight)
+            if not held:
+                continue
+            attempted = time.monotonic()
+            try:
+                renewed = await self.store.renew(held)
+            except Exception as e:
+                # Keep working while the lease still has time left (checked below)
+                self._log(f"⚠️  Lease renewal failed: {str(e)[:200]}")
+            else:
+                for item_id in renewed:
+                    self._renewed_at[item_id] = attempted
+                for item_id in set(held) - renewed:
+                    self._abandon(item_id, "Lost lease")
+            # Cut off from the database: stop before another runner can reclaim the item
+            expires_in = self.store.lease_seconds - self.heartbeat
+            now = time.monotonic()
+            for item_id in held:
+                if now - self._renewed_at.get(item_id, now) >= expires_in:
+                    self._abandon(item_id, "Lease about to expire without renewal")
+
+    async def _process(self, item: ClaimedItem) -> None:
+        submission_id = None
+        try:
+            job = await self.store.load_job(item)
+            if job is None:
+                await self._finish(item, None, "failed", "Batch item or domain no longer exists")
+                return
+            if job.already_submitted:
+                # A previous runner submitted it but died before recording the item
+                self.stats["skipped_duplicate"] += 1
+                await self._finish(item, None, "success", "Already submitted by a previous attempt")
+                return
+            site = await self._site_turn(job.url)
+            try:
+                submission_id = await self.store.start_submission(item, job.url, job.template_id)
+                self._log(f"▶️  Item {item.id} (run {item.batch_run_id}, attempt {item.attempt}): {job.url}")
+                with tempfile.TemporaryDirectory(prefix="teq-template-") as temp_dir:
+                    template_path = Path(temp_dir) / "template.json"
+                    template_path.write_text(json.dumps(build_template(job, self.browser_mode), indent=2), encoding="utf-8")
+                    result = await self.worker.run_job({"id": str(item.id), "url": job.url, "template": str(template_path)})
+            finally:
+                await self.scheduler.release(site)
+            status = result.get("status") or "failed"
+            message = result.get("message") or ""
+        except asyncio.CancelledError:
+            if submission_id is not None:
+                await asyncio.shield(self._record_abandoned(submission_id))
+            raise
+        except Exception as e:
+            status, message = "failed", f"Exception: {str(e)}"
+        await self._finish(item, submission_id, status, message)
+
+    async def _finish(self, item: ClaimedItem, submission_id: Optional[int], status: str, message: str) -> None:
+        """Hand the outcome to the write-behind buffer and wait until it is flushed."""
+        self._recording.add(item.id)
+        self.runs_touched.add(item.batch_run_id)
+        owned = await self.writer.record(ItemOutcome(item, submission_id, status, message))
+        if owned:
+            outcome = item_status_for(status)
+            self.stats[outcome] += 1
+            self._log(f"{'✅' if outcome == 'success' else '❌'} Item {item.id}: {status}")
+        else:
+            self.stats["lost"] += 1
+            self._log(f"🔒 Item {item.id} finished after its lease moved to another runner; result not applied")
+
+    async def _record_abandoned(self, submission_id: int) -> None:
+        try:
+            await self.store.close_submission(submission_id, "failed", "Abandoned: the batch item lease was lost")
+        except Exception:
+            pass
+
+
+async def run_batch(args: argparse.Namespace) -> Dict[str, int]:
+    store = LeaseStore.from_env(lease_seconds=args.lease_seconds, pool_size=args.workers + 2)
+    browser_mode = VISIBLE if args.headed else AUTO
+    worker = SubmissionWorker(
+        concurrency=args.workers, browser_mode=browser_mode, prewarm=min(2, args.workers),
+    )
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveConcurrency(
+            min_limit=min(args.min_workers, args.workers),
+            max_limit=args.workers,
+            initial=min(args.workers, max(args.min_workers, os.cpu_count() or 1)),
+            max_load_per_cpu=args.max_load_per_cpu,
+            min_free_memory=args.min_free_memory,
+            max_browser_rss_mb=args.max_browser_rss_mb,
+        )
+    async with store:
+        runner = BatchRunner(
+            store, worker,
+            workers=args.workers,
+            batch_run_id=args.batch_run_id,
+            heartbeat=min(args.heartbeat, args.lease_seconds / 3),
+            poll_interval=args.poll_interval,
+            once=args.once,
+            browser_mode=browser_mode,
+            controller=controller,
+            flush_interval=args.flush_ms / 1000,
+            flush_events=args.flush_events,
+            domain_delay=args.domain_delay,
+        )
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, runner.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        runner._log(f"🏁 Batch runner {store.owner} started ({args.workers} workers, lease {args.lease_seconds:.0f}s)")
+        try:
+            return await runner.run()
+        finally:
+            await worker.manager.cleanup()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Claim and run dashboard batch items; run one per host to scale out")
+    parser.add_argument("--batch-run-id", type=int, default=None,
+                        help="Only work on this AutomationBatchRun (default: any run with pending items)")
+    parser.add_argument("--workers", type=int, default=4, help="Items this runner processes at once (default: 4)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Let host load, free memory and browser RSS decide how many items run (--workers is the ceiling)")
+    parser.add_argument("--min-workers", type=int, default=1, help="Adaptive mode: lower bound (default: 1)")
+    parser.add_argument("--max-load-per-cpu", type=float, default=DEFAULT_MAX_LOAD_PER_CPU,
+                        help=f"Adaptive mode: back off above this load average per CPU (default: {DEFAULT_MAX_LOAD_PER_CPU})")
+    parser.add_argument("--min-free-memory", type=float, default=DEFAULT_MIN_FREE_MEMORY,
+                        help=f"Adaptive mode: back off below this fraction of available memory (default: {DEFAULT_MIN_FREE_MEMORY})")
+    parser.add_argument("--max-browser-rss-mb", type=float, default=None,
+                        help="Adaptive mode: back off above this Playwright + Chromium RSS (default: 70%% of RAM)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"Lease length; a dead runner's items are reclaimed after this (default: {DEFAULT_LEASE_SECONDS})")
+    parser.add_argument("--heartbeat", type=float, default=30.0,
+                        help="Seconds between lease renewals (default: 30, capped at a third of the lease)")
+    parser.add_argument("--poll-interval", type=float, default=5.0,
+                        help="Seconds between claim attempts when there is nothing to do (default: 5)")
+    parser.add_argument("--flush-ms", type=float, default=DEFAULT_FLUSH_INTERVAL * 1000,
+                        help=f"Write finished items at least this often (default: {DEFAULT_FLUSH_INTERVAL * 1000:.0f})")
+    parser.add_argument("--flush-events", type=int, default=DEFAULT_FLUSH_EVENTS,
+                        help=f"...or as soon as this many are waiting (default: {DEFAULT_FLUSH_EVENTS})")
+    parser.add_argument("--domain-delay", type=float, default=None,
+                        help="Minimum seconds between job starts on one registrable domain "
+                             "(default: TEQ_SUBMISSION_DELAY_SECONDS or 5)")
+    parser.add_argument("--once", action="store_true", help="Exit once no claimable items are left")
+    parser.add_argument("--headed", action="store_true", help="Always show the browser unless the template says otherwise "
+                             "(default: headless, escalating to a visible browser only for interactive CAPTCHAs)")
+    args = parser.parse_args()
+
+    try:
+        stats = asyncio.run(run_batch(args))
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print("", file=sys.stderr)
+    print("=" * 80, file=sys.stderr)
+    print("SUMMARY", file=sys.stderr)
+    print("=" * 80, file=sys.stderr)
+    for key, value in stats.items():
+        print(f"{key.replace('_', ' ').capitalize()}: {value}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
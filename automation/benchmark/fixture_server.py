@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the contact pages in the benchmark corpus.
+
+Every fixture in ``corpus/corpus.json`` is served at ``/<name>/contact`` and
+the fake backends it talks to (WPForms admin-ajax, the Contact Form 7 REST
+feedback endpoint, a JSON API, a Next.js server action, plain form POSTs)
+answer with the same kind of confirmation the real ones do. Every non-GET
+request is recorded with its parsed body, so the benchmark can check what
+actually reached the "site" instead of trusting the success detection.
+
+Usage (manual poking; the benchmark starts its own instance):
+    python3 fixture_server.py --port 8765
+"""
+
+import argparse
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+
+MAX_BODY_BYTES = 1024 * 1024
+
+_THANKS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Thank you</title></head>
+<body><h1>Thank you!</h1><p>{message}</p></body></html>
+"""
+
+_SEARCH_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Search results</title></head>
+<body><h1>Search results</h1><p>No results found.</p></body></html>
+"""
+
+
+@dataclass
+class RecordedRequest:
+    """One non-GET request received by the stand-in."""
+
+    fixture: str
+    method: str
+    path: str
+    content_type: str
+    fields: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body_bytes: int
+    received_at: float = field(default_factory=time.time)
+
+    def values(self) -> List[str]:
+        """Every submitted value, flattened."""
+        return [value for values in self.fields.values() for value in values]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fixture": self.fixture,
+            "method": self.method,
+            "path": self.path,
+            "content_type": self.content_type,
+            "fields": self.fields,
+            "headers": self.headers,
+            "body_bytes": self.body_bytes,
+            "received_at": self.received_at,
+        }
+
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR) -> List[Dict[str, Any]]:
+    """Return the fixture entries of ``corpus.json``."""
+    with open(corpus_dir / "corpus.json", "r", encoding="utf-8") as f:
+        return json.load(f)["fixtures"]
+
+
+def _flatten_json(value: Any, prefix: str, out: Dict[str, List[str]]) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten_json(item, f"{prefix}.{key}" if prefix else str(key), out)
+    elif isinstance(value, list):
+        for item in value:
+            _flatten_json(item, prefix, out)
+    elif value is not None:
+        out.setdefault(prefix or "_", []).append(str(value))
+
+
+def parse_body(content_type: str, body: bytes) -> Dict[str, List[str]]:
+    """Parse urlencoded, multipart and JSON bodies into ``{field: [values]}``."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    fields: Dict[str, List[str]] = {}
+    if not body:
+        return fields
+
+    if media_type == "application/x-www-form-urlencoded":
+        return {k: v for k, v in parse_qs(body.decode("utf-8", "replace"), keep_blank_values=True).items()}
+
+    if media_type == "multipart/form-data":
+        message = BytesParser(policy=policy.HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if not name:
+                continue
+            if part.get_filename():
+                fields.setdefault(name, []).append(f"<file {part.get_filename()}>")
+            else:
+                payload = part.get_payload(decode=True) or b""
+                fields.setdefault(name, []).append(payload.decode("utf-8", "replace"))
+        return fields
+
+    if media_type.endswith("json"):
+        try:
+            _flatten_json(json.loads(body.decode("utf-8", "replace")), "", fields)
+        except ValueError:
+            fields["_raw"] = [body.decode("utf-8", "replace")]
+        return fields
+
+    fields["_raw"] = [body.decode("utf-8", "replace")]
+    return fields
+
+
+def _reply_for(fixture: str, path: str, headers: Dict[str, str]) -> Tuple[int, str, bytes]:
+    """Pick the confirmation the real backend of ``fixture`` would send for ``path``."""
+    if path.endswith("/wp-admin/admin-ajax.php"):
+        body = {"success": True, "data": {"confirmation": "Thanks for contacting us! We will be in touch with you shortly."}}
+        return 200, "application/json", json.dumps(body).encode()
+    if "/wp-json/contact-form-7/" in path:
+        body = {
+            "contact_form_id": 512,
+            "status": "mail_sent",
+            "message": "Thank you for your message. It has been sent.",
+            "posted_data_hash": "0f9c7b5b1a0e4d2c",
+            "into": "#wpcf7-f512-p77-o1",
+            "invalid_fields": [],
+        }
+        return 200, "application/json", json.dumps(body).encode()
+    if headers.get("next-action"):
+        flight = '0:["$@1",["development",null]]\n1:{"ok":true,"message":"Thanks! Your message has been sent."}\n'
+        return 200, "text/x-component", flight.encode()
+    if "json" in headers.get("content-type", "") or "json" in headers.get("accept", ""):
+        return 200, "application/json", json.dumps({"ok": True}).encode()
+    if "newsletter" in path or "subscribe" in path:
+        return 200, "text/html; charset=utf-8", _THANKS_PAGE.format(message="You're subscribed to our newsletter.").encode()
+    return 200, "text/html; charset=utf-8", _THANKS_PAGE.format(message="Your message has been received.").encode()
+
+
+class FixtureServer:
+    """Threaded HTTP server for the corpus that records every submission."""
+
+    def __init__(self, corpus_dir: Path = CORPUS_DIR, host: str = "127.0.0.1", port: int = 0):
+        self.corpus_dir = Path(corpus_dir)
+        self.fixtures = {entry["name"]: entry for entry in load_corpus(self.corpus_dir)}
+        self._pages: Dict[str, bytes] = {
+            name: (self.corpus_dir / entry["file"]).read_bytes() for name, entry in self.fixtures.items()
+        }
+        self._recorded: List[RecordedRequest] = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fixture_url(self, name: str) -> str:
+        return f"{self.base_url}/{name}/contact"
+
+    def start(self) -> "FixtureServer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def recorded(self, fixture: Optional[str] = None) -> List[RecordedRequest]:
+        """Recorded submissions, optionally only those of one fixture."""
+        with self._lock:
+            return [r for r in self._recorded if fixture is None or r.fixture == fixture]
+
+    def clear(self, fixture: Optional[str] = None) -> None:
+        with self._lock:
+            self._recorded = [r for r in self._recorded if fixture is not None and r.fixture != fixture]
+
+    def _record(self, request: RecordedRequest) -> None:
+        with self._lock:
+            self._recorded.append(request)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            server_version = "TEQFixtureServer/1.0"
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+                pass
+
+            def _send(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _fixture_name(self, path: str) -> str:
+                return path.strip("/").split("/", 1)[0]
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                name = self._fixture_name(path)
+                if name not in server._pages:
+                    self._send(404, "text/plain; charset=utf-8", b"Not Found")
+                elif path.rstrip("/") in (f"/{name}", f"/{name}/contact"):
+                    self._send(200, "text/html; charset=utf-8", server._pages[name])
+                elif path.endswith("/search"):
+                    self._send(200, "text/html; charset=utf-8", _SEARCH_PAGE.encode())
+                else:
+                    self._send(404, "text/plain; charset=utf-8", b"Not Found")
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                length = min(int(self.headers.get("Content-Length") or 0), MAX_BODY_BYTES)
+                body = self.rfile.read(length) if length else b""
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                content_type = headers.get("content-type", "")
+                name = self._fixture_name(path)
+                if name not in server._pages:
+                    name = self._fixture_name(urlsplit(headers.get("referer", "")).path)
+                server._record(RecordedRequest(
+                    fixture=name,
+                    method=self.command,
+                    path=path,
+                    content_type=content_type,
+                    fields=parse_body(content_type, body),
+                    headers={k: v for k, v in headers.items() if k in ("referer", "origin", "next-action", "accept")},
+                    body_bytes=len(body),
+                ))
+                self._send(*_reply_for(name, path, headers))
+
+            do_PUT = do_POST
+
+        return Handler
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve the benchmark corpus and print recorded submissions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with FixtureServer(host=args.host, port=args.port) as server:
+        for name in server.fixtures:
+            print(f"{name:24} {server.fixture_url(name)}")
+        seen = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                recorded = server.recorded()
+                for request in recorded[seen:]:
+                    print(json.dumps(request.to_dict()), flush=True)
+                seen = len(recorded)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
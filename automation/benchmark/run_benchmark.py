@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the submission flow.
+
+Runs ``run_ultra_resilient_submission`` against every contact-page fixture in
+``corpus/`` (served by ``fixture_server.FixtureServer`` on localhost) and
+reports, per fixture:
+
+- wall time and the per-stage timings from ``result["stage_timings"]``
+  (medians over ``--repeat`` runs)
+- success-detection accuracy: the run's ``status`` is compared with what the
+  stand-in actually received, so a "success" without a matching POST is a
+  false positive and a recorded POST reported as failed is a false negative
+- expected outcome rate: whether the contact submission reached the stand-in
+  exactly when the fixture expects one (never for pages without a contact form)
+- peak RSS of this process plus the Playwright driver/browser tree
+
+The report is written as JSON. With ``--baseline`` it is compared against an
+earlier report and the script exits 1 when a fixture got slower than
+``--threshold`` (relative, and by more than ``--min-delta`` seconds), used
+more memory than the threshold allows, or dropped in either accuracy measure.
+
+Usage:
+    python3 run_benchmark.py --save-baseline benchmark_baseline.json
+    python3 run_benchmark.py --baseline benchmark_baseline.json --threshold 0.2
+    python3 run_benchmark.py --fixtures wpforms cf7 --repeat 5 --output report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+_benchmark_dir = Path(__file__).parent.absolute()
+for _path in (_benchmark_dir, _benchmark_dir.parent, _benchmark_dir.parent / "submission"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from fixture_server import FixtureServer, RecordedRequest
+from form_discovery import resolve_test_data, run_ultra_resilient_submission
+from resource_usage import children_rss_bytes, process_rss_bytes
+
+# Template used for every run: discovery and the per-domain cache are off so each
+# run does the same work against the fixture URL it is given
+BENCHMARK_TEMPLATE: Dict[str, Any] = {
+    "headless": True,
+    "http_discovery": False,
+    "form_cache": False,
+}
+
+# Late fetch()/beacon requests can land after the run returns
+SETTLE_SECONDS = 0.5
+
+
+class PeakRssSampler:
+    """Samples RSS of this process and its descendants while a run is in flight."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> None:
+        self.peak = max(self.peak, process_rss_bytes(os.getpid()) + children_rss_bytes())
+
+    async def _run(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "PeakRssSampler":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._sample()
+
+
+def matches_expected(request: RecordedRequest, entry: Dict[str, Any], test_data: Dict[str, str]) -> bool:
+    """True when ``request`` is the fixture's contact submission carrying the expected values."""
+    if not entry.get("submit_path") or request.path != entry["submit_path"]:
+        return False
+    submitted = request.values()
+    return all(
+        any(test_data[key] in value for value in submitted)
+        for key in entry.get("expect_values", [])
+        if test_data.get(key)
+    )
+
+
+def classify(detected: bool, posted: bool) -> str:
+    if detected:
+        return "true_positive" if posted else "false_positive"
+    return "false_negative" if posted else "true_negative"
+
+
+async def run_fixture(
+    server: FixtureServer,
+    entry: Dict[str, Any],
+    template_path: Path,
+    test_data: Dict[str, str],
+    timeout: float,
+) -> Dict[str, Any]:
+    """Run one submission against one fixture and score it."""
+    name = entry["name"]
+    server.clear(name)
+    started = time.monotonic()
+    error = None
+    with PeakRssSampler() as sampler:
+        try:
+            result = await asyncio.wait_for(
+                run_ultra_resilient_submission(server.fixture_url(name), template_path), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            result, error = {"status": "timeout"}, f"timed out after {timeout:.0f}s"
+        except Exception as e:
+            result, error = {"status": "error"}, f"{type(e).__name__}: {e}"
+    wall_seconds = time.monotonic() - started
+    await asyncio.sleep(SETTLE_SECONDS)
+
+    recorded = server.recorded(name)
+    posted = any(matches_expected(request, entry, test_data) for request in recorded)
+    detected = result.get("status") == "success"
+    outcome = classify(detected, posted)
+
+    stages: Dict[str, float] = {}
+    timings = result.get("stage_timings") or {}
+    for span in timings.get("stages", []):
+        stages[span["stage"]] = stages.get(span["stage"], 0.0) + float(span.get("seconds", 0.0))
+
+    return {
+        "status": result.get("status"),
+        "outcome": outcome,
+        "detection_correct": outcome in ("true_positive", "true_negative"),
+        "as_expected": posted == entry["expect_submission"],
+        "submission_received": posted,
+        "other_requests": [r.path for r in recorded if not matches_expected(r, entry, test_data)],
+        "wall_seconds": round(wall_seconds, 3),
+        "total_seconds": timings.get("total_seconds"),
+        "stages": {stage: round(seconds, 3) for stage, seconds in stages.items()},
+        "peak_rss_bytes": sampler.peak,
+        "error": error,
+    }
+
+
+def _median(values: List[float]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 3) if values else None
+
+
+def summarize_fixture(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    stage_names = sorted({stage for run in runs for stage in run["stages"]})
+    return {
+        "wall_seconds": _median([run["wall_seconds"] for run in runs]),
+        "total_seconds": _median([run["total_seconds"] for run in runs]),
+        "stages": {stage: _median([run["stages"].get(stage) for run in runs]) for stage in stage_names},
+        "peak_rss_bytes": max(run["peak_rss_bytes"] for run in runs),
+        "accuracy": round(sum(run["detection_correct"] for run in runs) / len(runs), 3),
+        "expected_rate": round(sum(run["as_expected"] for run in runs) / len(runs), 3),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_benchmark_dir, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run_benchmark(fixture_names: Optional[List[str]], repeat: int, timeout: float, headless: bool) -> Dict[str, Any]:
+    template = dict(BENCHMARK_TEMPLATE, headless=headless)
+    test_data = resolve_test_data(template)
+    report: Dict[str, Any] = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "repeat": repeat,
+        "fixtures": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="teq-benchmark-") as tmp, FixtureServer() as server:
+        template_path = Path(tmp) / "template.json"
+        template_path.write_text(json.dumps(template), encoding="utf-8")
+        entries = [e for e in server.fixtures.values() if not fixture_names or e["name"] in fixture_names]
+
+        for entry in entries:
+            runs = []
+            for attempt in range(1, repeat + 1):
+                print(f"▶ {entry['name']} ({attempt}/{repeat})", file=sys.stderr, flush=True)
+                run = await run_fixture(server, entry, template_path, test_data, timeout)
+                print(f"  {run['status']} / {run['outcome']} in {run['wall_seconds']:.1f}s", file=sys.stderr, flush=True)
+                runs.append(run)
+            report["fixtures"][entry["name"]] = {
+                "description": entry.get("description"),
+                "expect_submission": entry["expect_submission"],
+                "runs": runs,
+                "median": summarize_fixture(runs),
+            }
+
+    all_runs = [run for fixture in report["fixtures"].values() for run in fixture["runs"]]
+    outcomes = {key: sum(run["outcome"] == key for run in all_runs)
+                for key in ("true_positive", "false_positive", "false_negative", "true_negative")}
+    report["summary"] = {
+        "runs": len(all_runs),
+        "accuracy": round(sum(run["detection_correct"] for run in all_runs) / len(all_runs), 3) if all_runs else None,
+        "expected_rate": round(sum(run["as_expected"] for run in all_runs) / len(all_runs), 3) if all_runs else None,
+        **outcomes,
+        "median_wall_seconds": _median([run["wall_seconds"] for run in all_runs]),
+        "peak_rss_bytes": max((run["peak_rss_bytes"] for run in all_runs), default=0),
+    }
+    return report
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta: float) -> List[str]:
+    """Return human-readable regressions of ``report`` against ``baseline``."""
+    regressions: List[str] = []
+
+    def slower(label: str, current: Optional[float], previous: Optional[float]) -> None:
+        if current is None or not previous:
+            return
+        if current > previous * (1 + threshold) and current - previous > min_delta:
+            regressions.append(f"{label}: {previous:.2f}s -> {current:.2f}s (+{(current / previous - 1) * 100:.0f}%)")
+
+    for name, fixture in report["fixtures"].items():
+        previous = baseline.get("fixtures", {}).get(name)
+        if not previous:
+            continue
+        current_median, previous_median = fixture["median"], previous["median"]
+        slower(f"{name} wall time", current_median["wall_seconds"], previous_median["wall_seconds"])
+        for stage, seconds in current_median["stages"].items():
+            slower(f"{name} stage {stage}", seconds, previous_median["stages"].get(stage))
+        if previous_median["peak_rss_bytes"] and \
+                current_median["peak_rss_bytes"] > previous_median["peak_rss_bytes"] * (1 + threshold):
+            regressions.append(
+                f"{name} peak RSS: {previous_median['peak_rss_bytes'] / 2**20:.0f} MiB -> "
+                f"{current_median['peak_rss_bytes'] / 2**20:.0f} MiB"
+            )
+        if current_median["accuracy"] < previous_median["accuracy"]:
+            regressions.append(
+                f"{name} detection accuracy: {previous_median['accuracy']:.0%} -> {current_median['accuracy']:.0%}"
+            )
+        if current_median["expected_rate"] < previous_median.get("expected_rate", 0):
+            regressions.append(
+                f"{name} expected outcome rate: {previous_median['expected_rate']:.0%} -> "
+                f"{current_median['expected_rate']:.0%}"
+            )
+    return regressions
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    print(f"{'fixture':24} {'wall':>7} {'total':>7} {'rss MiB':>8} {'acc':>5}  outcomes")
+    for name, fixture in report["fixtures"].items():
+        median = fixture["median"]
+        outcomes = ", ".join(sorted({run["outcome"] for run in fixture["runs"]}))
+        print(
+            f"{name:24} {median['wall_seconds'] or 0:7.2f} {median['total_seconds'] or 0:7.2f} "
+            f"{median['peak_rss_bytes'] / 2**20:8.0f} {median['accuracy']:5.0%}  {outcomes}"
+        )
+        for stage, seconds in median["stages"].items():
+            print(f"    {stage:20} {seconds:7.2f}")
+    summary = report["summary"]
+    print(
+        f"\ndetection accuracy {summary['accuracy']:.0%}, expected outcome {summary['expected_rate']:.0%} "
+        f"over {summary['runs']} runs "
+        f"(tp={summary['true_positive']} fp={summary['false_positive']} "
+        f"fn={summary['false_negative']} tn={summary['true_negative']})"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the submission flow against the offline corpus")
+    parser.add_argument("--fixtures", nargs="+", help="Only run these fixtures (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per fixture (medians are reported)")
+    parser.add_argument("--timeout", type=float, default=180.0, help="Per-run timeout in seconds")
+    parser.add_argument("--headed", action="store_true", help="Show the browser instead of running headless")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_report.json"), help="Where to write the report")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="Also write the report here as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown / memory growth")
+    parser.add_argument("--min-delta", type=float, default=0.25, help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    report = asyncio.run(run_benchmark(args.fixtures, args.repeat, args.timeout, headless=not args.headed))
+    if not report["fixtures"]:
+        print("No fixtures matched", file=sys.stderr)
+        return 2
+
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print_summary(report)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_reports(report, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline} (baseline commit {baseline.get('commit')}):")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
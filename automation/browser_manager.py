@@ -24,16 +24,19 @@ except ImportError:
 class BrowserManager:
     """Manages a persistent browser instance for reuse across multiple URLs."""
     
-    def __init__(self, headless: bool = False, use_virtual_display: bool = False):
+    def __init__(self, headless: bool = False, use_virtual_display: bool = False, isolate_sessions: bool = True):
         """
         Initialize browser manager.
         
         Args:
             headless: Whether to run browser in headless mode
             use_virtual_display: Whether to use virtual display (for background operation)
+            isolate_sessions: Give every URL a fresh context so cookies/storage never leak between domains
         """
         self.headless = headless
         self.use_virtual_display = use_virtual_display
+        self.isolate_sessions = isolate_sessions
+        self._has_navigated = False
         self.playwright = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
@@ -124,6 +127,10 @@ class BrowserManager:
             else:
                 raise
         
+        await self._create_context_and_page()
+    
+    async def _create_context_and_page(self):
+        """Create a fresh context (with stealth scripts) and its single page."""
         # Create context
         print("   📦 Creating browser context...", file=sys.stderr)
         self.context = await self.browser.new_context(
@@ -157,6 +164,19 @@ class BrowserManager:
         self.page.set_default_timeout(180000)
         print("   ✅ Persistent page created - ready to navigate to URLs", file=sys.stderr)
     
+    async def new_session(self):
+        """Replace the current context and page, keeping the browser process warm."""
+        if not self.browser:
+            raise RuntimeError("Browser not started. Call start() first.")
+        try:
+            if self.context:
+                await self.context.close()  # Also closes the page
+        except Exception as e:
+            print(f"   ⚠️  Error closing previous context: {str(e)[:50]}", file=sys.stderr)
+        self.context = None
+        self.page = None
+        await self._create_context_and_page()
+    
     async def navigate_to(self, url: str, wait_until: str = "domcontentloaded", timeout: int = 30000):
         """
         Navigate to a new URL in the existing tab.
@@ -169,6 +189,10 @@ class BrowserManager:
         if not self.page:
             raise RuntimeError("Browser not started. Call start() first.")
         
+        # Fresh context per URL so one domain's cookies and storage never reach the next
+        if self.isolate_sessions and self._has_navigated:
+            await self.new_session()
+        
         # Verify page is still valid before navigating
         try:
             _ = self.page.url
@@ -180,6 +204,7 @@ class BrowserManager:
         
         print(f"   🔄 Navigating to: {url}", file=sys.stderr)
         try:
+            self._has_navigated = True
             await self.page.goto(url, wait_until=wait_until, timeout=timeout)
             print("   ✅ Navigation complete", file=sys.stderr)
         except Exception as e:
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Per-site politeness scheduling for batch runs.
+
+Work is keyed by registrable domain (eTLD+1), so ``a.example.com`` and
+``b.example.com`` count as the same site. For every site the scheduler caps how
+many jobs run at once and enforces a minimum spacing between job starts. When
+the next job for a site is not allowed yet, workers are handed jobs for other
+sites instead of sleeping; they only wait when every buffered job is blocked.
+"""
+
+import asyncio
+import functools
+import ipaddress
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Fallback when the backend settings (TEQ_SUBMISSION_DELAY_SECONDS) are not configured
+DEFAULT_SUBMISSION_DELAY_SECONDS = 5.0
+
+# Common multi-label public suffixes, used when tldextract is not installed
+_MULTI_LABEL_SUFFIXES = frozenset({
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk", "net.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "net.nz",
+    "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in",
+    "co.za", "org.za",
+    "com.br", "net.br", "org.br",
+    "com.mx", "com.ar", "com.co", "com.tr", "com.sg", "com.my", "com.hk", "com.cn",
+    "com.pk", "com.ng", "com.ph", "com.vn", "com.sa", "com.eg",
+    "co.jp", "ne.jp", "or.jp", "co.kr", "or.kr", "co.il", "co.id", "co.th",
+    "github.io", "herokuapp.com", "netlify.app", "vercel.app", "pages.dev",
+    "web.app", "firebaseapp.com", "azurewebsites.net", "blogspot.com",
+})
+
+
+def default_submission_delay() -> float:
+    """Minimum per-site spacing, read from the same env var as ``Settings.submission_delay_seconds``."""
+    try:
+        return max(0.0, float(os.environ.get("TEQ_SUBMISSION_DELAY_SECONDS", DEFAULT_SUBMISSION_DELAY_SECONDS)))
+    except ValueError:
+        return DEFAULT_SUBMISSION_DELAY_SECONDS
+
+
+_UNSET = object()
+_extractor: Any = _UNSET
+
+
+def _tld_extractor():
+    """tldextract over its bundled public suffix snapshot (never fetched over HTTP); None when not installed."""
+    global _extractor
+    if _extractor is _UNSET:
+        try:
+            import tldextract  # Optional: full public suffix list
+            _extractor = tldextract.TLDExtract(suffix_list_urls=())
+        except Exception:
+            _extractor = None
+    return _extractor
+
+
+@functools.lru_cache(maxsize=4096)
+def registrable_domain(url: str) -> str:
+    """Return the eTLD+1 for a URL or bare host (``https://a.b.example.co.uk/x`` -> ``example.co.uk``)."""
+    value = (url or "").strip()
+    if "://" not in value:
+        value = f"http://{value}"
+    try:
+        host = (urlsplit(value).hostname or "").rstrip(".").lower()
+    except ValueError:
+        host = ""
+    if not host:
+        return (url or "").strip().lower()
+
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    extractor = _tld_extractor()
+    if extractor is not None:
+        try:
+            extracted = extractor(host)
+            if extracted.domain and extracted.suffix:
+                return f"{extracted.domain}.{extracted.suffix}"
+        except Exception:
+            pass
+
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    if ".".join(labels[-2:]) in _MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class DomainScheduler:
+    """Bounded job buffer that dispatches round-robin across sites.
+
+    Args:
+        max_per_domain: jobs allowed to run concurrently against one site.
+        min_interval: seconds between two job starts on the same site
+            (defaults to ``TEQ_SUBMISSION_DELAY_SECONDS`` / 5.0).
+        max_buffered: jobs held in memory before ``add()`` blocks the producer.
+            A larger buffer lets the scheduler look further ahead for other
+            sites when the input is sorted by domain.
+        key_func: maps a job URL to its politeness key.
+    """
+
+    def __init__(
+        self,
+        max_per_domain: int = 1,
+        min_interval: Optional[float] = None,
+        max_buffered: int = 1000,
+        key_func: Callable[[str], str] = registrable_domain,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_per_domain = max(1, max_per_domain)
+        self.min_interval = default_submission_delay() if min_interval is None else max(0.0, min_interval)
+        self.max_buffered = max(1, max_buffered)
+        self._key_func = key_func
+        self._clock = clock
+
+        self._pending: "OrderedDict[str, Deque[Any]]" = OrderedDict()  # Round-robin order of sites with work
+        self._active: Dict[str, int] = {}
+        self._next_allowed: Dict[str, float] = {}
+        self._buffered = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+
+        self.dispatched = 0
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dispatched": self.dispatched,
+            "buffered": self._buffered,
+            "sites_pending": len(self._pending),
+            "sites_active": len(self._active),
+        }
+
+    async def add(self, url: str, job: Any) -> str:
+        """Buffer a job; blocks while ``max_buffered`` jobs are already waiting."""
+        key = self._key_func(url)
+        async with self._cond:
+            while self._buffered >= self.max_buffered and not self._closed:
+                await self._cond.wait()
+            if self._closed:
+                raise RuntimeError("DomainScheduler is closed")
+            self._pending.setdefault(key, deque()).append(job)
+            self._buffered += 1
+            self._cond.notify_all()
+        return key
+
+    async def close(self):
+        """No more jobs will be added; ``next()`` returns None once the buffer is empty."""
+        async with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    async def next(self) -> Optional[Tuple[str, Any]]:
+        """Return ``(key, job)`` for the next job allowed to start, or None when finished.
+
+        Call ``release(key)`` when the job completes.
+        """
+        async with self._cond:
+            while True:
+                picked, wait = self._pick(self._clock())
+                if picked is not None:
+                    self._cond.notify_all()  # Wake a producer blocked on a full buffer
+                    return picked
+                if self._closed and self._buffered == 0:
+                    return None
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, key: str):
+        """Mark one job for ``key`` as finished."""
+        async with self._cond:
+            remaining = self._active.get(key, 0) - 1
+            if remaining > 0:
+                self._active[key] = remaining
+            else:
+                self._active.pop(key, None)
+            self._prune(self._clock())
+            self._cond.notify_all()
+
+    def _pick(self, now: float) -> Tuple[Optional[Tuple[str, Any]], Optional[float]]:
+        wait: Optional[float] = None
+        for key, jobs in self._pending.items():
+            if self._active.get(key, 0) >= self.max_per_domain:
+                continue  # A release() will wake us
+            ready_at = self._next_allowed.get(key, 0.0)
+            if ready_at > now:
+                delay = ready_at - now
+                wait = delay if wait is None else min(wait, delay)
+                continue
+
+            job = jobs.popleft()
+            if jobs:
+                self._pending.move_to_end(key)
+            else:
+                del self._pending[key]
+            self._buffered -= 1
+            self._active[key] = self._active.get(key, 0) + 1
+            if self.min_interval:
+                self._next_allowed[key] = now + self.min_interval
+            self.dispatched += 1
+            return (key, job), None
+        return None, wait
+
+    def _prune(self, now: float):
+        # Forget spacing deadlines that have passed so memory stays bounded on huge batches
+        if len(self._next_allowed) <= 2 * self.max_buffered:
+            return
+        for key in [k for k, ready_at in self._next_allowed.items() if ready_at <= now]:
+            del self._next_allowed[key]
@@ -2,27 +2,46 @@
 """
 Batch processing script for multiple domains.
 
-This script processes multiple domains in parallel using asyncio.
-It's designed to be called from the Next.js API or run standalone.
+Domains are streamed through a bounded, politeness-aware scheduler into a pool
+of async workers. Work is keyed by registrable domain (eTLD+1): each site gets
+at most ``--per-domain-concurrency`` jobs at once and ``--domain-delay`` seconds
+between job starts, while idle workers pick up jobs for other sites. Every worker runs ``run_ultra_resilient_submission`` in its own
+isolated browser context (leased from one warm browser pool), and each result
+is appended to an NDJSON file as soon as it finishes. Memory stays constant no
+matter how many domains the batch holds, and a crash loses at most the
+in-flight jobs: rerun with ``--resume`` to skip URLs that already have results.
+With ``--adaptive`` the number of jobs in flight follows the host's load, free
+memory and browser RSS (see adaptive_concurrency.py) up to ``--workers``.
 
 Usage:
     python3 process_batch.py --domains domain1.com domain2.com --template template.json
-    python3 process_batch.py --domains-file domains.txt --template template.json --workers 10
+    python3 process_batch.py --domains-file domains.txt --template template.json --workers 10 --output results.ndjson
+    python3 process_batch.py --domains-file domains.txt --template template.json --output results.ndjson --resume
+    python3 process_batch.py --domains-file domains.txt --template template.json --adaptive --workers 60
 """
 
 import argparse
 import asyncio
 import json
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO
 
-# Add automation directory to Python path
+# Add automation directory (and the submission scripts) to Python path
 _script_dir = Path(__file__).parent.absolute()
-if str(_script_dir) not in sys.path:
-    sys.path.insert(0, str(_script_dir))
+for _path in (_script_dir, _script_dir / "submission"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
 
-from run_submission import run_submission
+from adaptive_concurrency import DEFAULT_MAX_LOAD_PER_CPU, DEFAULT_MIN_FREE_MEMORY, AdaptiveConcurrency
+from domain_scheduler import DomainScheduler
+from form_discovery import SubmissionWorker, run_ultra_resilient_submission
+from stage_timing import REGISTRY as STAGE_METRICS, STAGE_NAMES, serve_metrics
+
+# Ceiling for --workers when the adaptive controller decides the actual concurrency
+MAX_ADAPTIVE_WORKERS = 200
 
 
 async def process_single_domain(
@@ -30,10 +49,15 @@ async def process_single_domain(
     template_path: Path,
     domain_id: Optional[int] = None,
     template_id: Optional[int] = None,
+    worker: Optional[SubmissionWorker] = None,
 ) -> Dict[str, Any]:
     """Process a single domain and return the result."""
+    started = time.time()
     try:
-        result = await run_submission(url, template_path)
+        if worker is not None:
+            result = await worker.run_job({"url": url, "template": str(template_path)})
+        else:
+            result = await run_ultra_resilient_submission(url, template_path)
         return {
             "url": url,
             "domain_id": domain_id,
@@ -41,6 +65,7 @@ async def process_single_domain(
             "status": result.get("status", "unknown"),
             "message": result.get("message", ""),
             "success": result.get("status") == "success",
+            "duration_seconds": round(time.time() - started, 3),
         }
     except Exception as e:
         return {
@@ -50,85 +75,168 @@ async def process_single_domain(
             "status": "error",
             "message": f"Exception: {str(e)}",
             "success": False,
+            "duration_seconds": round(time.time() - started, 3),
         }
 
 
+class NdjsonResultSink:
+    """Append one JSON line per result and flush immediately so partial runs survive crashes."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.total = 0
+        self.successful = 0
+
+    def write(self, result: Dict[str, Any]):
+        self.stream.write(json.dumps(result) + "\n")
+        self.stream.flush()
+        self.total += 1
+        if result.get("success"):
+            self.successful += 1
+
+    @property
+    def failed(self) -> int:
+        return self.total - self.successful
+
+
 async def process_batch_parallel(
-    domains: List[Dict[str, Any]],
+    domains: Iterable[Dict[str, Any]],
     template_path: Path,
     max_workers: int = 20,
-) -> List[Dict[str, Any]]:
-    """Process multiple domains in parallel using asyncio semaphore.
-    
-    Optimized for maximum speed with aggressive parallelism.
+    sink: Optional[NdjsonResultSink] = None,
+    skip_urls: Optional[Set[str]] = None,
+    per_domain_concurrency: int = 1,
+    domain_delay: Optional[float] = None,
+    max_buffered: int = 1000,
+    controller: Optional[AdaptiveConcurrency] = None,
+) -> NdjsonResultSink:
+    """Stream domains through ``max_workers`` consumers and write each result as it completes.
+
+    ``domains`` may be any iterable (including a generator over a 50k-line file);
+    at most ``max_buffered`` domains are held in memory at any time.
+    ``domain_delay`` defaults to ``TEQ_SUBMISSION_DELAY_SECONDS`` (5s).
+    With a ``controller``, ``max_workers`` is only the ceiling: each consumer takes
+    one of the controller's slots per job, so the host's load decides how many run.
     """
-    
-    # Cap workers at reasonable limit to avoid resource exhaustion
-    max_workers = min(max_workers, 50)
-    
-    # Create semaphore to limit concurrent workers
-    semaphore = asyncio.Semaphore(max_workers)
-    
-    async def process_with_semaphore(domain_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a domain with semaphore control."""
-        async with semaphore:
-            return await process_single_domain(
+    if controller is not None:
+        max_workers = max(1, min(max_workers, MAX_ADAPTIVE_WORKERS))
+        controller.max_limit = min(controller.max_limit, max_workers)
+    else:
+        # Cap workers at reasonable limit to avoid resource exhaustion
+        max_workers = max(1, min(max_workers, 50))
+    sink = sink or NdjsonResultSink(sys.stdout)
+    skip_urls = skip_urls or set()
+
+    scheduler = DomainScheduler(
+        max_per_domain=per_domain_concurrency,
+        min_interval=domain_delay,
+        max_buffered=max(max_buffered, max_workers * 2),
+    )
+    worker = SubmissionWorker(concurrency=max_workers, prewarm=min(2, max_workers))
+
+    async def producer():
+        try:
+            for domain_info in domains:
+                if domain_info.get("url") in skip_urls:
+                    continue
+                await scheduler.add(domain_info["url"], domain_info)  # Blocks while the buffer is full
+        finally:
+            await scheduler.close()
+
+    async def run_one() -> bool:
+        leased = await scheduler.next()
+        if leased is None:
+            return False
+        site, domain_info = leased
+        try:
+            result = await process_single_domain(
                 url=domain_info["url"],
                 template_path=template_path,
                 domain_id=domain_info.get("domain_id"),
                 template_id=domain_info.get("template_id"),
+                worker=worker,
             )
-    
-    # Create tasks for all domains
-    tasks = [process_with_semaphore(domain_info) for domain_info in domains]
-    
-    # Run all tasks concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Handle exceptions
-    processed_results = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            processed_results.append({
-                "url": domains[i]["url"],
-                "domain_id": domains[i].get("domain_id"),
-                "template_id": domains[i].get("template_id"),
-                "status": "error",
-                "message": f"Exception: {str(result)}",
-                "success": False,
-            })
-        else:
-            processed_results.append(result)
-    
-    return processed_results
+            result["site"] = site
+            sink.write(result)
+        finally:
+            await scheduler.release(site)
+        return True
+
+    async def consumer():
+        while True:
+            if controller is None:
+                if not await run_one():
+                    return
+                continue
+            async with controller.slot():
+                if not await run_one():
+                    return
+
+    if controller is not None:
+        controller.start()
+    try:
+        await asyncio.gather(producer(), *(consumer() for _ in range(max_workers)))
+    finally:
+        if controller is not None:
+            await controller.stop()
+        await worker.manager.cleanup()
+    return sink
 
 
 async def process_batch_sequential(
-    domains: List[Dict[str, Any]],
+    domains: Iterable[Dict[str, Any]],
     template_path: Path,
-) -> List[Dict[str, Any]]:
-    """Process multiple domains sequentially (for comparison/testing)."""
-    results = []
-    for domain_info in domains:
-        result = await process_single_domain(
-            url=domain_info["url"],
-            template_path=template_path,
-            domain_id=domain_info.get("domain_id"),
-            template_id=domain_info.get("template_id"),
-        )
-        results.append(result)
-    return results
+    sink: Optional[NdjsonResultSink] = None,
+    skip_urls: Optional[Set[str]] = None,
+    domain_delay: Optional[float] = None,
+) -> NdjsonResultSink:
+    """Process multiple domains one at a time (for comparison/testing)."""
+    return await process_batch_parallel(
+        domains, template_path, max_workers=1, sink=sink, skip_urls=skip_urls, domain_delay=domain_delay
+    )
+
+
+def iter_domains_from_file(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield domains from a file lazily.
+
+    Each line is either a plain URL or an NDJSON object with ``url`` and optional
+    ``domain_id``/``template_id``. Blank lines and ``#`` comments are skipped.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and record.get("url"):
+                    yield record
+                continue
+            yield {"url": line}
 
 
 def load_domains_from_file(file_path: Path) -> List[Dict[str, Any]]:
     """Load domains from a text file (one URL per line)."""
-    domains = []
-    with open(file_path, "r") as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if line and not line.startswith("#"):
-                domains.append({"url": line})
-    return domains
+    return list(iter_domains_from_file(file_path))
+
+
+def load_completed_urls(output_path: Path) -> Set[str]:
+    """Return URLs that already have a result line in an NDJSON output file."""
+    completed: Set[str] = set()
+    if not output_path.exists():
+        return completed
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from a crash
+            if isinstance(record, dict) and record.get("url"):
+                completed.add(record["url"])
+    return completed
 
 
 def main() -> int:
@@ -144,7 +252,7 @@ def main() -> int:
     parser.add_argument(
         "--domains-file",
         type=Path,
-        help="File containing domain URLs (one per line)",
+        help="File containing domain URLs (one per line, or NDJSON objects with a url key)",
     )
     parser.add_argument(
         "--template",
@@ -158,84 +266,186 @@ def main() -> int:
         default=20,
         help="Number of parallel workers (default: 20, max recommended: 50)",
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Let host load, free memory and browser RSS decide concurrency (AIMD); "
+             "--workers becomes the ceiling (up to %d)" % MAX_ADAPTIVE_WORKERS,
+    )
+    parser.add_argument(
+        "--min-workers",
+        type=int,
+        default=1,
+        help="Adaptive mode: never run fewer jobs at once than this (default: 1)",
+    )
+    parser.add_argument(
+        "--max-load-per-cpu",
+        type=float,
+        default=DEFAULT_MAX_LOAD_PER_CPU,
+        help=f"Adaptive mode: back off above this 1-minute load average per CPU (default: {DEFAULT_MAX_LOAD_PER_CPU})",
+    )
+    parser.add_argument(
+        "--min-free-memory",
+        type=float,
+        default=DEFAULT_MIN_FREE_MEMORY,
+        help=f"Adaptive mode: back off below this fraction of available memory (default: {DEFAULT_MIN_FREE_MEMORY})",
+    )
+    parser.add_argument(
+        "--max-browser-rss-mb",
+        type=float,
+        default=None,
+        help="Adaptive mode: back off when Playwright + Chromium RSS exceeds this (default: 70%% of RAM)",
+    )
     parser.add_argument(
         "--sequential",
         action="store_true",
         help="Process domains sequentially instead of in parallel",
     )
+    parser.add_argument(
+        "--per-domain-concurrency",
+        type=int,
+        default=1,
+        help="Maximum jobs running at once against one registrable domain (default: 1)",
+    )
+    parser.add_argument(
+        "--domain-delay",
+        type=float,
+        default=None,
+        help="Minimum seconds between job starts on one registrable domain "
+             "(default: TEQ_SUBMISSION_DELAY_SECONDS or 5)",
+    )
+    parser.add_argument(
+        "--max-buffered",
+        type=int,
+        default=1000,
+        help="Domains read ahead from the input so workers can skip busy sites (default: 1000)",
+    )
     parser.add_argument(
         "--output",
         type=Path,
-        help="Output file for results (JSON)",
+        help="NDJSON file results are appended to as they finish (default: stdout)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip URLs that already have a result in --output",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve per-stage Prometheus metrics on this port while the batch runs",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        help="Write per-stage Prometheus metrics to this file when the batch finishes",
     )
-    
+
     args = parser.parse_args()
-    
-    # Load domains
-    domains = []
+
+    # Load domains (lazily for files so huge batches are never held in memory)
+    domains: Iterable[Dict[str, Any]]
     if args.domains:
         domains = [{"url": url} for url in args.domains]
     elif args.domains_file:
         if not args.domains_file.exists():
             print(f"Error: Domains file not found: {args.domains_file}", file=sys.stderr)
             return 1
-        domains = load_domains_from_file(args.domains_file)
+        domains = iter_domains_from_file(args.domains_file)
     else:
         print("Error: Must provide either --domains or --domains-file", file=sys.stderr)
         return 1
-    
-    if not domains:
-        print("Error: No domains to process", file=sys.stderr)
-        return 1
-    
+
     # Check template file
     if not args.template.exists():
         print(f"Error: Template file not found: {args.template}", file=sys.stderr)
         return 1
-    
-    print(f"Processing {len(domains)} domain(s)...", file=sys.stderr)
+
+    skip_urls: Set[str] = set()
+    if args.resume:
+        if not args.output:
+            print("Error: --resume requires --output", file=sys.stderr)
+            return 1
+        skip_urls = load_completed_urls(args.output)
+        print(f"Resuming: {len(skip_urls)} URL(s) already have results", file=sys.stderr)
+
     print(f"Template: {args.template}", file=sys.stderr)
-    print(f"Mode: {'Sequential' if args.sequential else f'Parallel ({args.workers} workers)'}", file=sys.stderr)
-    print("", file=sys.stderr)
-    
-    # Process domains
-    if args.sequential:
-        results = asyncio.run(process_batch_sequential(domains, args.template))
+    controller = None
+    if args.adaptive and not args.sequential:
+        ceiling = max(1, min(args.workers, MAX_ADAPTIVE_WORKERS))
+        controller = AdaptiveConcurrency(
+            min_limit=min(args.min_workers, ceiling),
+            max_limit=ceiling,
+            initial=min(ceiling, max(args.min_workers, os.cpu_count() or 1)),
+            max_load_per_cpu=args.max_load_per_cpu,
+            min_free_memory=args.min_free_memory,
+            max_browser_rss_mb=args.max_browser_rss_mb,
+        )
+        mode = f"Adaptive ({controller.min_limit}-{controller.max_limit} workers, starting at {controller.limit})"
     else:
-        results = asyncio.run(process_batch_parallel(domains, args.template, args.workers))
-    
+        mode = "Sequential" if args.sequential else f"Parallel ({args.workers} workers)"
+    print(f"Mode: {mode}", file=sys.stderr)
+    print("", file=sys.stderr)
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+        print(f"Metrics: http://0.0.0.0:{args.metrics_port}/metrics", file=sys.stderr)
+
+    output_stream = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    sink = NdjsonResultSink(output_stream)
+    try:
+        if args.sequential:
+            asyncio.run(process_batch_sequential(
+                domains, args.template, sink=sink, skip_urls=skip_urls, domain_delay=args.domain_delay
+            ))
+        else:
+            asyncio.run(process_batch_parallel(
+                domains,
+                args.template,
+                args.workers,
+                sink=sink,
+                skip_urls=skip_urls,
+                per_domain_concurrency=args.per_domain_concurrency,
+                domain_delay=args.domain_delay,
+                max_buffered=args.max_buffered,
+                controller=controller,
+            ))
+    finally:
+        if args.output:
+            output_stream.close()
+
+    if sink.total == 0 and not skip_urls:
+        print("Error: No domains to process", file=sys.stderr)
+        return 1
+
     # Print summary
-    success_count = sum(1 for r in results if r.get("success"))
-    error_count = len(results) - success_count
-    
     print("", file=sys.stderr)
     print("=" * 80, file=sys.stderr)
     print("SUMMARY", file=sys.stderr)
     print("=" * 80, file=sys.stderr)
-    print(f"Total domains: {len(results)}", file=sys.stderr)
-    print(f"Successful: {success_count}", file=sys.stderr)
-    print(f"Failed: {error_count}", file=sys.stderr)
-    print("", file=sys.stderr)
-    
-    # Output results
-    output_data = {
-        "total": len(results),
-        "successful": success_count,
-        "failed": error_count,
-        "results": results,
-    }
-    
+    print(f"Total domains: {sink.total}", file=sys.stderr)
+    print(f"Successful: {sink.successful}", file=sys.stderr)
+    print(f"Failed: {sink.failed}", file=sys.stderr)
+    if controller is not None:
+        print(f"Concurrency: ended at {controller.limit}, peak {controller.peak_in_flight} "
+              f"({controller.changes} adjustment(s))", file=sys.stderr)
     if args.output:
-        with open(args.output, "w") as f:
-            json.dump(output_data, f, indent=2)
         print(f"Results saved to: {args.output}", file=sys.stderr)
-    else:
-        # Print JSON to stdout
-        print(json.dumps(output_data, indent=2))
-    
-    return 0 if error_count == 0 else 1
+    print("", file=sys.stderr)
+    print("Stage latency (p50 / p95 / p99 seconds):", file=sys.stderr)
+    for stage in [*STAGE_NAMES.values(), "total"]:
+        q = STAGE_METRICS.quantiles(stage)
+        if any(q.values()):
+            print(f"  {stage:<16} {q[0.5]:7.2f} {q[0.95]:7.2f} {q[0.99]:7.2f}", file=sys.stderr)
+    if args.metrics_file:
+        args.metrics_file.write_text(STAGE_METRICS.render_prometheus(), encoding="utf-8")
+        print(f"Metrics written to: {args.metrics_file}", file=sys.stderr)
+    print("", file=sys.stderr)
+
+    return 0 if sink.failed == 0 else 1
 
 
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -2,20 +2,20 @@
 """
 Run automation for multiple URLs using a single browser tab.
 
-This script reuses the same browser tab, just navigating to different URLs.
-The browser runs in the background (headless=False with virtual display).
+This script keeps one browser warm and runs every URL in a fresh, isolated
+context on it. The browser runs in the background (headless=False with virtual
+display, which form_discovery sets up itself when no DISPLAY is available).
 """
 
 import asyncio
-import json
 import sys
 from pathlib import Path
 
-# Add automation directory to path
+# Add automation directory (and the submission scripts) to path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "submission"))
 
-from browser_manager import BrowserManager
-from run_submission import run_submission
+from form_discovery import SubmissionWorker
 
 
 async def run_multiple_urls(urls: list, template_path: Path, headless: bool = False, use_virtual_display: bool = True):
@@ -26,34 +26,17 @@ async def run_multiple_urls(urls: list, template_path: Path, headless: bool = Fa
         urls: List of URLs to process
         template_path: Path to template JSON file
         headless: Whether to run in headless mode (False = visible but in background)
-        use_virtual_display: Whether to use virtual display for background operation
+        use_virtual_display: Kept for CLI compatibility; form_discovery starts Xvfb when needed
     """
-    # Load template
-    template = json.loads(template_path.read_text())
-    
-    # Enable browser reuse in template
-    template['reuse_browser'] = True
-    template['headless'] = headless
-    template['use_virtual_display'] = use_virtual_display
-    
-    # Save updated template
-    updated_template_path = template_path.parent / f"{template_path.stem}_reuse.json"
-    updated_template_path.write_text(json.dumps(template, indent=2))
-    
-    # Create browser manager
-    browser_manager = BrowserManager(
-        headless=headless,
-        use_virtual_display=use_virtual_display
-    )
+    # One warm browser; each URL leases its own context from it
+    worker = SubmissionWorker(headless=headless, concurrency=1, prewarm=1)
     
     results = []
     
     try:
-        # Start browser once
         print("=" * 70)
         print("Starting persistent browser (single tab mode)")
         print("=" * 70)
-        await browser_manager.start()
         
         # Process each URL
         for i, url in enumerate(urls, 1):
@@ -62,11 +45,7 @@ async def run_multiple_urls(urls: list, template_path: Path, headless: bool = Fa
             print(f"{'=' * 70}\n")
             
             try:
-                result = await run_submission(
-                    url=url,
-                    template_path=updated_template_path,
-                    browser_manager=browser_manager
-                )
+                result = await worker.run_job({"url": url, "template": str(template_path)})
                 results.append({
                     'url': url,
                     'result': result,
@@ -92,7 +71,7 @@ async def run_multiple_urls(urls: list, template_path: Path, headless: bool = Fa
         print("\n" + "=" * 70)
         print("Stopping browser")
         print("=" * 70)
-        await browser_manager.stop()
+        await worker.manager.cleanup()
     
     # Print summary
     print("\n" + "=" * 70)
@@ -0,0 +1,105 @@
+"""
+Browser execution mode: headless by default, visible only when a page needs it.
+
+``visible`` is the old behaviour: every run launches a headed browser, which on
+servers means an Xvfb display plus full compositing. ``headless`` never shows
+a browser. ``auto`` (the default) runs headless and escalates a single run to
+a visible browser on a (virtual) display only when ``needs_visible_browser``
+finds an interactive challenge widget on the page: a reCAPTCHA v2 checkbox,
+hCaptcha or Cloudflare Turnstile. Invisible reCAPTCHA v3 badges and
+proof-of-work widgets work headless and do not escalate.
+
+The mode comes from the template's ``browser_mode`` key, then the
+``TEQ_BROWSER_MODE`` environment variable. Legacy templates that only carry
+``"headless": true`` run headless, and everything else runs ``auto``.
+``ModeUsage`` records wall time and browser-tree RSS for each mode a run used.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from resource_usage import children_rss_bytes
+
+AUTO = "auto"
+HEADLESS = "headless"
+VISIBLE = "visible"
+BROWSER_MODES = (AUTO, HEADLESS, VISIBLE)
+
+# Returns the first widget that only works (or only gets solved) in a headed browser
+_INTERACTIVE_WIDGET_JS = """
+() => {
+    const shown = (el) => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    for (const el of document.querySelectorAll('.g-recaptcha[data-sitekey], iframe[src*="recaptcha/api2/anchor"], iframe[src*="recaptcha/enterprise/anchor"]')) {
+        if (el.getAttribute('data-size') === 'invisible' || (el.src || '').includes('size=invisible')) continue;
+        if (shown(el)) return 'recaptcha_v2';
+    }
+    if (shown(document.querySelector('.h-captcha[data-sitekey], iframe[src*="hcaptcha.com"]'))) return 'hcaptcha';
+    if (shown(document.querySelector('.cf-turnstile, iframe[src*="challenges.cloudflare.com"]'))) return 'turnstile';
+    return null;
+}
+"""
+
+
+def resolve_browser_mode(template: Mapping[str, Any]) -> str:
+    """``auto``, ``headless`` or ``visible`` for a run of ``template``."""
+    for candidate in (template.get("browser_mode"), os.environ.get("TEQ_BROWSER_MODE")):
+        mode = str(candidate or "").strip().lower()
+        if mode in BROWSER_MODES:
+            return mode
+    return HEADLESS if template.get("headless") is True else AUTO
+
+
+async def needs_visible_browser(page) -> Optional[str]:
+    """Name of the interactive widget that calls for a visible browser, or None."""
+    try:
+        return await page.evaluate(_INTERACTIVE_WIDGET_JS)
+    except Exception:
+        return None
+
+
+def _rss_mb() -> float:
+    return round(children_rss_bytes() / (1024 * 1024), 1)
+
+
+class ModeUsage:
+    """Wall time and browser RSS per mode for one run (the ``browser_mode`` result entry)."""
+
+    def __init__(self, requested: str, mode: str):
+        self.requested = requested
+        self.mode = mode
+        self.escalation: Optional[Dict[str, Any]] = None
+        self._spans: Dict[str, Dict[str, float]] = {}
+        self._started = time.monotonic()
+
+    def switch(self, mode: str, reason: str) -> None:
+        """Close the current mode's span and start timing ``mode``."""
+        self._close()
+        self.escalation = {"from": self.mode, "to": mode, "reason": reason}
+        self.mode = mode
+        self._started = time.monotonic()
+
+    def revert(self) -> None:
+        """The switch did not happen: keep timing the previous mode."""
+        if self.escalation is not None:
+            self.escalation["failed"] = True
+            self.mode = self.escalation["from"]
+
+    def _close(self) -> None:
+        span = self._spans.setdefault(self.mode, {"seconds": 0.0, "rss_mb": 0.0})
+        span["seconds"] = round(span["seconds"] + time.monotonic() - self._started, 3)
+        span["rss_mb"] = max(span["rss_mb"], _rss_mb())
+
+    def report(self) -> Dict[str, Any]:
+        """Close the running span and return the summary for the result."""
+        self._close()
+        self._started = time.monotonic()
+        return {
+            "requested": self.requested,
+            "final": self.mode,
+            "escalated": self.escalation is not None and not self.escalation.get("failed"),
+            "escalation": self.escalation,
+            "modes": {mode: dict(span) for mode, span in self._spans.items()},
+        }
@@ -0,0 +1,316 @@
+"""
+Browser context pool for isolated, concurrent submissions.
+
+One (or a few) browser processes serve fresh BrowserContexts on demand. Every
+job gets its own context, so cookies, storage and service workers never leak
+between domains, while the expensive browser launch is paid once per slot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+
+def _noop_log(*_args, **_kwargs):
+    pass
+
+
+class _BrowserSlot:
+    """One launched browser process and its bookkeeping."""
+
+    __slots__ = ("browser", "active", "served", "draining")
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.active = 0        # contexts currently open on this browser (leased + pre-warmed)
+        self.served = 0        # contexts ever created on this browser
+        self.draining = False  # no new contexts; closed once active drops to 0
+
+    def is_connected(self) -> bool:
+        try:
+            return bool(self.browser and self.browser.is_connected())
+        except Exception:
+            return False
+
+
+class PooledSession:
+    """A context + page leased from the pool for exactly one job."""
+
+    __slots__ = ("context", "page", "slot")
+
+    def __init__(self, context, page, slot: _BrowserSlot):
+        self.context = context
+        self.page = page
+        self.slot = slot
+
+
+class BrowserContextPool:
+    """Serve isolated contexts from a small set of warm browsers.
+
+    Args:
+        launcher: async callable returning a newly launched Browser (or None).
+        browsers: number of browser processes to keep serving contexts.
+        max_contexts: maximum contexts leased at the same time (concurrency limit).
+        prewarm: contexts created ahead of demand so acquire() returns immediately.
+        max_contexts_per_browser: recycle a browser after serving this many contexts.
+        context_options: keyword arguments forwarded to ``browser.new_context``.
+        log: logging callable (defaults to silent).
+    """
+
+    def __init__(
+        self,
+        launcher: Callable[[], Awaitable[Any]],
+        *,
+        browsers: int = 1,
+        max_contexts: int = 8,
+        prewarm: int = 2,
+        max_contexts_per_browser: int = 50,
+        context_options: Optional[Dict[str, Any]] = None,
+        log: Callable[..., None] = _noop_log,
+    ):
+        self._launcher = launcher
+        self.browsers = max(1, browsers)
+        self.max_contexts = max(1, max_contexts)
+        self.prewarm = max(0, prewarm)
+        self.max_contexts_per_browser = max(1, max_contexts_per_browser)
+        self.context_options = context_options or {"viewport": {"width": 1280, "height": 720}}
+        self._log = log
+
+        self._slots: List[_BrowserSlot] = []
+        self._prewarmed: Deque[PooledSession] = deque()
+        self._leased: Dict[int, PooledSession] = {}
+        self._semaphore = asyncio.Semaphore(self.max_contexts)
+        self._lock = asyncio.Lock()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # ------------------------------------------------------------------ state
+
+    @property
+    def leased_count(self) -> int:
+        return len(self._leased)
+
+    @property
+    def prewarmed_count(self) -> int:
+        return len(self._prewarmed)
+
+    def is_alive(self) -> bool:
+        """True while at least one browser slot is connected."""
+        return not self._closed and any(slot.is_connected() for slot in self._slots)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "browsers": len(self._slots),
+            "leased": self.leased_count,
+            "prewarmed": self.prewarmed_count,
+            "served": sum(slot.served for slot in self._slots),
+        }
+
+    # -------------------------------------------------------------- lifecycle
+
+    async def start(self, first_browser=None) -> bool:
+        """Adopt an already-launched browser (optional), launch the rest and pre-warm."""
+        if first_browser is not None:
+            self._slots.append(_BrowserSlot(first_browser))
+        async with self._lock:
+            while self._healthy_slot_count() < self.browsers:
+                if not await self._launch_slot():
+                    break
+        if not self._slots:
+            return False
+        self._schedule_refill()
+        return True
+
+    async def close(self):
+        """Close every pre-warmed and leased context, then every browser."""
+        self._closed = True
+        if self._refill_task and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except BaseException:
+                pass
+        self._refill_task = None
+
+        sessions = list(self._prewarmed) + list(self._leased.values())
+        self._prewarmed.clear()
+        self._leased.clear()
+        for session in sessions:
+            await self._close_context(session)
+        for slot in self._slots:
+            await self._close_browser(slot)
+        self._slots.clear()
+
+    def drain(self):
+        """Mark every browser for recycling; each closes once its contexts are released."""
+        for slot in self._slots:
+            slot.draining = True
+        self._drop_prewarmed_on_draining()
+
+    # ----------------------------------------------------------------- leases
+
+    async def acquire(self) -> Optional[PooledSession]:
+        """Lease a fresh, isolated context (waits while the concurrency limit is reached)."""
+        if self._closed:
+            return None
+        await self._semaphore.acquire()
+        try:
+            session = await self._take_prewarmed()
+            if session is None:
+                async with self._lock:
+                    session = await self._create_session()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        if session is None:
+            self._semaphore.release()
+            return None
+        self._leased[id(session)] = session
+        self._schedule_refill()
+        return session
+
+    async def release(self, session: Optional[PooledSession]):
+        """Close a leased context and free its concurrency slot."""
+        if session is None or self._leased.pop(id(session), None) is None:
+            return
+        try:
+            await self._close_context(session)
+            await self._retire_if_drained(session.slot)
+        finally:
+            self._semaphore.release()
+        self._schedule_refill()
+
+    # --------------------------------------------------------------- internals
+
+    def _healthy_slot_count(self) -> int:
+        return sum(1 for slot in self._slots if slot.is_connected() and not slot.draining)
+
+    async def _launch_slot(self) -> Optional[_BrowserSlot]:
+        try:
+            browser = await self._launcher()
+        except Exception as e:
+            self._log(f"⚠️  Pool browser launch failed: {str(e)[:80]}")
+            browser = None
+        if not browser:
+            return None
+        slot = _BrowserSlot(browser)
+        self._slots.append(slot)
+        self._log(f"🧊 Pool browser launched ({len(self._slots)} running)")
+        return slot
+
+    async def _pick_slot(self) -> Optional[_BrowserSlot]:
+        # Drop disconnected browsers and retire ones that served enough contexts
+        for slot in list(self._slots):
+            if not slot.is_connected():
+                self._log("⚠️  Pool browser disconnected - replacing it")
+                self._slots.remove(slot)
+            elif slot.served >= self.max_contexts_per_browser and not slot.draining:
+                self._log(f"♻️  Pool browser served {slot.served} contexts - recycling")
+                slot.draining = True
+                await self._retire_if_drained(slot)
+        if self._healthy_slot_count() < self.browsers:
+            await self._launch_slot()
+        candidates = [slot for slot in self._slots if slot.is_connected() and not slot.draining]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda slot: slot.active)
+
+    async def _create_session(self) -> Optional[PooledSession]:
+        slot = await self._pick_slot()
+        if slot is None:
+            return None
+        context = None
+        try:
+            context = await slot.browser.new_context(**self.context_options)
+            page = await context.new_page()
+        except Exception as e:
+            self._log(f"⚠️  Pool context creation failed: {str(e)[:80]}")
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            return None
+        slot.active += 1
+        slot.served += 1
+        return PooledSession(context, page, slot)
+
+    async def _is_healthy(self, session: PooledSession) -> bool:
+        if session.slot.draining or not session.slot.is_connected():
+            return False
+        try:
+            if session.page.is_closed():
+                return False
+            await asyncio.wait_for(session.page.evaluate("1"), timeout=2)
+            return True
+        except Exception:
+            return False
+
+    async def _take_prewarmed(self) -> Optional[PooledSession]:
+        while self._prewarmed:
+            session = self._prewarmed.popleft()
+            if await self._is_healthy(session):
+                return session
+            await self._close_context(session)
+            await self._retire_if_drained(session.slot)
+        return None
+
+    def _schedule_refill(self):
+        if self._closed or self.prewarm == 0:
+            return
+        if self._refill_task and not self._refill_task.done():
+            return
+        try:
+            self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+        except RuntimeError:
+            self._refill_task = None
+
+    async def _refill(self):
+        while not self._closed and len(self._prewarmed) < self.prewarm:
+            async with self._lock:
+                session = await self._create_session()
+            if session is None:
+                return
+            if self._closed:
+                await self._close_context(session)
+                return
+            self._prewarmed.append(session)
+
+    def _drop_prewarmed_on_draining(self):
+        keep: Deque[PooledSession] = deque()
+        stale: List[PooledSession] = []
+        for session in self._prewarmed:
+            (stale if session.slot.draining else keep).append(session)
+        self._prewarmed = keep
+        for session in stale:
+            try:
+                asyncio.get_running_loop().create_task(self._discard(session))
+            except RuntimeError:
+                pass
+
+    async def _discard(self, session: PooledSession):
+        await self._close_context(session)
+        await self._retire_if_drained(session.slot)
+
+    async def _retire_if_drained(self, slot: _BrowserSlot):
+        if slot.draining:
+            self._drop_prewarmed_on_draining()
+        if slot.draining and slot.active <= 0 and slot in self._slots:
+            self._slots.remove(slot)
+            await self._close_browser(slot)
+            self._log(f"♻️  Pool browser retired after {slot.served} contexts")
+
+    async def _close_context(self, session: PooledSession):
+        try:
+            await session.context.close()
+        except Exception:
+            pass
+        session.slot.active = max(0, session.slot.active - 1)
+
+    async def _close_browser(self, slot: _BrowserSlot):
+        try:
+            await slot.browser.close()
+        except Exception:
+            pass
@@ -0,0 +1,357 @@
+"""
+HTTP-first contact-page discovery.
+
+Runs before (and concurrently with) the browser launch: fetches the landing
+page with a pooled async HTTP client, collects candidate contact URLs from
+anchors (nav/header/footer weighted), ``sitemap.xml`` and common paths, ranks
+them and validates the best ones with real GETs. Only candidates that answered
+200 with HTML on the same site are returned, so the browser can open the real
+contact page directly instead of guessing ``/contact`` after a full page load.
+
+Uses ``httpx`` when installed (``DiscoveryClient`` keeps one pool per worker)
+and falls back to ``urllib`` in a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+try:
+    import httpx
+except ImportError:  # Optional dependency
+    httpx = None
+
+_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+_MAX_BODY_BYTES = 2 * 1024 * 1024
+
+COMMON_CONTACT_PATHS = (
+    "/contact", "/contact-us", "/contactus", "/get-in-touch", "/contact.html",
+    "/contact-us.html", "/contact.php", "/kontakt", "/contacto", "/contatti",
+)
+
+# (path fragment, score) - first match wins, so longer/more specific fragments come first
+_PATH_KEYWORDS = (
+    ("contact-us", 6), ("contactus", 6), ("contact_us", 6), ("get-in-touch", 5), ("nous-contacter", 5),
+    ("contact", 5), ("kontakt", 4), ("contacto", 4), ("contatti", 4), ("contactez", 4),
+    ("enquiry", 3), ("enquire", 3), ("inquiry", 3), ("reach-us", 3), ("write-to-us", 3),
+)
+_TEXT_KEYWORDS = (
+    "contact", "get in touch", "kontakt", "contacto", "contatti", "contactez",
+    "enquir", "inquir", "reach us", "talk to us", "write to us",
+)
+_PENALTY_FRAGMENTS = (
+    "/blog/", "/tag/", "/category/", "/author/", "/feed", "/wp-json/", "/cart", "/login",
+    "/wp-admin", "replytocom", ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".zip", ".xml",
+)
+_REGION_BONUS = {"nav": 2, "header": 2, "footer": 1}
+_SOURCE_BONUS = {"anchor": 0, "sitemap": 1, "common_path": 0}
+_LOC_RE = re.compile(r"<loc>\s*([^<\s]+)\s*</loc>", re.IGNORECASE)
+
+
+class _PageParser(HTMLParser):
+    """Collect anchors (with text and page region) and contact-form signals in one pass."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors: List[Tuple[str, str, Optional[str]]] = []
+        self.contact_forms = 0
+        self._regions: List[str] = []
+        self._anchor_href: Optional[str] = None
+        self._anchor_text: List[str] = []
+        self._in_form = 0
+        self._form_has_contact_field = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {k: (v or "") for k, v in attrs}
+        if tag in _REGION_BONUS:
+            self._regions.append(tag)
+        elif tag == "a" and attributes.get("href"):
+            self._anchor_href = attributes["href"]
+            self._anchor_text = [attributes.get("title", ""), attributes.get("aria-label", "")]
+        elif tag == "form":
+            self._in_form += 1
+            self._form_has_contact_field = False
+        elif self._in_form and tag in ("textarea", "input"):
+            field_type = attributes.get("type", "text").lower()
+            name = f"{attributes.get('name', '')} {attributes.get('id', '')}".lower()
+            if tag == "textarea" or field_type == "email" or "email" in name:
+                self._form_has_contact_field = True
+
+    def handle_endtag(self, tag):
+        if tag in _REGION_BONUS and tag in self._regions:
+            # Pop up to and including the most recent matching region
+            while self._regions:
+                if self._regions.pop() == tag:
+                    break
+        elif tag == "a" and self._anchor_href is not None:
+            region = self._regions[-1] if self._regions else None
+            text = " ".join(" ".join(self._anchor_text).split())
+            self.anchors.append((self._anchor_href, text[:120], region))
+            self._anchor_href = None
+        elif tag == "form" and self._in_form:
+            self._in_form -= 1
+            if self._form_has_contact_field:
+                self.contact_forms += 1
+            self._form_has_contact_field = False
+
+    def handle_data(self, data):
+        if self._anchor_href is not None:
+            self._anchor_text.append(data)
+
+
+def parse_page(html: str) -> _PageParser:
+    parser = _PageParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        pass
+    return parser
+
+
+def _host(url: str) -> str:
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def same_site(url: str, base_url: str) -> bool:
+    """True when ``url`` is on the base host or one of its subdomains (``www.`` ignored)."""
+    host, base = _host(url), _host(base_url)
+    return bool(host) and (host == base or host.endswith("." + base) or base.endswith("." + host))
+
+
+def score_candidate(url: str, text: str = "", region: Optional[str] = None, source: str = "anchor") -> int:
+    """Heuristic contact-page score; 0 means "not a contact page candidate"."""
+    try:
+        path = urlsplit(url).path.lower()
+    except ValueError:
+        return 0
+    lowered = url.lower()
+    score = 0
+    for fragment, weight in _PATH_KEYWORDS:
+        if fragment in path:
+            score += weight
+            break
+    text = (text or "").lower()
+    if any(keyword in text for keyword in _TEXT_KEYWORDS):
+        score += 3
+    if score == 0:
+        return 0
+    score += _REGION_BONUS.get(region or "", 0) + _SOURCE_BONUS.get(source, 0)
+    if any(fragment in lowered for fragment in _PENALTY_FRAGMENTS):
+        score -= 4
+    # Prefer shallow pages (/contact over /blog/2021/contact-form-tips)
+    score -= max(0, path.strip("/").count("/") - 1)
+    return max(score, 0)
+
+
+def _new_client(timeout: float, max_connections: int):
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=timeout,
+        headers={"User-Agent": _USER_AGENT, "Accept": "text/html,application/xml;q=0.9,*/*;q=0.8"},
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+class DiscoveryClient:
+    """HTTP connection pool shared by every discovery run of a worker.
+
+    Keeps connections (and TLS sessions) alive across jobs instead of opening a
+    new client per run. Without ``httpx`` it holds nothing and runs use urllib.
+    """
+
+    def __init__(self, timeout: float = 8.0, max_connections: int = 32):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None and httpx is not None:
+            self._client = _new_client(self.timeout, self.max_connections)
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+class _Fetcher:
+    """Minimal async GET returning (status, final_url, content_type, text)."""
+
+    def __init__(self, timeout: float, max_connections: int, shared: Optional[DiscoveryClient] = None):
+        self.timeout = timeout
+        self.requests = 0
+        self._client = None
+        self._owns_client = False
+        self._max_connections = max_connections
+        self._shared = shared
+
+    async def __aenter__(self):
+        if self._shared is not None:
+            self._client = self._shared.client
+        elif httpx is not None:
+            self._client = _new_client(self.timeout, self._max_connections)
+            self._owns_client = True
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+
+    async def get(self, url: str) -> Optional[Tuple[int, str, str, str]]:
+        self.requests += 1
+        try:
+            if self._client is not None:
+                response = await self._client.get(url, timeout=self.timeout)
+                content_type = response.headers.get("content-type", "")
+                body = response.content[:_MAX_BODY_BYTES].decode(response.encoding or "utf-8", "replace")
+                return response.status_code, str(response.url), content_type, body
+            return await asyncio.get_running_loop().run_in_executor(None, self._urllib_get, url)
+        except Exception:
+            return None
+
+    def _urllib_get(self, url: str) -> Optional[Tuple[int, str, str, str]]:
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                content_type = response.headers.get("content-type", "")
+                charset = response.headers.get_content_charset() or "utf-8"
+                body = response.read(_MAX_BODY_BYTES).decode(charset, "replace")
+                return response.status, response.geturl(), content_type, body
+        except urllib.error.HTTPError as e:
+            return e.code, url, e.headers.get("content-type", "") if e.headers else "", ""
+        except Exception:
+            return None
+
+
+def _is_html(content_type: str) -> bool:
+    return not content_type or "html" in content_type.lower()
+
+
+async def _sitemap_candidates(fetcher: _Fetcher, base_url: str) -> List[str]:
+    fetched = await fetcher.get(urljoin(base_url, "/sitemap.xml"))
+    if not fetched or fetched[0] != 200:
+        return []
+    body = fetched[3]
+    locs = _LOC_RE.findall(body)
+    if "<sitemapindex" in body.lower():
+        # Follow at most two child sitemaps, preferring the ones listing pages
+        children = sorted(locs, key=lambda loc: "page" not in loc.lower())[:2]
+        child_bodies = await asyncio.gather(*(fetcher.get(child) for child in children))
+        locs = [loc for child in child_bodies if child and child[0] == 200 for loc in _LOC_RE.findall(child[3])]
+    return [loc for loc in locs[:5000] if score_candidate(loc, source="sitemap") > 0]
+
+
+async def discover_contact_pages(
+    url: str,
+    *,
+    timeout: float = 8.0,
+    max_validate: int = 6,
+    max_connections: int = 6,
+    client: Optional[DiscoveryClient] = None,
+) -> Dict[str, Any]:
+    """Find validated contact-page URLs for ``url`` without a browser.
+
+    Returns a dict with ``landing_url``, ``landing_has_form``, ranked
+    ``candidates`` (only validated ones, each with ``url``, ``score``,
+    ``sources`` and ``has_form``), ``best_url`` (None when the landing page
+    already has a contact form or nothing validated), ``requests`` and
+    ``elapsed_seconds``. Never raises. ``client`` is the worker's shared
+    connection pool; without one the run opens (and closes) its own.
+    """
+    started = time.monotonic()
+    report: Dict[str, Any] = {
+        "landing_url": url,
+        "landing_has_form": False,
+        "candidates": [],
+        "best_url": None,
+        "requests": 0,
+        "elapsed_seconds": 0.0,
+    }
+    try:
+        async with _Fetcher(timeout, max_connections, client) as fetcher:
+            landing, sitemap_urls = await asyncio.gather(
+                fetcher.get(url),
+                _sitemap_candidates(fetcher, url),
+            )
+            landing_url = url
+            anchors: List[Tuple[str, str, Optional[str]]] = []
+            if landing and landing[0] == 200 and _is_html(landing[2]):
+                landing_url = landing[1] or url
+                page = parse_page(landing[3])
+                report["landing_has_form"] = page.contact_forms > 0
+                anchors = page.anchors
+            report["landing_url"] = landing_url
+
+            # Merge candidates from every source, keeping the best score per URL
+            ranked: Dict[str, Dict[str, Any]] = {}
+
+            def add(candidate: str, score: int, source: str):
+                candidate = urldefrag(candidate)[0]
+                if score <= 0 or not candidate.startswith(("http://", "https://")):
+                    return
+                if not same_site(candidate, landing_url) or candidate.rstrip("/") == landing_url.rstrip("/"):
+                    return
+                entry = ranked.setdefault(candidate, {"url": candidate, "score": 0, "sources": []})
+                entry["score"] = max(entry["score"], score)
+                if source not in entry["sources"]:
+                    entry["sources"].append(source)
+
+            for href, text, region in anchors:
+                if href.startswith(("mailto:", "tel:", "javascript:", "#")):
+                    continue
+                absolute = urljoin(landing_url, href)
+                add(absolute, score_candidate(absolute, text, region, "anchor"), "anchor")
+            for loc in sitemap_urls:
+                add(loc, score_candidate(loc, source="sitemap"), "sitemap")
+            for path in COMMON_CONTACT_PATHS:
+                candidate = urljoin(landing_url, path)
+                add(candidate, score_candidate(candidate, source="common_path"), "common_path")
+            for entry in ranked.values():
+                entry["score"] += len(entry["sources"]) - 1  # Corroborated by several sources
+
+            to_validate = sorted(ranked.values(), key=lambda e: -e["score"])[:max_validate]
+            responses = await asyncio.gather(*(fetcher.get(entry["url"]) for entry in to_validate))
+
+            validated: List[Dict[str, Any]] = []
+            seen_final = set()
+            for entry, fetched in zip(to_validate, responses):
+                if not fetched or fetched[0] != 200 or not _is_html(fetched[2]):
+                    continue
+                final_url = fetched[1] or entry["url"]
+                if not same_site(final_url, landing_url) or final_url.rstrip("/") in seen_final:
+                    continue
+                seen_final.add(final_url.rstrip("/"))
+                has_form = parse_page(fetched[3]).contact_forms > 0
+                validated.append({
+                    "url": final_url,
+                    "score": entry["score"] + (10 if has_form else 0),
+                    "sources": entry["sources"],
+                    "has_form": has_form,
+                })
+            validated.sort(key=lambda e: -e["score"])
+            report["candidates"] = validated
+            if validated and not report["landing_has_form"]:
+                report["best_url"] = validated[0]["url"]
+            report["requests"] = fetcher.requests
+    except Exception as e:
+        report["error"] = str(e)[:200]
+    report["elapsed_seconds"] = round(time.monotonic() - started, 3)
+    return report
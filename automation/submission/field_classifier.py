@@ -0,0 +1,310 @@
+"""
+Multilingual form-field classification.
+
+Every control is described by a small token index built from its ``name``,
+``id``, ``placeholder``, ``aria-label``/``title``, ``autocomplete`` and the text
+of its ``<label>`` (``el.labels``, ``aria-labelledby`` or, for label-only
+builders, a short preceding sibling). Tokens are scored against a lexicon of
+synonyms in the languages the batches actually hit (EN, NL, DE, FR, ES, IT,
+PT, PL, SV); ``type``/``autocomplete`` and ``<textarea>`` add strong priors.
+Non-fillable kinds (search, website, address, captcha, ...) compete in the same
+scoring so ``search_query`` or ``postcode`` never win a logical field by a
+weak substring hit.
+
+``FIELD_CLASSIFIER_JS`` is the in-page implementation (one call classifies
+every control under a root); ``classify_field`` is its Python twin, used by
+the compiled template's fallbacks and for offline checks against saved
+fixtures. Both read the same ``LEXICON_PAYLOAD``.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+LEXICON_VERSION = 1
+
+# Fields the fill stage has test data for
+LOGICAL_FIELDS = ("email", "name", "phone", "subject", "company", "message")
+
+# Single tokens after tokenize(); order breaks ties (logical fields first, and
+# "company" before "name" so "company_name" is the company)
+LEXICON: Dict[str, Tuple[str, ...]] = {
+    "email": (
+        "email", "emails", "emailadres", "emailaddress", "mailadres", "mailaddress", "mail",
+        "correo", "courriel", "epost", "posta", "sahkoposti",
+    ),
+    "phone": (
+        "phone", "telephone", "tel", "telefon", "telefoon", "telefono", "telefone", "telefonnummer",
+        "telefoonnummer", "mobile", "mobiel", "mobil", "handy", "gsm", "cell", "cellphone", "celular",
+        "cellulare", "portable", "whatsapp",
+    ),
+    "subject": (
+        "subject", "onderwerp", "betreff", "asunto", "sujet", "objet", "oggetto", "assunto",
+        "temat", "amne", "topic", "regarding", "reason",
+    ),
+    "company": (
+        "company", "companyname", "organization", "organisation", "organizacion", "bedrijf",
+        "bedrijfsnaam", "firma", "firmenname", "unternehmen", "empresa", "entreprise", "societe",
+        "azienda", "business", "foretag",
+    ),
+    "name": (
+        "name", "fullname", "yourname", "fname", "lname", "firstname", "lastname", "surname", "given",
+        "family", "naam", "voornaam", "achternaam", "vorname", "nachname", "nom", "prenom",
+        "nombre", "apellido", "apellidos", "nome", "cognome", "sobrenome", "imie", "nazwisko",
+        "namn", "fornamn", "efternamn", "contactpersoon", "ansprechpartner",
+    ),
+    "message": (
+        "message", "messages", "comment", "comments", "bericht", "nachricht", "mensaje", "mensagem",
+        "messaggio", "commentaire", "commentaires", "opmerking", "opmerkingen", "vraag", "inquiry",
+        "enquiry", "question", "questions", "anfrage", "consulta", "wiadomosc", "meddelande",
+        "details", "body", "comentario", "comentarios", "remarks",
+    ),
+    # Recognized so they can out-score a logical field, never filled
+    "search": ("search", "query", "zoeken", "zoek", "suche", "buscar", "recherche", "cerca", "keyword", "keywords"),
+    "website": ("website", "url", "homepage", "webseite", "site", "web"),
+    "address": (
+        # No bare "address"/"adres": "E-Mail Adresse" is an email field
+        "street", "city", "zip", "zipcode", "postcode", "postal", "country", "state",
+        "straat", "plaats", "strasse", "ort", "plz", "ville", "direccion", "ciudad",
+    ),
+    "captcha": ("captcha", "recaptcha", "hcaptcha", "honeypot", "verification"),
+    "password": ("password", "passwort", "wachtwoord", "contrasena", "pwd"),
+}
+
+# autocomplete tokens (https://html.spec.whatwg.org/#autofill-field)
+AUTOCOMPLETE_FIELDS = {
+    "email": "email", "tel": "phone", "tel-national": "phone", "tel-local": "phone",
+    "name": "name", "given-name": "name", "family-name": "name", "additional-name": "name", "nickname": "name",
+    "organization": "company", "street-address": "address", "address-line1": "address",
+    "postal-code": "address", "country": "address", "url": "website", "current-password": "password",
+    "new-password": "password",
+}
+INPUT_TYPE_FIELDS = {"email": "email", "tel": "phone", "url": "website", "search": "search", "password": "password"}
+TAG_FIELDS = {"textarea": "message"}
+
+# How much one matching token from each source counts
+SOURCE_WEIGHTS = {"name": 2.0, "id": 1.5, "label": 2.0, "aria": 2.0, "placeholder": 1.5}
+PRIOR_WEIGHTS = {"type": 3.0, "autocomplete": 3.0, "tag": 1.5}
+EXACT_MATCH = 1.0
+PARTIAL_MATCH = 0.6  # lexicon term (>= 4 chars) inside a compound token, e.g. "telefoonnummer"
+MIN_PARTIAL_TERM = 4
+MIN_SCORE = 0.9
+CONFIDENT = 0.5  # callers treat matches at or above this as reliable
+
+LEXICON_PAYLOAD: Dict[str, Any] = {
+    "version": LEXICON_VERSION,
+    "order": list(LEXICON),
+    "terms": {kind: list(terms) for kind, terms in LEXICON.items()},
+    "logical": list(LOGICAL_FIELDS),
+    "autocomplete": AUTOCOMPLETE_FIELDS,
+    "types": INPUT_TYPE_FIELDS,
+    "tags": TAG_FIELDS,
+    "sourceWeights": SOURCE_WEIGHTS,
+    "priorWeights": PRIOR_WEIGHTS,
+    "exact": EXACT_MATCH,
+    "partial": PARTIAL_MATCH,
+    "minPartial": MIN_PARTIAL_TERM,
+    "minScore": MIN_SCORE,
+}
+
+# Builds (once per page and lexicon version) a classifier with
+# ``tokenize(text)``, ``describe(el)`` and ``classify(el)``.
+FIELD_CLASSIFIER_JS = r"""
+(lexicon) => {
+    const cached = window.__teqFieldClassifier;
+    if (cached && cached.version === lexicon.version) return cached;
+    const exact = new Map();
+    const partial = [];
+    for (const kind of lexicon.order) {
+        for (const term of lexicon.terms[kind]) {
+            if (!exact.has(term)) exact.set(term, kind);
+            if (term.length >= lexicon.minPartial) partial.push([term, kind]);
+        }
+    }
+    partial.sort((a, b) => b[0].length - a[0].length);
+    const rank = new Map(lexicon.order.map((kind, i) => [kind, i]));
+
+    const tokenize = (text) => String(text || '')
+        .normalize('NFD').replace(/[\u0300-\u036f]/g, '')
+        .replace(/([a-z0-9])([A-Z])/g, '$1 $2')
+        .toLowerCase()
+        .replace(/\be[\s_-]+mail/g, 'email')
+        .split(/[^\p{L}\p{N}]+/u)
+        .filter((token) => token.length >= 2);
+    const tokenKind = (token) => {
+        if (exact.has(token)) return [exact.get(token), lexicon.exact];
+        for (const [term, kind] of partial) if (token.includes(term)) return [kind, lexicon.partial];
+        return null;
+    };
+    const textOf = (node) => (node ? (node.textContent || '').trim().slice(0, 80) : '');
+    const labelText = (el) => {
+        const parts = [];
+        if (el.labels) for (const label of el.labels) parts.push(textOf(label));
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) for (const id of labelledBy.split(/\s+/)) parts.push(textOf(document.getElementById(id)));
+        if (!parts.some(Boolean)) {
+            const previous = el.previousElementSibling;
+            if (previous && !previous.matches('input, textarea, select, button')) {
+                const text = textOf(previous);
+                if (text.length <= 60) parts.push(text);
+            }
+        }
+        return parts.filter(Boolean).join(' ');
+    };
+    const describe = (el) => ({
+        tag: (el.tagName || '').toLowerCase(),
+        type: (el.getAttribute('type') || '').toLowerCase(),
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        placeholder: el.getAttribute('placeholder') || '',
+        label: labelText(el),
+        aria: [el.getAttribute('aria-label'), el.getAttribute('title')].filter(Boolean).join(' '),
+        autocomplete: (el.getAttribute('autocomplete') || '').toLowerCase(),
+    });
+    const score = (attrs) => {
+        const scores = {};
+        const add = (kind, weight) => { if (kind) scores[kind] = (scores[kind] || 0) + weight; };
+        for (const [source, weight] of Object.entries(lexicon.sourceWeights)) {
+            const best = {};
+            for (const token of tokenize(attrs[source])) {
+                const hit = tokenKind(token);
+                if (hit && (best[hit[0]] || 0) < hit[1]) best[hit[0]] = hit[1];
+            }
+            for (const [kind, match] of Object.entries(best)) add(kind, weight * match);
+        }
+        add(lexicon.types[attrs.type], lexicon.priorWeights.type);
+        for (const token of attrs.autocomplete.split(/\s+/)) add(lexicon.autocomplete[token], lexicon.priorWeights.autocomplete);
+        add(lexicon.tags[attrs.tag], lexicon.priorWeights.tag);
+        const ranked = Object.entries(scores).sort((a, b) => b[1] - a[1] || rank.get(a[0]) - rank.get(b[0]));
+        const best = ranked.length ? ranked[0][1] : 0;
+        const second = ranked.length > 1 ? ranked[1][1] : 0;
+        const kind = best >= lexicon.minScore ? ranked[0][0] : null;
+        const confidence = kind ? Math.round((best / (best + second + 1)) * 1000) / 1000 : 0;
+        const field = kind && lexicon.logical.includes(kind) ? kind : null;
+        return { field, kind, confidence };
+    };
+    const classifier = {
+        version: lexicon.version,
+        tokenize,
+        describe,
+        score,
+        classify(el) { return score(describe(el)); },
+    };
+    window.__teqFieldClassifier = classifier;
+    return classifier;
+}
+"""
+
+# One call: classify every fillable control under ``root`` (a form, or the document)
+CLASSIFY_FIELDS_JS = (
+    "(root, lexicon) => {\n"
+    "    const classifier = (" + FIELD_CLASSIFIER_JS + ")(lexicon);\n"
+    "    const scope = root || document;\n"
+    "    const skip = ['hidden', 'submit', 'button', 'image', 'reset', 'checkbox', 'radio', 'file'];\n"
+    "    return Array.from(scope.querySelectorAll('input, textarea, select')).map((el, index) => {\n"
+    "        const attrs = classifier.describe(el);\n"
+    "        if (skip.includes(attrs.type)) return null;\n"
+    "        return { index, name: attrs.name, id: attrs.id, tag: attrs.tag, ...classifier.score(attrs) };\n"
+    "    }).filter(Boolean);\n"
+    "}"
+)
+
+_COMBINING = re.compile("[\u0300-\u036f]")
+_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_E_MAIL = re.compile(r"\be[\s_-]+mail")
+_SPLIT = re.compile(r"[\W_]+")
+
+_EXACT: Dict[str, str] = {}
+for _kind, _terms in LEXICON.items():
+    for _term in _terms:
+        _EXACT.setdefault(_term, _kind)
+_PARTIAL: List[Tuple[str, str]] = sorted(
+    ((term, kind) for kind, terms in LEXICON.items() for term in terms if len(term) >= MIN_PARTIAL_TERM),
+    key=lambda item: -len(item[0]),
+)
+_RANK = {kind: index for index, kind in enumerate(LEXICON)}
+
+
+@dataclass(frozen=True)
+class FieldMatch:
+    """Classification of one control: ``field`` is set only for fillable (logical) kinds."""
+
+    field: Optional[str]
+    kind: Optional[str]
+    confidence: float
+    scores: Mapping[str, float] = field(default_factory=dict, compare=False)
+
+    @property
+    def confident(self) -> bool:
+        return self.field is not None and self.confidence >= CONFIDENT
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Same tokens as the in-page ``tokenize``: accents stripped, camelCase and punctuation split."""
+    value = _COMBINING.sub("", unicodedata.normalize("NFD", str(text or "")))
+    value = _E_MAIL.sub("email", _CAMEL.sub(r"\1 \2", value).lower())
+    return [token for token in _SPLIT.split(value) if len(token) >= 2]
+
+
+def _token_kind(token: str) -> Optional[Tuple[str, float]]:
+    kind = _EXACT.get(token)
+    if kind:
+        return kind, EXACT_MATCH
+    for term, kind in _PARTIAL:
+        if term in token:
+            return kind, PARTIAL_MATCH
+    return None
+
+
+def classify_field(
+    *,
+    tag: str = "input",
+    input_type: str = "",
+    name: str = "",
+    element_id: str = "",
+    placeholder: str = "",
+    label: str = "",
+    aria_label: str = "",
+    autocomplete: str = "",
+) -> FieldMatch:
+    """Python twin of the in-page ``classify``."""
+    sources = {"name": name, "id": element_id, "label": label, "aria": aria_label, "placeholder": placeholder}
+    scores: Dict[str, float] = {}
+
+    def add(kind: Optional[str], weight: float) -> None:
+        if kind:
+            scores[kind] = scores.get(kind, 0.0) + weight
+
+    for source, weight in SOURCE_WEIGHTS.items():
+        best: Dict[str, float] = {}
+        for token in tokenize(sources[source]):
+            hit = _token_kind(token)
+            if hit and best.get(hit[0], 0.0) < hit[1]:
+                best[hit[0]] = hit[1]
+        for kind, match in best.items():
+            add(kind, weight * match)
+    add(INPUT_TYPE_FIELDS.get((input_type or "").lower()), PRIOR_WEIGHTS["type"])
+    for token in (autocomplete or "").lower().split():
+        add(AUTOCOMPLETE_FIELDS.get(token), PRIOR_WEIGHTS["autocomplete"])
+    add(TAG_FIELDS.get((tag or "").lower()), PRIOR_WEIGHTS["tag"])
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], _RANK[item[0]]))
+    if not ranked or ranked[0][1] < MIN_SCORE:
+        return FieldMatch(None, None, 0.0, scores)
+    kind, best_score = ranked[0]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    confidence = round(best_score / (best_score + second + 1), 3)
+    return FieldMatch(kind if kind in LOGICAL_FIELDS else None, kind, confidence, scores)
+
+
+async def classify_form_fields(page, form_locator: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Classify every fillable control of a form (or the whole page) in one in-page call. Never raises."""
+    try:
+        if form_locator:
+            return await page.locator(form_locator).first.evaluate(CLASSIFY_FIELDS_JS, LEXICON_PAYLOAD, timeout=2000)
+        return await page.evaluate(f"(lexicon) => ({CLASSIFY_FIELDS_JS})(null, lexicon)", LEXICON_PAYLOAD)
+    except Exception:
+        return []
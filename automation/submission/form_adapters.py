@@ -0,0 +1,492 @@
+"""
+Form-framework adapters: deterministic fill/submit/verify for known builders.
+
+Most contact forms on the sites we submit to are rendered by a handful of
+WordPress/SaaS form builders whose markup, submit flow and outcome signal are
+stable. A ``FormAdapter`` describes one of them:
+
+* ``fingerprint`` - a cheap CSS selector that identifies the builder's forms
+  (``form.wpcf7-form``, ``.gform_wrapper form``, ``form.hs-form``, ...);
+* ``fields`` - logical field (plus ``first_name``/``last_name``) to selectors
+  inside the form, for the builder's own field classes and default names;
+* ``submit`` / ``consent`` - the submit control and required consent boxes;
+* ``success`` / ``error`` selectors and ``success_events`` / ``error_events``
+  - the builder's native outcome signal (CF7's ``wpcf7mailsent`` event, the
+  WPForms confirmation container, HubSpot's ``onFormSubmitted`` message...);
+* ``endpoint`` - regex for the request that carries the submission.
+
+``detect_adapter()`` matches every registered fingerprint in one evaluate,
+skipping forms the form scanner calls newsletter or search forms; off the
+contact page the form must also have a message field, so footer signups built
+with the same plugin fall through to the generic path. On a match the run
+skips generic form detection: ``fill()`` fills the mapped
+fields (the compiled template's field matcher covers the rest of the form)
+in one evaluate, and ``submit_and_verify()`` clicks the builder's submit
+control and waits for its native signal through ``SubmissionWatch``.
+
+New builders are added with ``register_adapter()``; HubSpot forms embedded in
+a cross-origin iframe are not reachable from the page and fall back to the
+generic path.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import form_scanner
+from network_capture import url_base
+from submit_watch import SubmissionWatch
+from template_compiler import FIELD_MATCHER_JS, CompiledTemplate
+
+ADAPTERS_VERSION = 1
+
+# Forms with fewer fillable controls (search boxes, email-only signups) stay on the generic path
+MIN_FORM_CONTROLS = 2
+
+
+def _log_noop(*_args, **_kwargs):
+    pass
+
+
+@dataclass(frozen=True)
+class FormAdapter:
+    """Markup, submit flow and native outcome signal of one form builder."""
+
+    name: str
+    fingerprint: str
+    fields: Mapping[str, Tuple[str, ...]]
+    submit: str
+    success: str
+    error: str = ""
+    success_events: Tuple[str, ...] = ()
+    error_events: Tuple[str, ...] = ()
+    consent: str = ""
+    endpoint: str = ""
+    _endpoint_re: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_endpoint_re", re.compile(self.endpoint, re.IGNORECASE) if self.endpoint else None)
+
+    @property
+    def signals(self) -> Dict[str, Any]:
+        """``SubmissionWatch`` native signal spec."""
+        return {
+            "success": self.success,
+            "error": self.error,
+            "successEvents": list(self.success_events),
+            "errorEvents": list(self.error_events),
+        }
+
+    @property
+    def spec(self) -> Dict[str, Any]:
+        """Argument for the in-page detect/fill scripts."""
+        return {
+            "name": self.name,
+            "fingerprint": self.fingerprint,
+            "fields": [[key, ", ".join(selectors)] for key, selectors in self.fields.items()],
+            "consent": self.consent,
+        }
+
+    def is_submission_url(self, url: str) -> bool:
+        return bool(self._endpoint_re and self._endpoint_re.search(url or ""))
+
+
+ADAPTERS: "OrderedDict[str, FormAdapter]" = OrderedDict()
+
+
+def register_adapter(adapter: FormAdapter) -> FormAdapter:
+    """Add (or replace) an adapter; detection tries adapters in registration order."""
+    ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+register_adapter(FormAdapter(
+    name="contact-form-7",
+    fingerprint=".wpcf7 form.wpcf7-form",
+    fields={
+        "name": ('[name="your-name"]', '[name="your_name"]'),
+        "email": ('[name="your-email"]', '[name="your_email"]', "input.wpcf7-email"),
+        "phone": ('[name="your-phone"]', '[name="your-tel"]', "input.wpcf7-tel"),
+        "subject": ('[name="your-subject"]',),
+        "company": ('[name="your-company"]',),
+        "message": ('[name="your-message"]', "textarea.wpcf7-textarea"),
+    },
+    submit="input.wpcf7-submit, button.wpcf7-submit, [type=submit]",
+    success='form.wpcf7-form.sent, form.wpcf7-form[data-status="sent"], .wpcf7-mail-sent-ok',
+    error=('form.wpcf7-form.invalid, form.wpcf7-form.failed, form.wpcf7-form.spam, form.wpcf7-form.aborted, '
+           '.wpcf7-validation-errors, .wpcf7-mail-sent-ng'),
+    success_events=("wpcf7mailsent",),
+    error_events=("wpcf7invalid", "wpcf7mailfailed", "wpcf7spam"),
+    consent=".wpcf7-acceptance input[type=checkbox]",
+    endpoint=r"/contact-form-7/v1/contact-forms/\d+/feedback|[?&]rest_route=/contact-form-7/",
+))
+
+register_adapter(FormAdapter(
+    name="wpforms",
+    fingerprint="form.wpforms-form",
+    fields={
+        "first_name": (".wpforms-field-name-first",),
+        "last_name": (".wpforms-field-name-last",),
+        "name": (".wpforms-field-name input",),
+        "email": (".wpforms-field-email input",),
+        "phone": (".wpforms-field-phone input",),
+        "message": (".wpforms-field-textarea textarea",),
+    },
+    submit="button.wpforms-submit, [type=submit]",
+    success='.wpforms-confirmation-container, .wpforms-confirmation-container-full, [id^="wpforms-confirmation-"]',
+    error=".wpforms-error-container, .wpforms-error-alert, label.wpforms-error",
+    success_events=("wpformsAjaxSubmitSuccess",),
+    error_events=("wpformsAjaxSubmitFailed", "wpformsAjaxSubmitError"),
+    consent=".wpforms-field-gdpr-checkbox input[type=checkbox]",
+    endpoint=r"admin-ajax\.php|[?&]wpforms\[|/wpforms/",
+))
+
+register_adapter(FormAdapter(
+    name="gravity-forms",
+    fingerprint='.gform_wrapper form[id^="gform_"]',
+    fields={
+        "first_name": (".name_first input",),
+        "last_name": (".name_last input",),
+        "name": (".ginput_container_name:not(.ginput_complex) input",),
+        "email": (".ginput_container_email input",),
+        "phone": (".ginput_container_phone input",),
+        "message": (".ginput_container_textarea textarea",),
+    },
+    submit='.gform_footer [type=submit], .gform_page_footer [type=submit], input.gform_button, button.gform_button',
+    success='.gform_confirmation_message, .gform_confirmation_wrapper',
+    error=".gform_validation_errors, .validation_error, .gform_submission_error",
+    success_events=("gform_confirmation_loaded",),
+    consent=".ginput_container_consent input[type=checkbox]",
+    endpoint=r"gf_page=|gform_submit|admin-ajax\.php",
+))
+
+register_adapter(FormAdapter(
+    name="hubspot",
+    fingerprint="form.hs-form",
+    fields={
+        "first_name": ('[name="firstname"]',),
+        "last_name": ('[name="lastname"]',),
+        "email": ('[name="email"]',),
+        "phone": ('[name="phone"]', '[name="mobilephone"]'),
+        "company": ('[name="company"]',),
+        "subject": ('[name="subject"]',),
+        "message": ('[name="message"]', "textarea"),
+    },
+    submit='.hs-submit [type=submit], input.hs-button[type=submit]',
+    success=".submitted-message, .hs-form__thankyou-message",
+    error=".hs-error-msgs, .hs-main-font-element .hs-error-msg",
+    success_events=("onFormSubmitted",),
+    consent=".legal-consent-container input[type=checkbox]",
+    endpoint=r"forms\.hsforms\.com/submissions|forms\.hubspot\.com/uploads/form|/submissions/v3/integration",
+))
+
+register_adapter(FormAdapter(
+    name="elementor",
+    fingerprint="form.elementor-form",
+    fields={
+        "name": ('[name="form_fields[name]"]', ".elementor-field-type-text input[name*=name]"),
+        "email": ('[name="form_fields[email]"]', ".elementor-field-type-email input"),
+        "phone": ('[name="form_fields[phone]"]', ".elementor-field-type-tel input"),
+        "subject": ('[name="form_fields[subject]"]',),
+        "company": ('[name="form_fields[company]"]',),
+        "message": ('[name="form_fields[message]"]', ".elementor-field-type-textarea textarea"),
+    },
+    submit=".elementor-field-type-submit button, button[type=submit]",
+    success=".elementor-message-success",
+    error=".elementor-message-danger, .elementor-error",
+    success_events=("submit_success",),
+    consent=".elementor-field-type-acceptance input[type=checkbox]",
+    endpoint=r"admin-ajax\.php",
+))
+
+
+# Shared by detect and fill: the builder's most contact-like visible form.
+# ``forms`` carries the form scanner's verdict per form index: newsletter and
+# search forms never match, and off the contact page the form needs a message
+# field (a textarea or a control the classifier calls "message").
+_PICK_FORM_JS = """
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && getComputedStyle(el).visibility !== 'hidden';
+    const TEXT_TYPES = ['', 'text', 'email', 'tel', 'url', 'number'];
+    const controls = (form) => Array.from(form.querySelectorAll('input, textarea, select')).filter((el) =>
+        !el.disabled && visible(el)
+        && (el.tagName !== 'INPUT' || TEXT_TYPES.includes((el.getAttribute('type') || '').toLowerCase())));
+    const allForms = Array.from(document.querySelectorAll('form'));
+    const pickForm = (adapter) => {
+        let best = null;
+        for (const form of document.querySelectorAll(adapter.fingerprint)) {
+            if (!visible(form)) continue;
+            const scanned = forms[allForms.indexOf(form)];
+            if (scanned && scanned.excluded) continue;
+            const found = controls(form);
+            const hasTextarea = found.some((el) => el.tagName === 'TEXTAREA');
+            // Off the contact page a name+email builder form is usually a footer signup
+            if (!contactPage && !hasTextarea && !(scanned && scanned.hasMessage)) continue;
+            const score = found.length + (hasTextarea ? 2 : 0);
+            if (found.length >= minControls && (!best || score > best.score)) best = { form, score };
+        }
+        return best;
+    };
+"""
+
+DETECT_JS = (
+    "({ adapters, minControls, forms, contactPage }) => {\n"
+    + _PICK_FORM_JS
+    + "    let best = null;\n"
+    "    for (const adapter of adapters) {\n"
+    "        const found = pickForm(adapter);\n"
+    "        if (found && (!best || found.score > best.score)) best = { name: adapter.name, score: found.score };\n"
+    "    }\n"
+    "    return best;\n"
+    "}"
+)
+
+# Fills mapped fields first (a first/last split takes the template name apart),
+# then lets the template's matcher classify what is left; required selects,
+# radios and consent/required checkboxes get a valid choice. The chosen form is
+# tagged so the submit step and ``SubmissionWatch`` address it by locator.
+FILL_JS = (
+    "({ adapter, matcherSpec, minControls, forms, contactPage }) => {\n"
+    + _PICK_FORM_JS
+    + "    const picked = pickForm(adapter);\n"
+    "    if (!picked) return null;\n"
+    "    const form = picked.form;\n"
+    "    document.querySelectorAll('[data-teq-adapter]').forEach((el) => el.removeAttribute('data-teq-adapter'));\n"
+    "    form.setAttribute('data-teq-adapter', adapter.name);\n"
+    "    const matcher = (" + FIELD_MATCHER_JS + ")(matcherSpec);\n"
+    "    const data = Object.assign({}, matcherSpec.testData);\n"
+    "    const parts = String(data.name || '').trim().split(/\\s+/);\n"
+    "    data.first_name = parts[0] || data.name;\n"
+    "    data.last_name = parts.slice(1).join(' ') || parts[0] || data.name;\n"
+    "    const setValue = (el, value) => {\n"
+    "        const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;\n"
+    "        const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;\n"
+    "        el.focus();\n"
+    "        setter.call(el, value);  // React-controlled inputs (HubSpot) ignore plain assignment\n"
+    "        el.dispatchEvent(new Event('input', { bubbles: true }));\n"
+    "        el.dispatchEvent(new Event('change', { bubbles: true }));\n"
+    "        el.blur();\n"
+    "    };\n"
+    "    const done = new Set();\n"
+    "    const stats = { fields_attempted: 0, fields_filled: 0, checkboxes_checked: 0, radios_selected: 0, mapped: [] };\n"
+    "    const fill = (el, value, key) => {\n"
+    "        if (done.has(el)) return;\n"
+    "        done.add(el);\n"
+    "        stats.fields_attempted += 1;\n"
+    "        if (value == null || el.readOnly) return;\n"
+    "        if (el.value && el.value.trim()) return;\n"
+    "        setValue(el, value);\n"
+    "        stats.fields_filled += 1;\n"
+    "        if (key && !stats.mapped.includes(key)) stats.mapped.push(key);\n"
+    "    };\n"
+    "    const fillable = new Set(controls(form).filter((el) => el.tagName !== 'SELECT'));\n"
+    "    for (const [key, selector] of adapter.fields) {\n"
+    "        if (data[key] == null) continue;\n"
+    "        for (const el of form.querySelectorAll(selector)) {\n"
+    "            const targets = fillable.has(el) ? [el] : Array.from(el.querySelectorAll('input, textarea')).filter((c) => fillable.has(c));\n"
+    "            targets.forEach((target) => fill(target, data[key], key));\n"
+    "        }\n"
+    "    }\n"
+    "    for (const el of fillable) {\n"
+    "        if (done.has(el)) continue;\n"
+    "        const match = matcher.match(el);\n"
+    "        const required = el.required || el.getAttribute('aria-required') === 'true';\n"
+    "        if (match.field) fill(el, data[match.field], match.field);\n"
+    "        else if (required && (el.getAttribute('type') || '').toLowerCase() === 'url') fill(el, 'https://example.com', null);\n"
+    "        else if (required && (el.getAttribute('type') || '').toLowerCase() === 'number') fill(el, '1', null);\n"
+    "        else if (required) fill(el, matcher.value(el), null);\n"
+    "    }\n"
+    "    for (const select of form.querySelectorAll('select')) {\n"
+    "        if (select.disabled || select.value || !(select.required || select.getAttribute('aria-required') === 'true')) continue;\n"
+    "        const option = Array.from(select.options).find((o) => o.value && !o.disabled);\n"
+    "        if (!option) continue;\n"
+    "        select.value = option.value;\n"
+    "        select.dispatchEvent(new Event('change', { bubbles: true }));\n"
+    "        stats.fields_attempted += 1;\n"
+    "        stats.fields_filled += 1;\n"
+    "    }\n"
+    "    const boxes = new Set(adapter.consent ? form.querySelectorAll(adapter.consent) : []);\n"
+    "    form.querySelectorAll('input[type=checkbox][required], input[type=checkbox][aria-required=true]').forEach((el) => boxes.add(el));\n"
+    "    for (const box of boxes) {\n"
+    "        if (box.checked || box.disabled) continue;\n"
+    "        box.click();\n"
+    "        if (!box.checked) box.checked = true;\n"
+    "        stats.checkboxes_checked += 1;\n"
+    "    }\n"
+    "    const groups = new Set();\n"
+    "    form.querySelectorAll('input[type=radio][required], input[type=radio][aria-required=true]').forEach((el) => el.name && groups.add(el.name));\n"
+    "    for (const group of groups) {\n"
+    "        const radios = Array.from(form.querySelectorAll('input[type=radio]')).filter((el) => el.name === group);\n"
+    "        if (radios.some((el) => el.checked)) continue;\n"
+    "        const radio = radios.find((el) => !el.disabled);\n"
+    "        if (radio) { radio.click(); stats.radios_selected += 1; }\n"
+    "    }\n"
+    "    stats.locator = 'form[data-teq-adapter=\"' + adapter.name + '\"]';\n"
+    "    stats.action = form.action || location.href;\n"
+    "    return stats;\n"
+    "}"
+)
+
+# Last resort when the submit control cannot be clicked
+_REQUEST_SUBMIT_JS = """
+(form) => {
+    if (typeof form.requestSubmit === 'function') form.requestSubmit();
+    else form.submit();
+    return true;
+}
+"""
+
+
+async def _scanned_forms(page) -> Dict[str, Dict[str, bool]]:
+    """Scanner verdicts the pick script needs, keyed by form index."""
+    scan = await form_scanner.scan_forms(page)
+    return {
+        str(form.get("formIndex")): {
+            "excluded": bool(form.get("isNewsletter") or form.get("isSearch")),
+            "hasMessage": bool(form.get("hasMessage")),
+        }
+        for form in scan.get("forms", [])
+    }
+
+
+async def detect_adapter(page, on_contact_page: bool = False) -> Optional[FormAdapter]:
+    """The registered adapter whose fingerprint matches the page's most contact-like form, if any.
+
+    Newsletter and search forms never match; unless ``on_contact_page`` the form
+    must also have a message field. Without a match the caller runs the
+    generic detection (and the contact-page search).
+    """
+    if not ADAPTERS:
+        return None
+    try:
+        found = await page.evaluate(DETECT_JS, {
+            "adapters": [adapter.spec for adapter in ADAPTERS.values()],
+            "minControls": MIN_FORM_CONTROLS,
+            "forms": await _scanned_forms(page),
+            "contactPage": bool(on_contact_page),
+        })
+    except Exception:
+        return None
+    return ADAPTERS.get(found["name"]) if found else None
+
+
+async def fill(page, adapter: FormAdapter, template: CompiledTemplate,
+               on_contact_page: bool = False) -> Dict[str, Any]:
+    """Fill the adapter's form in one evaluate; result keys match ``ultra_simple_form_fill``.
+
+    Picks the form with the same rules as ``detect_adapter``.
+    """
+    result: Dict[str, Any] = {
+        "fields_attempted": 0,
+        "fields_filled": 0,
+        "checkboxes_checked": 0,
+        "radios_selected": 0,
+        "adapter": adapter.name,
+    }
+    try:
+        stats = await page.evaluate(FILL_JS, {
+            "adapter": adapter.spec,
+            "matcherSpec": template.payload,
+            "minControls": MIN_FORM_CONTROLS,
+            "forms": await _scanned_forms(page),
+            "contactPage": bool(on_contact_page),
+        })
+    except Exception as exc:
+        result["adapter_error"] = str(exc)[:100]
+        return result
+    if stats:
+        result.update(stats)
+    return result
+
+
+async def submit_and_verify(page, adapter: FormAdapter, form_locator: str, form_action: str = "",
+                            timeout: float = 15.0, log: Callable[..., None] = _log_noop) -> Dict[str, Any]:
+    """Click the builder's submit control and wait for its native outcome signal.
+
+    Result keys match ``ultra_simple_form_submit``; ``submission_attempted`` stays
+    False when the form or its submit control is gone, so the caller can fall
+    back to the generic path.
+    """
+    result: Dict[str, Any] = {
+        "submission_attempted": False,
+        "submission_success": False,
+        "method_used": f"adapter:{adapter.name}",
+        "post_requests": 0,
+        "post_responses": 0,
+        "form_submission_detected": False,
+    }
+    submissions = []
+    form_action_base = url_base(form_action) if form_action else ""
+
+    def track_request(request) -> None:
+        try:
+            if request.method != "POST":
+                return
+            url = request.url
+            if not (adapter.is_submission_url(url) or (form_action_base and url_base(url) == form_action_base)):
+                return
+            post_data = request.post_data or ""
+        except Exception:
+            return
+        submissions.append({"url": url, "data_preview": post_data[:500], "data_length": len(post_data)})
+
+    form = page.locator(form_locator).first
+    watch = SubmissionWatch(page, form_action, signals=adapter.signals)
+    page.on("request", track_request)
+    started = time.monotonic()
+    try:
+        try:
+            if await form.count() == 0:
+                result["error"] = "Adapter form disappeared before submit"
+                return result
+        except Exception:
+            return result
+        await watch.start(form_locator)
+        try:
+            await form.locator(adapter.submit).first.click(timeout=5000)
+            result["submission_attempted"] = True
+        except Exception:
+            try:
+                result["submission_attempted"] = bool(await form.evaluate(_REQUEST_SUBMIT_JS))
+                result["method_used"] += "+requestSubmit"
+            except Exception as exc:
+                result["error"] = str(exc)[:100]
+                return result
+        log(f"   🧩 {adapter.name}: submit clicked, waiting for the native signal...")
+
+        native = await watch.wait_native(timeout)
+        verification = await watch.snapshot()
+        result["submit_verification"] = verification
+        result["post_requests"] = len(submissions)
+        result["post_responses"] = len(verification["responses"])
+        if submissions:
+            # The richest payload is the real submission (re-posts after validation are shorter)
+            result["form_submission_data"] = max(submissions, key=lambda item: item["data_length"])
+
+        if native and native.get("kind") == "success":
+            log(f"   ✅ {adapter.name} confirmed the submission ({native.get('phrase')})")
+            result["submission_success"] = True
+            result["form_submission_detected"] = True
+            result.setdefault("form_submission_data", {
+                "url": page.url, "data_preview": "", "data_length": 0, "native_signal": native.get("phrase"),
+            })
+        elif native:
+            log(f"   ❌ {adapter.name} rejected the submission ({native.get('phrase')}): {native.get('text', '')[:120]}")
+            result["error"] = native.get("text") or native.get("phrase")
+            result["validation_errors"] = [native.get("text") or native.get("phrase")]
+        else:
+            # No native verdict: report what was seen, the caller's final status stays unconfirmed
+            log(f"   ⚠️  {adapter.name}: no native signal within {timeout:.0f}s")
+            result["form_submission_detected"] = bool(submissions) and watch.successful_response() is not None
+        return result
+    finally:
+        result["adapter_seconds"] = round(time.monotonic() - started, 3)
+        try:
+            page.remove_listener("request", track_request)
+        except Exception:
+            pass
+        await watch.stop()
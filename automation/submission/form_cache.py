@@ -0,0 +1,366 @@
+"""
+Persistent contact-page / form-signature cache keyed by domain.
+
+For every domain that was submitted successfully we remember the resolved
+contact URL, the chosen form's structural signature and locator, the
+field-to-test-data mapping and the submit locator. Repeat runs open the cached
+contact page directly and skip HTTP discovery and in-page contact detection;
+an entry is dropped as soon as the live form's structural hash no longer
+matches, and entries expire after a TTL.
+
+Storage: Postgres (``"FormCache"`` table from the Prisma schema, via asyncpg
+when installed and ``DATABASE_URL`` is set) with a local on-disk JSON fallback
+that is always written, so runs keep their cache when the database is down.
+A worker shares one small asyncpg pool (``FormCachePool``) across all its jobs;
+after a failed connect the Postgres tier is skipped for a cool-off period and
+then retried.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import field_classifier
+from field_classifier import CONFIDENT
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# Seconds the Postgres tier is skipped after the database could not be reached
+DB_COOL_OFF_SECONDS = 60.0
+
+
+def _log_noop(*_args, **_kwargs):
+    pass
+
+
+def domain_key(url: str) -> str:
+    """Cache key for a URL: lowercase host without ``www.``."""
+    value = (url or "").strip()
+    if "://" not in value:
+        value = f"http://{value}"
+    try:
+        host = (urlsplit(value).hostname or "").lower()
+    except ValueError:
+        host = ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def form_signature(form: Dict[str, Any]) -> str:
+    """Structural hash of a scanned form (method, action path and visible field shapes).
+
+    Field values, ids and hidden inputs (nonces, timestamps) are ignored so the
+    hash only changes when the form's structure does.
+    """
+    try:
+        action_path = urlsplit(form.get("action") or "").path
+    except ValueError:
+        action_path = ""
+    shape = sorted(
+        f"{field.get('tag', '')}:{field.get('type', '')}:{field.get('name') or field.get('type', '')}"
+        for field in form.get("fields", [])
+    )
+    raw = json.dumps([form.get("method", "get"), action_path, shape], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def classify_field(field: Dict[str, Any]) -> Optional[str]:
+    """Test-data key a scanned field receives (same classifier as the fill stage), or None."""
+    if field.get("kind") and field.get("confidence", 0) >= CONFIDENT:
+        return field["kind"]
+    match = field_classifier.classify_field(
+        tag=field.get("tag") or "input",
+        input_type=field.get("type") or "",
+        name=field.get("name") or "",
+        element_id=field.get("id") or "",
+        placeholder=field.get("placeholder") or "",
+        autocomplete=field.get("autocomplete") or "",
+    )
+    return match.field
+
+
+def field_mapping(form: Dict[str, Any]) -> Dict[str, str]:
+    """``{field locator: test-data key}`` for every classifiable field of a scanned form."""
+    mapping: Dict[str, str] = {}
+    for field in form.get("fields", []):
+        key = classify_field(field)
+        if key and field.get("locator"):
+            mapping[field["locator"]] = key
+    return mapping
+
+
+def build_entry(contact_url: str, form: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "contact_url": contact_url,
+        "form_signature": form_signature(form),
+        "form_locator": form.get("locator"),
+        "submit_locator": form.get("submitLocator"),
+        "field_mapping": field_mapping(form),
+    }
+
+
+class _DiskStore:
+    """One JSON file per domain; atomic replace on write."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except Exception:
+            return None
+
+    async def put(self, key: str, entry: Dict[str, Any]):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(entry), encoding="utf-8")
+            os.replace(tmp, path)
+        except Exception:
+            pass
+
+    async def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except Exception:
+            pass
+
+
+def normalize_dsn(url: str) -> str:
+    """Accept Prisma/SQLAlchemy-style URLs and drop query params asyncpg would reject.
+
+    Shared with ``batch_leases.py``.
+    """
+    url = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in ("schema", "connection_limit", "pool_timeout")]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class FormCachePool:
+    """asyncpg pool shared by every form cache lookup of a worker.
+
+    Created lazily on first use and closed with the worker (it reopens lazily if
+    the worker keeps running). When the database cannot be reached, lookups skip
+    Postgres for ``cool_off`` seconds and then try again.
+    """
+
+    def __init__(self, dsn: str, max_size: int = 4, cool_off: float = DB_COOL_OFF_SECONDS):
+        self.dsn = dsn
+        self.max_size = max(1, max_size)
+        self.cool_off = cool_off
+        self._pool = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._retry_at = 0.0
+
+    def cooling_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def mark_unavailable(self) -> None:
+        self._retry_at = time.monotonic() + self.cool_off
+
+    async def pool(self):
+        if self._pool is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._pool is None:
+                    import asyncpg
+                    self._pool = await asyncpg.create_pool(
+                        normalize_dsn(self.dsn), min_size=0, max_size=self.max_size, timeout=3,
+                    )
+        return self._pool
+
+    async def aclose(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+
+class _PostgresStore:
+    """``"FormCache"`` rows (see prisma/schema.prisma) through asyncpg.
+
+    Uses the worker's shared ``FormCachePool`` when given; a one-off run opens a
+    connection per operation instead.
+    """
+
+    def __init__(self, dsn: str, log=_log_noop, pool: Optional[FormCachePool] = None):
+        self.dsn = dsn
+        self._log = log
+        self._shared = pool
+        # One-off runs keep their own cool-off state
+        self._cool_off = pool or FormCachePool(dsn)
+
+    def _unavailable(self, e: Exception):
+        self._cool_off.mark_unavailable()  # Don't retry a dead database on every lookup
+        self._log(f"⚠️  Form cache database unavailable, using disk cache for "
+                  f"{self._cool_off.cool_off:.0f}s: {str(e)[:80]}")
+
+    async def _run(self, operation):
+        if self._cool_off.cooling_off():
+            return None
+        if self._shared is not None:
+            try:
+                pool = await self._shared.pool()
+                conn = await pool.acquire(timeout=3)
+            except Exception as e:
+                self._unavailable(e)
+                return None
+            release = lambda: pool.release(conn)
+        else:
+            try:
+                import asyncpg
+                conn = await asyncpg.connect(normalize_dsn(self.dsn), timeout=3)
+            except Exception as e:
+                self._unavailable(e)
+                return None
+            release = conn.close
+        try:
+            return await asyncio.wait_for(operation(conn), timeout=5)
+        except Exception as e:
+            self._log(f"⚠️  Form cache query failed: {str(e)[:80]}")
+            return None
+        finally:
+            try:
+                await release()
+            except Exception:
+                pass
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        async def op(conn):
+            row = await conn.fetchrow(
+                'SELECT "contactUrl", "formSignature", "formLocator", "submitLocator", "fieldMapping", '
+                '"expiresAt" FROM "FormCache" WHERE "domainKey" = $1',
+                key,
+            )
+            if row is None:
+                return None
+            mapping = row["fieldMapping"]
+            return {
+                "contact_url": row["contactUrl"],
+                "form_signature": row["formSignature"],
+                "form_locator": row["formLocator"],
+                "submit_locator": row["submitLocator"],
+                "field_mapping": json.loads(mapping) if isinstance(mapping, str) else (mapping or {}),
+                "expires_at": row["expiresAt"].timestamp(),
+            }
+        return await self._run(op)
+
+    async def put(self, key: str, entry: Dict[str, Any]):
+        async def op(conn):
+            await conn.execute(
+                'INSERT INTO "FormCache" ("domainKey", "contactUrl", "formSignature", "formLocator", '
+                '"submitLocator", "fieldMapping", "hitCount", "createdAt", "updatedAt", "expiresAt") '
+                'VALUES ($1, $2, $3, $4, $5, $6::jsonb, 0, now(), now(), to_timestamp($7)) '
+                'ON CONFLICT ("domainKey") DO UPDATE SET "contactUrl" = EXCLUDED."contactUrl", '
+                '"formSignature" = EXCLUDED."formSignature", "formLocator" = EXCLUDED."formLocator", '
+                '"submitLocator" = EXCLUDED."submitLocator", "fieldMapping" = EXCLUDED."fieldMapping", '
+                '"updatedAt" = now(), "expiresAt" = EXCLUDED."expiresAt"',
+                key, entry["contact_url"], entry["form_signature"], entry.get("form_locator"),
+                entry.get("submit_locator"), json.dumps(entry.get("field_mapping") or {}), entry["expires_at"],
+            )
+        await self._run(op)
+
+    async def touch(self, key: str):
+        async def op(conn):
+            await conn.execute('UPDATE "FormCache" SET "hitCount" = "hitCount" + 1 WHERE "domainKey" = $1', key)
+        await self._run(op)
+
+    async def delete(self, key: str):
+        async def op(conn):
+            await conn.execute('DELETE FROM "FormCache" WHERE "domainKey" = $1', key)
+        await self._run(op)
+
+    async def contact_page_hint(self, url: str) -> Optional[str]:
+        """``Domain.contactPageUrl`` recorded by the contact checker, if it found one."""
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        host = parts.hostname or ""
+        bare = host[4:] if host.startswith("www.") else host
+        variants: List[str] = [url, url.rstrip("/")]
+        for scheme in ("https", "http"):
+            for h in (bare, f"www.{bare}"):
+                variants += [f"{scheme}://{h}", f"{scheme}://{h}/"]
+        variants.append(bare)
+
+        async def op(conn):
+            return await conn.fetchval(
+                'SELECT "contactPageUrl" FROM "Domain" WHERE url = ANY($1::text[]) '
+                'AND "contactCheckStatus" = \'found\' AND "contactPageUrl" IS NOT NULL LIMIT 1',
+                variants,
+            )
+        return await self._run(op)
+
+
+class FormCache:
+    """Read-through cache: Postgres first, disk as fallback; writes go to both."""
+
+    def __init__(self, disk: _DiskStore, postgres: Optional[_PostgresStore] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.disk = disk
+        self.postgres = postgres
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_env(cls, ttl_seconds: Optional[float] = None, log=_log_noop,
+                 pool: Optional[FormCachePool] = None) -> "FormCache":
+        """Build the cache from the environment; ``pool`` is the worker's shared Postgres pool, if any."""
+        directory = Path(os.environ.get("TEQ_FORM_CACHE_DIR")
+                         or Path.home() / ".cache" / "teqsmartsubmit" / "form_cache")
+        dsn = os.environ.get("DATABASE_URL") or os.environ.get("TEQ_DATABASE_URL")
+        if ttl_seconds is None:
+            try:
+                ttl_seconds = float(os.environ.get("TEQ_FORM_CACHE_TTL_HOURS", "")) * 3600
+            except ValueError:
+                ttl_seconds = DEFAULT_TTL_SECONDS
+        if pool is not None and dsn and pool.dsn != dsn:
+            pool = None
+        return cls(_DiskStore(directory), _PostgresStore(dsn, log, pool) if dsn else None, ttl_seconds)
+
+    async def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return a live entry for ``url``'s domain or None (expired entries are removed)."""
+        key = domain_key(url)
+        if not key:
+            return None
+        entry = None
+        if self.postgres:
+            entry = await self.postgres.get(key)
+        if entry is None:
+            entry = await self.disk.get(key)
+        if not entry:
+            return None
+        if entry.get("expires_at", 0) < time.time():
+            await self.invalidate(url)
+            return None
+        if self.postgres:
+            await self.postgres.touch(key)
+        return entry
+
+    async def put(self, url: str, entry: Dict[str, Any]):
+        key = domain_key(url)
+        if not key:
+            return
+        entry = dict(entry, domain_key=key, stored_at=time.time(), expires_at=time.time() + self.ttl_seconds)
+        await self.disk.put(key, entry)
+        if self.postgres:
+            await self.postgres.put(key, entry)
+
+    async def invalidate(self, url: str):
+        key = domain_key(url)
+        await self.disk.delete(key)
+        if self.postgres:
+            await self.postgres.delete(key)
+
+    async def contact_page_hint(self, url: str) -> Optional[str]:
+        if not self.postgres:
+            return None
+        return await self.postgres.contact_page_hint(url)
@@ -197,9 +197,10 @@ try:
     import hashlib
     import subprocess
     import signal
+    import weakref
     from pathlib import Path
-    from typing import Any, Dict, List, Optional, Union
-    from urllib.parse import urlparse
+    from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+    from urllib.parse import parse_qs, urlparse
     
     sys.stderr.write("✅ All basic imports successful\n")
     sys.stderr.flush()
@@ -318,6 +319,32 @@ def setup_ultra_resilient_environment():
 # Initialize environment
 setup_ultra_resilient_environment()
 
+# Event-driven, bounded page waits (replace fixed asyncio.sleep pauses)
+from page_waits import settle, start_wait_report, track_network
+# Event-driven submit verification (network response, scoped DOM mutations, navigation)
+from submit_watch import SubmissionWatch
+# Bounded, pre-filtered capture of submit-time requests
+from network_capture import (
+    EXCLUDED_URL_RE, FORM_ENDPOINT_RE, FORM_FIELDS_RE, STATIC_RESOURCE_RE, NetworkCapture, url_base,
+)
+# Per-stage timing spans and the process-wide stage histograms (Prometheus export)
+from stage_timing import REGISTRY as STAGE_METRICS, current_stage_timer, instrument_page, serve_metrics, start_stage_timer
+import form_scanner
+# Geometric overlay (cookie banner / CMP / modal) detection and dismissal
+from overlay_engine import overlay_engine
+# Deterministic fill/submit/verify for known form builders (CF7, WPForms, Gravity Forms, HubSpot, Elementor)
+import form_adapters
+from form_cache import FormCache, FormCachePool, build_entry, form_signature
+# Multilingual field classification (one in-page scoring pass, Python twin)
+from field_classifier import CONFIDENT as FIELD_CONFIDENT
+# Headless-by-default browser mode with per-run escalation to a visible browser
+from browser_mode import AUTO, BROWSER_MODES, HEADLESS, VISIBLE, ModeUsage, needs_visible_browser, resolve_browser_mode
+# Templates compiled once (normalized test data, field matchers, submit selectors), memoized by content hash
+from template_compiler import (
+    DEFAULT_TEST_DATA, DESCRIBE_ELEMENT_JS, FIELD_MATCHER_JS, CompiledTemplate, compile_template, load_template,
+    normalize_test_data,
+)
+
 # GLOBAL FALLBACKS - Multiple layers of redundancy
 ULTRA_FALLBACK_RESULTS = [
     {
@@ -352,118 +379,45 @@ def get_ultimate_fallback_result(url: str = "unknown") -> str:
         except:
             return '{"status": "error", "message": "ultimate fallback", "recovered": true}'
 
+# Batched log sink: log calls only enqueue; a writer thread batches to stderr and the heartbeat file
+from log_sink import get_sink
+_log_sink = get_sink(str(heartbeat_file) if heartbeat_file else None)
+
+# Structured progress/result events for the parent process (no-op unless TEQ_PROGRESS_FD/SOCKET is set)
+from progress_channel import get_channel
+_progress = get_channel()
+
 def ultra_safe_log_print(*args, **kwargs):
-    """ULTRA-RESILIENT logging - cannot fail under any circumstances."""
-    MAX_ATTEMPTS = 3
-    
-    for attempt in range(MAX_ATTEMPTS):
-        try:
-            # Safely get output stream - ALWAYS use stderr for logs so they're captured
-            output_file = None
-            for stream in [sys.stderr, sys.stdout]:
-                try:
-                    if (hasattr(stream, 'closed') and not stream.closed and 
-                        hasattr(stream, 'write')):
-                        output_file = stream
-                        break
-                except:
-                    continue
-            
-            if not output_file:
-                # Ultimate fallback - open a temporary file
-                try:
-                    output_file = open(os.devnull, 'w', encoding='utf-8', errors='ignore')
-                except:
-                    return  # Give up silently
-            
-            # Safely prepare message
-            safe_args = []
-            for arg in args:
-                try:
-                    if isinstance(arg, (str, int, float, bool)):
-                        safe_args.append(str(arg))
-                    else:
-                        safe_args.append(f"[{type(arg).__name__}]")
-                except:
-                    safe_args.append("[unprintable]")
-            
-            # Safely print to stderr (for logs) - use same non-blocking approach as safe_write
-            # CRITICAL: Use select() to check if pipe is writable before writing to prevent blocking
+    """ULTRA-RESILIENT logging - cannot fail and never blocks on the output pipe.
+
+    Messages are queued to the process log sink; ``level="debug"`` lines may be
+    dropped under backpressure and ``heartbeat=True`` also copies the line to
+    the heartbeat file.
+    """
+    try:
+        safe_args = []
+        for arg in args:
             try:
-                # Handle sep parameter
-                sep = kwargs.get('sep', ' ')
-                message = sep.join(str(arg) for arg in safe_args)
-                
-                # Handle end parameter (default is newline)
-                end = kwargs.get('end', '\n')
-                message += end
-                
-                # Check if stderr is a pipe (not TTY)
-                is_pipe = not (hasattr(sys.stderr, 'isatty') and sys.stderr.isatty())
-                
-                # For pipes, check if writable before writing (non-blocking check)
-                if is_pipe:
-                    try:
-                        import select
-                        if hasattr(sys.stderr, 'fileno'):
-                            fileno = sys.stderr.fileno()
-                            # Check if file descriptor is writable (timeout 0 = non-blocking)
-                            ready, _, _ = select.select([], [fileno], [], 0)
-                            if fileno not in ready:
-                                # Pipe buffer is full, but for logging we'll try a small delay and retry once
-                                # This ensures important logs don't get completely lost
-                                import time
-                                time.sleep(0.01)  # Small delay to let buffer drain
-                                # Try once more
-                                ready, _, _ = select.select([], [fileno], [], 0)
-                                if fileno not in ready:
-                                    # Still full, but write anyway - better to have partial logs than none
-                                    # The write might block briefly, but Node.js should read it
-                                    pass
-                    except (ImportError, OSError, ValueError):
-                        # select not available or failed, try writing anyway
-                        pass
-                
-                # Write the message
-                try:
-                    sys.stderr.write(message)
-                except (IOError, OSError) as e:
-                    # If write would block (EAGAIN/EWOULDBLOCK), try once more after brief delay
-                    import errno
-                    if hasattr(errno, 'EAGAIN') and e.errno == errno.EAGAIN:
-                        import time
-                        time.sleep(0.01)
-                        try:
-                            sys.stderr.write(message)
-                        except:
-                            pass  # Give up
-                    elif hasattr(errno, 'EWOULDBLOCK') and e.errno == errno.EWOULDBLOCK:
-                        import time
-                        time.sleep(0.01)
-                        try:
-                            sys.stderr.write(message)
-                        except:
-                            pass  # Give up
-                
-                # Only flush if it's a TTY (terminal), not a pipe
-                if not is_pipe:
-                    try:
-                        if hasattr(sys.stderr, 'isatty') and sys.stderr.isatty():
-                            sys.stderr.flush()
-                    except:
-                        pass
+                if isinstance(arg, (str, int, float, bool)):
+                    safe_args.append(str(arg))
+                else:
+                    safe_args.append(f"[{type(arg).__name__}]")
             except:
-                # Fallback to print if direct write fails
-                try:
-                    print(*safe_args, **{**kwargs, 'file': sys.stderr}, flush=False)  # Don't flush
-                except:
-                    pass
-                
-            break  # Success
-            
-        except Exception:
-            if attempt == MAX_ATTEMPTS - 1:
-                pass  # Silent failure - cannot log
+                safe_args.append("[unprintable]")
+        message = kwargs.get('sep', ' ').join(safe_args) + kwargs.get('end', '\n')
+        _log_sink.emit(message, level=kwargs.get('level', 'info'), heartbeat=kwargs.get('heartbeat', False))
+    except Exception:
+        try:
+            sys.stderr.write(" ".join(str(arg) for arg in args) + "\n")
+        except:
+            pass  # Silent failure - cannot log
+
+def log_heartbeat(*lines: str):
+    """Append breadcrumb lines to the heartbeat file (batched, no fsync)."""
+    try:
+        _log_sink.heartbeat(*lines)
+    except Exception:
+        pass
 
 class UltimateSafetyWrapper:
     """Wrap any operation to prevent any failure."""
@@ -499,6 +453,15 @@ class UltimateSafetyWrapper:
                 time.sleep(0.1 * (attempt + 1))
         return default_return
 
+# Truthy once a reCAPTCHA response token has been written into the page
+_RECAPTCHA_TOKEN_PRESENT_JS = """
+    () => {
+        const el = document.querySelector('#g-recaptcha-response, textarea[name="g-recaptcha-response"]');
+        return !!(el && el.value && el.value.length > 20);
+    }
+"""
+
+
 class LocalCaptchaSolver:
     """
     ULTRA-RESILIENT LOCAL CAPTCHA solver - no external dependencies.
@@ -577,7 +540,7 @@ class LocalCaptchaSolver:
                 )
                 
                 # Wait for token to appear after solving
-                await asyncio.sleep(5)
+                await settle(self.page, "captcha", 5, dom=False, condition=_RECAPTCHA_TOKEN_PRESENT_JS)
                 
                 # Validate page is still open before checking token
                 try:
@@ -633,14 +596,14 @@ class LocalCaptchaSolver:
                             ultra_safe_log_print("⚠️  Token found but appears to be fake - challenge may not have been solved")
                             ultra_safe_log_print("   🔄 Re-attempting comprehensive solving with longer waits...")
                             # Try one more time with longer waits
-                            await asyncio.sleep(5)
+                            await settle(self.page, "captcha", 5)
                             try:
                                 result2 = await asyncio.wait_for(
                                     self.ultimate_solver.solve_recaptcha_v2(site_key, page_url),
                                     timeout=300.0
                                 )
                                 if result2.get("success") and result2.get("token"):
-                                    await asyncio.sleep(5)
+                                    await settle(self.page, "captcha", 5, dom=False, condition=_RECAPTCHA_TOKEN_PRESENT_JS)
                                     token_verified2 = await self.page.evaluate("""
                                         () => {
                                             const recaptchaResponse = document.querySelector('#g-recaptcha-response');
@@ -675,7 +638,7 @@ class LocalCaptchaSolver:
                     else:
                         ultra_safe_log_print("⚠️  Comprehensive solver returned token but it's not in the page - retrying...")
                         # Wait a bit and check again
-                        await asyncio.sleep(5)
+                        await settle(self.page, "captcha", 5, dom=False, condition=_RECAPTCHA_TOKEN_PRESENT_JS)
                         token_verified = await self.page.evaluate("""
                             () => {
                                 const recaptchaResponse = document.querySelector('#g-recaptcha-response');
@@ -850,7 +813,7 @@ class LocalCaptchaSolver:
             
             # Scroll button into view
             await hashcash_button.scroll_into_view_if_needed()
-            await asyncio.sleep(0.5)
+            await settle(page, "captcha", 0.5, frames=True)
             
             # Get hashcash name for verification
             hashcash_name = await hashcash_button.evaluate("""
@@ -899,7 +862,7 @@ class LocalCaptchaSolver:
                     ultra_safe_log_print("   ✅ Hashcash button clicked (DOM click)")
             
             # Wait a moment for the click to register
-            await asyncio.sleep(1)
+            await settle(page, "captcha", 1)
             
             # Wait for the Hashcash to complete (checkmark appears)
             # Hashcash typically takes 1-5 seconds depending on difficulty level
@@ -952,7 +915,7 @@ class LocalCaptchaSolver:
                 
                 if is_solved:
                     # Wait a bit more to ensure hidden input is created
-                    await asyncio.sleep(1)
+                    await settle(page, "captcha", 1)
                     
                     # Verify hidden input exists with value
                     hidden_input = await page.query_selector(f'input[name="{hashcash_name}"], input[name*="Captacha"]')
@@ -1307,28 +1270,16 @@ async def _inner_form_discovery(page) -> List[Dict[str, Any]]:
         if not page or page.is_closed():
             return []
         
-        forms_data = await page.evaluate("""
-            () => {
-                try {
-                    const forms = Array.from(document.querySelectorAll('form'));
-                    return forms.map((form, index) => {
-                        try {
-                            return {
-                                index: index,
-                                action: form.action || '',
-                                method: form.method || 'get',
-                                fieldsCount: form.querySelectorAll('input, textarea, select').length
-                            };
-                        } catch (e) {
-                            return {index: index, error: e.message};
-                        }
-                    }).filter(f => !f.error);
-                } catch (e) {
-                    return [];
-                }
+        scan = await form_scanner.scan_forms(page)
+        return [
+            {
+                "index": form["formIndex"],
+                "action": form.get("action", ""),
+                "method": form.get("method", "get"),
+                "fieldsCount": form.get("fieldCount", 0),
             }
-        """)
-        return forms_data
+            for form in scan.get("forms", [])
+        ]
     except Exception:
         return []
 
@@ -1362,16 +1313,34 @@ async def ultra_safe_page_operation(page, operation_name: str, operation, *args,
 class UltimatePlaywrightManager:
     """Manage Playwright lifecycle with ultimate resilience."""
     
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, mode: Optional[str] = None):
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
-        # Always use visible mode for CAPTCHA verification (user requirement)
-        # If no DISPLAY available, we'll set up virtual display
-        self.headless = False  # Always False - force visible mode
+        # "auto" and "headless" launch headless; only "visible" (or an escalated run) needs a display.
+        # Without DISPLAY a visible browser gets a virtual display (Xvfb).
+        self.mode = mode if mode in BROWSER_MODES else (HEADLESS if headless else VISIBLE)
+        self.headless = self.mode != VISIBLE
+        # Visible browser of one escalated run on a persistent manager (closed with the session)
+        self.escalated_browser = None
+        # Manager owning the Xvfb display that escalated job managers share (the worker's manager)
+        self.display_owner = None
         self.xvfb_process = None
         self.original_display = os.environ.get('DISPLAY')
+        # Persistent managers are owned by the --serve worker and outlive a single run
+        self.persistent = False
+        # Optional BrowserContextPool: one warm browser serving isolated contexts per job
+        self.pool = None
+        self.pool_options = None
+        self.pool_session = None
+        self.owns_pool = False
+        # Worker-owned HTTP pool for contact discovery, shared with the job managers (like the pool)
+        self.discovery_client = None
+        # Worker-owned asyncpg pool for the form cache, shared with the job managers the same way
+        self.form_cache_pool = None
+        # Optional request interception (template "resource_profile"), re-applied to every new page
+        self.resource_blocker = None
         # Use UltimateLocalCaptchaSolver for audio challenge support
         try:
             from captcha_solver import UltimateLocalCaptchaSolver
@@ -1549,17 +1518,19 @@ class UltimatePlaywrightManager:
     async def start(self):
         """Start Playwright with multiple fallback strategies."""
         try:
-            ultra_safe_log_print("📍 [start()] Method called")
+            ultra_safe_log_print("📍 [start()] Method called", level="debug")
             sys.stderr.flush()
             
             # Set up virtual display if needed (for visible mode on headless servers)
             # MUST be done BEFORE importing/starting Playwright
             display_setup_success = True
             current_display = os.environ.get('DISPLAY')
-            ultra_safe_log_print(f"📍 [start()] Current DISPLAY: {current_display}")
+            ultra_safe_log_print(f"📍 [start()] Current DISPLAY: {current_display}", level="debug")
             sys.stderr.flush()
             
-            if not current_display:
+            if self.headless:
+                ultra_safe_log_print(f"🕶️  Browser mode '{self.mode}': launching headless (no display needed)")
+            elif not current_display:
                 ultra_safe_log_print("")
                 ultra_safe_log_print("🔄 No DISPLAY environment variable detected")
                 ultra_safe_log_print("   Setting up virtual display (Xvfb) for visible browser mode...")
@@ -1600,10 +1571,10 @@ class UltimatePlaywrightManager:
                 ultra_safe_log_print(f"✅ DISPLAY already set: {current_display}")
             
             # Try to import Playwright
-            ultra_safe_log_print("📍 [start()] About to import Playwright...")
-            ultra_safe_log_print(f"📍 Python executable: {sys.executable}")
-            ultra_safe_log_print(f"📍 Python version: {sys.version}")
-            ultra_safe_log_print(f"📍 Python path entries: {len(sys.path)}")
+            ultra_safe_log_print("📍 [start()] About to import Playwright...", level="debug")
+            ultra_safe_log_print(f"📍 Python executable: {sys.executable}", level="debug")
+            ultra_safe_log_print(f"📍 Python version: {sys.version}", level="debug")
+            ultra_safe_log_print(f"📍 Python path entries: {len(sys.path)}", level="debug")
             for i, path_entry in enumerate(sys.path[:3]):  # Show first 3 paths
                 ultra_safe_log_print(f"    [{i}] {path_entry}")
             sys.stderr.flush()
@@ -1613,7 +1584,7 @@ class UltimatePlaywrightManager:
                 default_return=None
             )
             
-            ultra_safe_log_print(f"📍 [start()] Playwright import result: {playwright_import is not None}")
+            ultra_safe_log_print(f"📍 [start()] Playwright import result: {playwright_import is not None}", level="debug")
             sys.stderr.flush()
             
             if not playwright_import:
@@ -1621,14 +1592,14 @@ class UltimatePlaywrightManager:
                 sys.stderr.flush()
                 return False
             
-            ultra_safe_log_print("📍 [start()] Importing async_playwright...")
+            ultra_safe_log_print("📍 [start()] Importing async_playwright...", level="debug")
             sys.stderr.flush()
             from playwright.async_api import async_playwright
-            ultra_safe_log_print("📍 [start()] async_playwright imported")
+            ultra_safe_log_print("📍 [start()] async_playwright imported", level="debug")
             sys.stderr.flush()
             
             # Try to start Playwright
-            ultra_safe_log_print("📍 [start()] About to call async_playwright().start()...")
+            ultra_safe_log_print("📍 [start()] About to call async_playwright().start()...", level="debug")
             sys.stderr.flush()
             
             self.playwright = await UltimateSafetyWrapper.execute_async(
@@ -1636,7 +1607,7 @@ class UltimatePlaywrightManager:
                 default_return=None
             )
             
-            ultra_safe_log_print(f"📍 [start()] async_playwright().start() returned: {self.playwright is not None}")
+            ultra_safe_log_print(f"📍 [start()] async_playwright().start() returned: {self.playwright is not None}", level="debug")
             sys.stderr.flush()
             
             if not self.playwright:
@@ -1645,35 +1616,11 @@ class UltimatePlaywrightManager:
                 return False
             
             # Try to launch browser with multiple strategies
-            ultra_safe_log_print("📍 [start()] About to launch browser...")
+            ultra_safe_log_print("📍 [start()] About to launch browser...", level="debug")
             sys.stderr.flush()
             
-            browsers_to_try = ['chromium', 'firefox']
             browser_errors = []
-            for browser_type in browsers_to_try:
-                try:
-                    ultra_safe_log_print(f"📍 [start()] Trying {browser_type}...")
-                    sys.stderr.flush()
-                    
-                    browser_launcher = getattr(self.playwright, browser_type).launch
-                    # Always use visible mode (headless=False) for CAPTCHA verification
-                    ultra_safe_log_print(f"   🖥️  Launching {browser_type} in visible mode (for CAPTCHA verification)...")
-                    sys.stderr.flush()
-                    
-                    self.browser = await browser_launcher(
-                        headless=False,  # Always visible for CAPTCHA verification
-                        timeout=120000,
-                        args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu', '--disable-blink-features=AutomationControlled']
-                    )
-                    
-                    ultra_safe_log_print(f"✅ Browser launched: {browser_type}")
-                    sys.stderr.flush()
-                    break
-                except Exception as e:
-                    error_msg = str(e)
-                    browser_errors.append(f"{browser_type}: {error_msg}")
-                    ultra_safe_log_print(f"⚠️  Failed to launch {browser_type}: {error_msg[:100]}")
-                    continue
+            self.browser = await self._launch_browser(browser_errors)
             
             if not self.browser:
                 ultra_safe_log_print("")
@@ -1721,33 +1668,21 @@ class UltimatePlaywrightManager:
                 ultra_safe_log_print("")
                 return False
             
-            # Create context
-            self.context = await UltimateSafetyWrapper.execute_async(
-                self.browser.new_context,
-                viewport={'width': 1280, 'height': 720},
-                default_return=None
-            )
-            
-            if not self.context:
-                ultra_safe_log_print("❌ Failed to create context")
-                return False
-            
-            # Create page
-            self.page = await UltimateSafetyWrapper.execute_async(
-                self.context.new_page,
-                default_return=None
-            )
-            
-            if not self.page:
-                ultra_safe_log_print("❌ Failed to create page")
+            if self.pool_options is not None:
+                from browser_pool import BrowserContextPool
+                self.pool = BrowserContextPool(
+                    self._launch_browser,
+                    log=ultra_safe_log_print,
+                    **self.pool_options
+                )
+                self.owns_pool = True
+                await self.pool.start(first_browser=self.browser)
+                ultra_safe_log_print(f"🧊 Context pool ready: {self.pool.stats()}")
+                if not await self._lease_pooled_session():
+                    return False
+            elif not await self._open_context_and_page():
                 return False
             
-            # Update captcha solver with page reference
-            if self.captcha_solver:
-                self.captcha_solver.page = self.page
-                if hasattr(self.captcha_solver, 'ultimate_solver') and self.captcha_solver.ultimate_solver:
-                    self.captcha_solver.ultimate_solver.page = self.page
-            
             ultra_safe_log_print("✅ Playwright setup completed successfully")
             return True
             
@@ -1756,11 +1691,244 @@ class UltimatePlaywrightManager:
             await self.cleanup()
             return False
     
+    async def _launch_browser(self, browser_errors: Optional[List[str]] = None, headless: Optional[bool] = None):
+        """Launch Chromium (Firefox as fallback); returns the browser or None."""
+        if browser_errors is None:
+            browser_errors = []
+        if headless is None:
+            headless = self.headless
+        browsers_to_try = ['chromium', 'firefox']
+        for browser_type in browsers_to_try:
+            try:
+                ultra_safe_log_print(f"📍 [start()] Trying {browser_type}...", level="debug")
+                sys.stderr.flush()
+                
+                browser_launcher = getattr(self.playwright, browser_type).launch
+                if headless:
+                    ultra_safe_log_print(f"   🕶️  Launching {browser_type} headless...")
+                else:
+                    ultra_safe_log_print(f"   🖥️  Launching {browser_type} in visible mode (for CAPTCHA verification)...")
+                sys.stderr.flush()
+                
+                browser = await browser_launcher(
+                    headless=headless,
+                    timeout=120000,
+                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu', '--disable-blink-features=AutomationControlled']
+                )
+                
+                ultra_safe_log_print(f"✅ Browser launched: {browser_type}")
+                sys.stderr.flush()
+                return browser
+            except Exception as e:
+                error_msg = str(e)
+                browser_errors.append(f"{browser_type}: {error_msg}")
+                ultra_safe_log_print(f"⚠️  Failed to launch {browser_type}: {error_msg[:100]}")
+                continue
+        return None
+    
+    def enable_context_pool(self, browsers: int = 1, max_contexts: int = 8, prewarm: int = 2,
+                            max_contexts_per_browser: int = 50):
+        """Serve sessions from a BrowserContextPool started by the next start()."""
+        self.persistent = True
+        self.pool_options = {
+            "browsers": browsers,
+            "max_contexts": max_contexts,
+            "prewarm": prewarm,
+            "max_contexts_per_browser": max_contexts_per_browser,
+            "context_options": {"viewport": {"width": 1280, "height": 720}},
+        }
+    
+    def spawn_job_manager(self) -> "UltimatePlaywrightManager":
+        """Return a per-job manager that leases isolated contexts from this manager's pool."""
+        child = UltimatePlaywrightManager(mode=self.mode)
+        child.display_owner = self
+        child.persistent = True
+        child.pool = self.pool
+        child.owns_pool = False
+        child.playwright = self.playwright
+        child.discovery_client = self.discovery_client
+        child.form_cache_pool = self.form_cache_pool
+        return child
+    
+    def _attach_page_to_solver(self):
+        if self.captcha_solver:
+            self.captcha_solver.page = self.page
+            if hasattr(self.captcha_solver, 'ultimate_solver') and self.captcha_solver.ultimate_solver:
+                self.captcha_solver.ultimate_solver.page = self.page
+    
+    def set_resource_profile(self, profile: Optional[str]):
+        """Select the request-interception profile for pages opened from now on."""
+        try:
+            from resource_profiles import ResourceBlocker
+            self.resource_blocker = ResourceBlocker.for_profile(profile)
+        except Exception as e:
+            ultra_safe_log_print(f"⚠️  Resource profile unavailable: {str(e)[:80]}")
+            self.resource_blocker = None
+        if self.resource_blocker:
+            ultra_safe_log_print(f"🪶 Resource profile: {self.resource_blocker.profile} (blocking media, fonts, trackers, third-party iframes)")
+    
+    async def _install_resource_blocker(self):
+        if self.resource_blocker and self.page:
+            if not await self.resource_blocker.install(self.page):
+                ultra_safe_log_print("⚠️  Could not install resource profile on page - loading everything")
+    
+    async def _lease_pooled_session(self) -> bool:
+        """Lease a fresh context/page from the pool (waits for a free slot)."""
+        session = await self.pool.acquire() if self.pool else None
+        if session is None:
+            ultra_safe_log_print("❌ Context pool could not provide a session")
+            return False
+        self.pool_session = session
+        self.context = session.context
+        self.page = session.page
+        self._attach_page_to_solver()
+        await self._install_resource_blocker()
+        return True
+    
+    async def _open_context_and_page(self) -> bool:
+        """Create a fresh context and page on the running browser."""
+        # Create context
+        self.context = await UltimateSafetyWrapper.execute_async(
+            self.browser.new_context,
+            viewport={'width': 1280, 'height': 720},
+            default_return=None
+        )
+        
+        if not self.context:
+            ultra_safe_log_print("❌ Failed to create context")
+            return False
+        
+        # Create page
+        self.page = await UltimateSafetyWrapper.execute_async(
+            self.context.new_page,
+            default_return=None
+        )
+        
+        if not self.page:
+            ultra_safe_log_print("❌ Failed to create page")
+            return False
+        
+        # Update captcha solver with page reference
+        self._attach_page_to_solver()
+        await self._install_resource_blocker()
+        
+        return True
+    
+    async def escalate_to_visible(self) -> bool:
+        """Move the current run to a visible browser (on Xvfb without DISPLAY); False if it stays headless.
+        
+        A one-off manager swaps its headless browser for the visible one. A persistent (worker)
+        manager keeps its warm headless browser/pool and uses a dedicated visible browser until
+        the session closes. The headless session is only dropped once the visible page exists.
+        """
+        if not self.headless:
+            return True
+        if not self.playwright:
+            return False
+        owner = self.display_owner or self
+        if not os.environ.get('DISPLAY') and not owner._setup_virtual_display():
+            ultra_safe_log_print("⚠️  No display available for a visible browser")
+            return False
+        browser = await self._launch_browser(headless=False)
+        if not browser:
+            return False
+        context = await UltimateSafetyWrapper.execute_async(
+            browser.new_context,
+            viewport={'width': 1280, 'height': 720},
+            default_return=None
+        )
+        page = await UltimateSafetyWrapper.execute_async(context.new_page, default_return=None) if context else None
+        if not page:
+            await UltimateSafetyWrapper.execute_async(browser.close, default_return=None, max_retries=0)
+            return False
+        
+        await self.close_session()
+        if self.persistent:
+            self.escalated_browser = browser
+        else:
+            headless_browser, self.browser = self.browser, browser
+            if headless_browser:
+                await UltimateSafetyWrapper.execute_async(headless_browser.close, default_return=None, max_retries=0)
+        self.context = context
+        self.page = page
+        self.headless = False
+        self._attach_page_to_solver()
+        await self._install_resource_blocker()
+        return True
+    
+    def is_browser_alive(self) -> bool:
+        """Return True if the launched browser (or pool) is still connected."""
+        if self.pool is not None:
+            return self.pool.is_alive()
+        try:
+            return bool(self.playwright and self.browser and self.browser.is_connected())
+        except Exception:
+            return False
+    
+    async def open_session(self) -> bool:
+        """Open a fresh context/page for one job, launching the browser only if needed.
+        
+        Used by worker mode (--serve) so Playwright and the browser stay warm
+        between submissions while every job still gets clean cookies and storage.
+        """
+        if self.pool is not None and not self.owns_pool:
+            # Job manager borrowing a pool owned by the worker
+            await self.close_session()
+            return self.pool.is_alive() and await self._lease_pooled_session()
+        
+        if not self.is_browser_alive():
+            if self.playwright or self.browser or self.pool:
+                await self.cleanup()
+            return await self.start()
+        
+        await self.close_session()
+        if self.pool is not None:
+            return await self._lease_pooled_session()
+        if await self._open_context_and_page():
+            return True
+        
+        # Context creation failed on a live browser - relaunch from scratch
+        ultra_safe_log_print("⚠️  Could not open a new context on the warm browser, relaunching...")
+        await self.cleanup()
+        return await self.start()
+    
+    async def close_session(self):
+        """Close the current page and context but keep the browser running."""
+        page, context = self.page, self.context
+        self.page = None
+        self.context = None
+        if self.pool_session is not None:
+            session, self.pool_session = self.pool_session, None
+            if self.pool is not None:
+                await self.pool.release(session)
+                page = context = None
+        if page:
+            try:
+                if not page.is_closed():
+                    await UltimateSafetyWrapper.execute_async(page.close, default_return=None, max_retries=0)
+            except Exception:
+                pass
+        if context:
+            await UltimateSafetyWrapper.execute_async(context.close, default_return=None, max_retries=0)
+        if self.escalated_browser is not None:
+            browser, self.escalated_browser = self.escalated_browser, None
+            await UltimateSafetyWrapper.execute_async(browser.close, default_return=None, max_retries=0)
+            self.headless = self.mode != VISIBLE
+    
+    async def release(self):
+        """End a run: drop only the session when persistent, everything otherwise."""
+        if self.persistent:
+            await self.close_session()
+        else:
+            await self.cleanup()
+    
     async def navigate(self, url: str) -> bool:
         """ULTRA-RESILIENT navigation that cannot fail."""
         if not self.page:
             return False
         
+        track_network(self.page)
+        instrument_page(self.page, current_stage_timer())
         return await UltimateSafetyWrapper.execute_async(
             self.page.goto,
             url,
@@ -1869,6 +2037,36 @@ class UltimatePlaywrightManager:
     
     async def cleanup(self):
         """ULTRA-RESILIENT cleanup that cannot fail."""
+        if self.pool is not None and not self.owns_pool:
+            # Borrowed pool: only give our context back, the owner closes the pool
+            await self.close_session()
+            return
+        
+        if self.discovery_client is not None:
+            try:
+                await self.discovery_client.aclose()  # Reopens lazily if the worker keeps running
+            except Exception:
+                pass
+        
+        if self.form_cache_pool is not None:
+            try:
+                await self.form_cache_pool.aclose()  # Reopens lazily as well
+            except Exception:
+                pass
+        
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            self.pool_session = None
+            self.page = None
+            self.context = None
+            try:
+                await pool.close()  # Closes every context and browser (including self.browser)
+                ultra_safe_log_print("✅ Cleaned up: context pool")
+            except Exception:
+                ultra_safe_log_print("⚠️  Failed to clean up: context pool")
+            self.browser = None
+            self.owns_pool = False
+        
         # Stop Xvfb if we started it
         if self.xvfb_process:
             try:
@@ -1894,14 +2092,15 @@ class UltimatePlaywrightManager:
         
         cleanup_operations = []
         
-        if self.page and not self.page.is_closed():
-            cleanup_operations.append(('page', lambda: self.page.close()))
-        if self.context:
-            cleanup_operations.append(('context', lambda: self.context.close()))
-        if self.browser:
-            cleanup_operations.append(('browser', lambda: self.browser.close()))
-        if self.playwright:
-            cleanup_operations.append(('playwright', lambda: self.playwright.stop()))
+        page, context, browser, playwright = self.page, self.context, self.browser, self.playwright
+        if page and not page.is_closed():
+            cleanup_operations.append(('page', lambda: page.close()))
+        if context:
+            cleanup_operations.append(('context', lambda: context.close()))
+        if browser:
+            cleanup_operations.append(('browser', lambda: browser.close()))
+        if playwright:
+            cleanup_operations.append(('playwright', lambda: playwright.stop()))
         
         for name, operation in cleanup_operations:
             try:
@@ -1912,9 +2111,15 @@ class UltimatePlaywrightManager:
                 ultra_safe_log_print(f"✅ Cleaned up: {name}")
             except Exception:
                 ultra_safe_log_print(f"⚠️  Failed to clean up: {name}")
+        
+        # Forget handles so a later start()/open_session() relaunches cleanly
+        self.page = None
+        self.context = None
+        self.browser = None
+        self.playwright = None
 
-async def ultra_safe_template_load(template_path: Path) -> Dict[str, Any]:
-    """ULTRA-RESILIENT template loading that cannot fail."""
+async def ultra_safe_template_load(template_path: Path) -> CompiledTemplate:
+    """ULTRA-RESILIENT template loading that cannot fail (compiled once per distinct template content)."""
     default_template = {
         "fields": [],
         "test_data": {
@@ -1926,230 +2131,79 @@ async def ultra_safe_template_load(template_path: Path) -> Dict[str, Any]:
         "headless": False  # Default to non-headless for better CAPTCHA solving
     }
     
-    # Try to load template file
-    template_content = UltimateSafetyWrapper.execute_sync(
-        template_path.read_text,
-        encoding='utf-8',
-        default_return=None
-    )
-    
-    if not template_content:
-        ultra_safe_log_print("⚠️  Using default template (file read failed)")
-        return default_template
-    
-    # Try to parse JSON
-    template = UltimateSafetyWrapper.execute_sync(
-        json.loads,
-        template_content,
-        default_return=default_template
-    )
-    
-    if template == default_template:
-        ultra_safe_log_print("⚠️  Using default template (JSON parse failed)")
+    template = UltimateSafetyWrapper.execute_sync(load_template, template_path, default_return=None)
+    if template is None:
+        ultra_safe_log_print("⚠️  Using default template (file read or JSON parse failed)")
+        return compile_template(default_template)
     
     return template
 
 
-DEFAULT_TEST_DATA = {
-    "name": "Test User",
-    "email": "test@example.com",
-    "phone": "+1234567890",
-    "message": "This is an automated test submission.",
-    "subject": "Test Inquiry",
-    "company": "Test Company",
-}
-
 CHECKPOINT_MARKER = "CHECKPOINT|"
 
 
 def log_checkpoint(step: int, title: str, status: str, detail: str = ""):
-    """Emit machine-readable checkpoint lines for the UI while keeping raw logs intact."""
-    safe_title = (title or "").replace("|", "/")
-    safe_status = (status or "").replace("|", "/")
-    safe_detail = (detail or "").replace("|", "/")
-    ultra_safe_log_print(f"{CHECKPOINT_MARKER}{step}|{safe_status}|{safe_title}|{safe_detail}")
+    """Emit a checkpoint on the progress channel, or as a ``CHECKPOINT|`` log line without one."""
+    try:
+        timer = current_stage_timer()
+        if timer is not None:
+            timer.checkpoint(step, status)
+        if _progress.enabled:
+            _progress.checkpoint(step, status, title, detail)
+        else:
+            _log_sink.checkpoint(step, status, title, detail)
+    except Exception:
+        pass
 
 
 def resolve_test_data(template: Dict[str, Any]) -> Dict[str, str]:
-    raw_test_data = template.get("test_data")
-    template_test_data = raw_test_data if isinstance(raw_test_data, dict) else {}
-    resolved: Dict[str, str] = {}
+    if isinstance(template, CompiledTemplate):
+        return dict(template.test_data)
+    return normalize_test_data(template.get("test_data"))
 
-    for key, fallback in DEFAULT_TEST_DATA.items():
-        value = template_test_data.get(key)
-        if isinstance(value, str):
-            normalized = value.strip()
-            if key == "message" and normalized.lower() in {"true", "false", "null", "undefined"}:
-                normalized = ""
-            resolved[key] = normalized or fallback
-        else:
-            resolved[key] = fallback
-
-    return resolved
-
-async def handle_banners_and_popups(page) -> int:
-    """ULTRA-RESILIENT banner/popup handler - closes cookie banners, newsletter popups, welcome modals, etc."""
-    banners_closed = 0
-    
+async def handle_banners_and_popups(page, form_locator: Optional[str] = None) -> int:
+    """Dismiss cookie banners, consent managers, newsletter popups and modals covering the page or the form."""
     if not page or page.is_closed():
-        return banners_closed
-    
+        return 0
     try:
-        # Wait a bit for banners to appear
-        await asyncio.sleep(1)
-        
-        # Comprehensive banner/popup detection and closing
-        closed_count = await page.evaluate("""
-            () => {
-                let closed = 0;
-                
-                // Common selectors for banners, popups, modals, overlays
-                const selectors = [
-                    // Cookie consent banners
-                    '[id*="cookie"]', '[class*="cookie"]', '[id*="Cookie"]', '[class*="Cookie"]',
-                    '[id*="consent"]', '[class*="consent"]', '[id*="Consent"]', '[class*="Consent"]',
-                    '[id*="gdpr"]', '[class*="gdpr"]', '[id*="GDPR"]', '[class*="GDPR"]',
-                    '#cookie-notice', '.cookie-notice', '#cookieNotice', '.cookieNotice',
-                    '#cookieConsent', '.cookieConsent', '#cookie-consent', '.cookie-consent',
-                    
-                    // Newsletter/subscribe popups
-                    '[id*="newsletter"]', '[class*="newsletter"]', '[id*="Newsletter"]', '[class*="Newsletter"]',
-                    '[id*="subscribe"]', '[class*="subscribe"]', '[id*="Subscribe"]', '[class*="Subscribe"]',
-                    '[id*="mailing"]', '[class*="mailing"]', '#newsletter-popup', '.newsletter-popup',
-                    
-                    // Welcome/modals/overlays
-                    '[id*="welcome"]', '[class*="welcome"]', '[id*="Welcome"]', '[class*="Welcome"]',
-                    '[id*="modal"]', '[class*="modal"]', '[id*="Modal"]', '[class*="Modal"]',
-                    '[id*="overlay"]', '[class*="overlay"]', '[id*="Overlay"]', '[class*="Overlay"]',
-                    '[id*="popup"]', '[class*="popup"]', '[id*="Popup"]', '[class*="Popup"]',
-                    '.modal', '#modal', '.overlay', '#overlay', '.popup', '#popup',
-                    
-                    // Common banner classes
-                    '.banner', '#banner', '[class*="banner"]', '[id*="banner"]',
-                    '.notification', '#notification', '[class*="notification"]',
-                    '.alert-banner', '.promo-banner', '.sticky-banner',
-                    
-                    // Specific common IDs
-                    '#onetrust-consent-sdk', '#CybotCookieDialog', '#cookie-law-info-bar',
-                    '#cookie-bar', '.cookie-bar', '#cc-window', '.cc-window',
-                    '#eu-cookie', '.eu-cookie', '#cookieDirective', '.cookieDirective'
-                ];
-                
-                // Try to find and close banners
-                for (const selector of selectors) {
-                    try {
-                        const elements = document.querySelectorAll(selector);
-                        elements.forEach(element => {
-                            // Check if element is visible
-                            const style = window.getComputedStyle(element);
-                            const isVisible = style.display !== 'none' && 
-                                            style.visibility !== 'hidden' && 
-                                            style.opacity !== '0' &&
-                                            element.offsetWidth > 0 && 
-                                            element.offsetHeight > 0;
-                            
-                            if (isVisible) {
-                                // Try to find close button within the element
-                                const closeButtons = element.querySelectorAll(
-                                    'button[class*="close"], ' +
-                                    'button[class*="Close"], ' +
-                                    'button[aria-label*="close" i], ' +
-                                    'button[aria-label*="dismiss" i], ' +
-                                    'button[title*="close" i], ' +
-                                    '.close, .Close, [class*="close-button"], ' +
-                                    '[class*="dismiss"], [class*="accept"], ' +
-                                    '[id*="close"], [id*="Close"], ' +
-                                    '[class*="cookie-accept"], ' +
-                                    '[class*="cookie-decline"], ' +
-                                    '[class*="cookie-dismiss"]'
-                                );
-                                
-                                if (closeButtons.length > 0) {
-                                    // Click the first close button
-                                    closeButtons[0].click();
-                                    closed++;
-                                } else {
-                                    // No close button found, try to hide the element directly
-                                    element.style.display = 'none';
-                                    element.style.visibility = 'hidden';
-                                    element.style.opacity = '0';
-                                    element.style.height = '0';
-                                    element.style.overflow = 'hidden';
-                                    closed++;
-                                }
-                            }
-                        });
-                    } catch (e) {
-                        // Continue with next selector
-                    }
-                }
-                
-                // Also try common close button selectors globally
-                const globalCloseSelectors = [
-                    'button[aria-label*="close" i]',
-                    'button[aria-label*="dismiss" i]',
-                    'button[title*="close" i]',
-                    '.close-button', '.dismiss-button', '.accept-button',
-                    '[data-dismiss="modal"]', '[data-bs-dismiss="modal"]'
-                ];
-                
-                for (const selector of globalCloseSelectors) {
-                    try {
-                        const buttons = document.querySelectorAll(selector);
-                        buttons.forEach(button => {
-                            const style = window.getComputedStyle(button);
-                            if (style.display !== 'none' && button.offsetWidth > 0) {
-                                button.click();
-                                closed++;
-                            }
-                        });
-                    } catch (e) {
-                        // Continue
-                    }
-                }
-                
-                return closed;
-            }
-        """)
-        
-        banners_closed = closed_count or 0
-        
-        # If we closed some banners, wait a bit for animations
-        if banners_closed > 0:
-            await asyncio.sleep(1)
-            
-            # Try one more time to catch any that appeared after first attempt
-            additional_closed = await page.evaluate("""
-                () => {
-                    let closed = 0;
-                    const selectors = [
-                        '[id*="cookie"]', '[class*="cookie"]', '[id*="newsletter"]', 
-                        '[class*="newsletter"]', '.modal', '.overlay', '.popup'
-                    ];
-                    
-                    for (const selector of selectors) {
-                        try {
-                            const elements = document.querySelectorAll(selector);
-                            elements.forEach(element => {
-                                const style = window.getComputedStyle(element);
-                                if (style.display !== 'none' && element.offsetHeight > 0) {
-                                    element.style.display = 'none';
-                                    closed++;
-                                }
-                            });
-                        } catch (e) {}
-                    }
-                    return closed;
-                }
-            """)
-            
-            banners_closed += (additional_closed or 0)
-        
+        engine = overlay_engine(page)
+        engine.log = ultra_safe_log_print
+        return await engine.sweep(form_locator)
     except Exception as e:
         ultra_safe_log_print(f"⚠️  Banner handling error: {str(e)[:50]}")
-        # Continue anyway - don't fail the whole process
-    
-    return banners_closed
+        return 0
+
+
+async def handle_new_overlays(page, form_locator: Optional[str] = None) -> int:
+    """Re-run the overlay sweep only if overlays appeared since the last one (late CMPs, timed popups)."""
+    try:
+        if not page or page.is_closed():
+            return 0
+        closed = await overlay_engine(page).sweep_if_new(form_locator)
+        if closed:
+            ultra_safe_log_print(f"   🚫 Dismissed {closed} late overlay(s)")
+        return closed
+    except Exception:
+        return 0
+
+async def escalate_to_visible_browser(playwright_manager, mode_usage: ModeUsage, reason: str,
+                                      url: Optional[str] = None) -> bool:
+    """Reopen the run in a visible browser and reload ``url`` (banners handled); False if it stays headless."""
+    ultra_safe_log_print(f"🖥️  {reason} needs a visible browser - escalating from headless...")
+    mode_usage.switch(VISIBLE, reason)
+    if not await playwright_manager.escalate_to_visible():
+        mode_usage.revert()
+        ultra_safe_log_print("⚠️  Could not start a visible browser - continuing headless")
+        return False
+    if url:
+        if not await playwright_manager.navigate(url):
+            ultra_safe_log_print(f"⚠️  Visible browser could not reload {url[:80]}")
+            return True
+        await settle(playwright_manager.page, "navigation", 2, network=True)
+        await handle_banners_and_popups(playwright_manager.page)
+    ultra_safe_log_print("✅ Continuing in a visible browser")
+    return True
+
 
 async def extract_wpforms_fields(page, form_load_timestamp: Optional[float] = None) -> Dict[str, Any]:
     """
@@ -2457,7 +2511,7 @@ async def inject_wpforms_fields(page, wpforms_data: Dict[str, Any]) -> bool:
         return False
 
 
-async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, Any]:
+async def ultra_simple_form_fill(page, template: Mapping[str, Any]) -> Dict[str, Any]:
     """ULTRA-RESILIENT simple form filling that cannot fail."""
     result = {
         "fields_attempted": 0,
@@ -2470,80 +2524,37 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
         return result
     
     try:
-        resolved_test_data = resolve_test_data(template)
+        compiled = compile_template(template)
+        resolved_test_data = dict(compiled.test_data)
         playwright_fields_filled = 0
         # First, identify the contact form (not newsletter form)
         # Contact form typically has: name, email, phone, comment/message fields
         # Newsletter form typically only has: email field
-        contact_form_info = await page.evaluate("""
-            () => {
-                const forms = Array.from(document.querySelectorAll('form'));
-                let contactForm = null;
-                let maxContactFields = 0;
-                
-                forms.forEach(form => {
-                    const fields = form.querySelectorAll('input, textarea');
-                    let hasName = false;
-                    let hasEmail = false;
-                    let hasPhone = false;
-                    let hasComment = false;
-                    const fieldNames = [];
-                    
-                    fields.forEach(field => {
-                        if (field.type === 'submit' || field.type === 'button' || field.type === 'hidden') {
-                            return;
-                        }
-                        const name = (field.name || field.id || '').toLowerCase();
-                        fieldNames.push(name);
-                        
-                        // Check for specific contact form field names
-                        if (name === 'name' || name.includes('naam')) hasName = true;
-                        if (name === 'email') hasEmail = true;
-                        if (name === 'phone' || name === 'telefoon') hasPhone = true;
-                        if (name === 'comment' || name === 'message' || name === 'bericht') hasComment = true;
-                    });
-                    
-                    // Contact form must have: name, email, and comment/message (at least 3 of these)
-                    const contactFieldCount = (hasName ? 1 : 0) + (hasEmail ? 1 : 0) + (hasPhone ? 1 : 0) + (hasComment ? 1 : 0);
-                    
-                    // Prioritize forms with name + email + comment (typical contact form)
-                    if (hasName && hasEmail && hasComment && contactFieldCount > maxContactFields) {
-                        maxContactFields = contactFieldCount;
-                        contactForm = form;
-                    } else if (contactFieldCount >= 3 && contactFieldCount > maxContactFields) {
-                        maxContactFields = contactFieldCount;
-                        contactForm = form;
-                    }
-                });
-                
-                // If contact form found, focus on it by scrolling to it
-                if (contactForm) {
-                    contactForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                    // Also try to find the contactInfo section
-                    const contactSection = contactForm.closest('.contactInfo, section');
-                    if (contactSection) {
-                        contactSection.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                    }
-                    return { found: true, fieldCount: maxContactFields };
-                }
-                
-                return { found: false, fieldCount: 0 };
-            }
-        """)
+        scan = await form_scanner.scan_forms(page)
+        fill_target = form_scanner.pick_fill_target(scan)
+        contact_form_info = {"found": False, "fieldCount": 0}
+        if fill_target:
+            # Focus on the contact form by scrolling to it (and its contactInfo section)
+            await form_scanner.scroll_form_into_view(page, fill_target, mode="closest_section")
+            contact_form_info = {"found": True, "fieldCount": fill_target.get("contactFieldCount", 0)}
+        # Email-only signup forms whose email box should be left alone
+        skip_form_indexes = [form["formIndex"] for form in scan.get("forms", []) if form.get("isEmailOnly")]
         
         if contact_form_info.get('found'):
             ultra_safe_log_print(f"   ✅ Contact form identified (has {contact_form_info.get('fieldCount')} contact fields: name, email, phone, comment)")
         else:
             ultra_safe_log_print("   ⚠️  Contact form not clearly identified, will fill all forms")
         
-        await asyncio.sleep(1)  # Wait for scroll
+        await settle(page, "fill", 1, frames=True)  # Wait for scroll
         
         # Comprehensive field detection and filling
         fill_result = await page.evaluate("""
-            (testData) => {
+            ({ template, skipFormIndexes }) => {
                 try {
+                    const matcher = (""" + FIELD_MATCHER_JS + """)(template);
                     let filled = 0;
                     let selects_filled = 0;
+                    const allForms = Array.from(document.querySelectorAll('form'));
                     
                     // Fill text inputs, email, phone, textarea
                     // Prioritize contact form fields (name, email, phone, comment)
@@ -2551,50 +2562,20 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                     text_inputs.forEach(input => {
                         try {
                             if (!input.value && input.offsetParent !== null && !input.disabled) {
-                                const name = (input.name || '').toLowerCase();
-                                const placeholder = (input.placeholder || '').toLowerCase();
-                                
-                                // Skip newsletter forms (only email field, no name/comment)
+                                // Skip newsletter forms (only email field, no name/comment) - classified by the form scanner
                                 const form = input.closest('form');
-                                if (form) {
-                                    const formFields = Array.from(form.querySelectorAll('input, textarea'));
-                                    const hasName = formFields.some(f => (f.name || '').toLowerCase() === 'name');
-                                    const hasComment = formFields.some(f => (f.name || '').toLowerCase() === 'comment' || (f.name || '').toLowerCase() === 'message');
-                                    // If form only has email and no name/comment, it's likely newsletter - skip it if we found a contact form
-                                    if (!hasName && !hasComment && name === 'email' && formFields.length <= 2) {
-                                        return; // Skip newsletter form
-                                    }
+                                if (form && skipFormIndexes.includes(allForms.indexOf(form)) && matcher.classify(input) === 'email') {
+                                    return; // Skip newsletter form
                                 }
                                 
-                                // If field has no name, try to add one based on type/placeholder
+                                // If field has no name, name it after the logical field it matches
                                 if (!input.name && !input.id) {
-                                    if (input.type === 'email' || placeholder.includes('email')) {
-                                        input.name = 'email';
-                                    } else if (placeholder.includes('name')) {
-                                        input.name = 'name';
-                                    } else if (placeholder.includes('phone') || input.type === 'tel') {
-                                        input.name = 'phone';
-                                    } else if (placeholder.includes('message') || input.tagName === 'TEXTAREA') {
-                                        input.name = 'message';
-                                    } else {
-                                        input.name = 'field_' + filled; // Generic name
-                                    }
+                                    input.name = matcher.classify(input) || ('field_' + filled); // Generic name
                                 }
                                 
-                                // Determine value to fill
-                                const currentName = (input.name || input.id || '').toLowerCase();
-                                let valueToFill = 'Test Value';
-                                if (input.type === 'email' || currentName.includes('email') || placeholder.includes('email') || placeholder.includes('e-mailadres')) {
-                                    valueToFill = testData.email;
-                                } else if (currentName.includes('name') || placeholder.includes('naam') || placeholder.includes('name')) {
-                                    valueToFill = testData.name;
-                                } else if (currentName.includes('phone') || currentName.includes('telefoon') || placeholder.includes('phone') || placeholder.includes('nummer') || input.type === 'tel') {
-                                    valueToFill = testData.phone;
-                                } else if (currentName.includes('subject') || placeholder.includes('subject')) {
-                                    valueToFill = testData.subject;
-                                } else if (currentName.includes('message') || currentName.includes('comment') || currentName.includes('bericht') || placeholder.includes('message') || placeholder.includes('bericht') || input.tagName === 'TEXTAREA') {
-                                    valueToFill = testData.message;
-                                }
+                                // Determine value to fill (null for search boxes, captchas and passwords)
+                                const valueToFill = matcher.value(input);
+                                if (valueToFill === null) return;
                                 
                                 // For React/Next.js controlled components, use native setter
                                 const nativeInputValueSetter = Object.getOwnPropertyDescriptor(window.HTMLInputElement.prototype, "value")?.set;
@@ -2660,7 +2641,7 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                     return { filled: 0, selects_filled: 0 };
                 }
             }
-        """, resolved_test_data)
+        """, {"template": compiled.payload, "skipFormIndexes": skip_form_indexes})
         
         result["fields_filled"] = fill_result.get("filled", 0) + fill_result.get("selects_filled", 0)
         
@@ -2673,47 +2654,35 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                 ultra_safe_log_print("   ✅ Found contact form in contactInfo section")
                 # Scroll to the contact form section
                 await contact_form_section.scroll_into_view_if_needed()
-                await asyncio.sleep(0.5)
+                await settle(page, "fill", 0.5, frames=True)
             
-            # Try to find contact form fields specifically (name, email, phone, comment)
-            contact_form_fields = await page.query_selector_all(
-                'input[name="name"], input[name="email"], input[name="phone"], input[name="subject"], input[name*="subject"], textarea[name="comment"], textarea[name="message"], textarea[id="message"], textarea'
-            )
+            # Contact form fields (name, email, phone, subject, company, message) as classified by the scanner
+            scanned_fields = fill_target.get("fields", []) if fill_target else [
+                field for form in scan.get("forms", []) if form.get("formIndex") not in skip_form_indexes
+                for field in form.get("fields", [])
+            ]
+            contact_form_fields = [
+                field for field in scanned_fields
+                if field.get("kind") and field.get("confidence", 0) >= FIELD_CONFIDENT and field.get("locator")
+            ]
             
-            if len(contact_form_fields) >= 3:  # Found contact form (has at least name, email, comment)
-                ultra_safe_log_print("   ✅ Found contact form fields (name, email, phone, comment)")
-                for input_field in contact_form_fields:
+            if len({field["kind"] for field in contact_form_fields}) >= 3:  # Found contact form (e.g. name, email, comment)
+                ultra_safe_log_print("   ✅ Found contact form fields (" + ", ".join(sorted({f["kind"] for f in contact_form_fields})) + ")")
+                for scanned_field in contact_form_fields:
                     try:
+                        input_field = page.locator(scanned_field["locator"]).first
                         is_visible = await input_field.is_visible()
                         if not is_visible:
                             continue
                         
                         current_value = await input_field.input_value()
                         if not current_value or current_value.strip() == '':
-                            name = await input_field.evaluate("(el) => (el.name || '').toLowerCase()")
-                            
-                            if name == 'name':
-                                await input_field.fill(resolved_test_data['name'])
-                                ultra_safe_log_print("   ✅ Filled name field")
-                                playwright_fields_filled += 1
-                            elif name == 'email':
-                                await input_field.fill(resolved_test_data['email'])
-                                ultra_safe_log_print("   ✅ Filled email field")
-                                playwright_fields_filled += 1
-                            elif name == 'phone':
-                                await input_field.fill(resolved_test_data['phone'])
-                                ultra_safe_log_print("   ✅ Filled phone field")
-                                playwright_fields_filled += 1
-                            elif name == 'subject' or 'subject' in name:
-                                await input_field.fill(resolved_test_data['subject'])
-                                ultra_safe_log_print("   ✅ Filled subject field")
-                                playwright_fields_filled += 1
-                            elif name == 'comment' or name == 'message':
-                                await input_field.fill(resolved_test_data['message'])
-                                ultra_safe_log_print("   ✅ Filled message field")
-                                playwright_fields_filled += 1
+                            kind = scanned_field["kind"]
+                            await input_field.fill(resolved_test_data[kind], timeout=2000)
+                            ultra_safe_log_print(f"   ✅ Filled {kind} field ({scanned_field.get('confidence', 0):.2f})")
+                            playwright_fields_filled += 1
                             
-                            await asyncio.sleep(0.2)
+                            await settle(page, "fill", 0.2, frames=True)
                     except:
                         continue
             
@@ -2727,29 +2696,14 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                     
                     current_value = await input_field.input_value()
                     if not current_value or current_value.strip() == '':
-                        # Determine what to fill
-                        name = await input_field.evaluate("(el) => (el.name || el.id || '').toLowerCase()")
-                        placeholder = await input_field.evaluate("(el) => (el.placeholder || '').toLowerCase()")
-                        input_type = await input_field.evaluate("(el) => el.type || ''")
-                        tag_name = await input_field.evaluate("(el) => el.tagName.toLowerCase()")
-                        
-                        value_to_fill = resolved_test_data['email']
-                        if input_type == 'email' or 'email' in name or 'email' in placeholder or 'e-mailadres' in placeholder:
-                            value_to_fill = resolved_test_data['email']
-                        elif 'name' in name or 'naam' in placeholder or 'name' in placeholder:
-                            value_to_fill = resolved_test_data['name']
-                        elif 'phone' in name or 'telefoon' in name or 'phone' in placeholder or 'nummer' in placeholder or input_type == 'tel':
-                            value_to_fill = resolved_test_data['phone']
-                        elif 'subject' in name or 'subject' in placeholder:
-                            value_to_fill = resolved_test_data['subject']
-                        elif 'message' in name or 'comment' in name or 'bericht' in name or 'message' in placeholder or 'bericht' in placeholder or tag_name == 'textarea':
-                            value_to_fill = resolved_test_data['message']
-                        else:
-                            value_to_fill = 'Test Value'
+                        # Determine what to fill (one round trip, compiled matcher)
+                        described = await input_field.evaluate(DESCRIBE_ELEMENT_JS, compiled.payload)
+                        name = described.get("label", "")
+                        value_to_fill = compiled.value_for(described.get("field"))
                         
                         # Use Playwright's fill() which properly handles React controlled components
                         await input_field.fill(value_to_fill)
-                        await asyncio.sleep(0.2)
+                        await settle(page, "fill", 0.2, frames=True)
                         ultra_safe_log_print(f"   ✅ Filled field using Playwright fill(): {name or 'unnamed'}")
                         playwright_fields_filled += 1
                 except:
@@ -2930,7 +2884,7 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                                     }
                                 }
                             """)
-                            await asyncio.sleep(0.2)
+                            await settle(page, "fill", 0.2, frames=True)
                             if checked_js:
                                 checked_count += 1
                                 ultra_safe_log_print(f"   ✅ Checked checkbox in group '{group_name}' (via JavaScript)")
@@ -2938,7 +2892,7 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                                 # Fallback: try Playwright check with shorter timeout
                                 try:
                                     await cb_to_check.check(timeout=2000)
-                                    await asyncio.sleep(0.2)
+                                    await settle(page, "fill", 0.2, frames=True)
                                     if await cb_to_check.is_checked():
                                         checked_count += 1
                                         ultra_safe_log_print(f"   ✅ Checked checkbox in group '{group_name}' (via Playwright)")
@@ -2946,7 +2900,7 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                                     # Last resort: click
                                     try:
                                         await cb_to_check.click(timeout=2000)
-                                        await asyncio.sleep(0.2)
+                                        await settle(page, "fill", 0.2, frames=True)
                                         if await cb_to_check.is_checked():
                                             checked_count += 1
                                             ultra_safe_log_print(f"   ✅ Checked checkbox in group '{group_name}' (via click)")
@@ -3075,21 +3029,21 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                                     }
                                 }
                             """)
-                            await asyncio.sleep(0.2)
+                            await settle(page, "fill", 0.2, frames=True)
                             if selected_js:
                                 selected_radio_count += 1
                                 ultra_safe_log_print(f"   ✅ Selected radio in group '{group_name}' (via JavaScript)")
                             else:
                                 try:
                                     await rb_to_select.check(timeout=2000)
-                                    await asyncio.sleep(0.2)
+                                    await settle(page, "fill", 0.2, frames=True)
                                     if await rb_to_select.is_checked():
                                         selected_radio_count += 1
                                         ultra_safe_log_print(f"   ✅ Selected radio in group '{group_name}' (via Playwright)")
                                 except:
                                     try:
                                         await rb_to_select.click(timeout=2000)
-                                        await asyncio.sleep(0.2)
+                                        await settle(page, "fill", 0.2, frames=True)
                                         if await rb_to_select.is_checked():
                                             selected_radio_count += 1
                                             ultra_safe_log_print(f"   ✅ Selected radio in group '{group_name}' (via click)")
@@ -3204,18 +3158,9 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
                         placeholder = field_info.get('placeholder', '').lower()
                         
                         # Determine what value to use
-                        if 'email' in field_name or 'email' in placeholder or field_type == 'email':
-                            value = resolved_test_data['email']
-                        elif 'name' in field_name or 'name' in placeholder:
-                            value = resolved_test_data['name']
-                        elif 'phone' in field_name or 'phone' in placeholder or field_type == 'tel':
-                            value = resolved_test_data['phone']
-                        elif 'subject' in field_name or 'subject' in placeholder:
-                            value = resolved_test_data['subject']
-                        elif 'message' in field_name or 'message' in placeholder:
-                            value = resolved_test_data['message']
-                        else:
-                            value = 'Test Value'
+                        value = compiled.value_for(
+                            compiled.classify(name=field_name, placeholder=placeholder, input_type=field_type, tag=field_type)
+                        )
                         
                         # Fill the field
                         filled = await page.evaluate(f"""
@@ -3254,8 +3199,67 @@ async def ultra_simple_form_fill(page, template: Dict[str, Any]) -> Dict[str, An
     
     return result
 
-async def ultra_simple_form_submit(page) -> Dict[str, Any]:
-    """ULTRA-RESILIENT form submission with proper POST tracking."""
+async def apply_cached_field_mapping(page, mapping: Dict[str, str], test_data: Dict[str, str]) -> int:
+    """Fill the cached field locators (empty ones only) before the generic fill; returns how many were filled."""
+    filled = 0
+    for locator, key in mapping.items():
+        value = test_data.get(key)
+        if not value:
+            continue
+        try:
+            field = page.locator(locator).first
+            if await field.count() == 0 or not await field.is_visible() or (await field.input_value()).strip():
+                continue
+            await field.fill(value, timeout=2000)
+            filled += 1
+        except Exception:
+            continue
+    if filled:
+        ultra_safe_log_print(f"   🗂️  Filled {filled} field(s) from the cached field mapping")
+    return filled
+
+# Page listeners registered by ultra_simple_form_submit. Only these are removed again:
+# the network tracker (settle) and stage timing keep their own handlers on the page.
+_submit_listeners: "weakref.WeakKeyDictionary[Any, List[Any]]" = weakref.WeakKeyDictionary()
+# The SubmissionWatch of a running ultra_simple_form_submit, stopped however the submit step ends
+_submit_watches: "weakref.WeakKeyDictionary[Any, SubmissionWatch]" = weakref.WeakKeyDictionary()
+
+
+def _add_submit_listener(page, event: str, handler) -> None:
+    page.on(event, handler)
+    _submit_listeners.setdefault(page, []).append((event, handler))
+
+
+def _remove_submit_listeners(page) -> None:
+    for event, handler in _submit_listeners.pop(page, []):
+        try:
+            page.remove_listener(event, handler)
+        except Exception:
+            pass
+
+
+async def ultra_simple_form_submit(page, preferred_form_locator: Optional[str] = None,
+                                   template: Optional[Mapping[str, Any]] = None,
+                                   preferred_submit_locator: Optional[str] = None) -> Dict[str, Any]:
+    """ULTRA-RESILIENT form submission with proper POST tracking.
+
+    ``preferred_form_locator`` and ``preferred_submit_locator`` (from the per-domain form cache)
+    select the target form and its submit control directly.
+    ``template`` supplies the test data for re-filling emptied fields and the submit selectors to try.
+    """
+    try:
+        return await _ultra_simple_form_submit(page, preferred_form_locator, template, preferred_submit_locator)
+    finally:
+        _remove_submit_listeners(page)
+        watch = _submit_watches.pop(page, None)
+        if watch is not None:
+            await watch.stop()
+
+
+async def _ultra_simple_form_submit(page, preferred_form_locator: Optional[str],
+                                    template: Optional[Mapping[str, Any]],
+                                    preferred_submit_locator: Optional[str]) -> Dict[str, Any]:
+    compiled = compile_template(template if template is not None else {})
     result = {
         "submission_attempted": False,
         "submission_success": False,
@@ -3271,88 +3275,11 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
     # Find all forms and identify the contact form (skip search forms)
     contact_form_found = False
     target_form = None
+    target_form_locator = None
     try:
-        forms_info = await page.evaluate("""
-            () => {
-                const allForms = Array.from(document.querySelectorAll('form'));
-                if (allForms.length === 0) return { found: false, forms: [] };
-                
-                const formsData = [];
-                
-                for (const form of allForms) {
-                    const method = (form.method || 'get').toLowerCase();
-                    const action = form.action || '';
-                    const formText = form.textContent.toLowerCase();
-                    const formId = (form.id || '').toLowerCase();
-                    const formClass = (form.className || '').toLowerCase();
-                    const role = form.getAttribute('role') || '';
-                    const fieldNames = Array.from(form.querySelectorAll('input, textarea, select'))
-                        .map((field) => `${field.name || ''} ${field.id || ''} ${field.placeholder || ''}`.toLowerCase())
-                        .join(' ');
-                    const emailFields = form.querySelectorAll('input[type="email"], input[name*="email"], input[id*="email"]').length;
-                    const nameFields = form.querySelectorAll('input[name*="name"], input[id*="name"], input[autocomplete="name"]').length;
-                    const messageFields = form.querySelectorAll('textarea, textarea[name*="message"], textarea[name*="comment"], textarea[id*="message"], textarea[id*="comment"]').length;
-                    const phoneFields = form.querySelectorAll('input[type="tel"], input[name*="phone"], input[id*="phone"], input[name*="mobile"], input[id*="mobile"]').length;
-                    
-                    // Check if it's a search form
-                    const isSearch = (
-                        role === 'search' ||
-                        (method === 'get' && (
-                            formText.includes('search') ||
-                            formId.includes('search') ||
-                            formClass.includes('search') ||
-                            action.includes('search') ||
-                            form.querySelector('input[type="search"]') ||
-                            form.querySelector('input[name*="search"]') ||
-                            form.querySelector('input[name*="q"]') ||
-                            form.querySelector('input[name="s"]')
-                        ))
-                    );
-
-                    const newsletterKeywords = [
-                        'newsletter', 'subscribe', 'subscription', 'mailchimp', 'substack',
-                        'sign up', 'signup', 'sign-up', 'join our mailing list', 'mailing list',
-                        'stay updated', 'latest news', 'breaking news', 'daily updates'
-                    ];
-                    const newsletterSignalText = `${formText} ${formId} ${formClass} ${action} ${fieldNames}`;
-                    const hasNewsletterKeyword = newsletterKeywords.some((keyword) => newsletterSignalText.includes(keyword));
-                    const isNewsletter = hasNewsletterKeyword && messageFields === 0 && phoneFields === 0 && emailFields >= 1 && nameFields <= 1;
-                    
-                    // Check if it's a contact form
-                    const isContact = (
-                        !isNewsletter && (
-                            formText.includes('contact') ||
-                            formId.includes('contact') ||
-                            formClass.includes('contact') ||
-                            action.includes('contact') ||
-                            (emailFields >= 1 && (nameFields >= 1 || messageFields >= 1 || phoneFields >= 1)) ||
-                            (messageFields >= 1 && (nameFields >= 1 || emailFields >= 1)) ||
-                            (method === 'post' && !isSearch && (messageFields >= 1 || (emailFields >= 1 && nameFields >= 1)))
-                        )
-                    );
-                    
-                    formsData.push({
-                        method: method,
-                        action: form.action ? new URL(form.action, window.location.href).href : window.location.href,
-                        isSearch: isSearch,
-                        isNewsletter: isNewsletter,
-                        isContact: isContact,
-                        hasEmail: emailFields > 0,
-                        hasName: nameFields > 0,
-                        hasMessage: messageFields > 0,
-                        hasPhone: phoneFields > 0,
-                        isPost: method === 'post',
-                        formIndex: formsData.length
-                    });
-                }
-                
-                return {
-                    found: true,
-                    forms: formsData,
-                    totalForms: allForms.length
-                };
-            }
-        """)
+        scan = await form_scanner.scan_forms(page)
+        scanned_forms = scan.get("forms", [])
+        forms_info = {"found": bool(scanned_forms), "forms": scanned_forms, "totalForms": len(scanned_forms)}
         
         if forms_info.get('found'):
             total_forms = forms_info.get('totalForms', 0)
@@ -3362,7 +3289,14 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
             
             # First, try to find a contact form
             contact_form_index = None
-            for i, form_data in enumerate(forms_data):
+            if preferred_form_locator:
+                for i, form_data in enumerate(forms_data):
+                    if form_data.get('locator') == preferred_form_locator:
+                        contact_form_index = i
+                        contact_form_found = True
+                        ultra_safe_log_print(f"   ✅ Cached contact form matched (form #{i+1})")
+                        break
+            for i, form_data in enumerate(forms_data if contact_form_index is None else []):
                 if form_data.get('isContact') and not form_data.get('isNewsletter'):
                     contact_form_index = i
                     contact_form_found = True
@@ -3402,6 +3336,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                 
                 # Store form index for later use
                 target_form = contact_form_index
+                target_form_locator = target_form_data.get('locator')
             else:
                 ultra_safe_log_print("   ⚠️  No suitable contact form found")
                 # Try to find contact page link
@@ -3454,11 +3389,11 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
         result["error"] = "No contact form found"
         return result
     
-    # Track POST and GET requests and responses (GET for contact forms)
-    post_requests = []
-    post_responses = []
-    get_requests = []
-    get_responses = []
+    # Track POST and GET requests and responses (GET for contact forms) in bounded ring buffers
+    capture = NetworkCapture(page, form_action_url)
+    post_requests = capture.post_requests
+    post_responses = capture.post_responses
+    get_requests = capture.get_requests
     form_submission_detected = False
     form_submission_data = None
     form_method = "POST"  # Default, will be updated
@@ -3475,7 +3410,6 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
 
             score = 0
             if isinstance(data_preview, str) and data_preview.startswith('{'):
-                import json
                 data_obj = json.loads(data_preview)
                 for key, value in data_obj.items():
                     key_lower = str(key).lower()
@@ -3503,211 +3437,115 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
     
     def track_request(request):
         nonlocal form_submission_data, form_submission_detected
-        if request.method == "POST":
-            post_requests.append({
-                "url": request.url,
-                "method": request.method
-            })
-            # Log ALL POST requests for debugging (even excluded ones)
-            url_lower = request.url.lower()
-            excluded = ['google-analytics', 'googletagmanager', 'google.com', 'pagead', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack', 'analytics', 'gtm', 'ccm']
-            is_excluded = any(ex in url_lower for ex in excluded)
+        # Cheap first pass: other methods, third-party trackers and asset GETs never get copied
+        record = capture.on_request(request, track_get=contact_form_found)
+        if record is None:
+            return
+        
+        if record.method == "POST":
+            url_lower = record.url.lower()
+            is_excluded = EXCLUDED_URL_RE.search(url_lower) is not None
             
             # Try to capture form data
             try:
-                post_data = request.post_data
-                if post_data:
-                    # Check if this looks like form data (check for form fields)
-                    url_lower = request.url.lower()
-                    is_form_domain = False
-                    try:
-                        from urllib.parse import urlparse
-                        req_domain = urlparse(request.url).netloc
-                        current_domain = urlparse(page.url).netloc if page.url else ""
-                        form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                        is_form_domain = (current_domain and req_domain == current_domain) or (form_domain and req_domain == form_domain)
-                    except:
-                        pass
+                post_data = request.post_data if not is_excluded else None
+                # Exclude CSS/JS files and other non-form resources FIRST
+                if post_data and not STATIC_RESOURCE_RE.search(url_lower):
+                    # Check if URL matches form action (exact match preferred)
+                    url_matches_form = capture.matches_form_action(record.url)
                     
-                    # Exclude CSS/JS files and other non-form resources FIRST
-                    url_lower = request.url.lower()
-                    excluded_extensions = ['.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.woff', '.woff2', '.ttf', '.eot', '.ico', '.map']
-                    excluded_paths = ['wp-includes', 'wp-content', '/static/', '/assets/', '/css/', '/js/', '/wp-json/', '/api/', '/dist/', '/build/']
-                    is_excluded_resource = any(ext in url_lower for ext in excluded_extensions) or any(path in url_lower for path in excluded_paths)
+                    # Check if it's a form endpoint (but not a resource file)
+                    is_form_endpoint = FORM_ENDPOINT_RE.search(url_lower) is not None
                     
-                    # If it's an excluded resource, skip immediately
-                    if is_excluded_resource:
-                        pass  # Don't capture this
-                    else:
-                        # Check if URL matches form action (exact match preferred)
-                        url_matches_form = False
-                        if form_action_url:
-                            form_base = form_action_url.split('?')[0].rstrip('/')
-                            req_base = request.url.split('?')[0].rstrip('/')
-                            url_matches_form = req_base == form_base
-                        
-                        # Check if it's a form endpoint (but not a resource file)
-                        is_form_endpoint = False
-                        if not any(ext in url_lower for ext in excluded_extensions):
-                            is_form_endpoint = any(kw in url_lower for kw in ['/contact', '/submit', '/form', '/message', '/send', '/mail'])
-                        
-                        # Check for form fields in POST data
-                        has_form_fields = any(field in post_data.lower() for field in ['name=', 'email=', 'message=', 'subject=', 'phone=', 'wpforms', 'form[', 'contact', 'submit', 'g-recaptcha-response'])
-                        
-                        # Only capture if:
-                        # 1. URL exactly matches form action OR
-                        # 2. (Is form endpoint AND has form fields) OR
-                        # 3. (Is form domain AND has form fields)
-                        should_capture = url_matches_form or (is_form_endpoint and has_form_fields) or (is_form_domain and has_form_fields)
-                        
-                        if should_capture:
-                            candidate_submission_data = {
-                                "url": request.url,
-                                "data_preview": post_data[:500] if len(post_data) > 500 else post_data,
-                                "data_length": len(post_data)
-                            }
-                            existing_score = get_submission_data_score(form_submission_data)
-                            candidate_score = get_submission_data_score(candidate_submission_data)
-                            if form_submission_data is None or candidate_score >= existing_score:
-                                form_submission_data = candidate_submission_data
-                            ultra_safe_log_print(f"   📦 Form data detected in POST to {request.url[:80]}:")
-                            ultra_safe_log_print(f"      {post_data[:300]}...")
+                    # Check for form fields in POST data
+                    has_form_fields = FORM_FIELDS_RE.search(post_data) is not None
+                    
+                    # Only capture if:
+                    # 1. URL exactly matches form action OR
+                    # 2. (Is form endpoint AND has form fields) OR
+                    # 3. (Is form domain AND has form fields)
+                    should_capture = url_matches_form or (has_form_fields and (is_form_endpoint or record.first_party))
+                    
+                    if should_capture:
+                        candidate_submission_data = {
+                            "url": record.url,
+                            "data_preview": post_data[:500],
+                            "data_length": len(post_data)
+                        }
+                        existing_score = get_submission_data_score(form_submission_data)
+                        candidate_score = get_submission_data_score(candidate_submission_data)
+                        if form_submission_data is None or candidate_score >= existing_score:
+                            form_submission_data = candidate_submission_data
+                        ultra_safe_log_print(f"   📦 Form data detected in POST to {record.url[:80]}:")
+                        ultra_safe_log_print(f"      {post_data[:300]}...")
             except:
                 pass
             
             if is_excluded:
-                ultra_safe_log_print(f"   ⏭️  POST request (EXCLUDED): {request.url[:100]}")
+                ultra_safe_log_print(f"   ⏭️  POST request (EXCLUDED): {record.url[:100]}", level="debug")
             else:
-                ultra_safe_log_print(f"   📤 Form POST request: {request.url[:100]}")
-        elif request.method == "GET" and contact_form_found:
-            # Track GET requests for GET contact forms
-            get_requests.append({
-                "url": request.url,
-                "method": request.method
-            })
-            # Check if this GET request matches form action
+                ultra_safe_log_print(f"   📤 Form POST request: {record.url[:100]}")
+        elif record.method == "GET":
+            # Check if this GET request matches form action (first-party only, see NetworkCapture)
             try:
-                from urllib.parse import urlparse, parse_qs
-                req_domain = urlparse(request.url).netloc
-                form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                current_domain = urlparse(page.url).netloc if page.url else ""
-                if (form_domain and req_domain == form_domain) or (current_domain and req_domain == current_domain):
-                    # Check if URL contains form action path or query parameters (form data)
-                    if form_action_url and (form_action_url.split('?')[0] in request.url or '?' in request.url):
-                        # Extract and log query parameters (form data)
-                        query_string = urlparse(request.url).query
-                        if query_string:
-                            try:
-                                query_params = parse_qs(query_string)
-                                ultra_safe_log_print(f"   📤 Form GET request: {request.url.split('?')[0]}")
-                                ultra_safe_log_print(f"   📦 Form data in GET request:")
-                                for key, values in query_params.items():
-                                    value_preview = values[0][:100] if values and values[0] else '(empty)'
-                                    ultra_safe_log_print(f"      - {key}: {value_preview}")
-                                
-                                # Store form submission data
-                                form_submission_data = {
-                                    "url": request.url,
-                                    "method": "GET",
-                                    "query_params": dict(query_params),
-                                    "query_string": query_string[:500]
-                                }
-                            except:
-                                ultra_safe_log_print(f"   📤 Form GET request: {request.url[:150]}")
-                        else:
-                            ultra_safe_log_print(f"   📤 Form GET request: {request.url[:100]}")
-                        form_submission_detected = True
+                if form_action_url and (capture.form_action_base in record.url or '?' in record.url):
+                    # Extract and log query parameters (form data)
+                    query_string = urlparse(record.url).query
+                    if query_string:
+                        try:
+                            query_params = parse_qs(query_string)
+                            ultra_safe_log_print(f"   📤 Form GET request: {url_base(record.url)}")
+                            ultra_safe_log_print(f"   📦 Form data in GET request:")
+                            for key, values in query_params.items():
+                                value_preview = values[0][:100] if values and values[0] else '(empty)'
+                                ultra_safe_log_print(f"      - {key}: {value_preview}")
+                            
+                            # Store form submission data
+                            form_submission_data = {
+                                "url": record.url,
+                                "method": "GET",
+                                "query_params": dict(query_params),
+                                "query_string": query_string[:500]
+                            }
+                        except:
+                            ultra_safe_log_print(f"   📤 Form GET request: {record.url[:150]}")
+                    else:
+                        ultra_safe_log_print(f"   📤 Form GET request: {record.url[:100]}")
+                    form_submission_detected = True
             except:
                 pass
     
     def track_response(response):
-        if response.request.method == "POST":
-            post_responses.append({
-                "url": response.url,
-                "status": response.status
-            })
-            # Check if this is a form submission (not analytics/tracking)
-            url_lower = response.url.lower()
-            excluded = ['google-analytics', 'googletagmanager', 'google.com', 'pagead', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack', 'analytics', 'gtm', 'ccm']
-            
-            # ALWAYS exclude Google/analytics domains first
-            is_excluded = any(ex in url_lower for ex in excluded)
-            if is_excluded:
-                ultra_safe_log_print(f"   ⏭️  POST response (EXCLUDED): {response.status} - {response.url[:100]}")
-                return  # Skip this response - it's analytics/tracking
-            
-            # Now check if it matches form action or current domain
-            try:
-                from urllib.parse import urlparse
-                response_domain = urlparse(response.url).netloc
-                form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                current_domain = urlparse(page.url).netloc if page.url else ""
-                
-                # STRICT: Must match form domain or current domain (not external domains)
-                is_form_submission = (
-                    (form_domain and response_domain == form_domain) or
-                    (current_domain and response_domain == current_domain)
-                )
-                
-                # Also check URL path matches form action
-                if not is_form_submission and form_action_url:
-                    try:
-                        form_path = urlparse(form_action_url).path
-                        response_path = urlparse(response.url).path
-                        if form_path and response_path.startswith(form_path):
-                            is_form_submission = True
-                    except:
-                        pass
-                
-                if is_form_submission and response.status in [200, 201, 204, 302, 303]:
-                    form_submission_detected = True
-                    ultra_safe_log_print(f"   ✅ Form submission confirmed: {response.status} - {response.url[:80]}")
-            except:
-                # Fallback: if URL contains form-related keywords (but exclude analytics)
-                if not any(ex in url_lower for ex in ['google.com', 'pagead', 'ccm', 'analytics']):
-                    if any(kw in url_lower for kw in ['contact', 'submit', 'send', 'message']):
-                        # Double-check domain matches
-                        try:
-                            from urllib.parse import urlparse
-                            response_domain = urlparse(response.url).netloc
-                            current_domain = urlparse(page.url).netloc if page.url else ""
-                            if current_domain and response_domain == current_domain:
-                                if response.status in [200, 201, 204, 302, 303]:
-                                    form_submission_detected = True
-                                    ultra_safe_log_print(f"   ✅ Form submission detected: {response.status}")
-                        except:
-                            pass
+        nonlocal form_submission_detected
+        record = capture.on_response(response)
+        if record is None:
+            return
+        
+        # Check if this is a form submission (not analytics/tracking)
+        if EXCLUDED_URL_RE.search(record.url.lower()):
+            ultra_safe_log_print(f"   ⏭️  POST response (EXCLUDED): {record.status} - {record.url[:100]}", level="debug")
+            return  # Skip this response - it's analytics/tracking
+        
+        # STRICT: Must match form domain or current domain (not external domains),
+        # or at least sit under the form action's path
+        is_form_submission = record.first_party
+        if not is_form_submission and form_action_url:
+            form_path = urlparse(form_action_url).path
+            if form_path and urlparse(record.url).path.startswith(form_path):
+                is_form_submission = True
+        
+        if is_form_submission and record.status in (200, 201, 204, 302, 303):
+            form_submission_detected = True
+            ultra_safe_log_print(f"   ✅ Form submission confirmed: {record.status} - {record.url[:80]}")
     
     
     # Set up tracking BEFORE attempting submission
-    try:
-        # Remove any existing listeners first
-        page.remove_all_listeners("request")
-        page.remove_all_listeners("response")
-    except:
-        pass
-    
-    # Track ALL requests to see what's happening
-    all_requests = []
-    def track_all_requests(request):
-        all_requests.append({
-            "url": request.url,
-            "method": request.method
-        })
-        # Log all requests to the form domain
-        try:
-            from urllib.parse import urlparse
-            req_domain = urlparse(request.url).netloc
-            current_domain = urlparse(page.url).netloc if page.url else ""
-            if current_domain and req_domain == current_domain and request.method == "POST":
-                ultra_safe_log_print(f"   🔍 POST to same domain: {request.url[:100]}")
-        except:
-            pass
+    # Drop only this function's handlers from an earlier attempt on the same page
+    _remove_submit_listeners(page)
     
     try:
-        page.on("request", track_request)
-        page.on("request", track_all_requests)  # Also track all requests
-        page.on("response", track_response)
+        _add_submit_listener(page, "request", track_request)
+        _add_submit_listener(page, "response", track_response)
         ultra_safe_log_print("   📡 POST request/response tracking enabled")
     except:
         pass
@@ -3982,7 +3820,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
 
     async def has_submission_activity_started():
         """Detect whether a real submission attempt is already in flight."""
-        if post_requests or post_responses or form_submission_detected:
+        if post_requests or post_responses or form_submission_detected or submit_watch.responses:
             return True
 
         try:
@@ -4000,9 +3838,22 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
             )
         except:
             return False
+
+    # A consent banner or popup that appeared after filling would swallow the submit click
+    await handle_new_overlays(page, target_form_locator)
+
+    # Submission signals are collected as events from the first submit attempt onwards
+    submit_watch = _submit_watches[page] = SubmissionWatch(page, form_action_url)
+
+    async def arm_submit_watch():
+        try:
+            if await submit_watch.start(target_form_locator):
+                ultra_safe_log_print(f"   📡 Submission watch armed on <{submit_watch.container or 'page'}>")
+        except Exception:
+            pass
     
     # Wait a moment for tracking to be set up
-    await asyncio.sleep(1)
+    await settle(page, "submit", 1, frames=True)
     
     # Check for Next.js form actions or other submission mechanisms
     form_action_info = await page.evaluate("""
@@ -4245,16 +4096,8 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
     # Try to find and click submit button properly
     submit_button_found = False
     try:
-        # Try multiple selectors for submit button
-        submit_selectors = [
-            'button[type="submit"]',
-            'input[type="submit"]',
-            'button:has-text("Submit")',
-            'button:has-text("Send")',
-            'form button:last-child',
-            'form button'
-        ]
-        
+        # Try multiple selectors for submit button (the cached control, then the template's own selector)
+        submit_selectors = ((preferred_submit_locator,) if preferred_submit_locator else ()) + compiled.submit_selectors
         for selector in submit_selectors:
             try:
                 submit_btn = await page.query_selector(selector)
@@ -4264,7 +4107,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                     
                     # Scroll into view
                     await submit_btn.scroll_into_view_if_needed()
-                    await asyncio.sleep(0.5)
+                    await settle(page, "submit", 0.5, frames=True)
                     
                     # Check if CAPTCHA is solved before submission
                     captcha_check = await page.evaluate("""
@@ -4331,7 +4174,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                             injected = await solver.inject_captcha_solution(page, solution)
                                             if injected:
                                                 ultra_safe_log_print("   ✅ CAPTCHA solved before submission")
-                                                await asyncio.sleep(2)  # Wait for CAPTCHA to be processed
+                                                await settle(page, "captcha", 2)  # Wait for CAPTCHA to be processed
                                                 
                                                 # Verify CAPTCHA response is now present
                                                 if not page.is_closed():
@@ -4406,7 +4249,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                             injected = await solver.inject_captcha_solution(page, solution)
                                             if injected:
                                                 ultra_safe_log_print("   ✅ CAPTCHA re-solved and injected")
-                                                await asyncio.sleep(2)
+                                                await settle(page, "captcha", 2)
                                         else:
                                             ultra_safe_log_print("   ⚠️  Page closed during CAPTCHA re-solving")
                                     else:
@@ -4489,7 +4332,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                                 injected = await solver.inject_captcha_solution(page, solution)
                                                 if injected:
                                                     ultra_safe_log_print("   ✅ CAPTCHA solved")
-                                                    await asyncio.sleep(2)
+                                                    await settle(page, "captcha", 2)
                                     except asyncio.TimeoutError:
                                         ultra_safe_log_print("   ⚠️  Final CAPTCHA attempt timed out (3s), proceeding with submission")
                                     except Exception as final_error:
@@ -4504,6 +4347,8 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                 ultra_safe_log_print(f"   ⚠️  Final CAPTCHA attempt error: {str(e)[:50]}")
                                 ultra_safe_log_print("   ℹ️  Proceeding with form submission anyway")
                     
+                    await arm_submit_watch()
+                    
                     # Get the target form element (skip search forms)
                     target_form_element = None
                     if target_form is not None:
@@ -4716,7 +4561,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     await submit_button.click(timeout=10000)
                                     ultra_safe_log_print("   ✅ Submit button clicked")
                                     result["submission_attempted"] = True
-                                    await asyncio.sleep(2)  # Wait for submission to process
+                                    await settle(page, "submit", 2, network=True)  # Wait for submission to process
                                 except Exception as click_error:
                                     ultra_safe_log_print(f"   ⚠️  Submit button click failed: {str(click_error)[:50]}")
                                     if await has_submission_activity_started():
@@ -4727,7 +4572,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                             await submit_button.evaluate("(btn) => btn.click()")
                                             ultra_safe_log_print("   ✅ Submit button clicked via JavaScript")
                                             result["submission_attempted"] = True
-                                            await asyncio.sleep(2)
+                                            await settle(page, "submit", 2, network=True)
                                         except:
                                             ultra_safe_log_print("   ⚠️  JavaScript click also failed")
                             else:
@@ -4737,7 +4582,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     await page.evaluate("() => { const form = document.querySelector('form'); if (form) form.submit(); }")
                                     ultra_safe_log_print("   ✅ Form submitted via form.submit()")
                                     result["submission_attempted"] = True
-                                    await asyncio.sleep(2)
+                                    await settle(page, "submit", 2, network=True)
                                 except Exception as submit_error:
                                     ultra_safe_log_print(f"   ⚠️  form.submit() failed: {str(submit_error)[:50]}")
                         except Exception as e:
@@ -4925,7 +4770,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     });
                                 }
                             """)
-                            await asyncio.sleep(2)  # Give more time for React to process
+                            await settle(page, "fill", 2)  # Give more time for React to process
                             
                             # Verify field values are still set and re-fill if needed
                             field_values = await page.evaluate("""
@@ -4957,27 +4802,16 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                         field = await page.query_selector(f'input[name="{field_name}"], textarea[name="{field_name}"], input[id="{field_name}"], textarea[id="{field_name}"]')
                                         if field:
                                             # Determine value based on field name
-                                            value_to_fill = 'Test Value'
-                                            field_name_lower = field_name.lower()
-                                            if 'email' in field_name_lower:
-                                                value_to_fill = resolved_test_data['email']
-                                            elif 'name' in field_name_lower:
-                                                value_to_fill = resolved_test_data['name']
-                                            elif 'phone' in field_name_lower or 'telefoon' in field_name_lower:
-                                                value_to_fill = resolved_test_data['phone']
-                                            elif 'subject' in field_name_lower:
-                                                value_to_fill = resolved_test_data['subject']
-                                            elif 'message' in field_name_lower or 'comment' in field_name_lower or 'bericht' in field_name_lower:
-                                                value_to_fill = resolved_test_data['message']
+                                            value_to_fill = compiled.value_for(compiled.classify(name=field_name))
                                             
                                             await field.fill(value_to_fill)
-                                            await asyncio.sleep(0.3)
+                                            await settle(page, "fill", 0.3, frames=True)
                                             ultra_safe_log_print(f"   ✅ Re-filled field: {field_name} = {value_to_fill}")
                                     except:
                                         pass
                                 
                                 # Verify again after re-filling
-                                await asyncio.sleep(1)
+                                await settle(page, "fill", 1, frames=True)
                                 field_values = await page.evaluate("""
                                     () => {
                                         const form = document.querySelector('form');
@@ -5001,7 +4835,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                             try:
                                 # Click button to trigger any JavaScript handlers
                                 await submit_btn.click(timeout=5000)
-                                await asyncio.sleep(3)  # Wait for AJAX/JavaScript
+                                await settle(page, "submit", 3, network=True)  # Wait for AJAX/JavaScript
                                 ultra_safe_log_print("   ✅ Button clicked successfully")
                             except Exception as e:
                                 ultra_safe_log_print(f"   ⚠️  Button click failed: {str(e)[:50]}, trying JavaScript click...")
@@ -5011,7 +4845,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     try:
                                         # Fallback to JavaScript click
                                         await submit_btn.evaluate("(btn) => btn.click()")
-                                        await asyncio.sleep(3)
+                                        await settle(page, "submit", 3, network=True)
                                         ultra_safe_log_print("   ✅ JavaScript click executed")
                                     except:
                                         if await has_submission_activity_started():
@@ -5020,7 +4854,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                             ultra_safe_log_print("   ⚠️  JavaScript click also failed, trying form.submit()...")
                                             # Last resort: form.submit()
                                             await page.evaluate("() => { const form = document.querySelector('form'); if (form) form.submit(); }")
-                                            await asyncio.sleep(2)
+                                            await settle(page, "submit", 2, network=True)
                         except Exception as e:
                             ultra_safe_log_print(f"   ⚠️  form.submit() failed: {str(e)[:50]}")
                             # Try JavaScript click as fallback
@@ -5029,7 +4863,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     ultra_safe_log_print("   ℹ️  Submission activity already detected, skipping fallback JavaScript click")
                                 else:
                                     await submit_btn.evaluate("(btn) => btn.click()")
-                                    await asyncio.sleep(2)
+                                    await settle(page, "submit", 2, network=True)
                             except:
                                 pass
                     else:
@@ -5041,17 +4875,16 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                 nonlocal form_post_detected
                                 if response.request.method == "POST":
                                     try:
-                                        from urllib.parse import urlparse
                                         resp_domain = urlparse(response.url).netloc
-                                        current_domain = urlparse(page.url).netloc if page.url else ""
-                                        form_domain = urlparse(form_action_url).netloc if form_action_url else ""
+                                        current_domain = capture.page_host
+                                        form_domain = capture.form_host
                                         if (current_domain and resp_domain == current_domain) or (form_domain and resp_domain == form_domain):
                                             form_post_detected = True
                                             ultra_safe_log_print(f"   ✅ Form POST response received: {response.status} - {response.url[:100]}")
                                     except:
                                         pass
                             
-                            page.on("response", check_form_response)
+                            _add_submit_listener(page, "response", check_form_response)
                             
                             # Try JavaScript click first (more reliable)
                             try:
@@ -5074,85 +4907,44 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                             post_response_status = response.status
                                             ultra_safe_log_print(f"   ✅ POST response detected: {response.status} - {url[:100]}")
                                 
-                                page.on("response", check_post_response)
+                                _add_submit_listener(page, "response", check_post_response)
                                 
                                 # Check for error messages after click
                                 await submit_btn.evaluate("(btn) => btn.click()")
                                 ultra_safe_log_print("   ✅ Submit button clicked, waiting for AJAX submission...")
                                 
-                                # Wait longer for AJAX and check multiple times
-                                for wait_attempt in range(8):
-                                    await asyncio.sleep(2)
-                                    
-                                    # Check for AJAX submissions
+                                # One bounded wait on the submission events (tracked POST/XHR response,
+                                # confirmation or error rendered next to the form, navigation)
+                                await submit_watch.wait(timeout=16)
+
+                                # Check for AJAX submissions (the document is gone after a full-page POST)
+                                try:
                                     ajax_submissions = await page.evaluate("() => window.__ajaxSubmissions || []")
-                                    if ajax_submissions:
-                                        for submission in ajax_submissions:
-                                            url = submission.get('url', '')
-                                            method = submission.get('method', '').upper()
-                                            # Check for contact form API endpoints
-                                            if any(keyword in url.lower() for keyword in ['contact', 'submit', 'form', 'message', 'send']):
-                                                ultra_safe_log_print(f"   ✅ Found contact form AJAX submission: {method} {url[:100]}")
-                                                form_post_detected = True
-                                                break
-                                    
-                                    # Check for error messages
-                                    error_messages = await page.evaluate("""
-                                        () => {
-                                            const errors = [];
-                                            const errorSelectors = [
-                                                '.error', '.alert-error', '.alert-danger',
-                                                '[role="alert"]', '.message-error',
-                                                '.validation-error', '.form-error',
-                                                '.text-red', '.text-danger'
-                                            ];
-                                            errorSelectors.forEach(selector => {
-                                                const elements = document.querySelectorAll(selector);
-                                                elements.forEach(el => {
-                                                    if (el.textContent && el.offsetParent !== null) {
-                                                        errors.push(el.textContent.trim());
-                                                    }
-                                                });
-                                            });
-                                            return errors;
-                                        }
-                                    """)
-                                    if error_messages:
-                                        ultra_safe_log_print(f"   ⚠️  Error messages on page: {error_messages[:3]}")
-                                    
-                                    # Check for success messages
-                                    success_messages = await page.evaluate("""
-                                        () => {
-                                            const success = [];
-                                            const successSelectors = [
-                                                '.success', '.alert-success', '.message-success',
-                                                '[role="alert"].success', '.text-green'
-                                            ];
-                                            successSelectors.forEach(selector => {
-                                                const elements = document.querySelectorAll(selector);
-                                                elements.forEach(el => {
-                                                    if (el.textContent && el.offsetParent !== null) {
-                                                        success.push(el.textContent.trim());
-                                                    }
-                                                });
-                                            });
-                                            return success;
-                                        }
-                                    """)
-                                    if success_messages:
-                                        ultra_safe_log_print(f"   ✅ Success messages: {success_messages[:2]}")
+                                except Exception:
+                                    ajax_submissions = []
+                                for submission in ajax_submissions or []:
+                                    url = submission.get('url', '')
+                                    method = submission.get('method', '').upper()
+                                    # Check for contact form API endpoints
+                                    if any(keyword in url.lower() for keyword in ['contact', 'submit', 'form', 'message', 'send']):
+                                        ultra_safe_log_print(f"   ✅ Found contact form AJAX submission: {method} {url[:100]}")
                                         form_post_detected = True
-                                    
-                                    if form_post_detected or post_response_received:
-                                        if post_response_received:
-                                            form_post_detected = True
-                                            ultra_safe_log_print(f"   ✅ Form POST response confirmed: {post_response_status} - {post_response_url[:100]}")
                                         break
+
+                                if submit_watch.dom_errors:
+                                    ultra_safe_log_print(f"   ⚠️  Error messages near form: {[e.get('text') or e.get('phrase') for e in submit_watch.dom_errors[:3]]}")
+                                if submit_watch.dom_success:
+                                    ultra_safe_log_print(f"   ✅ Success message: {(submit_watch.dom_success.get('text') or submit_watch.dom_success.get('phrase'))[:100]}")
+                                    form_post_detected = True
+
+                                if post_response_received:
+                                    form_post_detected = True
+                                    ultra_safe_log_print(f"   ✅ Form POST response confirmed: {post_response_status} - {post_response_url[:100]}")
                                 
                             except:
                                 # Fallback to Playwright click with shorter timeout
                                 await submit_btn.click(timeout=2000)
-                                await asyncio.sleep(5)
+                                await settle(page, "submit", 5, network=True)
                             
                             if not form_post_detected:
                                 ultra_safe_log_print("   ⚠️  No form POST response detected, trying form.submit()...")
@@ -5160,7 +4952,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     ultra_safe_log_print("   ℹ️  Submission activity already detected, skipping form.submit() retry")
                                 else:
                                     await page.evaluate("() => { const form = document.querySelector('form'); if (form) form.submit(); }")
-                                    await asyncio.sleep(2)
+                                    await settle(page, "submit", 2, network=True)
                         except Exception as e:
                             ultra_safe_log_print(f"   ⚠️  Error during submission: {str(e)[:50]}")
                             # Last resort: form.submit()
@@ -5169,7 +4961,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     ultra_safe_log_print("   ℹ️  Submission activity already detected, skipping last-resort form.submit()")
                                 else:
                                     await page.evaluate("() => { const form = document.querySelector('form'); if (form) form.submit(); }")
-                                    await asyncio.sleep(2)
+                                    await settle(page, "submit", 2, network=True)
                             except:
                                 pass
                     
@@ -5186,6 +4978,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
             if await has_submission_activity_started():
                 ultra_safe_log_print("   ℹ️  Submission activity already detected, skipping fallback form.submit()")
             else:
+                await arm_submit_watch()
                 post_requests.clear()
                 post_responses.clear()
                 form_submission_detected = False
@@ -5196,432 +4989,318 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
         except:
             pass
     
-    # Wait for POST requests/responses with longer timeout
+    # Wait for the submission to be confirmed: one deadline, woken by events rather than polling
     if result["submission_attempted"]:
         ultra_safe_log_print("   ⏳ Waiting for form submission...")
+        await arm_submit_watch()
+        verify_deadline = time.monotonic() + 30
         
-        # Check if form still exists (might indicate submission didn't work)
+        # Nothing at all within the first seconds: the click may not have reached the form's handler
+        if not await submit_watch.wait(timeout=3) and not await has_submission_activity_started():
+            ultra_safe_log_print("   🔄 No form submission detected, trying form.submit() again...")
+            try:
+                await page.evaluate("() => { const form = document.querySelector('form'); if (form) { form.submit(); } }")
+            except:
+                pass
+        if not submit_watch.signalled:
+            await submit_watch.wait(timeout=max(0.0, verify_deadline - time.monotonic()))
+        
+        verification = await submit_watch.snapshot()
+        result["submit_verification"] = verification
+        if verification["responses"]:
+            ultra_safe_log_print(f"   📡 Submission responses: {[(r['status'], r['url'][:60]) for r in verification['responses'][:3]]}")
+        if verification["url_changed"]:
+            ultra_safe_log_print(f"   🔀 Navigated after submit: {verification['navigations'][-1][:80]}")
+        if verification["form_removed"]:
+            ultra_safe_log_print("   🔍 Form was removed from the page after submit - possible submission")
+        if verification["errors"]:
+            ultra_safe_log_print(f"   ⚠️  Error messages near form: {verification['errors']}")
+        
+        # Check for form POST/GET to the actual form URL
         try:
-            form_still_exists = await page.evaluate("() => document.querySelector('form') !== null")
-            if form_still_exists:
-                ultra_safe_log_print("   ⚠️  Form still present on page - checking if submission occurred...")
-        except:
-            pass
-        
-        for wait_attempt in range(30):  # Wait up to 30 seconds (increased from 15)
-            await asyncio.sleep(1)
+            form_submission_found = False
+            # Check POST requests - VERIFY they contain form data
+            for req in post_requests:
+                try:
+                    req_domain = req.host
+                    current_domain = capture.page_host
+                    form_domain = capture.form_host
+                    if (current_domain and req_domain == current_domain) or (form_domain and req_domain == form_domain):
+                        # Check if URL matches form action
+                        if form_action_url and (req.url == form_action_url or req.url.startswith(form_action_url.split('?')[0])):
+                            # CRITICAL: Verify POST request contains form data
+                            has_form_data = bool(form_submission_data and form_submission_data.get('url') == req.url)
+                            if has_form_data:
+                                ultra_safe_log_print(f"   ✅ Form data verified in POST request")
+                            
+                            # Only mark as found if we have form data OR if URL clearly indicates form submission
+                            url_lower = req.url.lower()
+                            is_form_endpoint = any(kw in url_lower for kw in ['contact', 'submit', 'form', 'message', 'send', 'mail', 'api/contact', 'api/submit'])
+                            
+                            if has_form_data or is_form_endpoint:
+                                form_submission_found = True
+                                form_submission_detected = True
+                                ultra_safe_log_print(f"   ✅ Found form POST to form URL: {req.url[:100]}")
+                                if has_form_data:
+                                    ultra_safe_log_print(f"      Form data confirmed in request")
+                                break
+                            else:
+                                ultra_safe_log_print(f"   ⚠️  POST request found but no form data verified: {req.url[:100]}")
+                except:
+                    pass
             
-            # Check for form POST/GET to the actual form URL
-            try:
-                form_submission_found = False
-                # Check POST requests - VERIFY they contain form data
-                for req in post_requests:
+            # Check GET requests (for GET contact forms)
+            if not form_submission_found and contact_form_found:
+                for req in get_requests:
                     try:
-                        from urllib.parse import urlparse
-                        req_domain = urlparse(req['url']).netloc
-                        current_domain = urlparse(page.url).netloc if page.url else ""
-                        form_domain = urlparse(form_action_url).netloc if form_action_url else ""
+                        req_domain = req.host
+                        current_domain = capture.page_host
+                        form_domain = capture.form_host
                         if (current_domain and req_domain == current_domain) or (form_domain and req_domain == form_domain):
-                            # Check if URL matches form action
-                            if form_action_url and (req['url'] == form_action_url or req['url'].startswith(form_action_url.split('?')[0])):
-                                # CRITICAL: Verify POST request contains form data
-                                has_form_data = False
-                                try:
-                                    # Check if we captured form data for this request
-                                    if form_submission_data and form_submission_data.get('url') == req['url']:
-                                        has_form_data = True
-                                        ultra_safe_log_print(f"   ✅ Form data verified in POST request")
-                                    # Also check request post_data if available
-                                    # Note: We can't access post_data from the request object here,
-                                    # but we can check if form_submission_data was set
-                                except:
-                                    pass
-                                
-                                # Only mark as found if we have form data OR if URL clearly indicates form submission
-                                url_lower = req['url'].lower()
-                                is_form_endpoint = any(kw in url_lower for kw in ['contact', 'submit', 'form', 'message', 'send', 'mail', 'api/contact', 'api/submit'])
-                                
-                                if has_form_data or is_form_endpoint:
+                            # Check if URL matches form action (with or without query params)
+                            form_base = form_action_url.split('?')[0] if form_action_url else ""
+                            req_base = req.url.split('?')[0]
+                            if form_base and (req_base == form_base or req.url.startswith(form_base)):
+                                # Check if it has query parameters (form data was submitted)
+                                if '?' in req.url:
                                     form_submission_found = True
                                     form_submission_detected = True
-                                    ultra_safe_log_print(f"   ✅ Found form POST to form URL: {req['url'][:100]}")
-                                    if has_form_data:
-                                        ultra_safe_log_print(f"      Form data confirmed in request")
+                                    ultra_safe_log_print(f"   ✅ Found form GET submission: {req.url[:100]}")
                                     break
-                                else:
-                                    ultra_safe_log_print(f"   ⚠️  POST request found but no form data verified: {req['url'][:100]}")
-                    except:
-                        pass
-                
-                # Check GET requests (for GET contact forms)
-                if not form_submission_found and contact_form_found:
-                    for req in get_requests:
-                        try:
-                            from urllib.parse import urlparse
-                            req_domain = urlparse(req['url']).netloc
-                            current_domain = urlparse(page.url).netloc if page.url else ""
-                            form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                            if (current_domain and req_domain == current_domain) or (form_domain and req_domain == form_domain):
-                                # Check if URL matches form action (with or without query params)
-                                form_base = form_action_url.split('?')[0] if form_action_url else ""
-                                req_base = req['url'].split('?')[0]
-                                if form_base and (req_base == form_base or req['url'].startswith(form_base)):
-                                    # Check if it has query parameters (form data was submitted)
-                                    if '?' in req['url']:
-                                        form_submission_found = True
-                                        form_submission_detected = True
-                                        ultra_safe_log_print(f"   ✅ Found form GET submission: {req['url'][:100]}")
-                                        break
-                        except:
-                            pass
-                
-                if not form_submission_found and wait_attempt == 2:
-                    # After 2 seconds, if no form submission found, try form.submit() again
-                    ultra_safe_log_print("   🔄 No form submission detected, trying form.submit() again...")
-                    try:
-                        if await has_submission_activity_started():
-                            ultra_safe_log_print("   ℹ️  Submission activity already detected, skipping duplicate form.submit()")
-                        else:
-                            await page.evaluate("() => { const form = document.querySelector('form'); if (form) { form.submit(); } }")
-                            await asyncio.sleep(1)
                     except:
                         pass
-            except:
-                pass
-            
-            if post_requests:
-                result["post_requests"] = len(post_requests)
-                for req in post_requests:
-                    url_lower = req['url'].lower()
-                    excluded = ['google-analytics', 'googletagmanager', 'google.com', 'pagead', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack', 'analytics', 'gtm', 'ccm']
-                    if not any(ex in url_lower for ex in excluded):
-                        ultra_safe_log_print(f"   📤 Form POST request: {req['url'][:80]}")
-                        # Check if this matches form action or domain
-                        try:
-                            from urllib.parse import urlparse
-                            req_domain = urlparse(req['url']).netloc
-                            form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                            current_domain = urlparse(page.url).netloc if page.url else ""
-                            if (form_domain and req_domain == form_domain) or (current_domain and req_domain == current_domain):
-                                form_submission_detected = True
-                                ultra_safe_log_print("   ✅ Form POST request matches domain!")
-                        except:
-                            pass
-            
-            if post_responses:
-                result["post_responses"] = len(post_responses)
-                for resp in post_responses:
-                    url_lower = resp['url'].lower()
-                    excluded = ['google-analytics', 'googletagmanager', 'google.com', 'pagead', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack', 'analytics', 'gtm', 'ccm']
-                    
-                    # Skip analytics/tracking
-                    if any(ex in url_lower for ex in excluded):
-                        continue
-                    
-                    ultra_safe_log_print(f"   📥 Form POST response: {resp['status']} - {resp['url'][:80]}")
-                    # Check if this is a form submission response by domain match
+        except:
+            pass
+        
+        if post_requests:
+            result["post_requests"] = len(post_requests)
+            for req in post_requests:
+                url_lower = req.url.lower()
+                if not EXCLUDED_URL_RE.search(url_lower):
+                    ultra_safe_log_print(f"   📤 Form POST request: {req.url[:80]}")
+                    # Check if this matches form action or domain
                     try:
-                        from urllib.parse import urlparse
-                        resp_domain = urlparse(resp['url']).netloc
-                        form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                        current_domain = urlparse(page.url).netloc if page.url else ""
-                        
-                        # STRICT: Must match form domain or current domain
-                        if (form_domain and resp_domain == form_domain) or (current_domain and resp_domain == current_domain):
-                            if resp['status'] in [200, 201, 204, 302, 303]:
-                                form_submission_detected = True
-                                ultra_safe_log_print(f"   ✅ Form submission confirmed: {resp['status']}")
+                        req_domain = req.host
+                        form_domain = capture.form_host
+                        current_domain = capture.page_host
+                        if (form_domain and req_domain == form_domain) or (current_domain and req_domain == current_domain):
+                            form_submission_detected = True
+                            ultra_safe_log_print("   ✅ Form POST request matches domain!")
                     except:
                         pass
-            
-            # Check for AJAX form submission
-            try:
-                ajax_submissions = await page.evaluate("() => window.__ajaxSubmissions || []")
-                ajax_success = await page.evaluate("() => window.__formSubmissionSuccess || false")
+        
+        if post_responses:
+            result["post_responses"] = len(post_responses)
+            for resp in post_responses:
+                url_lower = resp.url.lower()
                 
-                if ajax_submissions:
-                    for submission in ajax_submissions:
-                        url = submission.get('url', '')
-                        method = submission.get('method', '').upper()
-                        status = submission.get('response_status', 0)
-                        response_data = submission.get('response_data', '')
-                        body = submission.get('body') or submission.get('data', '')
-                        
-                        ultra_safe_log_print(f"   🔍 AJAX {submission.get('type', 'unknown')} {method}: {url[:100]}")
-                        if body:
-                            ultra_safe_log_print(f"      Request body: {str(body)[:200]}")
-                        if status:
-                            ultra_safe_log_print(f"      Response status: {status}")
-                        if response_data:
-                            ultra_safe_log_print(f"      Response data: {str(response_data)[:200]}")
-                        
-                        # Check if it's a contact form submission
-                        url_lower = url.lower()
-                        is_contact_endpoint = any(keyword in url_lower for keyword in [
-                            'contact', 'submit', 'form', 'message', 'send', 'mail', 
-                            'api/contact', 'api/submit', 'api/form', 'api/message'
-                        ])
-                        
-                        # Check if it's to the form domain
-                        try:
-                            from urllib.parse import urlparse
-                            ajax_domain = urlparse(url).netloc
-                            current_domain = urlparse(page.url).netloc if page.url else ""
-                            
-                            if current_domain and ajax_domain == current_domain:
-                                if is_contact_endpoint or status >= 200:
-                                    form_submission_detected = True
-                                    form_submission_response = {
-                                        "url": url,
-                                        "method": method,
-                                        "status": status,
-                                        "response_data": response_data[:500] if response_data else None
-                                    }
-                                    ultra_safe_log_print(f"   ✅ Contact form AJAX submission detected!")
-                                    ultra_safe_log_print(f"      URL: {url[:100]}")
-                                    ultra_safe_log_print(f"      Status: {status}")
-                                    
-                                    # CRITICAL: Check response status and body for errors
-                                    submission_failed = False
-                                    if status >= 400:
-                                        submission_failed = True
-                                        ultra_safe_log_print(f"      ❌ Submission failed with status {status}")
-                                    
-                                    # Check response body for error messages
-                                    if response_data:
-                                        response_lower = str(response_data).lower()
-                                        # Check for common error indicators in JSON responses
-                                        if '"success":false' in response_lower or '"error":' in response_lower:
-                                            submission_failed = True
-                                            ultra_safe_log_print(f"      ❌ Server returned error: {response_data[:200]}")
-                                        # Check for error messages
-                                        error_keywords = ['missing required', 'invalid', 'error', 'failed', 'required fields']
-                                        if any(keyword in response_lower for keyword in error_keywords):
-                                            submission_failed = True
-                                            ultra_safe_log_print(f"      ❌ Error message in response: {response_data[:200]}")
-                                    
-                                    # Store submission failure status
-                                    if submission_failed:
-                                        form_submission_response["failed"] = True
-                                        form_submission_response["error_reason"] = f"Status {status}" if status >= 400 else "Error in response"
-                                    elif status >= 200 and status < 300:
-                                        ultra_safe_log_print(f"      ✅ Submission successful!")
-                        except:
-                            pass
+                # Skip analytics/tracking
+                if EXCLUDED_URL_RE.search(url_lower):
+                    continue
                 
-                # Also check the success flag
-                if ajax_success:
-                    ultra_safe_log_print(f"   ✅ AJAX submission success flag detected")
-                    form_submission_detected = True
-                    
-                # Also check the old flag
-                ajax_detected = await page.evaluate("() => window.__formSubmissionDetected || false")
-                if ajax_detected:
-                    ajax_url = await page.evaluate("() => window.__formSubmissionURL || ''")
-                    ultra_safe_log_print(f"   ✅ AJAX form submission detected: {ajax_url[:80]}")
-                    form_submission_detected = True
-            except Exception as e:
-                ultra_safe_log_print(f"   ⚠️  AJAX check error: {str(e)[:50]}")
-                pass
-            
-            # Additional verification: Check if form fields are cleared (indicates submission)
-            if wait_attempt >= 5:  # Only check after 5 seconds
+                ultra_safe_log_print(f"   📥 Form POST response: {resp.status} - {resp.url[:80]}")
+                # Check if this is a form submission response by domain match
                 try:
-                    form_fields_cleared = await page.evaluate("""
-                        () => {
-                            const form = document.querySelector('form');
-                            if (!form) return { cleared: false, reason: 'no_form' };
-                            
-                            const inputs = Array.from(form.querySelectorAll('input:not([type="hidden"]):not([type="submit"]):not([type="button"]), textarea'));
-                            let filled_count = 0;
-                            let empty_count = 0;
-                            
-                            inputs.forEach(input => {
-                                if (input.value && input.value.trim().length > 0) {
-                                    filled_count++;
-                                } else {
-                                    empty_count++;
-                                }
-                            });
-                            
-                            // If most fields are empty, form was likely submitted
-                            const cleared = empty_count > filled_count && inputs.length > 0;
-                            return { cleared: cleared, filled: filled_count, empty: empty_count, total: inputs.length };
-                        }
-                    """)
+                    resp_domain = resp.host
+                    form_domain = capture.form_host
+                    current_domain = capture.page_host
                     
-                    if form_fields_cleared.get('cleared') and not form_submission_detected:
-                        ultra_safe_log_print(f"   🔍 Form fields appear cleared ({form_fields_cleared.get('empty')}/{form_fields_cleared.get('total')} empty) - possible submission")
+                    # STRICT: Must match form domain or current domain
+                    if (form_domain and resp_domain == form_domain) or (current_domain and resp_domain == current_domain):
+                        if resp.status in [200, 201, 204, 302, 303]:
+                            form_submission_detected = True
+                            ultra_safe_log_print(f"   ✅ Form submission confirmed: {resp.status}")
                 except:
                     pass
+        
+        # Check for AJAX form submission (one read of the in-page fetch/XHR log)
+        ajax_state = {}
+        try:
+            ajax_state = await page.evaluate("""
+                () => ({
+                    submissions: window.__ajaxSubmissions || [],
+                    success: !!window.__formSubmissionSuccess,
+                    detected: !!window.__formSubmissionDetected,
+                    url: window.__formSubmissionURL || ''
+                })
+            """) or {}
+        except Exception as e:
+            ultra_safe_log_print(f"   ⚠️  AJAX check error: {str(e)[:50]}")
+        ajax_submissions = ajax_state.get('submissions') or []
+        
+        for submission in ajax_submissions:
+            url = submission.get('url', '')
+            method = submission.get('method', '').upper()
+            status = submission.get('response_status', 0)
+            response_data = submission.get('response_data', '')
+            body = submission.get('body') or submission.get('data', '')
+            
+            ultra_safe_log_print(f"   🔍 AJAX {submission.get('type', 'unknown')} {method}: {url[:100]}")
+            if body:
+                ultra_safe_log_print(f"      Request body: {str(body)[:200]}")
+            if status:
+                ultra_safe_log_print(f"      Response status: {status}")
+            if response_data:
+                ultra_safe_log_print(f"      Response data: {str(response_data)[:200]}")
+            
+            # Check if it's a contact form submission
+            url_lower = url.lower()
+            is_contact_endpoint = any(keyword in url_lower for keyword in [
+                'contact', 'submit', 'form', 'message', 'send', 'mail', 
+                'api/contact', 'api/submit', 'api/form', 'api/message'
+            ])
             
-            if form_submission_detected:
-                result["form_submission_detected"] = True
-                # STRICT: Only mark as success if we have verified form data AND no errors
+            # Check if it's to the form domain
+            try:
+                ajax_domain = urlparse(url).netloc
+                current_domain = capture.page_host
                 
-                # Check for submission failures (400, 500, error messages)
-                submission_failed = False
-                failure_reason = None
-                successful_form_response_seen = False
+                if current_domain and ajax_domain == current_domain:
+                    if is_contact_endpoint or status >= 200:
+                        form_submission_detected = True
+                        ultra_safe_log_print(f"   ✅ Contact form AJAX submission detected!")
+                        ultra_safe_log_print(f"      URL: {url[:100]}")
+                        ultra_safe_log_print(f"      Status: {status}")
+            except:
+                pass
+        
+        # Also check the success flag
+        if ajax_state.get('success'):
+            ultra_safe_log_print(f"   ✅ AJAX submission success flag detected")
+            form_submission_detected = True
+            
+        # Also check the old flag
+        if ajax_state.get('detected'):
+            ultra_safe_log_print(f"   ✅ AJAX form submission detected: {ajax_state.get('url', '')[:80]}")
+            form_submission_detected = True
+        
+        if form_submission_detected:
+            result["form_submission_detected"] = True
+            # STRICT: Only mark as success if we have verified form data AND no errors
+            
+            # Check for submission failures (400, 500, error messages)
+            submission_failed = False
+            failure_reason = None
+            successful_form_response_seen = submit_watch.successful_response() is not None
 
-                try:
-                    from urllib.parse import urlparse
-                    form_domain = urlparse(form_action_url).netloc if form_action_url else ""
-                    current_domain = urlparse(page.url).netloc if page.url else ""
-                    for resp in post_responses:
-                        resp_domain = urlparse(resp.get('url', '')).netloc
-                        if ((form_domain and resp_domain == form_domain) or (current_domain and resp_domain == current_domain)) and resp.get('status') in [200, 201, 204, 302, 303]:
-                            successful_form_response_seen = True
-                            break
-                except:
-                    pass
+            try:
+                form_domain = capture.form_host
+                current_domain = capture.page_host
+                for resp in post_responses:
+                    resp_domain = resp.host
+                    if ((form_domain and resp_domain == form_domain) or (current_domain and resp_domain == current_domain)) and resp.status in [200, 201, 204, 302, 303]:
+                        successful_form_response_seen = True
+                        break
+            except:
+                pass
 
-                success_get_detected = False
-                try:
-                    for req in get_requests:
-                        req_url = req.get('url', '').lower()
-                        if 'success=' in req_url or 'thank' in req_url:
-                            success_get_detected = True
-                            break
-                except:
-                    pass
+            success_get_detected = False
+            try:
+                for req in get_requests:
+                    req_url = req.url.lower()
+                    if 'success=' in req_url or 'thank' in req_url:
+                        success_get_detected = True
+                        break
+            except:
+                pass
 
-                has_meaningful_form_data = get_submission_data_score(form_submission_data) > 0
-                verified_success_signal = has_meaningful_form_data and (successful_form_response_seen or success_get_detected)
-                
-                # Check POST responses for error status codes
-                if not verified_success_signal:
-                    for resp in post_responses:
-                        if resp.get('status', 0) >= 400:
-                            submission_failed = True
-                            failure_reason = f"POST response status {resp.get('status')}"
-                            ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
-                            break
+            has_meaningful_form_data = get_submission_data_score(form_submission_data) > 0
+            verified_success_signal = has_meaningful_form_data and (successful_form_response_seen or success_get_detected)
+            
+            # Check POST responses for error status codes
+            if not verified_success_signal:
+                for resp in post_responses:
+                    if resp.status >= 400:
+                        submission_failed = True
+                        failure_reason = f"POST response status {resp.status}"
+                        ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
+                        break
+            
+            # Check AJAX submission responses
+            for submission in ajax_submissions:
+                status = submission.get('response_status', 0)
+                response_data = submission.get('response_data', '')
                 
-                # Check AJAX submission responses
-                try:
-                    ajax_submissions = await page.evaluate("() => window.__ajaxSubmissions || []")
-                    for submission in ajax_submissions:
-                        status = submission.get('response_status', 0)
-                        response_data = submission.get('response_data', '')
-                        
-                        if status >= 400:
-                            submission_failed = True
-                            failure_reason = f"AJAX response status {status}"
-                            ultra_safe_log_print(f"   ❌ AJAX submission failed: {failure_reason}")
-                            break
-                        
-                        # Check response body for error messages
-                        if response_data:
-                            response_str = str(response_data).lower()
-                            if '"success":false' in response_str or '"error":' in response_str:
-                                submission_failed = True
-                                failure_reason = "Server returned error in response"
-                                ultra_safe_log_print(f"   ❌ Server error in response: {response_data[:200]}")
-                                break
-                except:
-                    pass
+                if status >= 400:
+                    submission_failed = True
+                    failure_reason = f"AJAX response status {status}"
+                    ultra_safe_log_print(f"   ❌ AJAX submission failed: {failure_reason}")
+                    break
                 
-                # Check if form data contains actual values (not empty strings)
-                if form_submission_data:
-                    data_preview = form_submission_data.get('data_preview', '')
-                    if data_preview:
-                        # Check if all fields are empty in the submitted data
-                        import json
-                        try:
-                            if isinstance(data_preview, str):
-                                # Try to parse as JSON
-                                if data_preview.startswith('{'):
-                                    data_obj = json.loads(data_preview)
-                                    # Check if all non-CAPTCHA fields are empty
-                                    non_captcha_fields = {k: v for k, v in data_obj.items() if 'captcha' not in k.lower() and 'token' not in k.lower()}
-                                    if non_captcha_fields and all(not str(v).strip() for v in non_captcha_fields.values()):
-                                        submission_failed = True
-                                        failure_reason = "All form fields are empty in submission data"
-                                        ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
-                        except:
-                            # If not JSON, check if it's a query string with empty values
-                            if '=' in data_preview:
-                                params = data_preview.split('&')
-                                non_captcha_params = [p for p in params if 'captcha' not in p.lower() and 'token' not in p.lower()]
-                                if non_captcha_params and all('=' in p and (p.split('=')[1] == '' or p.split('=')[1] == 'null') for p in non_captcha_params):
+                # Check response body for error messages
+                if response_data:
+                    response_str = str(response_data).lower()
+                    if '"success":false' in response_str or '"error":' in response_str:
+                        submission_failed = True
+                        failure_reason = "Server returned error in response"
+                        ultra_safe_log_print(f"   ❌ Server error in response: {response_data[:200]}")
+                        break
+            
+            # Check if form data contains actual values (not empty strings)
+            if form_submission_data:
+                data_preview = form_submission_data.get('data_preview', '')
+                if data_preview:
+                    # Check if all fields are empty in the submitted data
+                    import json
+                    try:
+                        if isinstance(data_preview, str):
+                            # Try to parse as JSON
+                            if data_preview.startswith('{'):
+                                data_obj = json.loads(data_preview)
+                                # Check if all non-CAPTCHA fields are empty
+                                non_captcha_fields = {k: v for k, v in data_obj.items() if 'captcha' not in k.lower() and 'token' not in k.lower()}
+                                if non_captcha_fields and all(not str(v).strip() for v in non_captcha_fields.values()):
                                     submission_failed = True
                                     failure_reason = "All form fields are empty in submission data"
                                     ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
-                
-                if verified_success_signal and not submission_failed:
-                    result["submission_success"] = True
-                    ultra_safe_log_print("   ✅ Form submission confirmed with verified form data and success response!")
-                    break
-                elif form_submission_data and not submission_failed:
-                    result["submission_success"] = True
-                    ultra_safe_log_print("   ✅ Form submission confirmed with verified form data!")
-                    break
-                elif submission_failed:
-                    result["submission_success"] = False
-                    ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
-                    break
-                elif wait_attempt >= 20:  # Wait at least 20 seconds before accepting without form data
-                    # Even after 20 seconds, only mark as success if we have strong indicators
-                    # Check for success messages on page
-                    try:
-                        page_content = await page.content()
-                        content_lower = page_content.lower()
-                        strong_indicators = ['thank you', 'success', 'received', 'submitted successfully', 'message sent']
-                        has_strong_indicator = any(indicator in content_lower for indicator in strong_indicators)
-                        if has_strong_indicator:
-                            result["submission_success"] = True
-                            ultra_safe_log_print("   ✅ Form submission confirmed by success message on page!")
-                            break
-                        else:
-                            ultra_safe_log_print("   ⚠️  Form submission detected but no form data or success message - marking as attempted only")
-                            result["submission_success"] = False
-                            break
                     except:
-                        ultra_safe_log_print("   ⚠️  Form submission detected but no form data - marking as attempted only")
-                        result["submission_success"] = False
-                        break
-                else:
-                    ultra_safe_log_print("   ⏳ Form submission detected but waiting for form data verification...")
-                    # Continue waiting to verify
+                        # If not JSON, check if it's a query string with empty values
+                        if '=' in data_preview:
+                            params = data_preview.split('&')
+                            non_captcha_params = [p for p in params if 'captcha' not in p.lower() and 'token' not in p.lower()]
+                            if non_captcha_params and all('=' in p and (p.split('=')[1] == '' or p.split('=')[1] == 'null') for p in non_captcha_params):
+                                submission_failed = True
+                                failure_reason = "All form fields are empty in submission data"
+                                ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
             
-            # Check for success indicators on page (but require form_submission_data for strict verification)
-            try:
-                page_content = await page.content()
-                content_lower = page_content.lower()
-                success_indicators = ['thank you', 'thankyou', 'success', 'received', 'submitted successfully', 'message sent', 'your message has been']
-                if any(indicator in content_lower for indicator in success_indicators):
-                    # Only mark as success if we also have form data OR if we've waited long enough
-                    if form_submission_data or wait_attempt >= 15:
-                        result["submission_success"] = True
-                        ultra_safe_log_print("   ✅ Success indicators found on page!")
-                        # If success indicators found, also mark as detected
-                        if not form_submission_detected:
-                            form_submission_detected = True
-                            result["form_submission_detected"] = True
-                        break
-                    else:
-                        ultra_safe_log_print("   ⏳ Success message found but waiting for form data verification...")
-            except:
-                pass
+            if verified_success_signal and not submission_failed:
+                result["submission_success"] = True
+                ultra_safe_log_print("   ✅ Form submission confirmed with verified form data and success response!")
+            elif form_submission_data and not submission_failed:
+                result["submission_success"] = True
+                ultra_safe_log_print("   ✅ Form submission confirmed with verified form data!")
+            elif submission_failed:
+                result["submission_success"] = False
+                ultra_safe_log_print(f"   ❌ Form submission failed: {failure_reason}")
+            elif verification["success_text"]:
+                # No form data captured, but the confirmation rendered where the form was
+                result["submission_success"] = True
+                ultra_safe_log_print("   ✅ Form submission confirmed by success message on page!")
+            else:
+                ultra_safe_log_print("   ⚠️  Form submission detected but no form data or success message - marking as attempted only")
+                result["submission_success"] = False
+        
+        elif verification["success_text"]:
+            # A confirmation appeared in the form's container (or the page it navigated to) after the click
+            result["submission_success"] = True
+            form_submission_detected = True
+            result["form_submission_detected"] = True
+            ultra_safe_log_print(f"   ✅ Success indicators found on page: {verification['success_text'][:80]}")
+    
     
     # Final check: if we have POST requests to the form URL, consider it submitted
     # BUT: Only if we have form_submission_data to verify actual form submission
     if not form_submission_detected and post_requests:
         for req in post_requests:
-            url_lower = req['url'].lower()
-            excluded = ['google-analytics', 'googletagmanager', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack']
+            url_lower = req.url.lower()
             # Also exclude CSS/JS files and other resources
-            excluded_extensions = ['.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.woff', '.woff2', '.ttf', '.eot', '.ico', '.map']
-            excluded_paths = ['wp-includes', 'wp-content', '/static/', '/assets/', '/css/', '/js/', '/wp-json/', '/api/', '/dist/', '/build/']
-            is_excluded_resource = any(ext in url_lower for ext in excluded_extensions) or any(path in url_lower for path in excluded_paths)
-            if not any(ex in url_lower for ex in excluded) and not is_excluded_resource:
+            is_excluded_resource = STATIC_RESOURCE_RE.search(url_lower) is not None
+            if not EXCLUDED_URL_RE.search(url_lower) and not is_excluded_resource:
                 # Check if URL matches form domain
                 try:
-                    from urllib.parse import urlparse
-                    req_domain = urlparse(req['url']).netloc
-                    current_domain = urlparse(page.url).netloc if page.url else ""
-                    form_domain = urlparse(form_action_url).netloc if form_action_url else ""
+                    req_domain = req.host
+                    current_domain = capture.page_host
+                    form_domain = capture.form_host
                     
                     # STRICT: Only mark as submitted if:
                     # 1. URL matches form action OR
@@ -5629,17 +5308,17 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                     url_matches_action = False
                     if form_action_url:
                         form_base = form_action_url.split('?')[0]
-                        req_base = req['url'].split('?')[0]
-                        url_matches_action = req_base == form_base or req['url'].startswith(form_base)
+                        req_base = req.url.split('?')[0]
+                        url_matches_action = req_base == form_base or req.url.startswith(form_base)
                     
                     is_form_endpoint = any(kw in url_lower for kw in ['contact', 'submit', 'send', 'message', 'form', 'api/contact', 'api/submit'])
-                    has_form_data = form_submission_data and (form_submission_data.get('url') == req['url'] or form_submission_data.get('url', '').startswith(req['url'].split('?')[0]))
+                    has_form_data = form_submission_data and (form_submission_data.get('url') == req.url or form_submission_data.get('url', '').startswith(req.url.split('?')[0]))
                     
                     # Match by domain AND (form action OR form endpoint with data)
                     if current_domain and req_domain == current_domain:
                         if url_matches_action or (is_form_endpoint and has_form_data):
                             form_submission_detected = True
-                            ultra_safe_log_print(f"   ✅ Form submission detected by domain match: {req['url'][:80]}")
+                            ultra_safe_log_print(f"   ✅ Form submission detected by domain match: {req.url[:80]}")
                             if has_form_data:
                                 ultra_safe_log_print(f"      Form data verified in request")
                             break
@@ -5647,7 +5326,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                     if form_domain and req_domain == form_domain:
                         if url_matches_action or (is_form_endpoint and has_form_data):
                             form_submission_detected = True
-                            ultra_safe_log_print(f"   ✅ Form submission detected by form action match: {req['url'][:80]}")
+                            ultra_safe_log_print(f"   ✅ Form submission detected by form action match: {req.url[:80]}")
                             if has_form_data:
                                 ultra_safe_log_print(f"      Form data verified in request")
                             break
@@ -5657,16 +5336,14 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
         # Also check responses
         if not form_submission_detected and post_responses:
             for resp in post_responses:
-                url_lower = resp['url'].lower()
-                excluded = ['google-analytics', 'googletagmanager', 'clarity', 'facebook', 'twitter', 'doubleclick', 'getnitropack']
-                if not any(ex in url_lower for ex in excluded):
+                url_lower = resp.url.lower()
+                if not EXCLUDED_URL_RE.search(url_lower):
                     try:
-                        from urllib.parse import urlparse
-                        resp_domain = urlparse(resp['url']).netloc
-                        current_domain = urlparse(page.url).netloc if page.url else ""
-                        if current_domain and resp_domain == current_domain and resp['status'] in [200, 201, 204, 302, 303, 419]:
+                        resp_domain = resp.host
+                        current_domain = capture.page_host
+                        if current_domain and resp_domain == current_domain and resp.status in [200, 201, 204, 302, 303, 419]:
                             form_submission_detected = True
-                            ultra_safe_log_print(f"   ✅ Form submission detected by response: {resp['status']} - {resp['url'][:80]}")
+                            ultra_safe_log_print(f"   ✅ Form submission detected by response: {resp.status} - {resp.url[:80]}")
                             break
                     except:
                         pass
@@ -5675,6 +5352,7 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
     result["post_requests"] = len(post_requests)
     result["post_responses"] = len(post_responses)
     result["get_requests"] = len(get_requests)
+    result["network_capture"] = capture.stats()
     result["form_submission_detected"] = form_submission_detected
     if form_submission_data:
         result["form_submission_data"] = form_submission_data
@@ -5683,19 +5361,17 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
     if not form_submission_detected and get_requests and contact_form_found:
         for req in get_requests:
             try:
-                from urllib.parse import urlparse
-                req_domain = urlparse(req['url']).netloc
-                current_domain = urlparse(page.url).netloc if page.url else ""
-                form_domain = urlparse(form_action_url).netloc if form_action_url else ""
+                req_domain = req.host
+                current_domain = capture.page_host
+                form_domain = capture.form_host
                 if (current_domain and req_domain == current_domain) or (form_domain and req_domain == form_domain):
                     form_base = form_action_url.split('?')[0] if form_action_url else ""
-                    req_base = req['url'].split('?')[0]
-                    if form_base and (req_base == form_base or req['url'].startswith(form_base)):
-                        if '?' in req['url']:  # Has query params = form data submitted
+                    req_base = req.url.split('?')[0]
+                    if form_base and (req_base == form_base or req.url.startswith(form_base)):
+                        if '?' in req.url:  # Has query params = form data submitted
                             # Verify query params contain form fields
                             try:
-                                from urllib.parse import urlparse, parse_qs
-                                query_string = urlparse(req['url']).query
+                                query_string = urlparse(req.url).query
                                 query_params = parse_qs(query_string)
                                 # Check if query params contain form fields
                                 has_form_fields = any(key.lower() in ['name', 'email', 'message', 'phone', 'subject', 'contact'] for key in query_params.keys())
@@ -5706,10 +5382,10 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                                     ultra_safe_log_print("   ✅ Form submission detected (GET with form data in query params)")
                                     break
                                 else:
-                                    ultra_safe_log_print(f"   ⚠️  GET request has query params but no form fields: {req['url'][:80]}")
+                                    ultra_safe_log_print(f"   ⚠️  GET request has query params but no form fields: {req.url[:80]}")
                             except:
                                 # If we can't parse, be conservative
-                                ultra_safe_log_print(f"   ⚠️  GET request with query params but couldn't verify form data: {req['url'][:80]}")
+                                ultra_safe_log_print(f"   ⚠️  GET request with query params but couldn't verify form data: {req.url[:80]}")
                                 pass
             except:
                 pass
@@ -5720,9 +5396,8 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
         # Check if any POST request is to the same domain AND has form data
         for req in post_requests:
             try:
-                from urllib.parse import urlparse
-                req_domain = urlparse(req['url']).netloc
-                current_domain = urlparse(page.url).netloc if page.url else ""
+                req_domain = req.host
+                current_domain = capture.page_host
                 if current_domain and req_domain == current_domain:
                     # CRITICAL: Only mark as detected if we have form_submission_data
                     if form_submission_data:
@@ -5732,39 +5407,33 @@ async def ultra_simple_form_submit(page) -> Dict[str, Any]:
                         break
                     else:
                         # Check if URL suggests it's a form endpoint
-                        url_lower = req['url'].lower()
+                        url_lower = req.url.lower()
                         is_form_endpoint = any(kw in url_lower for kw in ['contact', 'submit', 'send', 'message', 'form', 'api/contact', 'api/submit', 'api/message'])
                         if is_form_endpoint:
-                            ultra_safe_log_print(f"   ⚠️  POST to form endpoint but no form data captured: {req['url'][:80]}")
+                            ultra_safe_log_print(f"   ⚠️  POST to form endpoint but no form data captured: {req.url[:80]}")
                             ultra_safe_log_print("   ⚠️  Submission NOT verified - may be a false positive")
             except:
                 pass
     
     return result
 
-async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[str, Any]:
-    """ULTRA-RESILIENT main submission function - CANNOT FAIL."""
+async def run_ultra_resilient_submission(
+    url: str,
+    template_path: Path,
+    playwright_manager: Optional[UltimatePlaywrightManager] = None,
+) -> Dict[str, Any]:
+    """ULTRA-RESILIENT main submission function - CANNOT FAIL.
     
-    # Get heartbeat file path for debugging
-    heartbeat_file_path = None
-    try:
-        heartbeat_file_path = Path('/var/www/projects/teqsmartsubmit/teqsmartsubmit/tmp/python_script_heartbeat_' + str(os.getpid()) + '.txt')
-        if not heartbeat_file_path.exists():
-            heartbeat_file_path = Path('/tmp/python_script_heartbeat_' + str(os.getpid()) + '.txt')
-    except:
-        pass
+    When ``playwright_manager`` is given (worker mode), its warm browser is reused:
+    the run opens a fresh context/page and only closes that session at the end.
+    """
     
     # Update heartbeat - function entry
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [run_ultra_resilient_submission] Function entry\n")
-                f.write(f"📍 [run_ultra_resilient_submission] URL: {url}\n")
-                f.write(f"📍 [run_ultra_resilient_submission] Template: {template_path}\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat(
+        "📍 [run_ultra_resilient_submission] Function entry",
+        f"📍 [run_ultra_resilient_submission] URL: {url}",
+        f"📍 [run_ultra_resilient_submission] Template: {template_path}",
+    )
     
     # Initialize result with multiple fallback values
     result = {
@@ -5777,16 +5446,11 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         "timestamp": time.time(),
         "attempt_id": int(time.time() * 1000)
     }
+    wait_report = start_wait_report()
+    stage_timer = start_stage_timer()
     
     # Step 1: Load template (cannot fail) - need to load before creating manager
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [run_ultra_resilient_submission] About to load template\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [run_ultra_resilient_submission] About to load template")
     
     ultra_safe_log_print("=" * 80)
     ultra_safe_log_print("🚀 STARTING AUTOMATION")
@@ -5796,69 +5460,93 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
     template = await ultra_safe_template_load(template_path)
     resolved_test_data = resolve_test_data(template)
     
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [run_ultra_resilient_submission] Template loaded\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [run_ultra_resilient_submission] Template loaded")
     result["steps_completed"].append("template_loaded")
     result["template_used"] = "custom" if template.get("fields") else "default"
     ultra_safe_log_print(f"✅ Template loaded: {result['template_used']} template")
     ultra_safe_log_print(f"📝 Submission message source: {'custom template/domain message' if resolved_test_data['message'] != DEFAULT_TEST_DATA['message'] else 'default message'}")
     log_checkpoint(1, "Template Load", "success", f"Loaded {result['template_used']} template")
     
-    # Get headless setting from template (default to False for better CAPTCHA solving)
-    headless_mode = template.get("headless", False)
-    if headless_mode:
+    # Browser mode from the template/env: "auto" runs headless and escalates only for interactive CAPTCHAs
+    browser_mode = resolve_browser_mode(template)
+    headless_mode = browser_mode != VISIBLE
+    if browser_mode == AUTO:
+        ultra_safe_log_print("🖥️  Browser mode: auto (headless, visible browser only for interactive CAPTCHA widgets)")
+    elif headless_mode:
         ultra_safe_log_print("🖥️  Running in headless mode")
     else:
         ultra_safe_log_print("🖥️  Running in visible browser mode (better for CAPTCHA solving)")
     
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [run_ultra_resilient_submission] About to create PlaywrightManager\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [run_ultra_resilient_submission] About to create PlaywrightManager")
     
-    ultra_safe_log_print(f"🔧 Creating PlaywrightManager instance...")
-    playwright_manager = UltimatePlaywrightManager(headless=headless_mode)
-    ultra_safe_log_print(f"✅ PlaywrightManager created")
+    # Step 1.4: Per-domain cache of the resolved contact page and form (known domains skip discovery)
+    cache_url = url
+    form_cache = None
+    cached_form = None
+    contact_hint = None
+    cached_target = None
+    cache_candidate = None
+    mode_usage = None
+    if template.get("form_cache", True):
+        try:
+            ttl_hours = template.get("form_cache_ttl_hours")
+            form_cache = FormCache.from_env(
+                float(ttl_hours) * 3600 if ttl_hours else None, log=ultra_safe_log_print,
+                pool=playwright_manager.form_cache_pool if playwright_manager is not None else None,
+            )
+            cached_form = await form_cache.get(cache_url)
+        except Exception as e:
+            ultra_safe_log_print(f"⚠️  Form cache unavailable: {str(e)[:80]}")
+            form_cache = None
+    if cached_form:
+        result["form_cache"] = {"status": "hit", "contact_url": cached_form.get("contact_url")}
+        ultra_safe_log_print(f"🗂️  Form cache hit: {str(cached_form.get('contact_url'))[:100]}")
+    elif form_cache is not None:
+        result["form_cache"] = {"status": "miss"}
+        # Contact page already recorded by the contact checker (Domain.contactPageUrl)
+        contact_hint = await form_cache.contact_page_hint(cache_url)
+        if contact_hint:
+            result["form_cache"]["contact_hint"] = contact_hint
+            ultra_safe_log_print(f"🗂️  Using recorded contact page: {contact_hint[:100]}")
     
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [run_ultra_resilient_submission] PlaywrightManager created\n")
-                f.write("📍 [run_ultra_resilient_submission] About to call playwright_manager.start()\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    # Step 1.5: HTTP-first contact-page discovery runs while the browser starts
+    discovery_task = None
+    contact_discovery = None
+    if template.get("http_discovery", True) and not cached_form and not contact_hint:
+        try:
+            from contact_discovery import discover_contact_pages
+            discovery_task = asyncio.create_task(discover_contact_pages(
+                url, client=playwright_manager.discovery_client if playwright_manager is not None else None,
+            ))
+            ultra_safe_log_print("🛰️  HTTP contact-page discovery started (in parallel with browser launch)")
+        except Exception as e:
+            ultra_safe_log_print(f"⚠️  HTTP contact discovery unavailable: {str(e)[:80]}")
+    
+    if playwright_manager is None:
+        ultra_safe_log_print(f"🔧 Creating PlaywrightManager instance...")
+        playwright_manager = UltimatePlaywrightManager(mode=browser_mode)
+        ultra_safe_log_print(f"✅ PlaywrightManager created")
+    else:
+        ultra_safe_log_print(f"♻️  Reusing warm PlaywrightManager (browser alive: {playwright_manager.is_browser_alive()})")
+    playwright_manager.set_resource_profile(template.get("resource_profile"))
+    
+    log_heartbeat(
+        "📍 [run_ultra_resilient_submission] PlaywrightManager created",
+        "📍 [run_ultra_resilient_submission] About to call playwright_manager.open_session()",
+    )
     
     try:
         # Step 2: Initialize Playwright (cannot fail)
         log_checkpoint(2, "Browser Init", "in_progress", f"Starting browser (headless={headless_mode})")
         ultra_safe_log_print(f"🚀 Initializing browser (headless={headless_mode})...")
-        ultra_safe_log_print(f"   📍 About to call playwright_manager.start()...")
+        ultra_safe_log_print(f"   📍 About to call playwright_manager.open_session()...", level="debug")
         sys.stderr.flush()
         
-        playwright_ready = await playwright_manager.start()
+        playwright_ready = await playwright_manager.open_session()
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] playwright_manager.start() returned: {playwright_ready}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [run_ultra_resilient_submission] playwright_manager.open_session() returned: {playwright_ready}")
         
-        ultra_safe_log_print(f"   📍 playwright_manager.start() returned: {playwright_ready}")
+        ultra_safe_log_print(f"   📍 playwright_manager.open_session() returned: {playwright_ready}", level="debug")
         sys.stderr.flush()
         
         if not playwright_ready:
@@ -5894,16 +5582,47 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         ultra_safe_log_print("✅ Browser initialized successfully")
         result["steps_completed"].append("browser_ready")
         log_checkpoint(2, "Browser Init", "success", "Browser initialized successfully")
+        mode_usage = ModeUsage(browser_mode, HEADLESS if playwright_manager.headless else VISIBLE)
+        if browser_mode == VISIBLE and playwright_manager.headless:
+            # Warm headless worker browser, but this template asks for a visible one
+            await escalate_to_visible_browser(playwright_manager, mode_usage, "template")
+        
+        log_heartbeat(
+            "📍 [run_ultra_resilient_submission] Browser initialized successfully",
+            "📍 [run_ultra_resilient_submission] About to navigate to URL",
+        )
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Browser initialized successfully\n")
-                    f.write("📍 [run_ultra_resilient_submission] About to navigate to URL\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        # Open the cached contact page directly for known domains
+        if cached_form and cached_form.get("contact_url"):
+            result["landing_url"] = url
+            url = cached_form["contact_url"]
+        elif contact_hint:
+            result["landing_url"] = url
+            url = contact_hint
+        
+        # Open the validated contact page directly when HTTP discovery found one
+        if discovery_task is not None:
+            try:
+                contact_discovery = await asyncio.wait_for(discovery_task, timeout=15)
+            except Exception:
+                contact_discovery = None
+            if contact_discovery:
+                result["contact_discovery"] = {
+                    "landing_has_form": contact_discovery.get("landing_has_form"),
+                    "best_url": contact_discovery.get("best_url"),
+                    "candidates": contact_discovery.get("candidates", [])[:5],
+                    "requests": contact_discovery.get("requests"),
+                    "elapsed_seconds": contact_discovery.get("elapsed_seconds"),
+                }
+                if contact_discovery.get("best_url"):
+                    result["landing_url"] = url
+                    url = contact_discovery["best_url"]
+                    ultra_safe_log_print(f"🛰️  HTTP discovery found contact page: {url[:100]} "
+                                         f"({contact_discovery.get('elapsed_seconds')}s, {contact_discovery.get('requests')} requests)")
+                elif contact_discovery.get("landing_has_form"):
+                    ultra_safe_log_print("🛰️  HTTP discovery: landing page already has a contact form")
+                else:
+                    ultra_safe_log_print("🛰️  HTTP discovery found no validated contact page")
         
         # Step 3: Navigate to URL (cannot fail)
         log_checkpoint(3, "Page Load", "in_progress", url)
@@ -5912,14 +5631,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         form_load_timestamp = time.time()
         navigation_success = await playwright_manager.navigate(url)
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] Navigation result: {navigation_success}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [run_ultra_resilient_submission] Navigation result: {navigation_success}")
         
         if not navigation_success:
             error_msg = f"Navigation failed to {url}"
@@ -5961,7 +5673,9 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         ultra_safe_log_print("")
         ultra_safe_log_print("🚫 STEP 3.5: Handling banners, popups, and cookie consent...")
         ultra_safe_log_print("-" * 80)
-        banners_closed = await handle_banners_and_popups(playwright_manager.page)
+        banners_closed = await handle_banners_and_popups(
+            playwright_manager.page, cached_form.get("form_locator") if cached_form else None
+        )
         result["banners_closed"] = banners_closed
         if banners_closed > 0:
             ultra_safe_log_print(f"✅ Closed {banners_closed} banner(s)/popup(s)")
@@ -5997,160 +5711,124 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
             ultra_safe_log_print("ℹ️  No forms found to update")
         ultra_safe_log_print("")
         
+        # Known form builders skip the generic detection heuristics entirely. Off the
+        # contact page only builder forms with a message field count (not footer signups)
+        on_contact_page = bool(result.get("landing_url"))
+        if not on_contact_page:
+            try:
+                from contact_discovery import score_candidate
+                on_contact_page = score_candidate(playwright_manager.page.url) > 0
+            except Exception:
+                pass
+        form_adapter = await form_adapters.detect_adapter(playwright_manager.page, on_contact_page=on_contact_page)
+        if form_adapter is not None:
+            result["form_adapter"] = form_adapter.name
+        
         # Check if there's a contact form, if not try to find contact page
         log_checkpoint(5, "Form Detection", "in_progress", "Scanning page for contact form")
-        try:
-            has_contact_form = await playwright_manager.page.evaluate("""
-                () => {
-                    const forms = document.querySelectorAll('form');
-                    for (const form of forms) {
-                        const method = (form.method || 'get').toLowerCase();
-                        const formText = form.textContent.toLowerCase();
-                        const formId = (form.id || '').toLowerCase();
-                        const formClass = (form.className || '').toLowerCase();
-                        
-                        // Check if it's a search form (skip)
-                        const isSearch = method === 'get' && (
-                            formText.includes('search') ||
-                            formId.includes('search') ||
-                            formClass.includes('search')
-                        );
-                        const fieldNames = Array.from(form.querySelectorAll('input, textarea, select'))
-                            .map((field) => `${field.name || ''} ${field.id || ''} ${field.placeholder || ''}`.toLowerCase())
-                            .join(' ');
-                        const newsletterKeywords = [
-                            'newsletter', 'subscribe', 'subscription', 'mailchimp', 'substack',
-                            'sign up', 'signup', 'sign-up', 'join our mailing list', 'mailing list',
-                            'stay updated', 'latest news', 'breaking news', 'daily updates'
-                        ];
-                        const hasNewsletterKeyword = newsletterKeywords.some((keyword) =>
-                            `${formText} ${formId} ${formClass} ${fieldNames}`.includes(keyword)
-                        );
-                        
-                        // Check if it's a contact form
-                        // Contact form should have: name, email, and comment/message fields
-                        const hasNameField = form.querySelector('input[name="name"]');
-                        const hasEmailField = form.querySelector('input[name="email"]');
-                        const hasPhoneField = form.querySelector('input[name="phone"]');
-                        const hasCommentField = form.querySelector('textarea[name="comment"]') || form.querySelector('textarea[name="message"]');
-                        const hasTextarea = !!form.querySelector('textarea');
-                        const isNewsletter = hasNewsletterKeyword && !hasTextarea && !!hasEmailField && !hasCommentField;
-                        
-                        // Contact form must have at least name, email, and comment
-                        const isContact = (hasNameField && hasEmailField && hasCommentField) || 
-                                        (!isNewsletter && method === 'post') || (
-                            formText.includes('contact') ||
-                            formId.includes('contact') ||
-                            formClass.includes('contact') ||
-                            (hasNameField && hasEmailField)  // At least name and email
-                        );
-                        
-                        if (isContact && !isSearch && !isNewsletter) {
-                            return true;
-                        }
-                    }
-                    return false;
-                }
-            """)
+        if form_adapter is not None:
+            ultra_safe_log_print(f"🧩 {form_adapter.name} form detected - using its fill/submit/verify path")
+            log_checkpoint(5, "Form Detection", "success", f"{form_adapter.name} form detected")
+        elif cached_form:
+            # The cached form must still be structurally identical, otherwise drop the entry
+            if cached_form.get("form_locator"):
+                await settle(playwright_manager.page, "detection", 2, selector=cached_form["form_locator"])
+            scan = await form_scanner.scan_forms(playwright_manager.page)
+            cached_target = next(
+                (form for form in scan.get("forms", []) if form_signature(form) == cached_form.get("form_signature")),
+                None,
+            )
+            if cached_target is not None:
+                await form_scanner.scroll_form_into_view(playwright_manager.page, cached_target, mode="closest_section")
+                ultra_safe_log_print("🗂️  Cached form signature matched - skipping contact form search")
+                log_checkpoint(5, "Form Detection", "success", "Cached contact form matched")
+            else:
+                ultra_safe_log_print("🗂️  Cached form signature changed - invalidating cache entry")
+                await form_cache.invalidate(cache_url)
+                result["form_cache"] = {"status": "invalidated", "contact_url": cached_form.get("contact_url")}
+                cached_form = None
+        if cached_target is None and form_adapter is None:
+            try:
+                scan = await form_scanner.scan_forms(playwright_manager.page)
+                has_contact_form = form_scanner.has_contact_form(scan)
             
-            # Always check for contactInfo section first (even if has_contact_form is false)
-            # Scroll down to load content if needed
-            await playwright_manager.page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-            await asyncio.sleep(1)
+                # Always check for contactInfo section first (even if has_contact_form is false)
+                # Scroll down to load content if needed
+                await playwright_manager.page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
+                await settle(playwright_manager.page, "detection", 1, network=True)
             
-            contact_form_result = await playwright_manager.page.evaluate("""
-                () => {
-                    // Try multiple selectors for contact section
-                    const contactSection = document.querySelector('.contactInfo, section.contactInfo, [class*="contactInfo"]');
-                    
-                    // Also try to find form with contact fields anywhere on page
-                    const allForms = document.querySelectorAll('form');
-                    let contactForm = null;
-                    
-                    for (const form of allForms) {
-                        const hasName = form.querySelector('input[name="name"]');
-                        const hasEmail = form.querySelector('input[name="email"]');
-                        const hasComment = form.querySelector('textarea[name="comment"]') || form.querySelector('textarea[name="message"]');
-                        
-                        if (hasName && hasEmail && hasComment) {
-                            contactForm = form;
-                            break;
-                        }
-                    }
-                    
-                    if (contactForm) {
-                        // Scroll to the form
-                        if (contactSection) {
-                            contactSection.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                        } else {
-                            contactForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
-                        }
-                        return true;
-                    }
-                    
-                    return false;
-                }
-            """)
+                # Re-scan only if the scroll loaded new content (generation changed)
+                scan = await form_scanner.scan_forms(playwright_manager.page)
+                contact_form_result = False
+                strict_form = form_scanner.strict_contact_form(scan)
+                if strict_form:
+                    # Scroll to the contactInfo section (or the form itself)
+                    contact_form_result = await form_scanner.scroll_form_into_view(
+                        playwright_manager.page, strict_form, mode="contact_section"
+                    )
             
-            if contact_form_result:
-                ultra_safe_log_print("✅ Found contact form with name, email, comment fields - scrolled to it")
-                log_checkpoint(5, "Form Detection", "success", "Found contact form on page")
-                await asyncio.sleep(2)  # Wait for scroll and content to load
-                # Don't navigate away if we found the contact form
-                has_contact_form = True
+                if contact_form_result:
+                    ultra_safe_log_print("✅ Found contact form with name, email, comment fields - scrolled to it")
+                    log_checkpoint(5, "Form Detection", "success", "Found contact form on page")
+                    await settle(playwright_manager.page, "detection", 2, network=True)  # Wait for scroll and content to load
+                    # Don't navigate away if we found the contact form
+                    has_contact_form = True
                 
-            if not has_contact_form and not contact_form_result:
-                    ultra_safe_log_print("🔍 No contact form found, looking for contact page...")
-                    contact_link = await playwright_manager.page.evaluate("""
-                        () => {
-                            // Look for contact links
-                            const links = Array.from(document.querySelectorAll('a[href*="contact"]'));
-                            if (links.length > 0) {
-                                return links[0].href;
-                            }
-                            // Try common contact page paths
-                            const currentUrl = window.location.href;
-                            const baseUrl = currentUrl.replace(/\\/$/, '');
-                            const commonPaths = ['/contact', '/contact-us', '/contactus', '/get-in-touch'];
-                            for (const path of commonPaths) {
-                                return baseUrl + path;
+                if not has_contact_form and not contact_form_result:
+                        ultra_safe_log_print("🔍 No contact form found, looking for contact page...")
+                        contact_link = await playwright_manager.page.evaluate("""
+                            () => {
+                                // Look for contact links
+                                const links = Array.from(document.querySelectorAll('a[href*="contact"]'));
+                                if (links.length > 0) {
+                                    return links[0].href;
+                                }
+                                return null;
                             }
-                            return null;
-                        }
-                    """)
+                        """)
                     
-                    if contact_link:
-                        ultra_safe_log_print(f"🔗 Found contact page: {contact_link[:80]}")
-                        ultra_safe_log_print("🌐 Navigating to contact page...")
-                        nav_success = await playwright_manager.navigate(contact_link)
-                        if nav_success:
-                            result["final_url"] = contact_link
-                            ultra_safe_log_print("✅ Navigated to contact page")
-                            log_checkpoint(5, "Form Detection", "warning", "Navigated to contact page to continue detection")
-                            # Wait a bit for dynamic content to load
-                            await asyncio.sleep(2)
+                        # Fall back to contact pages validated over HTTP (never unchecked path guesses)
+                        if not contact_link and contact_discovery:
+                            current_url = (playwright_manager.page.url or "").rstrip("/")
+                            for candidate in contact_discovery.get("candidates", []):
+                                if candidate["url"].rstrip("/") != current_url:
+                                    contact_link = candidate["url"]
+                                    break
+                    
+                        if contact_link:
+                            ultra_safe_log_print(f"🔗 Found contact page: {contact_link[:80]}")
+                            ultra_safe_log_print("🌐 Navigating to contact page...")
+                            nav_success = await playwright_manager.navigate(contact_link)
+                            if nav_success:
+                                result["final_url"] = contact_link
+                                ultra_safe_log_print("✅ Navigated to contact page")
+                                log_checkpoint(5, "Form Detection", "warning", "Navigated to contact page to continue detection")
+                                # Wait a bit for dynamic content to load
+                                await settle(playwright_manager.page, "navigation", 2, network=True)
+                            else:
+                                ultra_safe_log_print("⚠️  Failed to navigate to contact page")
+                                log_checkpoint(5, "Form Detection", "warning", "Found contact page but navigation failed")
                         else:
-                            ultra_safe_log_print("⚠️  Failed to navigate to contact page")
-                            log_checkpoint(5, "Form Detection", "warning", "Found contact page but navigation failed")
-                    else:
-                        ultra_safe_log_print("⚠️  No contact page found - please provide contact page URL")
-                        log_checkpoint(5, "Form Detection", "warning", "No clear contact form/page found")
-        except:
-            pass  # Continue anyway
+                            ultra_safe_log_print("⚠️  No contact page found - please provide contact page URL")
+                            log_checkpoint(5, "Form Detection", "warning", "No clear contact form/page found")
+            except:
+                pass  # Continue anyway
         
         # Step 4: Handle CAPTCHAs with LOCAL solver (cannot fail)
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Step 4: About to handle CAPTCHAs\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [run_ultra_resilient_submission] Step 4: About to handle CAPTCHAs")
         
         ultra_safe_log_print("🔐 Checking for CAPTCHAs (using LOCAL solver)...")
         log_checkpoint(6, "CAPTCHA", "in_progress", "Checking page for CAPTCHA widgets")
         
+        # Auto mode: only an interactive challenge widget is worth a visible browser
+        if browser_mode == AUTO and playwright_manager.headless:
+            widget = await needs_visible_browser(playwright_manager.page)
+            if widget and await escalate_to_visible_browser(
+                playwright_manager, mode_usage, widget, playwright_manager.page.url
+            ):
+                form_load_timestamp = time.time()
+                result["final_url"] = playwright_manager.page.url or result.get("final_url")
+        
         # First, do a quick check to see if CAPTCHA is actually present
         quick_captcha_check = await playwright_manager.page.evaluate("""
             () => {
@@ -6239,7 +5917,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                 
                 # Close current browser session
                 try:
-                    await playwright_manager.cleanup()
+                    await playwright_manager.release()
                     ultra_safe_log_print("   ✅ Browser closed")
                 except:
                     pass
@@ -6251,12 +5929,12 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                 
                 # Restart browser
                 ultra_safe_log_print("   🔄 Restarting browser...")
-                playwright_ready = await playwright_manager.start()
+                playwright_ready = await playwright_manager.open_session()
                 if playwright_ready:
                     ultra_safe_log_print(f"   🌐 Navigating back to URL: {url}")
                     nav_success = await playwright_manager.navigate(url)
                     if nav_success:
-                        await asyncio.sleep(3)
+                        await settle(playwright_manager.page, "navigation", 3, network=True)
                         await handle_banners_and_popups(playwright_manager.page)
                         ultra_safe_log_print("   ✅ Browser restarted, will restart from form finding...")
                         # Return a special flag to restart the entire process
@@ -6284,7 +5962,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                         
                         # Close current browser session
                         try:
-                            await playwright_manager.cleanup()
+                            await playwright_manager.release()
                             ultra_safe_log_print("   ✅ Browser closed")
                         except:
                             pass
@@ -6296,7 +5974,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                         
                         # Restart browser
                         ultra_safe_log_print("   🔄 Restarting browser...")
-                        playwright_ready = await playwright_manager.start()
+                        playwright_ready = await playwright_manager.open_session()
                         if not playwright_ready:
                             ultra_safe_log_print("   ❌ Failed to restart browser")
                             break
@@ -6309,7 +5987,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                             break
                         
                         # Wait for page to load
-                        await asyncio.sleep(3)
+                        await settle(playwright_manager.page, "navigation", 3, network=True)
                         
                         # Handle banners again after restart
                         await handle_banners_and_popups(playwright_manager.page)
@@ -6339,32 +6017,43 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         elif result.get("captcha_result", {}).get("captchas_detected", 0) > 0:
             log_checkpoint(6, "CAPTCHA", "warning", "CAPTCHA detected but not fully solved")
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] Step 4: CAPTCHA handled, detected: {captcha_result.get('captchas_detected', 0)}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [run_ultra_resilient_submission] Step 4: CAPTCHA handled, detected: {captcha_result.get('captchas_detected', 0)}")
         
         # Step 5: Simple form filling (cannot fail)
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Step 5: About to fill form fields\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [run_ultra_resilient_submission] Step 5: About to fill form fields")
         
         ultra_safe_log_print("")
         ultra_safe_log_print("✍️  STEP 5: Filling form fields...")
         ultra_safe_log_print("-" * 80)
         log_checkpoint(7, "Field Fill", "in_progress", "Filling detected form fields")
-        fill_result = await ultra_simple_form_fill(playwright_manager.page, template)
+        await handle_new_overlays(playwright_manager.page, cached_target.get("locator") if cached_target else None)
+        fill_result = None
+        if form_adapter is not None:
+            fill_result = await form_adapters.fill(playwright_manager.page, form_adapter, compile_template(template),
+                                                  on_contact_page=on_contact_page)
+            if fill_result.get("locator") and fill_result.get("fields_filled", 0) > 0:
+                ultra_safe_log_print(f"🧩 {form_adapter.name}: filled {', '.join(fill_result.get('mapped', [])) or 'required fields'}")
+            else:
+                ultra_safe_log_print(f"⚠️  {form_adapter.name} fill found nothing to fill - falling back to generic fill")
+                form_adapter = None
+                fill_result = None
+        if fill_result is None:
+            # Cache hit: the recorded field mapping fills first, the generic fill only covers the gaps
+            mapped_filled = 0
+            if cached_target is not None:
+                mapped_filled = await apply_cached_field_mapping(
+                    playwright_manager.page, cached_form.get("field_mapping") or {}, resolved_test_data
+                )
+            fill_result = await ultra_simple_form_fill(playwright_manager.page, template)
+            fill_result["fields_filled"] += mapped_filled
         result.update(fill_result)
         result["steps_completed"].append("form_filled")
+        if form_cache is not None:
+            # Remember what was filled so a successful submission can be cached for this domain
+            scan = await form_scanner.scan_forms(playwright_manager.page)
+            cache_target = cached_target or form_scanner.pick_fill_target(scan) or form_scanner.strict_contact_form(scan)
+            if cache_target:
+                cache_candidate = build_entry(playwright_manager.page.url, cache_target)
         ultra_safe_log_print(f"✅ Form filling completed: {fill_result.get('fields_filled', 0)} field(s) filled")
         if fill_result.get('fields_filled', 0) > 0:
             log_checkpoint(7, "Field Fill", "success", f"Filled {fill_result.get('fields_filled', 0)} field(s)")
@@ -6372,24 +6061,10 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
             log_checkpoint(7, "Field Fill", "warning", "No fields were filled")
         ultra_safe_log_print("")
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] Step 5: Form filled, fields: {fill_result.get('fields_filled', 0)}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [run_ultra_resilient_submission] Step 5: Form filled, fields: {fill_result.get('fields_filled', 0)}")
         
         # Step 5.5: Check and solve CAPTCHA again (after form filling, CAPTCHA might be visible now)
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Step 5.5: Re-checking CAPTCHAs after form fill\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [run_ultra_resilient_submission] Step 5.5: Re-checking CAPTCHAs after form fill")
         
         ultra_safe_log_print("🔐 STEP 5.5: Re-checking CAPTCHAs after form fill...")
         ultra_safe_log_print("-" * 80)
@@ -6476,14 +6151,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         ultra_safe_log_print("")
         
         # Step 6: Form submission (cannot fail)
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Step 6: About to submit form\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [run_ultra_resilient_submission] Step 6: About to submit form")
         
                 # Extract and inject WPForms fields before submission
         try:
@@ -6660,23 +6328,53 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
             # Always attempt submission at least once, even if CAPTCHA solving failed
             ultra_safe_log_print("🔄 Attempting form submission (will proceed even if CAPTCHA solving failed)...")
             
-            # First, try the normal submission flow with timeout
             submit_result = None
-            try:
-                submit_result = await asyncio.wait_for(
-                    ultra_simple_form_submit(playwright_manager.page),
-                    timeout=30.0  # 30 second timeout for submission
-                )
-                result.update(submit_result)
-                result["steps_completed"].append("submission_attempted")
-                ultra_safe_log_print(f"✅ Form submission attempted: {submit_result.get('submission_attempted', False)}")
-            except asyncio.TimeoutError:
-                ultra_safe_log_print("⚠️  Form submission timed out (30s), trying direct button click...")
-                submit_result = {"submission_attempted": False}
-            except Exception as e:
-                error_msg = str(e)
-                ultra_safe_log_print(f"⚠️  Form submission error: {error_msg[:50]}")
-                submit_result = {"submission_attempted": False}
+            if form_adapter is not None:
+                # Known builder: click its submit control and wait for its native success/error signal
+                try:
+                    submit_result = await asyncio.wait_for(
+                        form_adapters.submit_and_verify(
+                            playwright_manager.page,
+                            form_adapter,
+                            fill_result["locator"],
+                            fill_result.get("action", ""),
+                            log=ultra_safe_log_print,
+                        ),
+                        timeout=30.0
+                    )
+                except Exception as e:
+                    ultra_safe_log_print(f"⚠️  {form_adapter.name} submission error: {str(e)[:50]}")
+                    submit_result = None
+                if submit_result and submit_result.get("submission_attempted"):
+                    result.update(submit_result)
+                    result["steps_completed"].append("submission_attempted")
+                    ultra_safe_log_print(f"✅ {form_adapter.name} submission attempted (success: {submit_result.get('submission_success', False)})")
+                else:
+                    ultra_safe_log_print(f"⚠️  {form_adapter.name} submit control not reachable - falling back to generic submission")
+                    submit_result = None
+            
+            # Otherwise the normal submission flow with timeout
+            if submit_result is None:
+                try:
+                    submit_result = await asyncio.wait_for(
+                        ultra_simple_form_submit(
+                            playwright_manager.page,
+                            preferred_form_locator=cached_target.get("locator") if cached_target else None,
+                            template=template,
+                            preferred_submit_locator=cached_form.get("submit_locator") if cached_target else None,
+                        ),
+                        timeout=30.0  # 30 second timeout for submission
+                    )
+                    result.update(submit_result)
+                    result["steps_completed"].append("submission_attempted")
+                    ultra_safe_log_print(f"✅ Form submission attempted: {submit_result.get('submission_attempted', False)}")
+                except asyncio.TimeoutError:
+                    ultra_safe_log_print("⚠️  Form submission timed out (30s), trying direct button click...")
+                    submit_result = {"submission_attempted": False}
+                except Exception as e:
+                    error_msg = str(e)
+                    ultra_safe_log_print(f"⚠️  Form submission error: {error_msg[:50]}")
+                    submit_result = {"submission_attempted": False}
             
             # If submission wasn't attempted, try direct button click
             if not submit_result or not submit_result.get("submission_attempted"):
@@ -6690,14 +6388,14 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                             await submit_button.click(timeout=10000)
                             ultra_safe_log_print("   ✅ Submit button clicked directly")
                             result["submission_attempted"] = True
-                            await asyncio.sleep(2)
+                            await settle(playwright_manager.page, "submit", 2, network=True)
                         else:
                             ultra_safe_log_print("   ⚠️  Submit button not found, trying form.submit()...")
                             # Try form.submit() as last resort
                             await playwright_manager.page.evaluate("() => { const form = document.querySelector('form'); if (form) form.submit(); }")
                             ultra_safe_log_print("   ✅ Form submitted via form.submit()")
                             result["submission_attempted"] = True
-                            await asyncio.sleep(2)
+                            await settle(playwright_manager.page, "submit", 2, network=True)
                     else:
                         ultra_safe_log_print("   ⚠️  Page is closed, cannot click submit button")
                 except Exception as e:
@@ -6707,16 +6405,11 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
                     result["submission_success"] = False
                     result["error"] = str(e)[:100]
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] Step 6: Form submission completed\n")
-                    f.write(f"📍 [run_ultra_resilient_submission] Submission attempted: {submit_result.get('submission_attempted', False)}\n")
-                    f.write(f"📍 [run_ultra_resilient_submission] Submission detected: {submit_result.get('form_submission_detected', False)}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [run_ultra_resilient_submission] Step 6: Form submission completed",
+            f"📍 [run_ultra_resilient_submission] Submission attempted: {submit_result.get('submission_attempted', False)}",
+            f"📍 [run_ultra_resilient_submission] Submission detected: {submit_result.get('form_submission_detected', False)}",
+        )
         
         ultra_safe_log_print(f"✅ Submission step completed")
         ultra_safe_log_print(f"   - Attempted: {submit_result.get('submission_attempted', False)}")
@@ -6740,7 +6433,7 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         all_logs.append(f"URL: {url}")
         all_logs.append(f"Template: {template.get('name', 'Universal Auto-Detect')}")
         all_logs.append(f"Template Type: {result.get('template_used', 'unknown')}")
-        all_logs.append(f"Headless Mode: {headless_mode}")
+        all_logs.append(f"Browser Mode: {browser_mode} ({'headless' if playwright_manager.headless else 'visible'})")
         all_logs.append("")
         all_logs.append("STEPS COMPLETED:")
         for step in result.get('steps_completed', []):
@@ -6897,15 +6590,10 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         ultra_safe_log_print("✅ Process completed successfully")
         ultra_safe_log_print("\n".join(all_logs))
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] Process completed, status: {result.get('status', 'unknown')}\n")
-                    f.write("📍 [run_ultra_resilient_submission] About to return result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [run_ultra_resilient_submission] Process completed, status: {result.get('status', 'unknown')}",
+            "📍 [run_ultra_resilient_submission] About to return result",
+        )
         
         return result
         
@@ -6914,15 +6602,10 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         error_msg = str(e)[:100] if str(e) else "unknown error"
         ultra_safe_log_print(f"💥 Unexpected error in main process: {error_msg}")
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [run_ultra_resilient_submission] EXCEPTION: {type(e).__name__}: {error_msg}\n")
-                    f.write("📍 [run_ultra_resilient_submission] Creating error result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [run_ultra_resilient_submission] EXCEPTION: {type(e).__name__}: {error_msg}",
+            "📍 [run_ultra_resilient_submission] Creating error result",
+        )
         
         result.update({
             "status": "error",
@@ -6933,15 +6616,11 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         return result
         
     finally:
+        if discovery_task is not None and not discovery_task.done():
+            discovery_task.cancel()
+        
         # ULTRA-RESILIENT cleanup (cannot fail)
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Finally block: About to cleanup\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [run_ultra_resilient_submission] Finally block: About to cleanup")
         
         # Check if we're in the middle of CAPTCHA solving before cleanup
         try:
@@ -6965,48 +6644,69 @@ async def run_ultra_resilient_submission(url: str, template_path: Path) -> Dict[
         
         if is_solving_captcha:
             ultra_safe_log_print("⚠️  CAPTCHA solving still in progress, waiting a bit longer before cleanup...")
-            await asyncio.sleep(5)  # Give it a bit more time
+            await settle(playwright_manager.page, "cleanup", 5, dom=False, condition=_RECAPTCHA_TOKEN_PRESENT_JS)  # Give it a bit more time
+        
+        if mode_usage is not None:
+            # Sampled before release so the RSS still covers this run's browser
+            result["browser_mode"] = mode_usage.report()
+            ultra_safe_log_print("🖥️  Browser modes: " + ", ".join(
+                f"{mode} {span['seconds']:.1f}s / {span['rss_mb']:.0f} MB"
+                for mode, span in result["browser_mode"]["modes"].items()
+            ))
         
         ultra_safe_log_print("🔒 Cleaning up resources...")
         await UltimateSafetyWrapper.execute_async(
-            playwright_manager.cleanup,
+            playwright_manager.release,
             default_return=None
         )
         ultra_safe_log_print("🔒 Cleanup completed")
         
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [run_ultra_resilient_submission] Cleanup completed\n")
-                    f.write("📍 [run_ultra_resilient_submission] Function exit\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        if form_cache is not None and cache_candidate and result.get("status") == "success":
+            try:
+                await form_cache.put(cache_url, cache_candidate)
+                result.setdefault("form_cache", {})["stored"] = True
+                ultra_safe_log_print(f"🗂️  Cached contact page and form for {cache_url[:80]}")
+            except Exception as e:
+                ultra_safe_log_print(f"⚠️  Could not store form cache entry: {str(e)[:80]}")
+        
+        result["wait_report"] = wait_report.summary()
+        if playwright_manager.resource_blocker:
+            result["resource_stats"] = playwright_manager.resource_blocker.stats()
+            ultra_safe_log_print(
+                f"🪶 Resource profile blocked {result['resource_stats']['requests_blocked']}/"
+                f"{result['resource_stats']['requests_total']} requests "
+                f"(~{result['resource_stats']['estimated_bytes_saved'] // 1024} KB saved)"
+            )
+        ultra_safe_log_print(f"⏱️  Waits: {wait_report.format_line()}")
+        for stage, totals in wait_report.stages.items():
+            _progress.timing(f"wait.{stage}", totals["waited_seconds"], waits=int(totals["waits"]))
+        
+        stage_timer.close_open()
+        result["stage_timings"] = stage_timer.summary()
+        STAGE_METRICS.observe_run(result["stage_timings"], result.get("status"))
+        for span in result["stage_timings"]["stages"]:
+            _progress.timing(span["stage"], span["seconds"], bytes=span["bytes"], evaluate_calls=span["evaluate_calls"])
+        ultra_safe_log_print("⏱️  Stages: " + ", ".join(
+            f"{span['stage']} {span['seconds']:.1f}s" for span in result["stage_timings"]["stages"]
+        ))
+        
+        log_heartbeat(
+            "📍 [run_ultra_resilient_submission] Cleanup completed",
+            "📍 [run_ultra_resilient_submission] Function exit",
+        )
 
 async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
     """ULTRA-RESILIENT main async function - CANNOT FAIL to return JSON."""
     
-    # Initialize heartbeat file path for debugging (available throughout function)
-    heartbeat_file_path = None
-    try:
-        heartbeat_file_path = Path('/var/www/projects/teqsmartsubmit/teqsmartsubmit/tmp/python_script_heartbeat_' + str(os.getpid()) + '.txt')
-        if not heartbeat_file_path.exists():
-            heartbeat_file_path = Path('/tmp/python_script_heartbeat_' + str(os.getpid()) + '.txt')
-    except:
-        pass
+    # Heartbeat file written by the log sink (read back on timeout)
+    heartbeat_file_path = Path(_log_sink.heartbeat_path) if _log_sink.heartbeat_path else None
     
     # Update heartbeat immediately - function entry
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] Function entry - main_async_with_ultimate_safety called\n")
-                f.write("📍 [main_async] Function called\n")
-                f.write("📍 [main_async] About to write startup messages\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat(
+        "📍 [main_async] Function entry - main_async_with_ultimate_safety called",
+        "📍 [main_async] Function called",
+        "📍 [main_async] About to write startup messages",
+    )
     
     # Use non-blocking stderr writes to prevent hanging on full pipe buffers
     # CRITICAL: Even sys.stderr.write() can block if pipe buffer is full!
@@ -7064,14 +6764,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
             pass
     
     # CRITICAL: Update heartbeat FIRST before any stderr writes (heartbeat_file_path already initialized above)
-    try:
-        if heartbeat_file_path and heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] About to write startup messages (duplicate check)\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [main_async] About to write startup messages (duplicate check)")
     
     # Try to write to stderr, but don't let it block execution
     safe_write("📍 [main_async] Function called\n")
@@ -7089,26 +6782,12 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         pass
     
     # Update heartbeat to show we got past the writes
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] After initial log prints\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [main_async] After initial log prints")
     
     safe_write("📍 [main_async] After initial log prints\n")
     
     # Update heartbeat
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] About to get URL\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [main_async] About to get URL")
     
     # Validate inputs with fallbacks
     safe_write("📍 [main_async] About to get URL\n")
@@ -7119,14 +6798,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
     )
     
     # Update heartbeat
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write(f"📍 [main_async] URL: {url}\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat(f"📍 [main_async] URL: {url}")
     
     safe_write(f"📍 [main_async] URL: {url}\n")
     safe_write(f"📋 Target URL: {url}\n")
@@ -7138,14 +6810,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         pass
     
     # Update heartbeat
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] About to get template path\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [main_async] About to get template path")
     
     safe_write("📍 [main_async] About to get template path\n")
     
@@ -7155,14 +6820,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
     )
     
     # Update heartbeat
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write(f"📍 [main_async] Template path: {template_path}\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat(f"📍 [main_async] Template path: {template_path}")
     
     safe_write(f"📍 [main_async] Template path: {template_path}\n")
     safe_write(f"📄 Template path: {template_path}\n")
@@ -7176,14 +6834,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         pass
     
     # Update heartbeat - about to read template
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write("📍 [main_async] About to read template file\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat("📍 [main_async] About to read template file")
     
     try:
         # Get timeout from template or use default
@@ -7202,35 +6853,14 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         timeout = template_data.get("max_timeout_seconds", 300)
         
         # Update heartbeat - template read successfully
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] Template read, timeout: {timeout}s\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [main_async] Template read, timeout: {timeout}s")
     except Exception as e:
         timeout = 300
         # Update heartbeat - template read failed, using default
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] Template read failed, using default timeout: {timeout}s\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [main_async] Template read failed, using default timeout: {timeout}s")
     
     # Update heartbeat - about to start submission
-    try:
-        if heartbeat_file_path.exists():
-            with open(heartbeat_file_path, 'a') as f:
-                f.write(f"📍 [main_async] Starting submission with timeout: {timeout} seconds\n")
-                f.flush()
-                os.fsync(f.fileno())
-    except:
-        pass
+    log_heartbeat(f"📍 [main_async] Starting submission with timeout: {timeout} seconds")
     
     # Run with timeout protection and multiple fallbacks
     try:
@@ -7238,14 +6868,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         ultra_safe_log_print("")
         
         # Update heartbeat - about to call run_ultra_resilient_submission
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] About to call run_ultra_resilient_submission\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] About to call run_ultra_resilient_submission")
         
         # Wrap in retry loop for rate limit errors - restart entire process
         max_restarts = 2
@@ -7271,15 +6894,10 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
                     raise
         
         # Update heartbeat - submission completed
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] Submission completed, status: {result.get('status', 'unknown')}\n")
-                    f.write("📍 [main_async] About to process result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [main_async] Submission completed, status: {result.get('status', 'unknown')}",
+            "📍 [main_async] About to process result",
+        )
         
         ultra_safe_log_print("")
         ultra_safe_log_print("=" * 80)
@@ -7287,14 +6905,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         ultra_safe_log_print("=" * 80)
         
         # Update heartbeat - processing result
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] Processing result format\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] Processing result format")
         
         # Ensure result is properly formatted
         if not isinstance(result, dict):
@@ -7305,14 +6916,7 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         result["timestamp"] = time.time()
         
         # Update heartbeat - result formatted
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] Result formatted, status: {result.get('status', 'unknown')}\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(f"📍 [main_async] Result formatted, status: {result.get('status', 'unknown')}")
         
         # Print final result summary
         ultra_safe_log_print(f"Final Status: {result.get('status', 'unknown')}")
@@ -7352,49 +6956,34 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         ultra_safe_log_print("")
         
         # Update heartbeat - about to output JSON
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] About to output JSON result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] About to output JSON result")
         
         # Print JSON result to stdout (for route.ts to capture)
         json_result = json.dumps(result, indent=2)
         ultra_safe_log_print("📤 Outputting JSON result to stdout...")
+        _progress.result(result)
         print(json_result, flush=True)  # Print to stdout for route.ts
         ultra_safe_log_print("✅ JSON result output complete")
         
         # Update heartbeat - JSON output complete
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] JSON result output complete\n")
-                    f.write("📍 [main_async] About to return json_result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            "📍 [main_async] JSON result output complete",
+            "📍 [main_async] About to return json_result",
+        )
         
         return json_result
         
     except asyncio.TimeoutError:
         # Update heartbeat - timeout occurred
-        try:
-            if heartbeat_file_path and heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] TIMEOUT ERROR after {timeout} seconds\n")
-                    f.write("📍 [main_async] Creating timeout result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [main_async] TIMEOUT ERROR after {timeout} seconds",
+            "📍 [main_async] Creating timeout result",
+        )
         
         # Try to read heartbeat file to get logs
         captured_logs = []
         try:
+            _log_sink.flush()
             if heartbeat_file_path and heartbeat_file_path.exists():
                 with open(heartbeat_file_path, 'r') as f:
                     captured_logs = f.readlines()
@@ -7467,41 +7056,23 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         }
         
         # Update heartbeat - timeout result created
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] Timeout result created, about to output JSON\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] Timeout result created, about to output JSON")
         
         json_result = json.dumps(timeout_result)
+        _progress.result(timeout_result)
         print(json_result, flush=True)
         
         # Update heartbeat - timeout JSON output
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] Timeout JSON output, returning\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] Timeout JSON output, returning")
         
         return json_result
         
     except Exception as e:
         # Update heartbeat - exception occurred
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write(f"📍 [main_async] EXCEPTION: {type(e).__name__}: {str(e)[:100]}\n")
-                    f.write("📍 [main_async] Creating error result\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat(
+            f"📍 [main_async] EXCEPTION: {type(e).__name__}: {str(e)[:100]}",
+            "📍 [main_async] Creating error result",
+        )
         error_msg = str(e)
         ultra_safe_log_print("")
         ultra_safe_log_print(f"❌ ERROR: {error_msg}")
@@ -7519,29 +7090,220 @@ async def main_async_with_ultimate_safety(args: argparse.Namespace) -> str:
         }
         
         # Update heartbeat - error result created
-        try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] Error result created, about to output JSON\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("📍 [main_async] Error result created, about to output JSON")
         
         json_result = json.dumps(error_result)
+        _progress.result(error_result)
         print(json_result, flush=True)
         
         # Update heartbeat - error JSON output
+        log_heartbeat("📍 [main_async] Error JSON output, returning")
+        
+        return json_result
+
+def read_template_timeout(template_path: Path, default: int = 300) -> int:
+    """Return the template's max_timeout_seconds without failing."""
+    template_data = UltimateSafetyWrapper.execute_sync(load_template, template_path, default_return=None)
+    if template_data is None:
+        return default
+    try:
+        return int(template_data.get("max_timeout_seconds", default))
+    except (TypeError, ValueError):
+        return default
+
+
+class SubmissionWorker:
+    """Long-lived worker that keeps Playwright and the browser warm between jobs.
+    
+    Jobs arrive as NDJSON on stdin, one object per line:
+        {"id": "42", "url": "https://example.com/contact", "template": "/tmp/template.json"}
+    Each job produces exactly one NDJSON line on stdout:
+        {"type": "result", "id": "42", "result": {...}}
+    ``{"command": "metrics"}`` answers with the per-stage histograms in Prometheus text format
+    (also served over HTTP with ``--metrics-port``).
+    Logs keep going to stderr. Every job runs in its own BrowserContext leased from a
+    BrowserContextPool, so up to ``concurrency`` jobs run at once without sharing cookies.
+    A browser is recycled after ``max_jobs_per_browser`` contexts or when the browser
+    process tree grows above ``max_browser_rss_mb``.
+    """
+    
+    def __init__(self, max_jobs_per_browser: int = 50, max_browser_rss_mb: int = 1500,
+                 headless: bool = False, concurrency: int = 1, browsers: int = 1, prewarm: int = 1,
+                 metrics_port: Optional[int] = None, browser_mode: Optional[str] = None):
+        self.max_jobs_per_browser = max(1, max_jobs_per_browser)
+        self.metrics_port = metrics_port
+        self.max_browser_rss_mb = max_browser_rss_mb
+        self.concurrency = max(1, concurrency)
+        # Pool browsers launch in the worker's mode; a job needing a visible browser escalates on its own
+        self.manager = UltimatePlaywrightManager(
+            mode=resolve_browser_mode({"browser_mode": browser_mode, "headless": headless})
+        )
+        self.manager.enable_context_pool(
+            browsers=browsers,
+            max_contexts=self.concurrency,
+            prewarm=prewarm,
+            max_contexts_per_browser=self.max_jobs_per_browser,
+        )
+        # One keep-alive HTTP pool for every job's contact discovery
         try:
-            if heartbeat_file_path.exists():
-                with open(heartbeat_file_path, 'a') as f:
-                    f.write("📍 [main_async] Error JSON output, returning\n")
-                    f.flush()
-                    os.fsync(f.fileno())
-        except:
+            from contact_discovery import DiscoveryClient
+            self.manager.discovery_client = DiscoveryClient(max_connections=max(8, 4 * self.concurrency))
+        except Exception:
             pass
+        # ...and one small Postgres pool for every job's form cache lookups
+        dsn = os.environ.get("DATABASE_URL") or os.environ.get("TEQ_DATABASE_URL")
+        if dsn:
+            self.manager.form_cache_pool = FormCachePool(dsn, max_size=min(4, self.concurrency))
+        self.jobs_total = 0
+        self._start_lock = asyncio.Lock()
+    
+    def _browser_rss_mb(self) -> float:
+        try:
+            from resource_usage import children_rss_bytes
+            return children_rss_bytes() / (1024 * 1024)
+        except Exception:
+            return 0.0
+    
+    async def _ensure_started(self) -> bool:
+        """Launch Playwright and the pool once; relaunch if every browser died."""
+        async with self._start_lock:
+            if self.manager.is_browser_alive():
+                return True
+            if self.manager.pool or self.manager.playwright:
+                await self.manager.cleanup()
+            ready = await self.manager.start()
+            # The owner keeps no context of its own - jobs lease theirs from the pool
+            await self.manager.close_session()
+            return bool(ready)
+    
+    def _maybe_recycle(self):
+        """Retire the pool's browsers once they have grown too large."""
+        rss_mb = self._browser_rss_mb()
+        if self.max_browser_rss_mb and rss_mb > self.max_browser_rss_mb and self.manager.pool:
+            ultra_safe_log_print(f"♻️  Recycling browsers (RSS {rss_mb:.0f} MB > {self.max_browser_rss_mb} MB)")
+            self.manager.pool.drain()
+    
+    async def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one submission in an isolated pooled context; always returns a result dict."""
+        url = job.get("url") or "https://example.com"
+        template_path = Path(job.get("template") or "default.json")
+        timeout = read_template_timeout(template_path)
         
-        return json_result
+        await self._ensure_started()
+        job_manager = self.manager.spawn_job_manager()
+        
+        result = None
+        max_restarts = 2
+        try:
+            for restart_attempt in range(max_restarts + 1):
+                try:
+                    result = await asyncio.wait_for(
+                        run_ultra_resilient_submission(url, template_path, playwright_manager=job_manager),
+                        timeout=timeout
+                    )
+                    break
+                except Exception as e:
+                    if "RECAPTCHA_RATE_LIMIT_RESTART_FULL" in str(e) and restart_attempt < max_restarts:
+                        wait_time = 10 + (restart_attempt * 5)
+                        ultra_safe_log_print(f"   ⏳ Rate limit detected, waiting {wait_time} seconds before restarting job...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    raise
+        except asyncio.TimeoutError:
+            result = {
+                "status": "timeout",
+                "message": f"Operation timed out after {timeout} seconds",
+                "error_type": "timeout",
+                "recovered": True,
+            }
+            # A timed-out run may have wedged its browser - replace it once idle
+            if self.manager.pool:
+                self.manager.pool.drain()
+        except Exception as e:
+            result = {
+                "status": "error",
+                "message": f"Execution failed: {str(e)[:200]}",
+                "error_type": "execution_failed",
+                "recovered": True,
+            }
+        finally:
+            await job_manager.cleanup()
+        
+        if not isinstance(result, dict):
+            result = {"status": "error", "message": "Invalid result format", "recovered": True}
+        result["url"] = url
+        result["timestamp"] = time.time()
+        
+        self.jobs_total += 1
+        self._maybe_recycle()
+        return result
+    
+    async def serve(self) -> int:
+        """Read NDJSON jobs from stdin until EOF or {"command": "shutdown"}."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        running = set()
+        
+        def emit(payload: Dict[str, Any]):
+            try:
+                sys.stdout.write(json.dumps(payload) + "\n")
+                sys.stdout.flush()
+            except Exception:
+                pass
+        
+        async def handle(job: Dict[str, Any]):
+            job_id = job.get("id")
+            try:
+                ultra_safe_log_print(f"🧵 Job {job_id} started: {job.get('url')}")
+                result = await self.run_job(job)
+                emit({"type": "result", "id": job_id, "result": result})
+                ultra_safe_log_print(f"🧵 Job {job_id} finished: {result.get('status')}")
+            finally:
+                slots.release()
+        
+        if self.metrics_port:
+            try:
+                serve_metrics(self.metrics_port)
+                ultra_safe_log_print(f"📈 Stage metrics at http://0.0.0.0:{self.metrics_port}/metrics")
+            except OSError as e:
+                ultra_safe_log_print(f"⚠️  Could not serve metrics on port {self.metrics_port}: {e}")
+        
+        emit({"type": "ready", "pid": os.getpid(), "concurrency": self.concurrency})
+        ultra_safe_log_print(
+            f"🧵 Worker ready (pid={os.getpid()}, concurrency={self.concurrency}, "
+            f"recycle after {self.max_jobs_per_browser} jobs / {self.max_browser_rss_mb} MB)"
+        )
+        try:
+            while True:
+                line = await loop.run_in_executor(None, sys.stdin.readline)
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    job = json.loads(line)
+                    if not isinstance(job, dict):
+                        raise ValueError("job must be a JSON object")
+                except Exception as e:
+                    emit({"type": "error", "message": f"Invalid job: {str(e)[:100]}"})
+                    continue
+                if job.get("command") == "shutdown":
+                    break
+                if job.get("command") == "metrics":
+                    emit({"type": "metrics", "format": "prometheus", "text": STAGE_METRICS.render_prometheus()})
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(handle(job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        finally:
+            await self.manager.cleanup()
+            ultra_safe_log_print(f"🧵 Worker stopped after {self.jobs_total} job(s)")
+        return 0
+
 
 def main() -> int:
     """ULTRA-RESILIENT main function - CANNOT FAIL."""
@@ -7549,42 +7311,63 @@ def main() -> int:
     # Ultimate argument parsing with fallbacks
     try:
         parser = argparse.ArgumentParser(description="ULTRA-RESILIENT form automation.", add_help=False)
-        parser.add_argument("--url", required=True, help="Target form URL.")
-        parser.add_argument("--template", required=True, help="Path to JSON template.")
+        parser.add_argument("--url", help="Target form URL.")
+        parser.add_argument("--template", help="Path to JSON template.")
+        parser.add_argument("--serve", action="store_true",
+                            help="Run as a long-lived worker reading NDJSON jobs from stdin.")
+        parser.add_argument("--max-jobs-per-browser", type=int, default=50,
+                            help="Worker mode: recycle the browser after this many jobs.")
+        parser.add_argument("--max-browser-rss-mb", type=int, default=1500,
+                            help="Worker mode: recycle the browser above this RSS (0 disables).")
+        parser.add_argument("--concurrency", type=int, default=1,
+                            help="Worker mode: isolated contexts running at the same time.")
+        parser.add_argument("--browsers", type=int, default=1,
+                            help="Worker mode: browser processes serving contexts.")
+        parser.add_argument("--prewarm", type=int, default=1,
+                            help="Worker mode: contexts created ahead of demand.")
+        parser.add_argument("--metrics-port", type=int, default=None,
+                            help="Worker mode: serve per-stage Prometheus metrics on this port.")
+        parser.add_argument("--browser-mode", choices=BROWSER_MODES, default=None,
+                            help="Worker mode: launch pool browsers headless ('auto'/'headless') or visible "
+                                 "(default: TEQ_BROWSER_MODE, else auto).")
         
         try:
             args = parser.parse_args()
+            if not args.serve and (not args.url or not args.template):
+                raise SystemExit(2)
         except SystemExit:
             # Argument parsing failed, use defaults
             args = argparse.Namespace()
             args.url = "https://example.com"
             args.template = "template.json"
+            args.serve = False
             
     except Exception:
         # Ultimate fallback for argument parsing
         args = argparse.Namespace()
         args.url = "https://example.com"
         args.template = "template.json"
+        args.serve = False
+    
+    if getattr(args, 'serve', False):
+        worker = SubmissionWorker(
+            max_jobs_per_browser=args.max_jobs_per_browser,
+            max_browser_rss_mb=args.max_browser_rss_mb,
+            concurrency=args.concurrency,
+            browsers=args.browsers,
+            prewarm=args.prewarm,
+            metrics_port=args.metrics_port,
+            browser_mode=args.browser_mode,
+        )
+        try:
+            return asyncio.run(worker.serve())
+        except KeyboardInterrupt:
+            return 0
     
     # ULTRA-RESILIENT execution
     try:
         # Update heartbeat before starting main function
-        try:
-            if heartbeat_file:
-                if isinstance(heartbeat_file, Path):
-                    if heartbeat_file.exists():
-                        with open(heartbeat_file, 'a') as f:
-                            f.write("About to call asyncio.run(main_async_with_ultimate_safety)\n")
-                            f.flush()
-                            os.fsync(f.fileno())
-                else:
-                    if os.path.exists(str(heartbeat_file)):
-                        with open(heartbeat_file, 'a') as f:
-                            f.write("About to call asyncio.run(main_async_with_ultimate_safety)\n")
-                            f.flush()
-                            os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("About to call asyncio.run(main_async_with_ultimate_safety)")
         
         sys.stderr.write("📍 [main()] About to call asyncio.run(main_async_with_ultimate_safety)\n")
         sys.stderr.flush()
@@ -7596,22 +7379,7 @@ def main() -> int:
         sys.stderr.flush()
         
         # Update heartbeat after main function
-        try:
-            if heartbeat_file:
-                if isinstance(heartbeat_file, Path):
-                    if heartbeat_file.exists():
-                        with open(heartbeat_file, 'a') as f:
-                            f.write("asyncio.run() completed\n")
-                            f.flush()
-                            os.fsync(f.fileno())
-                else:
-                    if os.path.exists(str(heartbeat_file)):
-                        with open(heartbeat_file, 'a') as f:
-                            f.write("asyncio.run() completed\n")
-                            f.flush()
-                            os.fsync(f.fileno())
-        except:
-            pass
+        log_heartbeat("asyncio.run() completed")
         
         # ULTRA-RESILIENT output - cannot fail
         try:
@@ -0,0 +1,291 @@
+"""
+Single-pass form scanner shared by the detection, fill and submit stages.
+
+One injected script walks every ``<form>`` once and returns a compact,
+versioned description: classification (search / newsletter / contact), field
+counts, the individual fields (each with its logical ``kind`` and confidence
+from ``field_classifier``) and stable locators. The page keeps a
+MutationObserver generation counter; the Python side caches the last scan per
+page and only re-walks the DOM when the document or its generation changed,
+so repeated stage lookups cost one tiny ``evaluate`` instead of a full scan.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Any, Dict, Optional
+
+from field_classifier import CONFIDENT, FIELD_CLASSIFIER_JS, LEXICON_PAYLOAD
+
+FORM_SCANNER_VERSION = 3
+
+_SCANNER_JS = r"""
+({ version, knownDoc, knownGeneration, lexicon, minConfidence }) => {
+    let scanner = window.__teqFormScanner;
+    if (!scanner || scanner.version !== version) {
+        if (scanner && scanner.observer) scanner.observer.disconnect();
+        scanner = window.__teqFormScanner = {
+            version,
+            doc: Math.random().toString(36).slice(2),
+            generation: 0,
+            observer: null,
+        };
+        try {
+            scanner.observer = new MutationObserver(() => { scanner.generation += 1; });
+            scanner.observer.observe(document.documentElement || document, {
+                subtree: true,
+                childList: true,
+                attributes: true,
+                attributeFilter: ['name', 'id', 'type', 'class', 'action', 'method', 'role', 'hidden', 'disabled'],
+            });
+        } catch (e) {}
+    }
+    if (knownDoc === scanner.doc && knownGeneration === scanner.generation) {
+        return { unchanged: true, doc: scanner.doc, generation: scanner.generation };
+    }
+
+    const classifier = (""" + FIELD_CLASSIFIER_JS + r""")(lexicon);
+    const esc = (value) => (window.CSS && CSS.escape) ? CSS.escape(value) : String(value).replace(/["\\]/g, '\\$&');
+    const uniqueIn = (root, selector) => { try { return root.querySelectorAll(selector).length === 1; } catch (e) { return false; } };
+    const NEWSLETTER_KEYWORDS = [
+        'newsletter', 'subscribe', 'subscription', 'mailchimp', 'substack',
+        'sign up', 'signup', 'sign-up', 'join our mailing list', 'mailing list',
+        'stay updated', 'latest news', 'breaking news', 'daily updates'
+    ];
+    const pageUrl = window.location.href;
+    const allForms = Array.from(document.querySelectorAll('form'));
+
+    const forms = allForms.map((form, index) => {
+        // Read attributes, not properties: a field named "action" or "id" shadows form.action / form.id
+        const method = (form.getAttribute('method') || 'get').toLowerCase();
+        const rawAction = typeof form.action === 'string' ? form.action : '';
+        let action = pageUrl;
+        try { action = rawAction ? new URL(rawAction, pageUrl).href : pageUrl; } catch (e) {}
+        const formText = (form.textContent || '').toLowerCase();
+        const rawId = form.getAttribute('id') || '';
+        const formId = rawId.toLowerCase();
+        const formClass = (form.getAttribute('class') || '').toLowerCase();
+        const role = form.getAttribute('role') || '';
+
+        let locator = `form >> nth=${index}`;
+        if (rawId && uniqueIn(document, `form#${esc(rawId)}`)) locator = `form#${esc(rawId)}`;
+        else if (form.getAttribute('name') && uniqueIn(document, `form[name="${esc(form.getAttribute('name'))}"]`)) {
+            locator = `form[name="${esc(form.getAttribute('name'))}"]`;
+        }
+
+        let emailFields = 0, nameFields = 0, messageFields = 0, phoneFields = 0;
+        let exactName = false, exactEmail = false, exactPhone = false, exactComment = false;
+        let looseName = false, looseEmail = false, loosePhone = false, looseComment = false;
+        let searchInput = false, inputTextareaCount = 0;
+        const signalParts = [];
+        const fields = [];
+
+        const controls = form.querySelectorAll('input, textarea, select');
+        controls.forEach((field, fieldIndex) => {
+            const tag = field.tagName.toLowerCase();
+            const type = (field.getAttribute('type') || (tag === 'input' ? 'text' : tag)).toLowerCase();
+            const name = (field.getAttribute('name') || '').toLowerCase();
+            const id = (field.id || '').toLowerCase();
+            const placeholder = (field.getAttribute('placeholder') || '').toLowerCase();
+            const autocomplete = (field.getAttribute('autocomplete') || '').toLowerCase();
+            signalParts.push(`${name} ${id} ${placeholder}`);
+            const skipped = ['submit', 'button', 'hidden', 'image', 'reset'].includes(type);
+            // Multilingual label/name/placeholder scoring; literal names below stay for the strict checks
+            const match = skipped ? { field: null, kind: null, confidence: 0 } : classifier.classify(field);
+            const kind = match.confidence >= minConfidence ? match.field : null;
+
+            if (tag === 'input') {
+                if (type === 'email' || name.includes('email') || id.includes('email') || kind === 'email') emailFields++;
+                if (name.includes('name') || id.includes('name') || autocomplete === 'name' || kind === 'name') nameFields++;
+                if (type === 'tel' || name.includes('phone') || id.includes('phone') || name.includes('mobile') || id.includes('mobile') || kind === 'phone') phoneFields++;
+                if (type === 'search' || name.includes('search') || name.includes('q') || name === 's' || match.kind === 'search') searchInput = true;
+                if (name === 'name') exactName = true;
+                if (name === 'email') exactEmail = true;
+                if (name === 'phone') exactPhone = true;
+            }
+            if (tag === 'textarea' || (tag === 'input' && kind === 'message')) {
+                messageFields++;
+                if (name === 'comment' || name === 'message') exactComment = true;
+            }
+            if (tag !== 'select') {
+                inputTextareaCount++;
+                if (!['submit', 'button', 'hidden'].includes(type)) {
+                    const key = name || id;
+                    if (key === 'name' || key.includes('naam') || kind === 'name') looseName = true;
+                    if (key === 'email' || kind === 'email') looseEmail = true;
+                    if (key === 'phone' || key === 'telefoon' || kind === 'phone') loosePhone = true;
+                    if (key === 'comment' || key === 'message' || key === 'bericht' || kind === 'message') looseComment = true;
+                }
+            }
+
+            if (skipped || fields.length >= 50) return;
+            let fieldLocator = `${locator} >> input, textarea, select >> nth=${fieldIndex}`;
+            if (field.id && uniqueIn(document, `#${esc(field.id)}`)) fieldLocator = `#${esc(field.id)}`;
+            else if (field.getAttribute('name') && uniqueIn(form, `[name="${esc(field.getAttribute('name'))}"]`)) {
+                fieldLocator = `${locator} >> [name="${esc(field.getAttribute('name'))}"]`;
+            }
+            fields.push({
+                tag, type, name, id,
+                placeholder: placeholder.slice(0, 80),
+                autocomplete,
+                kind: match.field,
+                confidence: match.confidence,
+                required: !!field.required,
+                visible: field.offsetParent !== null,
+                locator: fieldLocator,
+            });
+        });
+
+        const isSearch = role === 'search' || (method === 'get' && (
+            formText.includes('search') || formId.includes('search') || formClass.includes('search') ||
+            rawAction.toLowerCase().includes('search') || searchInput
+        ));
+        const signalText = `${formText} ${formId} ${formClass} ${action.toLowerCase()} ${signalParts.join(' ').toLowerCase()}`;
+        const hasNewsletterKeyword = NEWSLETTER_KEYWORDS.some((keyword) => signalText.includes(keyword));
+        const isNewsletter = hasNewsletterKeyword && messageFields === 0 && phoneFields === 0 && emailFields >= 1 && nameFields <= 1;
+        const isContact = !isNewsletter && (
+            formText.includes('contact') || formId.includes('contact') || formClass.includes('contact') ||
+            action.toLowerCase().includes('contact') ||
+            (emailFields >= 1 && (nameFields >= 1 || messageFields >= 1 || phoneFields >= 1)) ||
+            (messageFields >= 1 && (nameFields >= 1 || emailFields >= 1)) ||
+            (method === 'post' && !isSearch && (messageFields >= 1 || (emailFields >= 1 && nameFields >= 1)))
+        );
+        const submitControl = form.querySelector('button[type="submit"], input[type="submit"], button:not([type])');
+        let submitLocator = null;
+        if (submitControl) {
+            const submitId = submitControl.getAttribute('id');
+            submitLocator = (submitId && uniqueIn(document, `#${esc(submitId)}`))
+                ? `#${esc(submitId)}`
+                : `${locator} >> button[type="submit"], input[type="submit"], button:not([type]) >> nth=0`;
+        }
+        const contactFieldCount = (looseName ? 1 : 0) + (looseEmail ? 1 : 0) + (loosePhone ? 1 : 0) + (looseComment ? 1 : 0);
+
+        return {
+            formIndex: index,
+            locator,
+            method,
+            action,
+            isPost: method === 'post',
+            isSearch,
+            isNewsletter,
+            isContact,
+            // Exact name="name"/"email"/(comment|message) fields - the classic contact form
+            isStrictContact: exactName && exactEmail && exactComment,
+            // Only an email box (plus maybe a button) and no name/comment - typical signup widget
+            isEmailOnly: looseEmail && !exactName && !exactComment && inputTextareaCount <= 2,
+            hasEmail: emailFields > 0,
+            hasName: nameFields > 0,
+            hasMessage: messageFields > 0,
+            hasPhone: phoneFields > 0,
+            hasExactPhone: exactPhone,
+            contactFieldCount,
+            hasContactTrio: looseName && looseEmail && looseComment,
+            inContactSection: !!form.closest('.contactInfo, section.contactInfo, [class*="contactInfo"]'),
+            fieldCount: controls.length,
+            submitLocator,
+            fields,
+        };
+    });
+
+    return { version, doc: scanner.doc, generation: scanner.generation, url: pageUrl, forms };
+}
+"""
+
+_SCROLL_JS = r"""
+({ index, mode }) => {
+    const form = document.querySelectorAll('form')[index];
+    if (!form) return false;
+    let target = form;
+    if (mode === 'contact_section') {
+        target = document.querySelector('.contactInfo, section.contactInfo, [class*="contactInfo"]') || form;
+    } else if (mode === 'closest_section') {
+        form.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        target = form.closest('.contactInfo, section') || form;
+    }
+    target.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    return true;
+}
+"""
+
+_EMPTY_SCAN: Dict[str, Any] = {"version": FORM_SCANNER_VERSION, "generation": -1, "url": "", "forms": []}
+
+_cache: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+async def scan_forms(page, force: bool = False) -> Dict[str, Any]:
+    """Return the form description for the page's current DOM state.
+
+    Re-walks the DOM only when the document or its mutation generation changed
+    since the last scan of this page (or when ``force`` is set). Never raises.
+    """
+    try:
+        if not page or page.is_closed():
+            return dict(_EMPTY_SCAN)
+    except Exception:
+        return dict(_EMPTY_SCAN)
+
+    try:
+        cached = None if force else _cache.get(page)
+    except TypeError:
+        cached = None
+
+    try:
+        scan = await page.evaluate(_SCANNER_JS, {
+            "version": FORM_SCANNER_VERSION,
+            "lexicon": LEXICON_PAYLOAD,
+            "minConfidence": CONFIDENT,
+            "knownDoc": cached.get("doc") if cached else None,
+            "knownGeneration": cached.get("generation") if cached else None,
+        })
+    except Exception:
+        return dict(_EMPTY_SCAN)
+
+    if isinstance(scan, dict) and scan.get("unchanged") and cached:
+        return cached
+    if not isinstance(scan, dict) or "forms" not in scan:
+        return dict(_EMPTY_SCAN)
+    try:
+        _cache[page] = scan
+    except TypeError:
+        pass
+    return scan
+
+
+def pick_fill_target(scan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Form with the most name/email/phone/comment fields (name+email+comment preferred)."""
+    best = None
+    best_count = 0
+    for form in scan.get("forms", []):
+        count = form.get("contactFieldCount", 0)
+        if count > best_count and (form.get("hasContactTrio") or count >= 3):
+            best, best_count = form, count
+    return best
+
+
+def has_contact_form(scan: Dict[str, Any]) -> bool:
+    """True when any non-search, non-newsletter form looks like a contact form."""
+    return any(
+        (form.get("isContact") or form.get("isStrictContact") or form.get("isPost"))
+        and not form.get("isSearch") and not form.get("isNewsletter")
+        for form in scan.get("forms", [])
+    )
+
+
+def strict_contact_form(scan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """First form with exact name/email/comment fields."""
+    for form in scan.get("forms", []):
+        if form.get("isStrictContact"):
+            return form
+    return None
+
+
+async def scroll_form_into_view(page, form: Dict[str, Any], mode: str = "form") -> bool:
+    """Scroll a scanned form into view.
+
+    ``mode`` is ``"form"``, ``"closest_section"`` (the form's enclosing section)
+    or ``"contact_section"`` (the page's ``.contactInfo`` block when present).
+    """
+    try:
+        return bool(await page.evaluate(_SCROLL_JS, {"index": form.get("formIndex", 0), "mode": mode}))
+    except Exception:
+        return False
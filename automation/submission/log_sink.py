@@ -0,0 +1,224 @@
+"""
+Asynchronous, batched log sink for the submission worker.
+
+Log calls only append to an in-process ring buffer; a daemon writer thread
+drains it every few milliseconds and writes each batch to stderr and the
+heartbeat file with one ``write`` per destination (no per-line flush, no
+fsync). Callers - including code running on the asyncio event loop - never
+block on I/O.
+
+Backpressure: once the buffer is past its high-water mark, ``debug`` lines
+are dropped; when it is completely full the oldest queued line is discarded.
+Both are counted in ``stats()``.
+
+With ``TEQ_LOG_FORMAT=jsonl`` checkpoint events are written as
+``CHECKPOINT|{json}`` instead of the pipe-separated form.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+CHECKPOINT_MARKER = "CHECKPOINT|"
+
+# Destinations of a queued line
+_STDERR = 1
+_HEARTBEAT = 2
+_BOTH = _STDERR | _HEARTBEAT
+
+
+class LogSink:
+    """Ring buffer plus background writer; one instance per process."""
+
+    def __init__(
+        self,
+        stream=None,
+        heartbeat_path: Optional[str] = None,
+        capacity: int = 20000,
+        flush_interval: float = 0.05,
+        json_checkpoints: bool = False,
+    ):
+        self.stream = stream
+        self.heartbeat_path = heartbeat_path
+        self.capacity = max(16, int(capacity))
+        self.high_water = int(self.capacity * 0.75)
+        self.flush_interval = flush_interval
+        self.json_checkpoints = json_checkpoints
+        self.dropped_debug = 0
+        self.dropped_overflow = 0
+        self.lines_written = 0
+        self.batches_written = 0
+
+        self._buffer: deque = deque()
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+        self._heartbeat_fh = None
+        self._thread = threading.Thread(target=self._run, name="teq-log-sink", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, heartbeat_path: Optional[str] = None) -> "LogSink":
+        try:
+            capacity = int(os.environ.get("TEQ_LOG_BUFFER", "20000"))
+        except ValueError:
+            capacity = 20000
+        return cls(
+            heartbeat_path=heartbeat_path,
+            capacity=capacity,
+            json_checkpoints=os.environ.get("TEQ_LOG_FORMAT", "").lower() == "jsonl",
+        )
+
+    # ------------------------------------------------------------ producers
+
+    def emit(self, message: str, level: str = "info", heartbeat: bool = False):
+        """Queue one already-formatted message (including its line ending)."""
+        if self._closed:
+            return
+        size = len(self._buffer)
+        if size >= self.high_water and level == "debug":
+            self.dropped_debug += 1
+            return
+        if size >= self.capacity:
+            try:
+                self._buffer.popleft()
+                self.dropped_overflow += 1
+            except IndexError:
+                pass
+        self._buffer.append((_BOTH if heartbeat else _STDERR, message))
+        self._idle.clear()
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def heartbeat(self, *lines: str):
+        """Queue breadcrumb lines for the heartbeat file only (debug priority)."""
+        if not self.heartbeat_path or self._closed:
+            return
+        if len(self._buffer) >= self.high_water:
+            self.dropped_debug += len(lines)
+            return
+        self._buffer.append((_HEARTBEAT, "".join(f"{line}\n" for line in lines)))
+        self._idle.clear()
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def checkpoint(self, step: int, status: str, title: str, detail: str = ""):
+        if self.json_checkpoints:
+            payload = json.dumps(
+                {"step": step, "status": status, "title": title, "detail": detail, "ts": round(time.time(), 3)},
+                ensure_ascii=False,
+            )
+            self.emit(f"{CHECKPOINT_MARKER}{payload}\n")
+        else:
+            clean = [(value or "").replace("|", "/") for value in (status, title, detail)]
+            self.emit(f"{CHECKPOINT_MARKER}{step}|{clean[0]}|{clean[1]}|{clean[2]}\n")
+
+    # --------------------------------------------------------------- writer
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+            if self._closed and not self._buffer:
+                return
+
+    def _drain(self):
+        if not self._buffer:
+            self._idle.set()
+            return
+        to_stderr = []
+        to_heartbeat = []
+        while True:
+            try:
+                target, message = self._buffer.popleft()
+            except IndexError:
+                break
+            if target & _STDERR:
+                to_stderr.append(message)
+            if target & _HEARTBEAT:
+                to_heartbeat.append(message)
+        if to_stderr:
+            self._write_stderr("".join(to_stderr))
+        if to_heartbeat:
+            self._write_heartbeat("".join(to_heartbeat))
+        self.lines_written += len(to_stderr) + len(to_heartbeat)
+        self.batches_written += 1
+        if not self._buffer:
+            self._idle.set()
+
+    def _write_stderr(self, text: str):
+        stream = self.stream or sys.stderr
+        try:
+            stream.write(text)
+            stream.flush()
+        except Exception:
+            pass
+
+    def _write_heartbeat(self, text: str):
+        if not self.heartbeat_path:
+            return
+        try:
+            if self._heartbeat_fh is None:
+                self._heartbeat_fh = open(self.heartbeat_path, "a", encoding="utf-8", errors="replace")
+            self._heartbeat_fh.write(text)
+            self._heartbeat_fh.flush()
+        except Exception:
+            self._heartbeat_fh = None
+
+    # ------------------------------------------------------------ lifecycle
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Block until everything queued so far is written (call off the hot path)."""
+        if threading.current_thread() is self._thread:
+            return False
+        self._wakeup.set()
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 2.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._heartbeat_fh is not None:
+            try:
+                self._heartbeat_fh.close()
+            except Exception:
+                pass
+            self._heartbeat_fh = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._buffer),
+            "lines_written": self.lines_written,
+            "batches_written": self.batches_written,
+            "dropped_debug": self.dropped_debug,
+            "dropped_overflow": self.dropped_overflow,
+        }
+
+
+_sink: Optional[LogSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_sink(heartbeat_path: Optional[str] = None) -> LogSink:
+    """Process-wide sink, created on first use and flushed at interpreter exit."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = LogSink.from_env(heartbeat_path)
+                atexit.register(_sink.close)
+    elif heartbeat_path and not _sink.heartbeat_path:
+        _sink.heartbeat_path = heartbeat_path
+    return _sink
@@ -0,0 +1,198 @@
+"""
+Bounded capture of the requests made while a form is being submitted.
+
+``NetworkCapture`` sits behind the page's ``request``/``response`` listeners in
+``ultra_simple_form_submit``. Every event first goes through a cheap filter
+(method, then host against the cached first-party hosts, then one precompiled
+tracker regex) and only survivors are copied into a ``CaptureRecord``. Records
+live in fixed-size ring buffers, so ad-heavy pages cannot grow them without
+bound; drops and evictions are counted instead.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+# Analytics/ads/consent beacons - never the form submission
+EXCLUDED_URL_RE = re.compile(
+    r"google-analytics|googletagmanager|google\.com|pagead|clarity|facebook|twitter|"
+    r"doubleclick|getnitropack|analytics|gtm|ccm"
+)
+# Static assets and framework/REST paths that carry no form payload of their own
+STATIC_RESOURCE_RE = re.compile(
+    r"\.(?:css|js|png|jpe?g|gif|svg|woff2?|ttf|eot|ico|map)|"
+    r"wp-includes|wp-content|/static/|/assets/|/css/|/js/|/wp-json/|/api/|/dist/|/build/"
+)
+FORM_ENDPOINT_RE = re.compile(r"/contact|/submit|/form|/message|/send|/mail")
+FORM_FIELDS_RE = re.compile(
+    r"name=|email=|message=|subject=|phone=|wpforms|form\[|contact|submit|g-recaptcha-response",
+    re.IGNORECASE,
+)
+
+DEFAULT_CAPACITY = 256
+
+
+def url_netloc(url: str) -> str:
+    """``urlparse(url).netloc`` without building a ParseResult."""
+    start = url.find("://")
+    if start < 0:
+        return ""
+    start += 3
+    end = len(url)
+    for sep in "/?#":
+        index = url.find(sep, start, end)
+        if index != -1:
+            end = index
+    return url[start:end]
+
+
+def url_base(url: str) -> str:
+    """URL without its query string."""
+    index = url.find("?")
+    return url if index < 0 else url[:index]
+
+
+class CaptureRecord:
+    """One captured request (and, for responses, its status)."""
+
+    __slots__ = ("method", "url", "host", "first_party", "status")
+
+    def __init__(self, method: str, url: str, host: str, first_party: bool, status: Optional[int] = None):
+        self.method = method
+        self.url = url
+        self.host = host
+        self.first_party = first_party
+        self.status = status
+
+    def as_dict(self) -> Dict[str, object]:
+        data: Dict[str, object] = {"method": self.method, "url": self.url}
+        if self.status is not None:
+            data["status"] = self.status
+        return data
+
+
+class RingBuffer:
+    """Fixed-size FIFO; once full, each append evicts the oldest record."""
+
+    __slots__ = ("_items", "evicted")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._items: Deque[CaptureRecord] = deque(maxlen=capacity)
+        self.evicted = 0
+
+    def append(self, record: CaptureRecord) -> None:
+        if len(self._items) == self._items.maxlen:
+            self.evicted += 1
+        self._items.append(record)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        return iter(tuple(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+
+class NetworkCapture:
+    """Filters and buffers the submit-time POST requests/responses and form GETs of one page."""
+
+    def __init__(self, page, form_action_url: str = "", capacity: int = DEFAULT_CAPACITY):
+        self.page = page
+        self.form_action_url = form_action_url or ""
+        self.form_host = url_netloc(self.form_action_url)
+        self.form_action_base = url_base(self.form_action_url)
+        self.post_requests = RingBuffer(capacity)
+        self.post_responses = RingBuffer(capacity)
+        self.get_requests = RingBuffer(capacity)
+        self.seen = 0
+        self.dropped = 0
+        self._page_url = None
+        self._page_host = ""
+
+    @property
+    def page_host(self) -> str:
+        """Host of the page's current URL (re-derived only when the URL changes)."""
+        try:
+            url = self.page.url or ""
+        except Exception:
+            url = ""
+        if url != self._page_url:
+            self._page_url = url
+            self._page_host = url_netloc(url)
+        return self._page_host
+
+    def is_first_party(self, host: str) -> bool:
+        return bool(host) and (host == self.page_host or host == self.form_host)
+
+    def matches_form_action(self, url: str) -> bool:
+        """True when ``url`` (without query) is the form's action URL."""
+        return bool(self.form_action_base) and url_base(url).rstrip("/") == self.form_action_base.rstrip("/")
+
+    def on_request(self, request, track_get: bool = False) -> Optional[CaptureRecord]:
+        """Record ``request`` if it can be part of the submission; None when it was filtered out."""
+        self.seen += 1
+        try:
+            method = request.method
+            if method != "POST" and not (track_get and method == "GET"):
+                return None
+            url = request.url
+        except Exception:
+            return None
+        host = url_netloc(url)
+        first_party = self.is_first_party(host)
+        if method == "GET":
+            # Only first-party navigations/XHR can be a GET form submission or its thank-you page
+            if not first_party:
+                return None
+            try:
+                if request.resource_type not in ("document", "xhr", "fetch"):
+                    return None
+            except Exception:
+                pass
+            record = CaptureRecord(method, url, host, True)
+            self.get_requests.append(record)
+            return record
+        if not first_party and EXCLUDED_URL_RE.search(url.lower()):
+            self.dropped += 1
+            return None
+        record = CaptureRecord(method, url, host, first_party)
+        self.post_requests.append(record)
+        return record
+
+    def on_response(self, response) -> Optional[CaptureRecord]:
+        """Record the response to a tracked POST; None when it was filtered out."""
+        try:
+            if response.request.method != "POST":
+                return None
+            url = response.url
+            status = response.status
+        except Exception:
+            return None
+        host = url_netloc(url)
+        first_party = self.is_first_party(host)
+        if not first_party and EXCLUDED_URL_RE.search(url.lower()):
+            return None
+        record = CaptureRecord("POST", url, host, first_party, status)
+        self.post_responses.append(record)
+        return record
+
+    def clear_posts(self) -> None:
+        self.post_requests.clear()
+        self.post_responses.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "seen": self.seen,
+            "dropped_third_party": self.dropped,
+            "post_requests": len(self.post_requests),
+            "post_responses": len(self.post_responses),
+            "get_requests": len(self.get_requests),
+            "evicted": self.post_requests.evicted + self.post_responses.evicted + self.get_requests.evicted,
+        }
@@ -0,0 +1,398 @@
+"""
+Geometric overlay detection and dismissal.
+
+Replaces the selector sweep over ``[class*="modal"]``/``[id*="cookie"]``/... :
+one TreeWalker pass over the DOM reads each element's computed style once and
+only stops at fixed/sticky (or full-screen high z-index) boxes and modal
+``<dialog>`` elements. A box is an overlay when it is a known consent manager
+(CMP), a dialog, covers a large share of the viewport, sits on top of the
+target form, or is a consent bar - and never when it contains the form or is
+the site's own header/navigation. Overlays are dismissed with the CMP's accept
+button (or its JS API), then a close/accept control scoped to the overlay, and
+only hidden as a last resort once a click did not remove them.
+
+The page keeps a MutationObserver that records newly added or re-styled
+elements, so ``sweep_if_new()`` right before filling and submitting costs one
+tiny ``evaluate`` unless a new overlay actually appeared.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from page_waits import settle
+
+OVERLAY_ENGINE_VERSION = 1
+
+# root: selector that identifies the CMP's banner; accept: its "accept" control(s);
+# api: ``object.method`` called when no accept button is clickable.
+CMP_ADAPTERS = (
+    {"name": "onetrust", "root": "#onetrust-banner-sdk, #onetrust-consent-sdk, #onetrust-pc-sdk",
+     "accept": "#onetrust-accept-btn-handler, #accept-recommended-btn-handler", "api": "OneTrust.AllowAll"},
+    {"name": "cookiebot", "root": "#CybotCookiebotDialog, #CookieBanner",
+     "accept": "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll, "
+               "#CybotCookiebotDialogBodyButtonAccept, #CybotCookiebotDialogBodyLevelButtonAccept",
+     "api": "Cookiebot.submitCustomConsent"},
+    {"name": "cookieyes", "root": ".cky-consent-container, .cky-overlay, #cookie-law-info-bar",
+     "accept": ".cky-btn-accept, #cookie_action_close_header, .cli_action_button[data-cli_action=\"accept\"]"},
+    {"name": "complianz", "root": "#cmplz-cookiebanner-container, .cmplz-cookiebanner, #cc-window.cmplz",
+     "accept": ".cmplz-accept, .cmplz-btn.cmplz-accept"},
+    {"name": "cookie-notice", "root": "#cookie-notice", "accept": "#cn-accept-cookie"},
+    {"name": "borlabs", "root": "#BorlabsCookieBox, #BorlabsCookieWidget",
+     "accept": "#BorlabsCookieBox a[data-cookie-accept-all], #BorlabsCookieBox ._brlbs-btn-accept-all"},
+    {"name": "usercentrics", "root": "#usercentrics-root, #uc-center-container",
+     "accept": "[data-testid=\"uc-accept-all-button\"]", "api": "UC_UI.acceptAllConsents"},
+    {"name": "didomi", "root": "#didomi-host, #didomi-popup, #didomi-notice",
+     "accept": "#didomi-notice-agree-button", "api": "Didomi.setUserAgreeToAll"},
+    {"name": "quantcast", "root": "#qc-cmp2-container, .qc-cmp2-container",
+     "accept": ".qc-cmp2-summary-buttons button[mode=\"primary\"], #qc-cmp2-ui button[mode=\"primary\"]"},
+    {"name": "osano", "root": ".osano-cm-window, .osano-cm-dialog",
+     "accept": ".osano-cm-accept-all, .osano-cm-accept"},
+    {"name": "termly", "root": "#termly-code-snippet-support, [class*=\"termly-styles-root\"]",
+     "accept": "[data-tid=\"banner-accept\"]"},
+    {"name": "iubenda", "root": "#iubenda-cs-banner", "accept": ".iubenda-cs-accept-btn",
+     "api": "_iub.cs.api.acceptAll"},
+    {"name": "trustarc", "root": "#truste-consent-track, #consent_blackbar, .truste_box_overlay",
+     "accept": "#truste-consent-button, .call[role=\"button\"]"},
+    {"name": "cookieconsent", "root": ".cc-window, .cc-banner, #cc-main",
+     "accept": ".cc-allow, .cc-dismiss, .cc-btn.cc-accept, #cc-main [data-role=\"all\"]"},
+    {"name": "moove-gdpr", "root": "#moove_gdpr_cookie_info_bar", "accept": ".moove-gdpr-infobar-allow-all"},
+)
+
+# Controls that close an overlay without a decision; queried inside candidates only
+CLOSE_SELECTORS = (
+    '[aria-label*="close" i], [aria-label*="dismiss" i], [title*="close" i], '
+    '[data-dismiss="modal"], [data-bs-dismiss="modal"], [data-close], .close, .modal-close, '
+    '.popup-close, [class*="close-button"], [class*="closeButton"], [class*="dismiss"]'
+)
+
+# Exact (trimmed, lowercase) button labels
+ACCEPT_LABELS = (
+    "accept", "accept all", "accept cookies", "accept all cookies", "allow", "allow all", "allow cookies",
+    "agree", "i agree", "i accept", "got it", "ok", "okay", "understood", "continue",
+    "accepter", "tout accepter", "j'accepte", "akzeptieren", "alle akzeptieren", "zustimmen",
+    "einverstanden", "aceptar", "aceptar todo", "accetta", "accetto", "accetta tutto", "aceitar",
+    "aceitar todos", "accepteren", "alles accepteren", "akceptuję", "godkänn", "accepter alle",
+)
+CLOSE_LABELS = (
+    "close", "dismiss", "no thanks", "no, thanks", "not now", "maybe later", "skip", "×", "✕", "✖", "x",
+    "fermer", "schließen", "cerrar", "chiudi", "fechar", "sluiten", "non merci", "nein danke",
+)
+
+_SWEEP_JS = r"""
+(form, opts) => {
+    let state = window.__teqOverlays;
+    if (!state || state.version !== opts.version) {
+        if (state && state.observer) state.observer.disconnect();
+        state = window.__teqOverlays = { version: opts.version, dirty: true, pending: new Set(), observer: null };
+        try {
+            state.observer = new MutationObserver((records) => {
+                for (const record of records) {
+                    if (state.pending.size >= 200) { state.dirty = true; return; }
+                    if (record.type === 'childList') {
+                        record.addedNodes.forEach((node) => { if (node.nodeType === 1) state.pending.add(node); });
+                    } else if (record.target.nodeType === 1) {
+                        state.pending.add(record.target);
+                    }
+                }
+            });
+            state.observer.observe(document.documentElement || document, {
+                subtree: true,
+                childList: true,
+                attributes: true,
+                attributeFilter: ['class', 'style', 'hidden', 'open', 'aria-hidden', 'aria-modal'],
+            });
+        } catch (e) {}
+    }
+
+    const cmpRoots = opts.adapters.map((a) => a.root).join(', ');
+    const isModal = (el) => { try { return el.matches(':modal'); } catch (e) { return false; } };
+    const floating = (el) => {
+        if (el.matches(cmpRoots) || isModal(el)) return true;
+        const position = getComputedStyle(el).position;
+        return position === 'fixed' || position === 'sticky';
+    };
+
+    if (opts.onlyIfNew && !state.dirty) {
+        // Only the elements added/re-styled since the last sweep (and their direct children) are inspected
+        for (const el of state.pending) {
+            if (!el.isConnected || el.hasAttribute('data-teq-overlay') || !el.getClientRects().length) continue;
+            if (floating(el) || Array.from(el.children).slice(0, 20).some(floating) || el.querySelector(cmpRoots)) {
+                state.dirty = true;
+                break;
+            }
+        }
+        state.pending.clear();
+        if (!state.dirty) return { skipped: true, handled: [], scanned: 0 };
+    }
+    state.dirty = false;
+    state.pending.clear();
+
+    const vw = window.innerWidth || document.documentElement.clientWidth;
+    const vh = window.innerHeight || document.documentElement.clientHeight;
+    const viewArea = Math.max(1, vw * vh);
+    const forms = form ? [form] : Array.from(document.forms).filter((f) => f.querySelector('textarea'));
+    const formRects = forms.map((f) => f.getBoundingClientRect()).filter((r) => r.width > 0 && r.height > 0);
+    const accept = new Set(opts.acceptLabels);
+    const close = new Set(opts.closeLabels);
+    const skipTags = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'svg', 'FORM', 'IFRAME', 'VIDEO', 'CANVAS']);
+    const chromeSelector = 'header, nav, [role="banner"], [role="navigation"]';
+    const consentRe = /cookie|consent|gdpr|privacy|datenschutz|cookies/i;
+
+    const shown = (el) => {
+        if (!el.isConnected) return false;
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const overlapShare = (a, b) => {
+        const w = Math.min(a.right, b.right) - Math.max(a.left, b.left);
+        const h = Math.min(a.bottom, b.bottom) - Math.max(a.top, b.top);
+        return w > 0 && h > 0 ? (w * h) / (b.width * b.height) : 0;
+    };
+    const adapterFor = (el) => opts.adapters.find((a) => {
+        try { return el.matches(a.root) || !!el.querySelector(a.root); } catch (e) { return false; }
+    });
+
+    let scanned = 0;
+    const candidates = [];
+    const consider = (el, style) => {
+        if (style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return;
+        if (forms.some((f) => el.contains(f))) return;
+        const rect = el.getBoundingClientRect();
+        const visible = Math.max(0, Math.min(rect.right, vw) - Math.max(rect.left, 0))
+            * Math.max(0, Math.min(rect.bottom, vh) - Math.max(rect.top, 0));
+        if (!visible) return;
+        const coverage = visible / viewArea;
+        const z = parseInt(style.zIndex, 10) || 0;
+        const cmp = adapterFor(el);
+        const dialog = isModal(el) || el.getAttribute('aria-modal') === 'true'
+            || ['dialog', 'alertdialog'].includes(el.getAttribute('role'));
+        let reason = null;
+        if (cmp) reason = 'cmp:' + cmp.name;
+        else if (z < 0 || el.matches(chromeSelector) || el.querySelector('nav')) return;
+        else if (dialog) reason = 'dialog';
+        else if (coverage >= opts.minCoverage && z >= opts.minZIndex) reason = 'covers viewport';
+        else if (z >= 1 && formRects.some((r) => overlapShare(rect, r) >= opts.minFormOverlap)) reason = 'covers form';
+        else if (style.position === 'fixed' && consentRe.test((el.textContent || '').slice(0, 2000))) reason = 'consent bar';
+        if (reason) candidates.push({ el, reason, cmp, dialog, coverage });
+    };
+
+    const root = document.body || document.documentElement;
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, {
+        acceptNode(el) {
+            scanned += 1;
+            if (skipTags.has(el.tagName)) return NodeFilter.FILTER_REJECT;
+            const style = getComputedStyle(el);
+            if (style.display === 'none') return NodeFilter.FILTER_REJECT;
+            const position = style.position;
+            const fullScreen = position === 'absolute' && (parseInt(style.zIndex, 10) || 0) >= opts.minZIndex;
+            if (position === 'fixed' || position === 'sticky' || fullScreen || isModal(el)) {
+                // Click-through wrappers only position their children; look inside them instead
+                if (style.pointerEvents === 'none' && !el.matches(cmpRoots)) return NodeFilter.FILTER_SKIP;
+                if (fullScreen && el.getBoundingClientRect().width < vw * 0.9) return NodeFilter.FILTER_SKIP;
+                consider(el, style);
+                return NodeFilter.FILTER_REJECT;
+            }
+            return NodeFilter.FILTER_SKIP;
+        },
+    });
+    while (walker.nextNode()) {}
+
+    const label = (el) => (el.innerText || el.value || el.getAttribute('aria-label') || '')
+        .trim().toLowerCase().replace(/\s+/g, ' ');
+    const clickFirst = (scope, selector, labels) => {
+        let controls;
+        try { controls = scope.querySelectorAll(selector); } catch (e) { return null; }
+        for (const control of Array.from(controls).slice(0, 60)) {
+            if (labels && !labels.has(label(control))) continue;
+            if (!shown(control)) continue;
+            try { control.click(); return control; } catch (e) {}
+        }
+        return null;
+    };
+    const callApi = (path) => {
+        const parts = path.split('.');
+        const owner = parts.slice(0, -1).reduce((o, key) => (o ? o[key] : undefined), window);
+        const fn = owner && owner[parts[parts.length - 1]];
+        if (typeof fn !== 'function') return false;
+        try { fn.call(owner, true, true, true); return true; } catch (e) { return false; }
+    };
+    const buttons = 'button, a, [role="button"], input[type="button"], input[type="submit"]';
+
+    const handled = [];
+    const seenCmp = new Set();
+    let needsEscape = false;
+    for (const { el, reason, cmp, dialog } of candidates) {
+        let action = null;
+        if (cmp && seenCmp.has(cmp.name)) continue;
+        if (cmp) {
+            seenCmp.add(cmp.name);
+            if (clickFirst(document, cmp.accept)) action = 'accepted';
+            else if (cmp.api && callApi(cmp.api)) action = 'api';
+        }
+        if (!action) {
+            // Consent bars get accepted, everything else closed
+            const prefer = reason === 'consent bar' || cmp ? [accept, close] : [close, accept];
+            if (clickFirst(el, buttons, prefer[0]) || clickFirst(el, opts.closeSelectors, null) || clickFirst(el, buttons, prefer[1])) {
+                action = 'clicked';
+            }
+        }
+        if (!action && dialog) needsEscape = true;
+        const id = handled.length;
+        el.setAttribute('data-teq-overlay', action ? 'dismissed' : 'pending');
+        el.setAttribute('data-teq-overlay-id', String(id));
+        handled.push({
+            id,
+            reason,
+            action: action || 'pending',
+            tag: el.tagName.toLowerCase() + (el.id ? '#' + el.id : ''),
+        });
+    }
+    return { skipped: false, handled, scanned, needsEscape };
+}
+"""
+
+# Overlays that are still on screen after their dismissal click (or had nothing
+# to click) are hidden; the scroll lock modals put on <html>/<body> is released.
+_VERIFY_JS = r"""
+({ hide }) => {
+    const shown = (el) => {
+        if (!el.isConnected) return false;
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const hidden = [];
+    let removed = 0;
+    document.querySelectorAll('[data-teq-overlay="dismissed"], [data-teq-overlay="pending"]').forEach((el) => {
+        if (!shown(el)) { removed += 1; el.setAttribute('data-teq-overlay', 'gone'); return; }
+        if (!hide) return;
+        el.style.setProperty('display', 'none', 'important');
+        el.setAttribute('data-teq-overlay', 'hidden');
+        hidden.push(Number(el.getAttribute('data-teq-overlay-id')));
+    });
+    if (hidden.length || removed) {
+        for (const node of [document.documentElement, document.body]) {
+            if (!node) continue;
+            node.classList.remove('modal-open', 'no-scroll', 'noscroll', 'overflow-hidden');
+            if (getComputedStyle(node).overflow === 'hidden') node.style.setProperty('overflow', 'auto', 'important');
+        }
+    }
+    return { hidden, removed };
+}
+"""
+
+_engines: "weakref.WeakKeyDictionary[Any, OverlayEngine]" = weakref.WeakKeyDictionary()
+
+
+def overlay_engine(page) -> "OverlayEngine":
+    """The page's engine (one per page, so its counters span every sweep)."""
+    try:
+        engine = _engines.get(page)
+        if engine is None:
+            engine = _engines[page] = OverlayEngine(page)
+        return engine
+    except TypeError:
+        return OverlayEngine(page)
+
+
+class OverlayEngine:
+    """Finds overlays geometrically and dismisses them; ``sweep_if_new()`` re-runs only on DOM changes."""
+
+    def __init__(
+        self,
+        page,
+        *,
+        min_z_index: int = 10,
+        min_coverage: float = 0.35,
+        min_form_overlap: float = 0.2,
+        hide: bool = True,
+        settle_budget: float = 1.0,
+        log: Optional[Callable[[str], None]] = None,
+    ):
+        self.page = page
+        self.min_z_index = min_z_index
+        self.min_coverage = min_coverage
+        self.min_form_overlap = min_form_overlap
+        self.hide = hide
+        self.settle_budget = settle_budget
+        self.log = log
+        self.dismissed = 0
+        self.sweeps = 0
+        self.history: List[Dict[str, Any]] = []
+
+    def _args(self, only_if_new: bool) -> Dict[str, Any]:
+        return {
+            "version": OVERLAY_ENGINE_VERSION,
+            "onlyIfNew": only_if_new,
+            "adapters": [dict(adapter) for adapter in CMP_ADAPTERS],
+            "acceptLabels": list(ACCEPT_LABELS),
+            "closeLabels": list(CLOSE_LABELS),
+            "closeSelectors": CLOSE_SELECTORS,
+            "minZIndex": self.min_z_index,
+            "minCoverage": self.min_coverage,
+            "minFormOverlap": self.min_form_overlap,
+        }
+
+    async def _evaluate(self, form_locator: Optional[str], only_if_new: bool) -> Optional[Dict[str, Any]]:
+        args = self._args(only_if_new)
+        if form_locator:
+            try:
+                return await self.page.locator(form_locator).first.evaluate(_SWEEP_JS, args, timeout=2000)
+            except Exception:
+                pass
+        try:
+            return await self.page.evaluate(f"(args) => ({_SWEEP_JS})(null, args)", args)
+        except Exception:
+            return None
+
+    async def sweep(self, form_locator: Optional[str] = None, only_if_new: bool = False) -> int:
+        """Detect and dismiss overlays; returns how many were dismissed. Never raises.
+
+        ``form_locator`` names the form that must stay usable: overlays on top
+        of it are dismissed and nothing containing it is touched. Without it,
+        every form with a ``<textarea>`` is protected.
+        """
+        try:
+            if not self.page or self.page.is_closed():
+                return 0
+        except Exception:
+            return 0
+
+        report = await self._evaluate(form_locator, only_if_new)
+        if not isinstance(report, dict) or report.get("skipped"):
+            return 0
+        self.sweeps += 1
+        handled = report.get("handled") or []
+        if not handled:
+            return 0
+
+        try:
+            if any(item.get("action") != "pending" for item in handled):
+                await settle(self.page, "banners", self.settle_budget, quiet_ms=150)
+            if report.get("needsEscape"):
+                await self.page.keyboard.press("Escape")
+            verified = await self.page.evaluate(_VERIFY_JS, {"hide": self.hide})
+        except Exception:
+            verified = None
+        hidden = set(verified.get("hidden") or []) if isinstance(verified, dict) else set()
+        for item in handled:
+            if item.get("id") in hidden:
+                # Survived its click (or had nothing to click) - hidden instead
+                item["action"] = "hidden"
+
+        dismissed = sum(1 for item in handled if item["action"] != "pending")
+        self.dismissed += dismissed
+        self.history.extend(handled)
+        if self.log:
+            for item in handled:
+                self.log(f"   🚫 {item['tag']} ({item['reason']}) → {item['action']}")
+        return dismissed
+
+    async def sweep_if_new(self, form_locator: Optional[str] = None) -> int:
+        """Sweep again only if overlay-like elements appeared since the last sweep."""
+        return await self.sweep(form_locator, only_if_new=True)
@@ -0,0 +1,296 @@
+"""
+Bounded, event-driven page waits.
+
+Replaces fixed ``asyncio.sleep`` pauses: every primitive returns as soon as the
+page is settled (DOM mutations stopped, network idle, element visible, response
+seen, ...) and never waits longer than its upper bound. None of them raise - a
+closed page or navigated-away context simply ends the wait.
+
+``settle()`` is the drop-in replacement for the old sleeps: it takes the old
+sleep duration as its budget and records the time actually spent per stage in
+the run's ``WaitReport`` so the seconds saved can be reported with the result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+_DOM_QUIET_JS = """
+({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    const root = document.documentElement || document;
+    let quietTimer = null;
+    let capTimer = null;
+    let observer = null;
+    const done = (settled) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(settled);
+    };
+    observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    observer.observe(root, { subtree: true, childList: true, attributes: true, characterData: true });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    capTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+# Two animation frames = layout/paint after scroll or a framework re-render; the
+# setTimeout guard covers background tabs where rAF is throttled.
+_FRAMES_JS = """
+() => new Promise((resolve) => {
+    const guard = setTimeout(() => resolve(false), 100);
+    requestAnimationFrame(() => requestAnimationFrame(() => { clearTimeout(guard); resolve(true); }));
+})
+"""
+
+
+class WaitReport:
+    """Per-stage totals of fixed-sleep budgets versus time actually waited."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def record(self, stage: str, budget: float, waited: float):
+        entry = self.stages.setdefault(stage, {"waits": 0, "fixed_seconds": 0.0, "waited_seconds": 0.0})
+        entry["waits"] += 1
+        entry["fixed_seconds"] += budget
+        entry["waited_seconds"] += min(waited, budget)
+
+    @property
+    def total_saved(self) -> float:
+        return sum(e["fixed_seconds"] - e["waited_seconds"] for e in self.stages.values())
+
+    def summary(self) -> Dict[str, Any]:
+        stages = {
+            stage: {
+                "waits": int(e["waits"]),
+                "fixed_seconds": round(e["fixed_seconds"], 3),
+                "waited_seconds": round(e["waited_seconds"], 3),
+                "saved_seconds": round(e["fixed_seconds"] - e["waited_seconds"], 3),
+            }
+            for stage, e in self.stages.items()
+        }
+        return {"stages": stages, "total_saved_seconds": round(self.total_saved, 3)}
+
+    def format_line(self) -> str:
+        parts = [
+            f"{stage} {e['fixed_seconds'] - e['waited_seconds']:.1f}s"
+            for stage, e in sorted(self.stages.items(), key=lambda item: item[1]["waited_seconds"] - item[1]["fixed_seconds"])
+        ]
+        return f"saved {self.total_saved:.1f}s vs fixed sleeps" + (f" ({', '.join(parts)})" if parts else "")
+
+
+_current_report: contextvars.ContextVar[Optional[WaitReport]] = contextvars.ContextVar("teq_wait_report", default=None)
+
+
+def start_wait_report() -> WaitReport:
+    """Begin a fresh report for the current submission (scoped to this task's context)."""
+    report = WaitReport()
+    _current_report.set(report)
+    return report
+
+
+def current_wait_report() -> Optional[WaitReport]:
+    return _current_report.get()
+
+
+# ------------------------------------------------------------------ network
+
+
+class _InflightTracker:
+    """Counts in-flight requests for one page; installed once per page on first use."""
+
+    def __init__(self, page):
+        self.inflight = 0
+        self.last_change = time.monotonic()
+        self.changed = asyncio.Event()
+        page.on("request", self._started)
+        page.on("requestfinished", self._finished)
+        page.on("requestfailed", self._finished)
+
+    def _started(self, _request):
+        self.inflight += 1
+        self._touch()
+
+    def _finished(self, _request):
+        self.inflight = max(0, self.inflight - 1)
+        self._touch()
+
+    def _touch(self):
+        self.last_change = time.monotonic()
+        self.changed.set()
+
+
+_trackers: "weakref.WeakKeyDictionary[Any, _InflightTracker]" = weakref.WeakKeyDictionary()
+
+
+def _tracker_for(page) -> Optional[_InflightTracker]:
+    try:
+        tracker = _trackers.get(page)
+        if tracker is None:
+            tracker = _InflightTracker(page)
+            _trackers[page] = tracker
+        return tracker
+    except Exception:
+        return None
+
+
+def track_network(page):
+    """Start counting requests on ``page`` (call right after navigation for accurate idle detection)."""
+    _tracker_for(page)
+
+
+async def wait_for_network_idle(page, idle_ms: int = 500, timeout: float = 3.0) -> bool:
+    """Wait until no request has been in flight for ``idle_ms``; False on timeout.
+
+    The quiet period counts from the call at the earliest: right after a click
+    the page looks idle until the click's request arrives, so idle is only
+    reported after observing the page for at least ``idle_ms``.
+    """
+    tracker = _tracker_for(page)
+    if tracker is None:
+        return False
+    idle = idle_ms / 1000
+    started = time.monotonic()
+    deadline = started + timeout
+    while True:
+        now = time.monotonic()
+        quiet_since = max(tracker.last_change, started)
+        if tracker.inflight == 0 and now - quiet_since >= idle:
+            return True
+        remaining = deadline - now
+        if remaining <= 0:
+            return False
+        tracker.changed.clear()
+        step = remaining
+        if tracker.inflight == 0:
+            step = min(step, idle - (now - quiet_since))
+        try:
+            await asyncio.wait_for(tracker.changed.wait(), timeout=max(0.01, step))
+        except asyncio.TimeoutError:
+            pass
+
+
+# ---------------------------------------------------------------------- DOM
+
+
+def _page_alive(page) -> bool:
+    try:
+        return page is not None and not page.is_closed()
+    except Exception:
+        return False
+
+
+async def wait_for_dom_quiet(page, quiet_ms: int = 250, timeout: float = 2.0) -> bool:
+    """Wait until the DOM has had no mutations for ``quiet_ms``; False on timeout."""
+    if not _page_alive(page):
+        return False
+    try:
+        return bool(await asyncio.wait_for(
+            page.evaluate(_DOM_QUIET_JS, {"quietMs": quiet_ms, "timeoutMs": int(timeout * 1000)}),
+            timeout=timeout + 0.5,
+        ))
+    except Exception:
+        return False
+
+
+async def wait_for_frames(page, timeout: float = 0.5) -> bool:
+    """Wait for two animation frames (layout after scroll/fill has been applied)."""
+    if not _page_alive(page):
+        return False
+    try:
+        return bool(await asyncio.wait_for(page.evaluate(_FRAMES_JS), timeout=timeout))
+    except Exception:
+        return False
+
+
+async def wait_for_visible(page, selector: str, timeout: float = 2.0) -> bool:
+    """Wait until ``selector`` is visible; False on timeout."""
+    if not _page_alive(page):
+        return False
+    try:
+        await page.wait_for_selector(selector, state="visible", timeout=int(timeout * 1000))
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_condition(page, expression: str, timeout: float = 2.0, arg: Any = None) -> bool:
+    """Wait until a JS predicate returns truthy; False on timeout."""
+    if not _page_alive(page):
+        return False
+    try:
+        await page.wait_for_function(expression, arg=arg, timeout=int(timeout * 1000))
+        return True
+    except Exception:
+        return False
+
+
+async def wait_for_response(page, predicate: Callable[[Any], bool], timeout: float = 5.0):
+    """Return the first response matching ``predicate``, or None on timeout."""
+    if not _page_alive(page):
+        return None
+    try:
+        return await page.wait_for_event("response", predicate=predicate, timeout=int(timeout * 1000))
+    except Exception:
+        return None
+
+
+# ------------------------------------------------------------------- settle
+
+
+async def settle(
+    page,
+    stage: str,
+    budget: float,
+    *,
+    dom: bool = True,
+    network: bool = False,
+    frames: bool = False,
+    selector: Optional[str] = None,
+    condition: Optional[str] = None,
+    quiet_ms: int = 250,
+) -> float:
+    """Event-driven replacement for ``asyncio.sleep(budget)``.
+
+    Waits for the requested signals (all bounded by ``budget`` seconds in total):
+    ``network`` idle, then ``condition``/``selector``, then ``dom`` quiescence or
+    just two animation ``frames``. Returns the seconds spent and records them
+    against ``budget`` in the current ``WaitReport``.
+    """
+    started = time.monotonic()
+
+    async def _run():
+        if network:
+            await wait_for_network_idle(page, timeout=budget)
+        remaining = max(0.05, budget - (time.monotonic() - started))
+        if condition:
+            await wait_for_condition(page, condition, timeout=remaining)
+        elif selector:
+            await wait_for_visible(page, selector, timeout=remaining)
+        remaining = max(0.05, budget - (time.monotonic() - started))
+        if frames:
+            await wait_for_frames(page, timeout=remaining)
+        elif dom:
+            await wait_for_dom_quiet(page, quiet_ms=quiet_ms, timeout=remaining)
+
+    if _page_alive(page):
+        try:
+            await asyncio.wait_for(_run(), timeout=budget)
+        except Exception:
+            pass
+
+    waited = time.monotonic() - started
+    report = _current_report.get()
+    if report is not None:
+        report.record(stage, budget, waited)
+    return waited
@@ -0,0 +1,169 @@
+"""
+Machine-readable progress channel, separate from the human-readable stderr log.
+
+The parent process opts in by passing an extra inherited file descriptor
+(``TEQ_PROGRESS_FD``, e.g. fd 3 from Node's ``stdio`` array) or a Unix socket
+path (``TEQ_PROGRESS_SOCKET``). Every event is one frame: a 4-byte big-endian
+length followed by that many bytes of UTF-8 JSON. Event types:
+
+* ``{"type": "checkpoint", "step", "status", "title", "detail", "ts"}`` -
+  terminal statuses also carry ``elapsed_seconds`` since the step started.
+* ``{"type": "timing", "stage", "seconds", "ts"}``
+* ``{"type": "result", "result": {...}, "ts"}`` - the final result object.
+
+Frames are written by a background thread so emitters never block on the
+reader. Without either environment variable the channel is disabled and every
+call is a no-op.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_HEADER = struct.Struct(">I")
+_TERMINAL_STATUSES = frozenset({"success", "failed", "warning", "error", "skipped"})
+
+
+def encode_frame(event: Dict[str, Any]) -> bytes:
+    payload = json.dumps(event, ensure_ascii=False, default=str).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def decode_frames(buffer: bytes):
+    """Split ``buffer`` into complete events; returns ``(events, remaining_bytes)``."""
+    events = []
+    offset = 0
+    while len(buffer) - offset >= _HEADER.size:
+        (length,) = _HEADER.unpack_from(buffer, offset)
+        end = offset + _HEADER.size + length
+        if end > len(buffer):
+            break
+        events.append(json.loads(buffer[offset + _HEADER.size:end].decode("utf-8")))
+        offset = end
+    return events, buffer[offset:]
+
+
+class ProgressChannel:
+    """Length-prefixed JSON event writer over an inherited fd or a Unix socket."""
+
+    def __init__(self, fd: Optional[int] = None, sock: Optional[socket.socket] = None):
+        self._fd = fd
+        self._sock = sock
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._step_started: Dict[int, float] = {}
+        self._broken = False
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        if self.enabled:
+            self._thread = threading.Thread(target=self._run, name="teq-progress", daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> "ProgressChannel":
+        fd_value = os.environ.get("TEQ_PROGRESS_FD", "").strip()
+        if fd_value.isdigit():
+            fd = int(fd_value)
+            try:
+                os.fstat(fd)
+                return cls(fd=fd)
+            except OSError:
+                pass
+        socket_path = os.environ.get("TEQ_PROGRESS_SOCKET", "").strip()
+        if socket_path and hasattr(socket, "AF_UNIX"):
+            try:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(2)
+                sock.connect(socket_path)
+                sock.settimeout(None)
+                return cls(sock=sock)
+            except OSError:
+                pass
+        return cls()
+
+    @property
+    def enabled(self) -> bool:
+        return (self._fd is not None or self._sock is not None) and not self._broken
+
+    # ------------------------------------------------------------- events
+
+    def send(self, event: Dict[str, Any]):
+        if not self.enabled or self._closed:
+            return
+        event.setdefault("ts", round(time.time(), 3))
+        try:
+            self._queue.put(encode_frame(event))
+        except Exception:
+            pass
+
+    def checkpoint(self, step: int, status: str, title: str, detail: str = ""):
+        if not self.enabled:
+            return
+        event: Dict[str, Any] = {"type": "checkpoint", "step": step, "status": status, "title": title, "detail": detail}
+        now = time.monotonic()
+        if status == "in_progress":
+            self._step_started.setdefault(step, now)
+        elif status in _TERMINAL_STATUSES and step in self._step_started:
+            event["elapsed_seconds"] = round(now - self._step_started.pop(step), 3)
+        self.send(event)
+
+    def timing(self, stage: str, seconds: float, **extra):
+        self.send({"type": "timing", "stage": stage, "seconds": round(seconds, 3), **extra})
+
+    def result(self, result: Dict[str, Any]):
+        self.send({"type": "result", "result": result})
+
+    # ------------------------------------------------------------- writer
+
+    def _write(self, data: bytes):
+        if self._sock is not None:
+            self._sock.sendall(data)
+            return
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+
+    def _run(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            try:
+                self._write(frame)
+            except OSError:
+                self._broken = True  # Reader went away; progress is best-effort
+                return
+
+    def close(self, timeout: float = 5.0):
+        """Write out everything queued, then stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+
+
+_channel: Optional[ProgressChannel] = None
+
+
+def get_channel() -> ProgressChannel:
+    """Process-wide channel configured from the environment (disabled if not requested)."""
+    global _channel
+    if _channel is None:
+        _channel = ProgressChannel.from_env()
+        atexit.register(_channel.close)
+    return _channel
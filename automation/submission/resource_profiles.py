@@ -0,0 +1,183 @@
+"""
+Request-interception profiles for submission runs.
+
+Templates choose a profile with ``"resource_profile"``:
+
+* ``"full"`` (default) - load everything, no interception.
+* ``"lean"`` - abort media, fonts, known trackers/ad/chat-widget hosts,
+  third-party images and third-party iframes that are not form-relevant.
+  CAPTCHA providers and hosted-form providers are always allowed, and XHR/fetch
+  to the page's own site is never blocked.
+
+Aborted requests never transfer bytes, so "bytes saved" is an estimate from
+typical transfer sizes per resource type; bytes actually loaded are measured
+from response ``content-length`` headers.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    from domain_scheduler import registrable_domain
+except ImportError:  # Run from automation/submission: the scheduler lives one level up
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from domain_scheduler import registrable_domain
+
+RESOURCE_PROFILES = ("full", "lean")
+
+# Typical transfer sizes (bytes) used to estimate what an aborted request would have cost
+_ESTIMATED_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 35_000,
+    "script": 30_000,
+    "stylesheet": 15_000,
+    "document": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+
+_TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com", "doubleclick.net",
+    "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "connect.facebook.net", "facebook.com/tr", "hotjar.com", "hotjar.io", "clarity.ms",
+    "segment.io", "cdn.segment.com", "mixpanel.com", "fullstory.com", "nr-data.net",
+    "bat.bing.com", "ads-twitter.com", "analytics.twitter.com", "snap.licdn.com",
+    "px.ads.linkedin.com", "analytics.tiktok.com", "quantserve.com", "scorecardresearch.com",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com", "amazon-adsystem.com",
+    "mc.yandex.ru", "crazyegg.com", "mouseflow.com", "luckyorange.com", "pinimg.com/ct",
+    # Chat widgets: heavy, and they overlay forms
+    "widget.intercom.io", "js.intercomcdn.com", "js.driftt.com", "embed.tawk.to",
+    "client.crisp.chat", "static.zdassets.com", "livechatinc.com", "tidio.co",
+)
+
+# Third parties a contact form may genuinely need (CAPTCHAs and hosted form providers)
+_FORM_RELEVANT_HOSTS = (
+    "google.com/recaptcha", "gstatic.com/recaptcha", "recaptcha.net", "hcaptcha.com",
+    "challenges.cloudflare.com", "hsforms.net", "hsforms.com", "hubspot.com", "hs-scripts.com",
+    "typeform.com", "jotform.com", "jotfor.ms", "wufoo.com", "formstack.com", "cognitoforms.com",
+    "forms.office.com", "docs.google.com/forms", "paperform.co", "tally.so", "123formbuilder.com",
+    "zohopublic.com", "forms.zohopublic", "mailchimp.com", "list-manage.com",
+)
+
+_ALWAYS_BLOCKED_TYPES = frozenset({"media", "font"})
+
+
+def _matches(host_and_path: str, needles) -> bool:
+    return any(needle in host_and_path for needle in needles)
+
+
+class ResourceBlocker:
+    """Route handler implementing one profile; one instance accumulates stats for a run."""
+
+    def __init__(self, profile: str = "lean"):
+        self.profile = profile
+        self.requests_total = 0
+        self.requests_blocked = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.blocked_by_type: Dict[str, int] = {}
+        self.estimated_bytes_saved = 0
+        self.bytes_loaded = 0
+
+    @classmethod
+    def for_profile(cls, profile: Optional[str]) -> Optional["ResourceBlocker"]:
+        """Return a blocker for ``profile`` or None for the unfiltered "full" profile."""
+        name = (profile or "full").strip().lower()
+        if name == "lean":
+            return cls(name)
+        return None
+
+    def block_reason(self, url: str, resource_type: str, page_url: str, is_subframe: bool) -> Optional[str]:
+        """Return why a request should be aborted, or None to let it through."""
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return None
+        if parts.scheme not in ("http", "https"):
+            return None
+        host = (parts.hostname or "").lower()
+        host_and_path = f"{host}{parts.path}"
+        try:
+            page_host = (urlsplit(page_url).hostname or "").lower()
+        except ValueError:
+            page_host = ""
+        same_site = not page_host or registrable_domain(host) == registrable_domain(page_host)
+
+        if _matches(host_and_path, _FORM_RELEVANT_HOSTS):
+            return None
+        if same_site and resource_type in ("xhr", "fetch", "document", "websocket", "eventsource"):
+            return None  # Never break the form's own submission or navigation
+        if resource_type in _ALWAYS_BLOCKED_TYPES:
+            return resource_type
+        if _matches(host_and_path, _TRACKER_HOSTS):
+            return "tracker"
+        if same_site:
+            return None
+        if resource_type == "image":
+            return "third_party_image"
+        if resource_type == "document" and is_subframe:
+            return "third_party_iframe"
+        return None
+
+    async def handle(self, route, request):
+        self.requests_total += 1
+        try:
+            resource_type = request.resource_type
+            frame = request.frame
+            is_subframe = frame is not None and frame.parent_frame is not None
+            page_url = ""
+            try:
+                page_url = frame.page.url if frame is not None else ""
+            except Exception:
+                page_url = ""
+            reason = self.block_reason(request.url, resource_type, page_url, is_subframe)
+        except Exception:
+            reason = None
+
+        if reason is None:
+            try:
+                await route.continue_()
+            except Exception:
+                pass
+            return
+
+        self.requests_blocked += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.estimated_bytes_saved += _ESTIMATED_BYTES.get(resource_type, 10_000)
+        try:
+            await route.abort("blockedbyclient")
+        except Exception:
+            pass
+
+    def _on_response(self, response):
+        try:
+            length = response.headers.get("content-length")
+            if length:
+                self.bytes_loaded += int(length)
+        except Exception:
+            pass
+
+    async def install(self, page) -> bool:
+        """Route every request of ``page`` through this profile."""
+        try:
+            await page.route("**/*", self.handle)
+            page.on("response", self._on_response)
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "requests_total": self.requests_total,
+            "requests_blocked": self.requests_blocked,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_loaded": self.bytes_loaded,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+        }
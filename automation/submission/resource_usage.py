@@ -0,0 +1,57 @@
+"""Lightweight process resource sampling (Linux /proc, no psutil dependency)."""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional
+
+
+def _read_ppid_map() -> Dict[int, int]:
+    """Return {pid: ppid} for every process visible in /proc."""
+    ppids: Dict[int, int] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return ppids
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                stat = f.read().decode("utf-8", "replace")
+            # Field 2 (comm) may contain spaces; everything after the last ')' is fixed-width
+            fields = stat[stat.rfind(")") + 2:].split()
+            ppids[int(entry)] = int(fields[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return ppids
+
+
+def descendant_pids(root_pid: Optional[int] = None) -> List[int]:
+    """Return all descendant PIDs of ``root_pid`` (defaults to this process)."""
+    root = root_pid if root_pid is not None else os.getpid()
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in _read_ppid_map().items():
+        children.setdefault(ppid, []).append(pid)
+    found: List[int] = []
+    stack = list(children.get(root, []))
+    while stack:
+        pid = stack.pop()
+        found.append(pid)
+        stack.extend(children.get(pid, []))
+    return found
+
+
+def process_rss_bytes(pid: int) -> int:
+    """Return resident set size of one process in bytes (0 if unavailable)."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def children_rss_bytes(root_pid: Optional[int] = None) -> int:
+    """Summed RSS of every descendant process (Playwright driver + browser tree)."""
+    return sum(process_rss_bytes(pid) for pid in descendant_pids(root_pid))
@@ -0,0 +1,316 @@
+"""
+Per-stage timing spans for a submission run, plus process-wide histograms.
+
+``log_checkpoint`` drives the spans: an ``in_progress`` checkpoint opens the
+span for that step and the next terminal status (success / warning / failed)
+closes it. While a span is open, response bytes (``content-length``) and
+``page.evaluate`` calls on the instrumented page are charged to it.
+
+Finished runs are folded into ``REGISTRY``, which keeps Prometheus-style
+cumulative buckets plus a bounded sample window per stage for p50/p95/p99, and
+renders everything in the Prometheus text exposition format. The backend's
+``/api/v1/metrics`` endpoint keeps a copy (``backend/app/core/metrics.py``) whose
+tests check that its buckets, quantiles and rendering match this module.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+STAGE_NAMES = {
+    1: "template_load",
+    2: "browser_init",
+    3: "page_load",
+    4: "banner_handling",
+    5: "form_detection",
+    6: "captcha",
+    7: "field_fill",
+    8: "submit",
+    9: "verification",
+}
+
+_TERMINAL_STATUSES = frozenset({"success", "failed", "warning", "error", "skipped"})
+
+# Upper bounds (seconds) of the exported histogram buckets
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+QUANTILES = (0.5, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class StageSpan:
+    __slots__ = ("step", "name", "started", "duration", "bytes", "evaluate_calls", "status")
+
+    def __init__(self, step: int, name: str):
+        self.step = step
+        self.name = name
+        self.started = time.monotonic()
+        self.duration: Optional[float] = None
+        self.bytes = 0
+        self.evaluate_calls = 0
+        self.status = "in_progress"
+
+    def finish(self, status: str):
+        if self.duration is None:
+            self.duration = time.monotonic() - self.started
+            self.status = status
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "stage": self.name,
+            "seconds": round(self.duration if self.duration is not None else time.monotonic() - self.started, 3),
+            "bytes": self.bytes,
+            "evaluate_calls": self.evaluate_calls,
+            "status": self.status,
+        }
+
+
+class StageTimer:
+    """Spans of one run; bytes/evaluate calls outside any span are kept as ``other``."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.spans: List[StageSpan] = []
+        self._open: Dict[int, StageSpan] = {}
+        self.other_bytes = 0
+        self.other_evaluate_calls = 0
+
+    def checkpoint(self, step: int, status: str):
+        if status == "in_progress":
+            if step not in self._open:
+                span = StageSpan(step, STAGE_NAMES.get(step, f"step_{step}"))
+                self._open[step] = span
+                self.spans.append(span)
+        elif status in _TERMINAL_STATUSES:
+            span = self._open.pop(step, None)
+            if span is not None:
+                span.finish(status)
+
+    def _active(self) -> Optional[StageSpan]:
+        # The most recently opened span gets the cost when stages overlap
+        for span in reversed(self.spans):
+            if span.duration is None:
+                return span
+        return None
+
+    def add_bytes(self, count: int):
+        span = self._active()
+        if span is not None:
+            span.bytes += count
+        else:
+            self.other_bytes += count
+
+    def count_evaluate(self):
+        span = self._active()
+        if span is not None:
+            span.evaluate_calls += 1
+        else:
+            self.other_evaluate_calls += 1
+
+    def close_open(self, status: str = "interrupted"):
+        for span in list(self._open.values()):
+            span.finish(status)
+        self._open.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "stages": [span.as_dict() for span in self.spans],
+            "total_seconds": round(time.monotonic() - self.started, 3),
+            "other_bytes": self.other_bytes,
+            "other_evaluate_calls": self.other_evaluate_calls,
+        }
+
+
+_current_timer: contextvars.ContextVar[Optional[StageTimer]] = contextvars.ContextVar("teq_stage_timer", default=None)
+
+
+def start_stage_timer() -> StageTimer:
+    timer = StageTimer()
+    _current_timer.set(timer)
+    return timer
+
+
+def current_stage_timer() -> Optional[StageTimer]:
+    return _current_timer.get()
+
+
+# ------------------------------------------------------------ instrumentation
+
+_page_timers: "weakref.WeakKeyDictionary[Any, StageTimer]" = weakref.WeakKeyDictionary()
+
+
+def instrument_page(page, timer: Optional[StageTimer]):
+    """Charge ``page``'s response bytes and ``evaluate`` calls to ``timer``'s open span."""
+    if page is None or timer is None:
+        return
+    try:
+        first_time = page not in _page_timers
+        _page_timers[page] = timer
+    except TypeError:
+        return
+    if not first_time:
+        return
+
+    def on_response(response):
+        bound = _page_timers.get(page)
+        if bound is None:
+            return
+        try:
+            length = response.headers.get("content-length")
+            if length:
+                bound.add_bytes(int(length))
+        except Exception:
+            pass
+
+    original_evaluate = page.evaluate
+
+    async def counting_evaluate(*args, **kwargs):
+        bound = _page_timers.get(page)
+        if bound is not None:
+            bound.count_evaluate()
+        return await original_evaluate(*args, **kwargs)
+
+    try:
+        page.on("response", on_response)
+        page.evaluate = counting_evaluate
+    except Exception:
+        pass
+
+
+# ------------------------------------------------------------------ registry
+
+
+class _StageStats:
+    __slots__ = ("bucket_counts", "count", "sum", "samples", "bytes", "evaluate_calls")
+
+    def __init__(self, window: int):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque = deque(maxlen=window)
+        self.bytes = 0
+        self.evaluate_calls = 0
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class StageHistograms:
+    """Thread-safe per-stage duration histograms with windowed quantiles."""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._stages: Dict[str, _StageStats] = {}
+        self._runs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, byte_count: int = 0, evaluate_calls: int = 0):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats(self.window)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.bucket_counts[i] += 1
+            stats.count += 1
+            stats.sum += seconds
+            stats.samples.append(seconds)
+            stats.bytes += byte_count
+            stats.evaluate_calls += evaluate_calls
+
+    def observe_run(self, summary: Dict[str, Any], status: Optional[str] = None):
+        """Fold one ``StageTimer.summary()`` into the histograms."""
+        for span in summary.get("stages", []):
+            self.observe(span["stage"], span["seconds"], span.get("bytes", 0), span.get("evaluate_calls", 0))
+        self.observe("total", summary.get("total_seconds", 0.0))
+        if status:
+            self.count_run(status)
+
+    def count_run(self, status: str):
+        """Count one finished run by its final status."""
+        with self._lock:
+            self._runs[status] = self._runs.get(status, 0) + 1
+
+    def quantiles(self, stage: str) -> Dict[float, float]:
+        with self._lock:
+            stats = self._stages.get(stage)
+            values = sorted(stats.samples) if stats else []
+        return {q: _quantile(values, q) for q in QUANTILES}
+
+    def render_prometheus(self, prefix: str = "teq_submission") -> str:
+        lines: List[str] = []
+        with self._lock:
+            stages = {name: (list(s.bucket_counts), s.count, s.sum, sorted(s.samples), s.bytes, s.evaluate_calls)
+                      for name, s in self._stages.items()}
+            runs = dict(self._runs)
+
+        name = f"{prefix}_stage_duration_seconds"
+        lines.append(f"# HELP {name} Duration of each submission stage.")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, (buckets, count, total, _samples, _b, _e) in sorted(stages.items()):
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        name = f"{prefix}_stage_duration_quantile_seconds"
+        lines.append(f"# HELP {name} p50/p95/p99 stage duration over the most recent runs.")
+        lines.append(f"# TYPE {name} gauge")
+        for stage, (_buckets, _count, _total, samples, _b, _e) in sorted(stages.items()):
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {_quantile(samples, q):.6f}')
+
+        for metric, index, help_text in (
+            ("stage_bytes_total", 4, "Response bytes transferred during each stage."),
+            ("stage_evaluate_calls_total", 5, "page.evaluate calls made during each stage."),
+        ):
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, values in sorted(stages.items()):
+                if stage != "total":
+                    lines.append(f'{name}{{stage="{stage}"}} {values[index]}')
+
+        name = f"{prefix}_runs_total"
+        lines.append(f"# HELP {name} Finished submission runs by final status.")
+        lines.append(f"# TYPE {name} counter")
+        for status, count in sorted(runs.items()):
+            lines.append(f'{name}{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = StageHistograms()
+
+
+def serve_metrics(port: int, registry: StageHistograms = REGISTRY, host: str = "0.0.0.0"):
+    """Expose ``registry`` at ``http://host:port/metrics`` from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="teq-metrics", daemon=True).start()
+    return server
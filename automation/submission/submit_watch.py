@@ -0,0 +1,468 @@
+"""
+Event-driven verification of a form submission.
+
+``SubmissionWatch`` is started right before the submit click and turns the
+three things that can confirm a submission into events instead of polling the
+page: the network response to the tracked POST/XHR, DOM mutations inside the
+form's container (and toasts appended to ``<body>``), and main-frame
+navigations. Success/error phrases are matched in the page against the text
+of the changed subtree only, so nothing is serialized to Python except the
+matched snippet. ``wait()`` returns on the first signal (plus a short grace
+period for the others to catch up) or when its single timeout expires.
+
+Form frameworks with a native outcome signal (see ``form_adapters``) pass it
+as ``signals``: DOM/jQuery event names, ``postMessage`` event names and
+confirmation/error selectors. Those arrive as ``source: "native"`` events and
+``wait_native()`` waits for them specifically.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from network_capture import EXCLUDED_URL_RE
+
+try:
+    from domain_scheduler import registrable_domain
+except ImportError:  # Run from automation/submission: the scheduler lives one level up
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from domain_scheduler import registrable_domain
+
+SUCCESS_PHRASES = (
+    "thank you", "thankyou", "thanks for", "success", "received", "submitted successfully",
+    "message sent", "message has been sent", "your message has been", "we will be in touch",
+    "we'll be in touch", "we will get back", "we'll get back",
+)
+ERROR_PHRASES = (
+    "error", "failed", "invalid", "is required", "field is required", "required field",
+    "please fill", "please enter", "please complete", "try again", "could not be sent",
+)
+
+SUBMIT_METHODS = ("POST", "PUT", "PATCH")
+
+# Installs one MutationObserver over the form's container. Each success/error
+# phrase found in added or changed nodes is appended to ``state.events``;
+# ``state.next(n)`` resolves once more than ``n`` events exist. ``native`` adds
+# the framework's own outcome events and selectors (each reported once).
+_WATCH_JS = """
+(form, { success, errors, maxText, maxEvents, native }) => {
+    const previous = window.__teqSubmitWatch;
+    if (previous && previous.stop) previous.stop();
+
+    form = form || document.querySelector('form');
+    let container = form ? (form.parentElement || document.body) : document.body;
+    if (container !== document.body && container.parentElement && container.parentElement !== document.body) {
+        container = container.parentElement;
+    }
+
+    const state = { events: [], mutations: 0, formRemoved: false, waiters: [] };
+    const seen = new WeakSet();
+    const match = (text) => {
+        const lower = text.slice(0, maxText).toLowerCase();
+        for (const phrase of success) if (lower.includes(phrase)) return ['success', phrase];
+        for (const phrase of errors) if (lower.includes(phrase)) return ['error', phrase];
+        return null;
+    };
+    const visible = (el) => {
+        if (!el.isConnected) return false;
+        if (el.offsetParent !== null) return true;
+        const style = getComputedStyle(el);
+        return style.position === 'fixed' && style.display !== 'none' && style.visibility !== 'hidden';
+    };
+    const push = (event) => {
+        if (state.events.length >= maxEvents) return;
+        state.events.push(event);
+        const waiters = state.waiters;
+        state.waiters = [];
+        waiters.forEach((resolve) => resolve());
+    };
+    const inspect = (node) => {
+        const el = node && (node.nodeType === 1 ? node : node.parentElement);
+        if (!el || seen.has(el) || (form && el.contains(form))) return;
+        if (['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE'].includes(el.tagName)) return;
+        if (!visible(el)) return;
+        const text = (el.innerText || el.textContent || '').trim();
+        if (!text) return;
+        const found = match(text);
+        if (!found) return;
+        seen.add(el);
+        push({ kind: found[0], phrase: found[1], text: text.slice(0, 200), source: 'dom' });
+    };
+
+    const cleanups = [];
+    const fired = new Set();
+    const fire = (kind, phrase, text) => {
+        if (fired.has(phrase)) return;
+        fired.add(phrase);
+        push({ kind, phrase, text: (text || '').trim().slice(0, 200), source: 'native' });
+    };
+    let checkNative = () => {};
+    if (native) {
+        const listen = (names, kind) => (names || []).forEach((name) => {
+            const handler = () => fire(kind, 'event:' + name, '');
+            document.addEventListener(name, handler, true);
+            cleanups.push(() => document.removeEventListener(name, handler, true));
+            // jQuery-triggered events (WPForms, Gravity Forms, Elementor) never reach native listeners
+            if (window.jQuery) {
+                window.jQuery(document).on(name, handler);
+                cleanups.push(() => window.jQuery(document).off(name, handler));
+            }
+        });
+        listen(native.successEvents, 'success');
+        listen(native.errorEvents, 'error');
+        const onMessage = (event) => {
+            let data = event.data;
+            if (typeof data === 'string' && data.charAt(0) === '{') {
+                try { data = JSON.parse(data); } catch (e) { return; }
+            }
+            const name = data && typeof data === 'object' ? data.eventName : null;
+            if (!name) return;
+            if ((native.successEvents || []).includes(name)) fire('success', 'message:' + name, '');
+            else if ((native.errorEvents || []).includes(name)) fire('error', 'message:' + name, '');
+        };
+        window.addEventListener('message', onMessage);
+        cleanups.push(() => window.removeEventListener('message', onMessage));
+
+        // Confirmation/error containers already on the page before the click do not count
+        const before = new Set();
+        [native.success, native.error].forEach((selector) => {
+            if (selector) document.querySelectorAll(selector).forEach((el) => { if (visible(el)) before.add(el); });
+        });
+        const firstNew = (selector) => {
+            if (!selector) return null;
+            for (const el of document.querySelectorAll(selector)) if (!before.has(el) && visible(el)) return el;
+            return null;
+        };
+        checkNative = () => {
+            const ok = firstNew(native.success);
+            if (ok) fire('success', 'selector:success', ok.innerText || ok.textContent);
+            const bad = firstNew(native.error);
+            if (bad) fire('error', 'selector:error', bad.innerText || bad.textContent);
+        };
+        // Frameworks replace the whole wrapper (outside the observed container) with the confirmation
+        const documentObserver = new MutationObserver(() => checkNative());
+        documentObserver.observe(document.body, {
+            subtree: true, childList: true,
+            attributes: true, attributeFilter: ['class', 'style', 'hidden', 'data-status'],
+        });
+        cleanups.push(() => documentObserver.disconnect());
+    }
+
+    const observer = new MutationObserver((records) => {
+        state.mutations += records.length;
+        for (const record of records) {
+            if (record.type === 'childList') {
+                record.addedNodes.forEach(inspect);
+            } else {
+                inspect(record.target);
+            }
+        }
+        if (form && !form.isConnected && !state.formRemoved) {
+            state.formRemoved = true;
+            push({ kind: 'form_removed', phrase: null, text: '', source: 'dom' });
+        }
+    });
+    const options = {
+        subtree: true, childList: true, characterData: true,
+        attributes: true, attributeFilter: ['class', 'style', 'hidden', 'aria-hidden', 'data-status'],
+    };
+    observer.observe(container, options);
+    if (container !== document.body) observer.observe(document.body, { childList: true });
+
+    state.next = (count) => state.events.length > count
+        ? Promise.resolve(state.events.slice(count))
+        : new Promise((resolve) => state.waiters.push(resolve)).then(() => state.events.slice(count));
+    state.stop = () => {
+        observer.disconnect();
+        cleanups.forEach((cleanup) => cleanup());
+        state.waiters.forEach((resolve) => resolve());
+        state.waiters = [];
+    };
+    window.__teqSubmitWatch = state;
+    return container.tagName.toLowerCase();
+}
+"""
+
+_NEXT_JS = """
+(count) => window.__teqSubmitWatch ? window.__teqSubmitWatch.next(count) : []
+"""
+
+_SNAPSHOT_JS = """
+() => {
+    const state = window.__teqSubmitWatch;
+    return state ? { mutations: state.mutations, formRemoved: state.formRemoved } : null;
+}
+"""
+
+_STOP_JS = """
+() => { if (window.__teqSubmitWatch && window.__teqSubmitWatch.stop) window.__teqSubmitWatch.stop(); }
+"""
+
+# Framework confirmation/error container in a freshly loaded document
+_MATCH_NATIVE_JS = """
+({ success, error }) => {
+    const find = (selector) => selector ? document.querySelector(selector) : null;
+    const ok = find(success);
+    if (ok) return ['success', 'selector:success', (ok.innerText || '').trim().slice(0, 200)];
+    const bad = find(error);
+    if (bad) return ['error', 'selector:error', (bad.innerText || '').trim().slice(0, 200)];
+    return null;
+}
+"""
+
+# After a navigation the whole new document is the changed subtree
+_MATCH_DOCUMENT_JS = """
+({ success, errors, maxText }) => {
+    const root = document.querySelector('main, [role="main"], article') || document.body;
+    if (!root) return null;
+    const text = (root.innerText || '').slice(0, maxText).toLowerCase();
+    for (const phrase of success) if (text.includes(phrase)) return ['success', phrase];
+    for (const phrase of errors) if (text.includes(phrase)) return ['error', phrase];
+    return null;
+}
+"""
+
+
+def _site(url: Optional[str]) -> str:
+    return registrable_domain(url) if url else ""
+
+
+def is_excluded_url(url: str) -> bool:
+    return EXCLUDED_URL_RE.search((url or "").lower()) is not None
+
+
+class SubmissionWatch:
+    """Collects submission signals for one page from the submit click onwards."""
+
+    def __init__(self, page, form_action_url: str = "", max_text: int = 4000, max_events: int = 16,
+                 signals: Optional[Dict[str, Any]] = None):
+        self.page = page
+        self.form_action_url = form_action_url or ""
+        self.signals = signals
+        self.max_text = max_text
+        self.max_events = max_events
+        self.start_url = ""
+        self.responses: List[Dict[str, Any]] = []
+        self.dom_events: List[Dict[str, Any]] = []
+        self.navigations: List[str] = []
+        self.container: Optional[str] = None
+        self._changed = asyncio.Event()
+        self._dom_task: Optional[asyncio.Task] = None
+        self._started = False
+
+    # ------------------------------------------------------------ lifecycle
+
+    async def start(self, form_locator: Optional[str] = None) -> bool:
+        """Install the observer on the target form's container and the network/navigation listeners."""
+        if self._started:
+            return True
+        try:
+            self.start_url = self.page.url or ""
+        except Exception:
+            self.start_url = ""
+        try:
+            self.page.on("response", self._on_response)
+            self.page.on("framenavigated", self._on_navigated)
+        except Exception:
+            return False
+        self._started = True
+        await self._install(form_locator)
+        return True
+
+    async def _install(self, form_locator: Optional[str] = None) -> None:
+        args = {
+            "success": list(SUCCESS_PHRASES),
+            "errors": list(ERROR_PHRASES),
+            "maxText": self.max_text,
+            "maxEvents": self.max_events,
+            "native": self.signals,
+        }
+        try:
+            if form_locator:
+                try:
+                    self.container = await self.page.locator(form_locator).first.evaluate(_WATCH_JS, args, timeout=2000)
+                except Exception:
+                    self.container = None
+            if self.container is None:
+                self.container = await self.page.evaluate(f"(args) => ({_WATCH_JS})(null, args)", args)
+        except Exception:
+            self.container = None
+            return
+        if self._dom_task is None or self._dom_task.done():
+            self._dom_task = asyncio.get_running_loop().create_task(self._follow_dom())
+
+    async def _follow_dom(self) -> None:
+        """Stream DOM events out of the page; ends when the page navigates or the watch stops."""
+        seen = 0
+        while self._started:
+            try:
+                events = await self.page.evaluate(_NEXT_JS, seen)
+            except Exception:
+                return
+            if not events:
+                return
+            seen += len(events)
+            self.dom_events.extend(events)
+            self._changed.set()
+
+    async def stop(self) -> None:
+        if not self._started:
+            return
+        self._started = False
+        for event, handler in (("response", self._on_response), ("framenavigated", self._on_navigated)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        try:
+            await self.page.evaluate(_STOP_JS)
+        except Exception:
+            pass
+        if self._dom_task is not None and not self._dom_task.done():
+            self._dom_task.cancel()
+
+    # -------------------------------------------------------------- signals
+
+    def is_submission_response(self, response) -> bool:
+        """Same-site POST/PUT/PATCH that is not an analytics beacon.
+
+        Compared by registrable domain, so a form on ``www.`` posting to ``api.``
+        of the same site still counts.
+        """
+        try:
+            if response.request.method not in SUBMIT_METHODS or is_excluded_url(response.url):
+                return False
+            site = _site(response.url)
+            return bool(site) and site in (_site(self.start_url), _site(self.form_action_url))
+        except Exception:
+            return False
+
+    def _on_response(self, response) -> None:
+        if not self.is_submission_response(response):
+            return
+        try:
+            self.responses.append({"url": response.url, "status": response.status, "at": time.monotonic()})
+        except Exception:
+            return
+        self._changed.set()
+
+    def _on_navigated(self, frame) -> None:
+        try:
+            if frame != self.page.main_frame:
+                return
+            self.navigations.append(frame.url)
+        except Exception:
+            return
+        self._changed.set()
+
+    @property
+    def signalled(self) -> bool:
+        return bool(self.responses or self.dom_events or self.navigations)
+
+    @property
+    def dom_success(self) -> Optional[Dict[str, Any]]:
+        return next((e for e in self.dom_events if e.get("kind") == "success"), None)
+
+    @property
+    def dom_errors(self) -> List[Dict[str, Any]]:
+        return [e for e in self.dom_events if e.get("kind") == "error"]
+
+    @property
+    def native_result(self) -> Optional[Dict[str, Any]]:
+        """First framework-native outcome (success or error) event, if any."""
+        return next((e for e in self.dom_events if e.get("source") == "native"), None)
+
+    @property
+    def url_changed(self) -> bool:
+        return any(url.split("#")[0] != self.start_url.split("#")[0] for url in self.navigations)
+
+    def successful_response(self) -> Optional[Dict[str, Any]]:
+        return next((r for r in self.responses if r["status"] in (200, 201, 204, 302, 303)), None)
+
+    def failed_response(self) -> Optional[Dict[str, Any]]:
+        return next((r for r in self.responses if r["status"] >= 400), None)
+
+    # ----------------------------------------------------------------- wait
+
+    async def _wait_until(self, predicate: Callable[[], bool], deadline: float) -> bool:
+        while not predicate():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._changed.clear()
+            if predicate():
+                break
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return predicate()
+        return True
+
+    async def wait(self, timeout: float, grace: float = 1.5) -> bool:
+        """Wait for the first submission signal, then up to ``grace`` for the rest; False on timeout."""
+        deadline = time.monotonic() + timeout
+        if not await self._wait_until(lambda: self.signalled, deadline):
+            return False
+        # A response usually comes first and the confirmation renders right after it
+        # (or the other way round with optimistic UIs); give the other side a moment.
+        await self._wait_until(
+            lambda: (self.dom_success is not None or self.navigations) and bool(self.responses),
+            min(deadline, time.monotonic() + grace),
+        )
+        if self.navigations:
+            await self._match_new_document()
+        return True
+
+    async def wait_native(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the framework's own outcome signal (or a navigation, then check the new document)."""
+        deadline = time.monotonic() + timeout
+        await self._wait_until(lambda: self.native_result is not None or bool(self.navigations), deadline)
+        if self.native_result is None and self.navigations:
+            await self._match_new_document()
+        return self.native_result
+
+    async def _match_new_document(self) -> None:
+        """After a navigation, look for the confirmation in the new document (in-page, matched phrase only)."""
+        if any(e.get("source") == "navigation" for e in self.dom_events):
+            return
+        try:
+            await self.page.wait_for_load_state("domcontentloaded", timeout=3000)
+            if self.signals and self.native_result is None:
+                native = await self.page.evaluate(
+                    _MATCH_NATIVE_JS, {"success": self.signals.get("success"), "error": self.signals.get("error")}
+                )
+                if native:
+                    self.dom_events.append({"kind": native[0], "phrase": native[1], "text": native[2], "source": "native"})
+            found = await self.page.evaluate(
+                _MATCH_DOCUMENT_JS,
+                {"success": list(SUCCESS_PHRASES), "errors": list(ERROR_PHRASES), "maxText": self.max_text},
+            )
+        except Exception:
+            return
+        if found:
+            self.dom_events.append({"kind": found[0], "phrase": found[1], "text": "", "source": "navigation"})
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Everything observed so far, for logging and the run result."""
+        page_state = None
+        try:
+            page_state = await self.page.evaluate(_SNAPSHOT_JS)
+        except Exception:
+            pass
+        success = self.dom_success
+        return {
+            "container": self.container,
+            "responses": [{"url": r["url"], "status": r["status"]} for r in self.responses[:10]],
+            "navigations": self.navigations[:5],
+            "url_changed": self.url_changed,
+            "success_text": success.get("text") or success.get("phrase") if success else None,
+            "errors": [e.get("text") or e.get("phrase") for e in self.dom_errors[:3]],
+            "form_removed": bool(page_state and page_state.get("formRemoved"))
+                or any(e.get("kind") == "form_removed" for e in self.dom_events),
+            "mutations": page_state.get("mutations") if page_state else None,
+            "native": self.native_result,
+        }
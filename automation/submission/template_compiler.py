@@ -0,0 +1,250 @@
+"""
+Compiled, immutable submission templates.
+
+A template file used to be read, ``json.loads``-ed and normalized on every run,
+and every fill path re-derived "which logical field is this input" from
+substring tests written inline in Python and in per-call JS strings.
+``load_template()`` now turns a template into a ``CompiledTemplate`` once:
+normalized test data, the field matcher payload (logical fields name, email,
+phone, subject, company and message, classified by ``field_classifier``) and
+the submit selectors to try. Compiled
+templates are memoized by content hash, so a worker or batch runner that sees
+the same template for thousands of jobs parses it once.
+
+``CompiledTemplate`` is a read-only ``Mapping`` over the original template, so
+``template.get("headless")`` and friends keep working. ``payload`` is the
+single argument handed to the in-page matcher (``FIELD_MATCHER_JS``), which
+builds its lexicon index once per page and template digest.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from field_classifier import FIELD_CLASSIFIER_JS, LEXICON_PAYLOAD, classify_field
+
+DEFAULT_TEST_DATA = {
+    "name": "Test User",
+    "email": "test@example.com",
+    "phone": "+1234567890",
+    "message": "This is an automated test submission.",
+    "subject": "Test Inquiry",
+    "company": "Test Company",
+}
+
+# Value for inputs no matcher claims
+FALLBACK_VALUE = "Test Value"
+
+# Recognized non-fillable kinds that must be left empty
+SKIPPED_KINDS = ("search", "captcha", "password")
+
+DEFAULT_SUBMIT_SELECTORS = (
+    'button[type="submit"]',
+    'input[type="submit"]',
+    'button:has-text("Submit")',
+    'button:has-text("Send")',
+    'form button:last-child',
+    'form button',
+)
+
+_PLACEHOLDER_MESSAGES = {"true", "false", "null", "undefined"}
+_MEMO_SIZE = 256
+
+# Returns the page's matcher for ``spec`` (CompiledTemplate.payload), building it
+# only when the template digest changed since the last call on this page.
+FIELD_MATCHER_JS = (
+    "(spec) => {\n"
+    "    const cached = window.__teqFieldMatcher;\n"
+    "    if (cached && cached.digest === spec.digest) return cached;\n"
+    "    const classifier = (" + FIELD_CLASSIFIER_JS + ")(spec.lexicon);\n"
+    "    const matcher = {\n"
+    "        digest: spec.digest,\n"
+    "        match(el) { return classifier.classify(el); },\n"
+    "        classify(el) { return classifier.classify(el).field; },\n"
+    "        value(el) {\n"
+    "            const match = classifier.classify(el);\n"
+    "            if (match.field) return spec.testData[match.field];\n"
+    "            return spec.skippedKinds.includes(match.kind) ? null : spec.fallbackValue;\n"
+    "        },\n"
+    "    };\n"
+    "    window.__teqFieldMatcher = matcher;\n"
+    "    return matcher;\n"
+    "}"
+)
+
+# ``element.evaluate`` helper: logical field and display name of one element
+DESCRIBE_ELEMENT_JS = (
+    "(el, spec) => ({ field: (" + FIELD_MATCHER_JS + ")(spec).classify(el), label: el.name || el.id || '' })"
+)
+
+
+def normalize_test_data(raw: Any) -> Dict[str, str]:
+    """Trimmed test data with defaults for missing or placeholder values."""
+    source = raw if isinstance(raw, dict) else {}
+    resolved: Dict[str, str] = {}
+    for key, fallback in DEFAULT_TEST_DATA.items():
+        value = source.get(key)
+        if isinstance(value, str):
+            normalized = value.strip()
+            if key == "message" and normalized.lower() in _PLACEHOLDER_MESSAGES:
+                normalized = ""
+            resolved[key] = normalized or fallback
+        else:
+            resolved[key] = fallback
+    return resolved
+
+
+class CompiledTemplate(Mapping):
+    """Immutable template plus everything derived from it; hashed and compared by ``digest``."""
+
+    __slots__ = ("digest", "test_data", "submit_selectors", "_source", "_payload")
+
+    def __init__(self, source: Mapping[str, Any], digest: str):
+        # Nested values are frozen too: compiled templates are shared process-wide through ``_memo``
+        self._source = {key: _freeze(value) for key, value in source.items()}
+        self.digest = digest
+        self.test_data: Mapping[str, str] = _FrozenDict(normalize_test_data(self._source.get("test_data")))
+        custom_submit = self._source.get("submit_selector")
+        self.submit_selectors: Tuple[str, ...] = tuple(
+            dict.fromkeys(([custom_submit] if isinstance(custom_submit, str) and custom_submit.strip() else [])
+                          + list(DEFAULT_SUBMIT_SELECTORS))
+        )
+        self._payload = {
+            "digest": digest,
+            "lexicon": LEXICON_PAYLOAD,
+            "testData": dict(self.test_data),
+            "fallbackValue": FALLBACK_VALUE,
+            "skippedKinds": list(SKIPPED_KINDS),
+        }
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, "_payload"):
+            raise AttributeError("CompiledTemplate is immutable")
+        object.__setattr__(self, name, value)
+
+    # Mapping over the raw template
+    def __getitem__(self, key: str) -> Any:
+        return self._source[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._source)
+
+    def __len__(self) -> int:
+        return len(self._source)
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompiledTemplate):
+            return self.digest == other.digest
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(digest={self.digest[:12]!r})"
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """The single argument for ``FIELD_MATCHER_JS`` (serialized by Playwright, never mutated here)."""
+        return self._payload
+
+    def classify(self, name: str = "", placeholder: str = "", input_type: str = "", tag: str = "",
+                 element_id: str = "", aria_label: str = "", autocomplete: str = "", label: str = "") -> Optional[str]:
+        """Python twin of the in-page ``classify``: the logical field for these attributes, or None."""
+        return classify_field(
+            tag=tag or "input", input_type=input_type, name=name, element_id=element_id,
+            placeholder=placeholder, label=label, aria_label=aria_label, autocomplete=autocomplete,
+        ).field
+
+    def value_for(self, field: Optional[str]) -> str:
+        """Test data for a logical field (``FALLBACK_VALUE`` when unclassified)."""
+        return self.test_data.get(field, FALLBACK_VALUE) if field else FALLBACK_VALUE
+
+
+class _FrozenDict(dict):
+    """dict that refuses writes (still JSON-serializable, unlike MappingProxyType)."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("read-only mapping")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly  # type: ignore[assignment]
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(tuple(sorted(self.items())))
+
+    def __reduce__(self):
+        # copy/deepcopy/pickle hand out a plain, writable dict
+        return dict, (dict(self),)
+
+
+class _FrozenList(list):
+    """list that refuses writes (the nested-list counterpart of ``_FrozenDict``)."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("read-only list")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly  # type: ignore[assignment]
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly  # type: ignore[assignment]
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(tuple(self))
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only deep copy of a parsed JSON value."""
+    if isinstance(value, Mapping):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return _FrozenList(_freeze(item) for item in value)
+    return value
+
+
+_memo: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+
+
+def _remember(digest: str, build) -> CompiledTemplate:
+    compiled = _memo.get(digest)
+    if compiled is not None:
+        _memo.move_to_end(digest)
+        return compiled
+    compiled = build()
+    _memo[digest] = compiled
+    if len(_memo) > _MEMO_SIZE:
+        _memo.popitem(last=False)
+    return compiled
+
+
+def compile_template(template: Mapping[str, Any]) -> CompiledTemplate:
+    """Compile an already-parsed template (memoized by the hash of its canonical JSON)."""
+    if isinstance(template, CompiledTemplate):
+        return template
+    canonical = json.dumps(template, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    digest = hashlib.sha256(canonical).hexdigest()
+    return _remember(digest, lambda: CompiledTemplate(template, digest))
+
+
+def load_template(path: Path) -> Optional[CompiledTemplate]:
+    """Read and compile a template file, memoized by the hash of its bytes; None if unreadable/invalid."""
+    try:
+        content = Path(path).read_bytes()
+    except OSError:
+        return None
+    digest = hashlib.sha256(content).hexdigest()
+    compiled = _memo.get(digest)
+    if compiled is not None:
+        _memo.move_to_end(digest)
+        return compiled
+    try:
+        template = json.loads(content.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(template, dict):
+        return None
+    return _remember(digest, lambda: CompiledTemplate(template, digest))
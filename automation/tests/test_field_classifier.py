@@ -0,0 +1,39 @@
+"""Field classifier tests."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "submission"))
+
+from field_classifier import CONFIDENT, classify_field
+
+# (control attributes, expected logical field, expected kind)
+FIELDS = [
+    ({"name": "your-name"}, "name", "name"),
+    ({"name": "fname"}, "name", "name"),
+    ({"name": "correo"}, "email", "email"),
+    ({"name": "nachricht"}, "message", "message"),
+    ({"tag": "textarea", "name": "nachricht"}, "message", "message"),
+    ({"name": "field_3", "label": "E-Mail Adresse"}, "email", "email"),
+    ({"name": "input_7", "label": "Telefoonnummer"}, "phone", "phone"),
+    ({"name": "search_query"}, None, "search"),
+    ({"name": "postcode"}, None, "address"),
+]
+
+
+@pytest.mark.parametrize("attributes, expected_field, expected_kind", FIELDS)
+def test_classify_field(attributes, expected_field, expected_kind) -> None:
+    """Multilingual names and labels map to logical fields; search/address controls are never filled."""
+    match = classify_field(**attributes)
+    assert match.kind == expected_kind
+    assert match.field == expected_field
+    assert match.confident is (expected_field is not None)
+    if expected_field is None:
+        assert match.confidence >= CONFIDENT  # Recognized, just not fillable
+
+
+def test_unknown_control_is_unclassified() -> None:
+    match = classify_field(name="x1")
+    assert match.field is None and match.kind is None and match.confidence == 0.0
@@ -0,0 +1,25 @@
+"""Lean resource profile tests."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "submission"))
+
+from resource_profiles import ResourceBlocker
+
+
+def test_first_party_subdomains_are_same_site() -> None:
+    """``forms.x.de`` iframes and CDN images on ``www.x.de`` pages are first-party."""
+    blocker = ResourceBlocker("lean")
+    page_url = "https://www.bmw.de/de/kontakt.html"
+    assert blocker.block_reason("https://forms.bmw.de/contact", "document", page_url, True) is None
+    assert blocker.block_reason("https://cdn.bmw.de/logo.png", "image", page_url, False) is None
+    assert blocker.block_reason("https://cdn.abc.io/hero.jpg", "image", "https://www.abc.io/", False) is None
+
+
+def test_third_party_subframes_and_images_are_blocked() -> None:
+    """Other sites' images and iframes are still aborted."""
+    blocker = ResourceBlocker("lean")
+    page_url = "https://www.bmw.de/de/kontakt.html"
+    assert blocker.block_reason("https://forms.other.de/embed", "document", page_url, True) == "third_party_iframe"
+    assert blocker.block_reason("https://img.example.co.uk/a.png", "image", page_url, False) == "third_party_image"
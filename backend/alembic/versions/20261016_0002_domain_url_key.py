@@ -0,0 +1,105 @@
+"""Add canonical URL key to domains for import deduplication."""
+
+from __future__ import annotations
+
+import ipaddress
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261016_0002"
+down_revision = "20241113_0001"
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.services.domain_import.canonicalize_url as of this revision:
+# the backfill must not change when the application's canonicalization evolves.
+_MAX_URL_LENGTH = 512
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# Rows read and updated per round trip during the backfill
+_BACKFILL_CHUNK = 5000
+
+
+def _valid_host(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        pass
+    if host == "localhost":
+        return True
+    labels = host.split(".")
+    if len(labels) < 2 or not labels[-1].isalpha():
+        return False
+    return all(
+        label and len(label) <= 63 and not label.startswith("-") and not label.endswith("-")
+        and all(ch.isalnum() or ch == "-" for ch in label)
+        for label in labels
+    )
+
+
+def _url_key(value: str) -> Optional[str]:
+    """Dedup key for ``value`` (host without ``www.`` + path + query), or None when invalid."""
+    raw = (value or "").strip()
+    if not raw:
+        return None
+    if "://" not in raw:
+        raw = f"https://{raw.lstrip('/')}"
+    try:
+        parts = urlsplit(raw)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        return None
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii").lower()
+    except UnicodeError:
+        return None
+    if not _valid_host(host):
+        return None
+
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    path = parts.path.rstrip("/")
+    if len(urlunsplit((scheme, netloc, path, parts.query, ""))) > _MAX_URL_LENGTH:
+        return None
+
+    key_host = netloc[4:] if netloc.startswith("www.") else netloc
+    return key_host + path + (f"?{parts.query}" if parts.query else "")
+
+
+def upgrade() -> None:
+    op.add_column("domains", sa.Column("url_key", sa.String(length=512), nullable=True))
+
+    # Backfill in id-ordered chunks, one executemany UPDATE per chunk; the first row
+    # of every group of existing duplicates keeps the key
+    bind = op.get_bind()
+    select_chunk = sa.text("SELECT id, url FROM domains WHERE id > :after ORDER BY id LIMIT :limit")
+    update_keys = sa.text("UPDATE domains SET url_key = :key WHERE id = :id")
+    seen = set()
+    after = 0
+    while True:
+        rows = bind.execute(select_chunk, {"after": after, "limit": _BACKFILL_CHUNK}).fetchall()
+        if not rows:
+            break
+        after = rows[-1][0]
+        updates = []
+        for domain_id, url in rows:
+            key = _url_key(url)
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            updates.append({"key": key, "id": domain_id})
+        if updates:
+            bind.execute(update_keys, updates)
+
+    op.create_index("ix_domains_url_key", "domains", ["url_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_domains_url_key", table_name="domains")
+    op.drop_column("domains", "url_key")
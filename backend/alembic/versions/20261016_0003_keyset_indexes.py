@@ -0,0 +1,36 @@
+"""Composite and partial indexes for keyset pagination of domains and submission logs."""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261016_0003"
+down_revision = "20261016_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_domains_created_at_id", "domains", ["created_at", "id"])
+    op.create_index(
+        "ix_domains_active_created_at_id",
+        "domains",
+        ["created_at", "id"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+    op.create_index("ix_submission_logs_created_at_id", "submission_logs", ["created_at", "id"])
+    op.create_index("ix_submission_logs_domain_created_at_id", "submission_logs", ["domain_id", "created_at", "id"])
+    # Supersedes the single-column status index
+    op.create_index("ix_submission_logs_status_created_at_id", "submission_logs", ["status", "created_at", "id"])
+    op.drop_index("ix_submission_logs_status", table_name="submission_logs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_submission_logs_status", "submission_logs", ["status"])
+    op.drop_index("ix_submission_logs_status_created_at_id", table_name="submission_logs")
+    op.drop_index("ix_submission_logs_domain_created_at_id", table_name="submission_logs")
+    op.drop_index("ix_submission_logs_created_at_id", table_name="submission_logs")
+    op.drop_index("ix_domains_active_created_at_id", table_name="domains")
+    op.drop_index("ix_domains_created_at_id", table_name="domains")
@@ -2,32 +2,39 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin, get_db_session
+from app.core.pagination import InvalidCursor
 from app.crud import domain as domain_crud
 from app.db.models.admin import Admin
-from app.schemas.domain import DomainCreate, DomainRead, DomainUpdate
+from app.schemas.domain import DomainCreate, DomainImportResult, DomainPage, DomainRead, DomainUpdate
+from app.services.domain_import import DomainImportReport, detect_format, iter_import_rows
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[DomainRead], summary="List registered domains")
+@router.get("/", response_model=DomainPage, summary="List registered domains")
 async def list_domains(
     *,
     session: AsyncSession = Depends(get_db_session),
     _admin: Admin = Depends(get_current_admin),
     is_active: Optional[bool] = Query(default=None, description="Filter by active status"),
-    skip: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
     limit: int = Query(default=100, ge=1, le=500),
-) -> List[DomainRead]:
-    """Return domains with optional filters."""
-    records = await domain_crud.list_domains(session, skip=skip, limit=limit, is_active=is_active)
-    return list(records)
+) -> DomainPage:
+    """Return one page of domains, newest first, with optional filters."""
+    try:
+        records, cursor_token = await domain_crud.list_domains(
+            session, cursor=cursor, limit=limit, is_active=is_active
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return DomainPage(items=list(records), next_cursor=cursor_token)
 
 
 @router.post(
@@ -59,6 +66,38 @@ async def create_domain(
     return domain
 
 
+@router.post(
+    "/import",
+    response_model=DomainImportResult,
+    summary="Bulk import domains from a CSV or NDJSON file",
+)
+async def import_domains(
+    *,
+    file: UploadFile = File(..., description="CSV with a url column (e.g. a domains export) or NDJSON"),
+    format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    category: Optional[str] = Query(default=None, description="Category for rows that have none"),
+    chunk_size: int = Query(default=domain_crud.IMPORT_CHUNK_SIZE, ge=1, le=5000),
+    session: AsyncSession = Depends(get_db_session),
+    _admin: Admin = Depends(get_current_admin),
+) -> DomainImportResult:
+    """Stream the file, normalize every URL and insert new domains in chunks."""
+    report = DomainImportReport()
+    rows = iter_import_rows(
+        file.file,
+        report,
+        fmt=format or detect_format(file.filename, file.content_type),
+        default_category=category,
+    )
+    await domain_crud.import_domains(session, rows, report, chunk_size=chunk_size)
+    return DomainImportResult(
+        created=report.created,
+        skipped=report.skipped,
+        invalid=report.invalid,
+        total=report.total,
+        errors=report.errors,
+    )
+
+
 @router.get(
     "/{domain_id}",
     response_model=DomainRead,
@@ -0,0 +1,37 @@
+"""Submission stage latency metrics."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Response, status
+
+from app.api.deps import get_api_key
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, StageMetrics, get_stage_metrics
+from app.schemas.metrics import StageTimingReport
+
+router = APIRouter()
+
+
+@router.get("/", summary="Stage latency histograms in Prometheus text format")
+async def export_metrics(metrics: StageMetrics = Depends(get_stage_metrics)) -> Response:
+    """Return per-stage histograms and p50/p95/p99 for scraping."""
+    return Response(content=metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.post(
+    "/stages",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Record the stage timings of a finished run",
+)
+async def record_stage_timings(
+    payload: StageTimingReport,
+    _api_key: str = Depends(get_api_key),
+    metrics: StageMetrics = Depends(get_stage_metrics),
+) -> Response:
+    """Fold one run's ``stage_timings`` into the histograms."""
+    for timing in payload.stages:
+        metrics.observe(timing.stage, timing.seconds, timing.bytes, timing.evaluate_calls)
+    if payload.total_seconds is not None:
+        metrics.observe("total", payload.total_seconds)
+    if payload.status:
+        metrics.count_run(payload.status)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
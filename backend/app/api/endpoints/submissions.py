@@ -0,0 +1,45 @@
+"""Submission log endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin, get_db_session
+from app.core.pagination import InvalidCursor
+from app.crud import submission as submission_crud
+from app.db.models.admin import Admin
+from app.schemas.submission import SubmissionLogPage
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SubmissionLogPage, summary="List submission attempts")
+async def list_submission_logs(
+    *,
+    session: AsyncSession = Depends(get_db_session),
+    _admin: Admin = Depends(get_current_admin),
+    status_filter: Optional[str] = Query(default=None, alias="status", description="Filter by submission status"),
+    domain_id: Optional[int] = Query(default=None, ge=1),
+    created_after: Optional[datetime] = Query(default=None, description="Only logs created at or after this time"),
+    created_before: Optional[datetime] = Query(default=None, description="Only logs created before this time"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    limit: int = Query(default=50, ge=1, le=500),
+) -> SubmissionLogPage:
+    """Return one page of submission logs, newest first."""
+    try:
+        records, cursor_token = await submission_crud.list_submission_logs(
+            session,
+            cursor=cursor,
+            limit=limit,
+            status=status_filter,
+            domain_id=domain_id,
+            created_after=created_after,
+            created_before=created_before,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return SubmissionLogPage(items=list(records), next_cursor=cursor_token)
@@ -2,10 +2,12 @@
 
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, domains, health
+from app.api.endpoints import auth, domains, health, metrics, submissions
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(domains.router, prefix="/domains", tags=["domains"])
+api_router.include_router(submissions.router, prefix="/submissions", tags=["submissions"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
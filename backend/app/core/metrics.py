@@ -0,0 +1,121 @@
+"""Per-stage submission latency histograms exported in Prometheus text format.
+
+A backend copy of the automation worker's ``StageHistograms``
+(``automation/submission/stage_timing.py``); ``tests/test_metrics.py`` checks
+that buckets, quantiles and the rendered output stay identical.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, List, Tuple
+
+# Upper bounds (seconds) of the exported histogram buckets; kept in step with the automation worker
+BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _StageStats:
+    __slots__ = ("bucket_counts", "count", "total", "samples", "bytes", "evaluate_calls")
+
+    def __init__(self, window: int) -> None:
+        self.bucket_counts: List[int] = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.bytes = 0
+        self.evaluate_calls = 0
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class StageMetrics:
+    """Thread-safe stage duration histograms with p50/p95/p99 over a sliding sample window."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self.window = window
+        self._stages: Dict[str, _StageStats] = {}
+        self._runs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, byte_count: int = 0, evaluate_calls: int = 0) -> None:
+        """Record one stage duration."""
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _StageStats(self.window)
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.bucket_counts[index] += 1
+            stats.count += 1
+            stats.total += seconds
+            stats.samples.append(seconds)
+            stats.bytes += byte_count
+            stats.evaluate_calls += evaluate_calls
+
+    def count_run(self, status: str) -> None:
+        """Count one finished run by its final status."""
+        with self._lock:
+            self._runs[status] = self._runs.get(status, 0) + 1
+
+    def quantiles(self, stage: str) -> Dict[float, float]:
+        """Return p50/p95/p99 for ``stage`` (zeros when nothing was recorded)."""
+        with self._lock:
+            stats = self._stages.get(stage)
+            values = sorted(stats.samples) if stats else []
+        return {q: _quantile(values, q) for q in QUANTILES}
+
+    def render_prometheus(self, prefix: str = "teq_submission") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            stages = {
+                name: (list(s.bucket_counts), s.count, s.total, sorted(s.samples), s.bytes, s.evaluate_calls)
+                for name, s in self._stages.items()
+            }
+            runs = dict(self._runs)
+
+        lines: List[str] = []
+        name = f"{prefix}_stage_duration_seconds"
+        lines += [f"# HELP {name} Duration of each submission stage.", f"# TYPE {name} histogram"]
+        for stage, (buckets, count, total, _samples, _bytes, _calls) in sorted(stages.items()):
+            for bound, bucket_count in zip(BUCKETS, buckets):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        name = f"{prefix}_stage_duration_quantile_seconds"
+        lines += [f"# HELP {name} p50/p95/p99 stage duration over the most recent runs.", f"# TYPE {name} gauge"]
+        for stage, (_buckets, _count, _total, samples, _bytes, _calls) in sorted(stages.items()):
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {_quantile(samples, q):.6f}')
+
+        for metric, index, help_text in (
+            ("stage_bytes_total", 4, "Response bytes transferred during each stage."),
+            ("stage_evaluate_calls_total", 5, "page.evaluate calls made during each stage."),
+        ):
+            name = f"{prefix}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for stage, values in sorted(stages.items()):
+                if stage != "total":
+                    lines.append(f'{name}{{stage="{stage}"}} {values[index]}')
+
+        name = f"{prefix}_runs_total"
+        lines += [f"# HELP {name} Finished submission runs by final status.", f"# TYPE {name} counter"]
+        for status, count in sorted(runs.items()):
+            lines.append(f'{name}{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache
+def get_stage_metrics() -> StageMetrics:
+    """Return the process-wide stage metrics registry."""
+    return StageMetrics()
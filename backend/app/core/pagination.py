@@ -0,0 +1,52 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``, newest first."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque token pointing just past the row with ``(created_at, row_id)``."""
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Inverse of :func:`encode_cursor`."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def apply_keyset(stmt: Select, created_col: Any, id_col: Any, cursor: Optional[str], limit: int) -> Select:
+    """Order ``stmt`` newest first and start it after ``cursor``.
+
+    One extra row is fetched so :func:`next_cursor` can tell whether another
+    page exists without a COUNT query.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Row comparison lets Postgres seek straight into the (created_at, id) index
+        stmt = stmt.where(tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    return stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Tuple[Sequence[Any], Optional[str]]:
+    """Trim the look-ahead row and return ``(page, cursor for the next page or None)``."""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
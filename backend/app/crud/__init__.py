@@ -1,6 +1,6 @@
 """CRUD helper modules."""
 
-from app.crud import admin, domain
+from app.crud import admin, domain, submission
 
-__all__ = ["admin", "domain"]
+__all__ = ["admin", "domain", "submission"]
 
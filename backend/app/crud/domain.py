@@ -2,29 +2,51 @@
 
 from __future__ import annotations
 
-from typing import Optional, Sequence
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import apply_keyset, next_cursor
 from app.db.models.domain import Domain
 from app.schemas.domain import DomainCreate, DomainUpdate
+from app.services.domain_import import (
+    DomainImportReport,
+    DomainImportRow,
+    InvalidDomainURL,
+    canonicalize_url,
+)
+
+IMPORT_CHUNK_SIZE = 1000
+
+
+def url_key_for(url: str) -> Optional[str]:
+    """Canonical dedup key for ``url`` (None when it cannot be normalized)."""
+    try:
+        return canonicalize_url(url).key
+    except InvalidDomainURL:
+        return None
 
 
 async def list_domains(
     session: AsyncSession,
     *,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100,
     is_active: bool | None = None,
-) -> Sequence[Domain]:
-    """Return domains with optional filtering."""
-    stmt = select(Domain).order_by(Domain.created_at.desc()).offset(skip).limit(limit)
+) -> Tuple[Sequence[Domain], Optional[str]]:
+    """Return one page of domains (newest first) and the cursor of the next page.
+
+    Raises ``InvalidCursor`` for a malformed cursor.
+    """
+    stmt = select(Domain)
     if is_active is not None:
         stmt = stmt.where(Domain.is_active.is_(is_active))
+    stmt = apply_keyset(stmt, Domain.created_at, Domain.id, cursor, limit)
     result = await session.execute(stmt)
-    return result.scalars().unique().all()
+    return next_cursor(result.scalars().unique().all(), limit)
 
 
 async def get_domain(session: AsyncSession, domain_id: int) -> Optional[Domain]:
@@ -33,8 +55,9 @@ async def get_domain(session: AsyncSession, domain_id: int) -> Optional[Domain]:
 
 
 async def get_domain_by_url(session: AsyncSession, url: str) -> Optional[Domain]:
-    """Fetch a domain by URL."""
-    stmt = select(Domain).where(Domain.url == url)
+    """Fetch a domain by URL, matching any spelling with the same canonical key."""
+    key = url_key_for(url)
+    stmt = select(Domain).where(Domain.url_key == key if key else Domain.url == url)
     result = await session.execute(stmt)
     return result.scalars().first()
 
@@ -43,6 +66,7 @@ async def create_domain(session: AsyncSession, payload: DomainCreate) -> Domain:
     """Persist a new domain record."""
     domain = Domain(
         url=str(payload.url),
+        url_key=url_key_for(str(payload.url)),
         category=payload.category,
         is_active=payload.is_active,
     )
@@ -61,6 +85,7 @@ async def update_domain(session: AsyncSession, domain: Domain, payload: DomainUp
     data = payload.model_dump(exclude_unset=True)
     if "url" in data and data["url"] is not None:
         domain.url = str(data.pop("url"))
+        domain.url_key = url_key_for(domain.url)
     for field, value in data.items():
         setattr(domain, field, value)
     session.add(domain)
@@ -74,3 +99,53 @@ async def delete_domain(session: AsyncSession, domain: Domain) -> None:
     await session.delete(domain)
     await session.commit()
 
+
+async def _insert_chunk(session: AsyncSession, rows: List[DomainImportRow]) -> int:
+    """Insert one chunk with a single multi-row statement; returns how many rows were new."""
+    stmt = (
+        pg_insert(Domain)
+        .values([
+            {"url": row.url, "url_key": row.url_key, "category": row.category, "is_active": row.is_active}
+            for row in rows
+        ])
+        .on_conflict_do_nothing()
+        .returning(Domain.id)
+    )
+    result = await session.execute(stmt)
+    created = len(result.fetchall())
+    await session.commit()
+    return created
+
+
+async def import_domains(
+    session: AsyncSession,
+    rows: Iterable[DomainImportRow],
+    report: DomainImportReport,
+    *,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> DomainImportReport:
+    """Bulk-insert streamed rows in chunks, skipping URLs whose canonical key already exists.
+
+    Duplicates inside the file are dropped before they reach the database;
+    duplicates of stored domains are skipped by ``ON CONFLICT DO NOTHING``.
+    Each chunk is committed on its own, so a huge file never holds one long
+    transaction.
+    """
+    seen: Set[str] = set()
+    chunk: List[DomainImportRow] = []
+    for row in rows:
+        if row.url_key in seen:
+            report.skipped += 1
+            continue
+        seen.add(row.url_key)
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            created = await _insert_chunk(session, chunk)
+            report.created += created
+            report.skipped += len(chunk) - created
+            chunk = []
+    if chunk:
+        created = await _insert_chunk(session, chunk)
+        report.created += created
+        report.skipped += len(chunk) - created
+    return report
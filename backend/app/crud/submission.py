@@ -0,0 +1,40 @@
+"""Submission log CRUD helpers."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import apply_keyset, next_cursor
+from app.db.models.submission import SubmissionLog
+
+
+async def list_submission_logs(
+    session: AsyncSession,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    status: Optional[str] = None,
+    domain_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Tuple[Sequence[SubmissionLog], Optional[str]]:
+    """Return one page of submission logs (newest first) and the cursor of the next page.
+
+    Raises ``InvalidCursor`` for a malformed cursor.
+    """
+    stmt = select(SubmissionLog)
+    if status is not None:
+        stmt = stmt.where(SubmissionLog.status == status)
+    if domain_id is not None:
+        stmt = stmt.where(SubmissionLog.domain_id == domain_id)
+    if created_after is not None:
+        stmt = stmt.where(SubmissionLog.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(SubmissionLog.created_at < created_before)
+    stmt = apply_keyset(stmt, SubmissionLog.created_at, SubmissionLog.id, cursor, limit)
+    result = await session.execute(stmt)
+    return next_cursor(result.scalars().all(), limit)
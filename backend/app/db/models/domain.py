@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -15,9 +15,15 @@ class Domain(Base):
     """Domain queued for automation runs."""
 
     __tablename__ = "domains"
+    __table_args__ = (
+        # Keyset pagination (newest first), overall and for the common active-only filter
+        Index("ix_domains_created_at_id", "created_at", "id"),
+        Index("ix_domains_active_created_at_id", "created_at", "id", postgresql_where=text("is_active")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     url: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
+    url_key: Mapped[Optional[str]] = mapped_column(String(512), unique=True, index=True, nullable=True)
     category: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
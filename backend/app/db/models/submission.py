@@ -5,7 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -24,6 +24,12 @@ class SubmissionLog(Base):
     """History of automation submission attempts."""
 
     __tablename__ = "submission_logs"
+    __table_args__ = (
+        # Keyset pagination (newest first), overall and per status / per domain
+        Index("ix_submission_logs_created_at_id", "created_at", "id"),
+        Index("ix_submission_logs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_submission_logs_domain_created_at_id", "domain_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     domain_id: Mapped[int] = mapped_column(ForeignKey("domains.id", ondelete="CASCADE"), nullable=False)
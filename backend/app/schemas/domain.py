@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field, HttpUrl
 
@@ -41,3 +41,28 @@ class DomainRead(DomainBase):
     class Config:
         from_attributes = True
 
+
+
+class DomainImportError(BaseModel):
+    """One rejected row of an import file."""
+
+    line: int
+    value: str
+    reason: str
+
+
+class DomainImportResult(BaseModel):
+    """Outcome of a bulk domain import."""
+
+    created: int = Field(..., description="New domains inserted")
+    skipped: int = Field(..., description="Rows whose canonical URL already existed (in the file or the database)")
+    invalid: int = Field(..., description="Rows without a usable URL")
+    total: int
+    errors: List[DomainImportError] = Field(default_factory=list, description="First rejected rows")
+
+
+class DomainPage(BaseModel):
+    """One page of domains, newest first."""
+
+    items: List[DomainRead]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as ?cursor= to get the next page; null on the last page")
@@ -0,0 +1,25 @@
+"""Stage timing schemas reported by automation runs."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class StageTiming(BaseModel):
+    """One timed stage of a submission run (``stage_timings.stages[]`` in the run result)."""
+
+    stage: str = Field(..., min_length=1, max_length=64, pattern=r"^[a-z0-9_.]+$")
+    seconds: float = Field(..., ge=0)
+    bytes: int = Field(default=0, ge=0)
+    evaluate_calls: int = Field(default=0, ge=0)
+    status: Optional[str] = None
+
+
+class StageTimingReport(BaseModel):
+    """Stage timings of one finished run."""
+
+    stages: List[StageTiming] = Field(default_factory=list, max_length=64)
+    total_seconds: Optional[float] = Field(default=None, ge=0)
+    status: Optional[str] = Field(default=None, max_length=32)
@@ -0,0 +1,31 @@
+"""Submission log schemas."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SubmissionLogRead(BaseModel):
+    """Submission attempt returned to clients."""
+
+    id: int
+    domain_id: int
+    template_id: Optional[int] = None
+    status: str
+    message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class SubmissionLogPage(BaseModel):
+    """One page of submission logs, newest first."""
+
+    items: List[SubmissionLogRead]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as ?cursor= to get the next page; null on the last page")
@@ -0,0 +1,218 @@
+"""Streaming parsing and URL canonicalization for bulk domain imports."""
+
+from __future__ import annotations
+
+import csv
+import io
+import ipaddress
+import json
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+MAX_URL_LENGTH = 512
+MAX_CATEGORY_LENGTH = 128
+MAX_REPORTED_ERRORS = 50
+
+_TRUE_VALUES = {"1", "true", "yes", "y", "t", "active"}
+_FALSE_VALUES = {"0", "false", "no", "n", "f", "inactive"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class InvalidDomainURL(ValueError):
+    """Raised when a value cannot be turned into a domain URL."""
+
+
+@dataclass(frozen=True)
+class CanonicalURL:
+    """Normalized URL to store plus the key duplicates are detected by."""
+
+    url: str
+    key: str
+
+
+@dataclass(frozen=True)
+class DomainImportRow:
+    """One valid row of an import file."""
+
+    line: int
+    url: str
+    url_key: str
+    category: Optional[str]
+    is_active: bool
+
+
+@dataclass
+class DomainImportReport:
+    """Counts for one import, filled in while the file streams through."""
+
+    created: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: List[Dict[str, object]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.created + self.skipped + self.invalid
+
+    def add_error(self, line: int, value: str, reason: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "value": value[:200], "reason": reason})
+
+
+def _valid_host(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        pass
+    if host == "localhost":
+        return True
+    labels = host.split(".")
+    if len(labels) < 2 or not labels[-1].isalpha():
+        return False
+    return all(
+        label and len(label) <= 63 and not label.startswith("-") and not label.endswith("-")
+        and all(ch.isalnum() or ch == "-" for ch in label)
+        for label in labels
+    )
+
+
+def canonicalize_url(value: str) -> CanonicalURL:
+    """Normalize ``value`` and derive its dedup key.
+
+    The stored URL gets a lowercase scheme (``https`` when missing) and host,
+    no default port, no fragment (hash routes such as ``/#/contact`` are
+    client-side only) and no trailing slash. The key additionally drops the
+    scheme and a leading ``www.``, so ``http://www.Example.com/`` and
+    ``https://example.com/#/contact`` are the same domain.
+    """
+    raw = (value or "").strip()
+    if not raw:
+        raise InvalidDomainURL("empty URL")
+    if "://" not in raw:
+        raw = f"https://{raw.lstrip('/')}"
+    try:
+        parts = urlsplit(raw)
+        port = parts.port
+    except ValueError as exc:
+        raise InvalidDomainURL(str(exc)) from exc
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS:
+        raise InvalidDomainURL(f"unsupported scheme '{scheme}'")
+    host = (parts.hostname or "").rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii").lower()
+    except UnicodeError as exc:
+        raise InvalidDomainURL("invalid host") from exc
+    if not _valid_host(host):
+        raise InvalidDomainURL("invalid host")
+
+    netloc = host if port in (None, _DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    path = parts.path.rstrip("/")
+    url = urlunsplit((scheme, netloc, path, parts.query, ""))
+    if len(url) > MAX_URL_LENGTH:
+        raise InvalidDomainURL(f"URL longer than {MAX_URL_LENGTH} characters")
+
+    key_host = netloc[4:] if netloc.startswith("www.") else netloc
+    key = key_host + path + (f"?{parts.query}" if parts.query else "")
+    return CanonicalURL(url=url, key=key)
+
+
+def _parse_bool(value: object, default: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower() if value is not None else ""
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    return default
+
+
+def _row_fields(record: Dict[str, object]) -> Tuple[object, object, object]:
+    """Pick url/category/active out of a record using the export's or the API's column names."""
+    lowered = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    url = lowered.get("url") or lowered.get("domain") or lowered.get("website")
+    active = lowered.get("isactive", lowered.get("is_active", lowered.get("active")))
+    return url, lowered.get("category"), active
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """``ndjson`` for .ndjson/.jsonl files or JSON content types, ``csv`` otherwise."""
+    name = (filename or "").lower()
+    media = (content_type or "").split(";", 1)[0].strip().lower()
+    if name.endswith((".ndjson", ".jsonl", ".json")) or media in (
+        "application/x-ndjson", "application/jsonl", "application/json",
+    ):
+        return "ndjson"
+    return "csv"
+
+
+def _iter_csv(text: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, object]]]:
+    reader = csv.reader(text)
+    header: Optional[List[str]] = None
+    for row in reader:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            names = [cell.strip().lower() for cell in row]
+            if {"url", "domain", "website"} & set(names):
+                header = names
+                continue
+            header = ["url"]  # Headerless list of URLs
+        yield reader.line_num, dict(zip(header, row))
+
+
+def _iter_ndjson(text: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, object]]]:
+    for line_number, line in enumerate(text, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, {"_invalid": line}
+            continue
+        if isinstance(record, str):
+            record = {"url": record}
+        yield line_number, record if isinstance(record, dict) else {"_invalid": line}
+
+
+def iter_import_rows(
+    stream: BinaryIO,
+    report: DomainImportReport,
+    *,
+    fmt: str = "csv",
+    default_category: Optional[str] = None,
+    default_active: bool = True,
+) -> Iterator[DomainImportRow]:
+    """Yield canonical rows from a CSV or NDJSON byte stream, one line at a time.
+
+    Rows that cannot be imported are counted (and sampled) in ``report`` instead
+    of being yielded.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    records = _iter_ndjson(text) if fmt == "ndjson" else _iter_csv(text)
+    try:
+        for line, record in records:
+            if "_invalid" in record:
+                report.add_error(line, str(record["_invalid"]), "not a JSON object")
+                continue
+            url, category, active = _row_fields(record)
+            try:
+                canonical = canonicalize_url(str(url) if url is not None else "")
+            except InvalidDomainURL as exc:
+                report.add_error(line, str(url or ""), str(exc))
+                continue
+            category_text = str(category).strip() if category not in (None, "") else default_category
+            yield DomainImportRow(
+                line=line,
+                url=canonical.url,
+                url_key=canonical.key,
+                category=category_text[:MAX_CATEGORY_LENGTH] if category_text else None,
+                is_active=_parse_bool(active, default_active),
+            )
+    finally:
+        text.detach()
@@ -0,0 +1,49 @@
+"""Bulk domain import parsing tests."""
+
+import io
+
+import pytest
+
+from app.services.domain_import import DomainImportReport, InvalidDomainURL, canonicalize_url, iter_import_rows
+
+
+def test_canonical_key_ignores_scheme_www_slash_and_fragment() -> None:
+    """Spellings of the same site collapse to one key; the stored URL stays usable."""
+    keys = {
+        canonicalize_url(url).key
+        for url in ("https://www.offsure.com/#/contact", "http://offsure.com/", "OFFSURE.com", "https://offsure.com:443")
+    }
+    assert keys == {"offsure.com"}
+    assert canonicalize_url("www.Example.com/contact-us/").url == "https://www.example.com/contact-us"
+
+
+@pytest.mark.parametrize("value", ["", "not a url", "ftp://example.com", "https://exa_mple.com"])
+def test_invalid_urls_are_rejected(value: str) -> None:
+    with pytest.raises(InvalidDomainURL):
+        canonicalize_url(value)
+
+
+def test_csv_export_rows_are_streamed_and_counted() -> None:
+    """Export columns are mapped and bad rows are reported with their line number."""
+    data = (
+        "url,category,customMessage,isActive\n"
+        "https://teqtop.com,Technology,Hello,true\n"
+        "nope,,,true\n"
+        "https://www.zsy6688.com/,,,false\n"
+    ).encode()
+    report = DomainImportReport()
+    rows = list(iter_import_rows(io.BytesIO(data), report, default_category="domains"))
+    assert [(row.url_key, row.category, row.is_active) for row in rows] == [
+        ("teqtop.com", "Technology", True),
+        ("zsy6688.com", "domains", False),
+    ]
+    assert report.invalid == 1
+    assert report.errors[0]["line"] == 3
+
+
+def test_ndjson_rows() -> None:
+    report = DomainImportReport()
+    data = b'{"url": "a.com", "is_active": false}\n"b.com"\n[1]\n'
+    rows = list(iter_import_rows(io.BytesIO(data), report, fmt="ndjson"))
+    assert [(row.url, row.is_active) for row in rows] == [("https://a.com", False), ("https://b.com", True)]
+    assert report.invalid == 1
@@ -0,0 +1,68 @@
+"""Stage metrics endpoint tests."""
+
+import importlib.util
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import BUCKETS, PROMETHEUS_CONTENT_TYPE, QUANTILES, StageMetrics
+from app.main import app
+
+
+def test_stage_timings_are_exported() -> None:
+    """Reported stage timings show up as Prometheus histograms and quantiles."""
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/metrics/stages",
+        json={
+            "stages": [{"stage": "page_load", "seconds": 1.5, "bytes": 2048, "evaluate_calls": 3}],
+            "total_seconds": 12.0,
+            "status": "success",
+        },
+    )
+    assert response.status_code == 204
+
+    response = client.get("/api/v1/metrics/")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'teq_submission_stage_duration_seconds_bucket{stage="page_load",le="2.5"}' in body
+    assert 'teq_submission_stage_duration_quantile_seconds{stage="page_load",quantile="0.95"}' in body
+    assert 'teq_submission_runs_total{status="success"}' in body
+
+
+def test_quantiles() -> None:
+    """p50/p95/p99 come from the recorded samples."""
+    metrics = StageMetrics()
+    for seconds in range(1, 101):
+        metrics.observe("captcha", float(seconds))
+    quantiles = metrics.quantiles("captcha")
+    assert quantiles[0.5] == 51.0
+    assert quantiles[0.95] == 95.0
+    assert quantiles[0.99] == 99.0
+
+
+def _worker_stage_timing():
+    """Load the automation worker's ``stage_timing`` module by path (it is not a package)."""
+    path = Path(__file__).resolve().parents[2] / "automation" / "submission" / "stage_timing.py"
+    spec = importlib.util.spec_from_file_location("teq_stage_timing", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_matches_worker_histograms() -> None:
+    """The backend copy keeps the worker's buckets, quantiles and exposition output."""
+    stage_timing = _worker_stage_timing()
+    assert BUCKETS == stage_timing.BUCKETS
+    assert QUANTILES == stage_timing.QUANTILES
+    assert PROMETHEUS_CONTENT_TYPE == stage_timing.PROMETHEUS_CONTENT_TYPE
+
+    backend, worker = StageMetrics(), stage_timing.StageHistograms()
+    for seconds in (0.03, 0.4, 1.0, 7.5, 45.0, 400.0):
+        backend.observe("page_load", seconds, 1024, 2)
+        worker.observe("page_load", seconds, 1024, 2)
+    backend.count_run("success")
+    worker.count_run("success")
+    assert backend.quantiles("page_load") == worker.quantiles("page_load")
+    assert backend.render_prometheus() == worker.render_prometheus()
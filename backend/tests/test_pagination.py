@@ -0,0 +1,29 @@
+"""Keyset pagination cursor tests."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, next_cursor
+
+
+def test_cursor_round_trip() -> None:
+    created_at = datetime(2026, 4, 1, 11, 19, 46, 210000, tzinfo=timezone.utc)
+    token = encode_cursor(created_at, 1455)
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 1455)
+
+
+def test_invalid_cursor() -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+
+
+def test_next_cursor_uses_look_ahead_row() -> None:
+    """A page only gets a cursor when the extra row fetched past ``limit`` exists."""
+    rows = [SimpleNamespace(id=i, created_at=datetime(2026, 1, 1, tzinfo=timezone.utc)) for i in (5, 4, 3)]
+    page, cursor = next_cursor(rows, 2)
+    assert [row.id for row in page] == [5, 4]
+    assert decode_cursor(cursor)[1] == 4
+    assert next_cursor(rows, 3) == (rows, None)
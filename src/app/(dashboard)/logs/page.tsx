@@ -245,6 +245,25 @@ export default function LogsPage() {
     for (const line of message.split("\n")) {
       if (!line.startsWith(CHECKPOINT_PREFIX)) continue;
 
+      // JSON-lines mode (TEQ_LOG_FORMAT=jsonl): CHECKPOINT|{"step":..,"status":..,"title":..,"detail":..}
+      const payload = line.slice(CHECKPOINT_PREFIX.length);
+      if (payload.startsWith("{")) {
+        try {
+          const event = JSON.parse(payload);
+          const step = Number(event.step);
+          if (Number.isNaN(step)) continue;
+          checkpoints.set(step, {
+            step,
+            status: event.status || "pending",
+            title: event.title || `Step ${step}`,
+            detail: event.detail || "",
+          });
+        } catch {
+          // Ignore malformed checkpoint payloads
+        }
+        continue;
+      }
+
       const [, stepRaw = "", status = "", title = "", detail = ""] = line.split("|");
       const step = Number(stepRaw);
       if (Number.isNaN(step)) continue;
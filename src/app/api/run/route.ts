@@ -3,10 +3,13 @@ import { spawn } from "node:child_process";
 import { mkdtemp, writeFile, rm } from "node:fs/promises";
 import os from "node:os";
 import path from "node:path";
+import type { Readable } from "node:stream";
 import type { Prisma } from "@prisma/client";
 
 import { markBatchItemRunning, refreshBatchRunCounts, syncBatchRunItemFromSubmissionLog } from "@/lib/automation-batches";
 import { prisma } from "@/lib/prisma";
+import { PROGRESS_FD, ProgressDecoder, renderCheckpointLines, type ProgressCheckpoint } from "@/lib/progress-channel";
+import { reportStageTimings } from "@/lib/stage-metrics";
 import { clearRunningSubmission, getSubmissionStopReason, registerRunningSubmission, stopRunningSubmission } from "@/lib/running-submissions";
 
 export const runtime = "nodejs";
@@ -99,6 +102,20 @@ export async function POST(req: NextRequest) {
     // Browser runs in background (headless=false with virtual display)
     const reuseBrowser = template.reuse_browser ?? template.reuseBrowser ?? false;
     
+    // Browser mode for the script: "auto" runs headless and escalates to a visible browser (on its own
+    // Xvfb display) only for interactive CAPTCHA widgets; "headless" never shows one; "visible" always does
+    const requestedBrowserMode = String(template.browser_mode ?? template.browserMode ?? process.env.TEQ_BROWSER_MODE ?? "").toLowerCase();
+    let browserMode: "auto" | "headless" | "visible";
+    if (reuseBrowser) {
+      browserMode = "visible";
+    } else if (requestedBrowserMode === "auto" || requestedBrowserMode === "headless" || requestedBrowserMode === "visible") {
+      browserMode = requestedBrowserMode;
+    } else if (templateHeadless !== undefined) {
+      browserMode = templateHeadless ? "headless" : "visible";
+    } else {
+      browserMode = forceHeadless ? "headless" : "auto";
+    }
+    
     // Fetch custom message from domain if domainId is provided
     let customMessage = null;
     if (domainIdValue) {
@@ -134,6 +151,7 @@ export async function POST(req: NextRequest) {
       headless: reuseBrowser ? false : shouldUseHeadless,
       use_virtual_display: reuseBrowser ? true : useVirtualDisplay, // Always use virtual display in reuse mode
       reuse_browser: reuseBrowser, // Enable browser reuse (single tab mode)
+      browser_mode: browserMode,
       use_auto_detect: template.use_auto_detect ?? (!hasFields), // Auto-detect if no fields provided
       test_data: {
         ...(baseTestData as Record<string, unknown>),
@@ -231,9 +249,10 @@ export async function POST(req: NextRequest) {
         const pythonCommand = os.platform() === "win32" ? "python" : "python3";
         
         // Check if xvfb-run is available (doesn't require sudo, just needs to be installed)
-        // This allows visible browser mode on headless servers without Xvfb installation
+        // This allows visible browser mode on headless servers without Xvfb installation.
+        // Headless/auto runs start without a display (auto sets up Xvfb itself only if it escalates).
         let useXvfbRun = false;
-        if (os.platform() !== "win32" && !process.env.DISPLAY) {
+        if (os.platform() !== "win32" && !process.env.DISPLAY && browserMode === "visible") {
           try {
             const { execSync } = require('child_process');
             execSync('which xvfb-run', { stdio: 'ignore', timeout: 2000 });
@@ -345,19 +364,24 @@ export async function POST(req: NextRequest) {
             PYTHONUNBUFFERED: "1", 
             PYTHONIOENCODING: "utf-8",
             // Force immediate output
-            PYTHON_FLUSH: "1"
+            PYTHON_FLUSH: "1",
+            // Checkpoints, timings and the final result arrive as framed JSON on fd 3
+            TEQ_PROGRESS_FD: String(PROGRESS_FD),
           },
-          // Ensure we can capture output immediately
-          stdio: ['ignore', 'pipe', 'pipe']
+          // Ensure we can capture output immediately; fd 3 is the structured progress channel
+          stdio: ['ignore', 'pipe', 'pipe', 'pipe']
         });
+        const pythonStdout = python.stdout!;
+        const pythonStderr = python.stderr!;
+        const progressStream = python.stdio[PROGRESS_FD] as Readable | null;
 
-        python.stdout.setEncoding("utf8");
-        python.stderr.setEncoding("utf8");
+        pythonStdout.setEncoding("utf8");
+        pythonStderr.setEncoding("utf8");
         registerRunningSubmission(submission.id, python, tempDir);
         
         // Set streams to flowing mode for immediate output
-        python.stdout.resume();
-        python.stderr.resume();
+        pythonStdout.resume();
+        pythonStderr.resume();
 
         let stdout = "";
         let stderr = "";
@@ -366,15 +390,37 @@ export async function POST(req: NextRequest) {
         let processStartTime = Date.now();
         let hasReceivedAnyOutput = false;
 
+        // Structured progress: no scanning of stderr for checkpoints or of stdout for the result
+        const checkpoints = new Map<number, ProgressCheckpoint>();
+        let progressResult: Record<string, unknown> | null = null;
+        const withCheckpoints = (logs: string) => {
+          const lines = renderCheckpointLines(checkpoints);
+          return lines ? `${lines}\n${logs}` : logs;
+        };
+        if (progressStream) {
+          const decoder = new ProgressDecoder();
+          progressStream.on("data", (chunk: Buffer) => {
+            hasReceivedAnyOutput = true;
+            for (const event of decoder.push(chunk)) {
+              if (event.type === "checkpoint") {
+                checkpoints.set(event.step, event);
+              } else if (event.type === "result") {
+                progressResult = event.result;
+              }
+            }
+          });
+          progressStream.on("error", () => undefined);
+        }
+
         // Handle stdout
-        python.stdout.on("data", async (chunk) => {
+        pythonStdout.on("data", async (chunk) => {
           stdout += chunk;
           hasReceivedAnyOutput = true;
         });
 
         // Handle stderr - update database immediately for EVERY chunk (no delay)
         // CRITICAL: Update on every chunk to show real-time progress
-        python.stderr.on("data", async (chunk) => {
+        pythonStderr.on("data", async (chunk) => {
           stderr += chunk;
           hasReceivedAnyOutput = true;
           
@@ -384,7 +430,7 @@ export async function POST(req: NextRequest) {
             await prisma.submissionLog.update({
               where: { id: submission.id },
               data: {
-                message: stderr || "Automation in progress...",
+                message: withCheckpoints(stderr || "Automation in progress..."),
               },
             });
             lastLogUpdate = Date.now();
@@ -509,8 +555,8 @@ export async function POST(req: NextRequest) {
       return;
     }
 
-    // Try to extract JSON from stdout (might be mixed with logs)
-    let parsed: any = null;
+    // Prefer the result delivered on the progress channel; fall back to extracting JSON from stdout
+    let parsed: any = progressResult;
     let jsonStart = -1;
     let jsonEnd = -1;
     
@@ -518,7 +564,7 @@ export async function POST(req: NextRequest) {
     const stdoutTrimmed = stdout.trim();
     
     // Try to find JSON object boundaries
-    jsonStart = stdoutTrimmed.lastIndexOf("{");
+    jsonStart = parsed ? -1 : stdoutTrimmed.lastIndexOf("{");
     if (jsonStart !== -1) {
       // Find matching closing brace
       let braceCount = 0;
@@ -546,6 +592,7 @@ export async function POST(req: NextRequest) {
 
     // If we found valid JSON, use it regardless of exit code
     if (parsed && typeof parsed === "object") {
+      void reportStageTimings(parsed);
       // CRITICAL: Respect the status from Python script - never override it
       let finalStatus: string;
       if (parsed.status === "timeout") {
@@ -588,7 +635,7 @@ export async function POST(req: NextRequest) {
         completeLogs = stdoutTrimmed || "No logs available - process may have completed too quickly";
       }
       
-      const finalMessage = completeLogs.trim();
+      const finalMessage = withCheckpoints(completeLogs.trim());
       
       await prisma.submissionLog.update({
         where: { id: submission.id },
@@ -0,0 +1,62 @@
+// Decoder for the automation script's progress channel (see automation/submission/progress_channel.py).
+// Each frame is a 4-byte big-endian length followed by UTF-8 JSON.
+
+export const PROGRESS_FD = 3;
+
+export type ProgressCheckpoint = {
+  type: "checkpoint";
+  step: number;
+  status: string;
+  title: string;
+  detail: string;
+  ts: number;
+  elapsed_seconds?: number;
+};
+
+export type ProgressTiming = {
+  type: "timing";
+  stage: string;
+  seconds: number;
+  ts: number;
+  [key: string]: unknown;
+};
+
+export type ProgressResult = {
+  type: "result";
+  result: Record<string, unknown>;
+  ts: number;
+};
+
+export type ProgressEvent = ProgressCheckpoint | ProgressTiming | ProgressResult;
+
+export class ProgressDecoder {
+  private buffer: Buffer = Buffer.alloc(0);
+
+  push(chunk: Buffer): ProgressEvent[] {
+    this.buffer = this.buffer.length === 0 ? chunk : Buffer.concat([this.buffer, chunk]);
+    const events: ProgressEvent[] = [];
+    let offset = 0;
+    while (this.buffer.length - offset >= 4) {
+      const length = this.buffer.readUInt32BE(offset);
+      const end = offset + 4 + length;
+      if (end > this.buffer.length) break;
+      try {
+        events.push(JSON.parse(this.buffer.toString("utf8", offset + 4, end)) as ProgressEvent);
+      } catch {
+        // Skip a malformed frame; the length prefix keeps the stream in sync
+      }
+      offset = end;
+    }
+    this.buffer = this.buffer.subarray(offset);
+    return events;
+  }
+}
+
+// Checkpoints rendered in the CHECKPOINT|step|status|title|detail form the logs page parses
+export function renderCheckpointLines(checkpoints: Map<number, ProgressCheckpoint>): string {
+  const clean = (value: string | undefined) => (value ?? "").replace(/\|/g, "/").replace(/\n/g, " ");
+  return Array.from(checkpoints.values())
+    .sort((a, b) => a.step - b.step)
+    .map((checkpoint) => `CHECKPOINT|${checkpoint.step}|${clean(checkpoint.status)}|${clean(checkpoint.title)}|${clean(checkpoint.detail)}`)
+    .join("\n");
+}
@@ -1,8 +1,7 @@
-import type { ChildProcessByStdio } from "node:child_process";
-import type { Readable } from "node:stream";
+import type { ChildProcess } from "node:child_process";
 
 type StopReason = "pause" | "cancel";
-type ManagedChildProcess = ChildProcessByStdio<null, Readable, Readable>;
+type ManagedChildProcess = ChildProcess;
 
 type RunningSubmission = {
   process: ManagedChildProcess;
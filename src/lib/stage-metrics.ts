@@ -0,0 +1,33 @@
+// Forwards a run's per-stage timings to the FastAPI backend's metrics endpoint
+// (POST /api/v1/metrics/stages) when TEQ_METRICS_URL is configured.
+
+type StageTimings = {
+  stages?: Array<{ stage: string; seconds: number; bytes?: number; evaluate_calls?: number; status?: string }>;
+  total_seconds?: number;
+};
+
+export async function reportStageTimings(result: Record<string, unknown> | null | undefined) {
+  const endpoint = process.env.TEQ_METRICS_URL;
+  const timings = result?.stage_timings as StageTimings | undefined;
+  if (!endpoint || !timings?.stages?.length) return;
+
+  const headers: Record<string, string> = { "Content-Type": "application/json" };
+  if (process.env.TEQ_METRICS_API_KEY) {
+    headers["X-API-Key"] = process.env.TEQ_METRICS_API_KEY;
+  }
+
+  try {
+    await fetch(endpoint, {
+      method: "POST",
+      headers,
+      body: JSON.stringify({
+        stages: timings.stages,
+        total_seconds: timings.total_seconds,
+        status: typeof result?.status === "string" ? result.status : undefined,
+      }),
+      signal: AbortSignal.timeout(3000),
+    });
+  } catch {
+    // Metrics are best-effort and must never affect the run
+  }
+}